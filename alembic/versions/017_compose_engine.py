@@ -0,0 +1,18 @@
+"""Add per-job compose_engine to ugc_jobs
+
+Revision ID: 017
+Revises: 016
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "017"
+down_revision = "016"
+
+
+def upgrade():
+    op.add_column("ugc_jobs", sa.Column("compose_engine", sa.String(20), nullable=True))
+
+
+def downgrade():
+    op.drop_column("ugc_jobs", "compose_engine")
@@ -0,0 +1,20 @@
+"""Add render_profile and trim_cuts to ugc_jobs
+
+Revision ID: 018
+Revises: 017
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "018"
+down_revision = "017"
+
+
+def upgrade():
+    op.add_column("ugc_jobs", sa.Column("render_profile", sa.String(20), nullable=True))
+    op.add_column("ugc_jobs", sa.Column("trim_cuts", sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("ugc_jobs", "trim_cuts")
+    op.drop_column("ugc_jobs", "render_profile")
@@ -0,0 +1,18 @@
+"""Add stage_states to ugc_jobs
+
+Revision ID: 019
+Revises: 018
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "019"
+down_revision = "018"
+
+
+def upgrade():
+    op.add_column("ugc_jobs", sa.Column("stage_states", sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("ugc_jobs", "stage_states")
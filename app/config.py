@@ -19,6 +19,8 @@ class Settings(BaseSettings):
     # Celery
     celery_broker_url: str = "sqla+sqlite:///celery_broker.db"
     celery_result_backend: str = "db+sqlite:///celery_results.db"
+    celery_dedicated_queues: bool = True  # route tasks to llm/image/video_gen/render queues (false: all but render on "celery")
+    job_events_poll_seconds: float = 1.0  # without Redis: how often each watched job is re-read for worker updates (SSE)
 
     # API
     api_secret_key: str
@@ -38,6 +40,20 @@ class Settings(BaseSettings):
     # Output
     output_dir: str = "output"
 
+    # Composition
+    compose_engine: str = "moviepy"  # moviepy/ffmpeg (per-job override via UGCJob.compose_engine)
+    compose_output_variants: str = "final,aroll"  # comma list of ugc_compositor.OUTPUT_VARIANTS keys
+    compose_review_profile: str = "draft"  # RENDER_PROFILES key for the stage 5 review render; master renders on approve
+    compose_incremental: bool = True  # ffmpeg engine: re-encode only timeline segments whose inputs changed
+    compose_workers: int = 1  # ffmpeg engine: timeline windows encoded in parallel processes (opt-in, >1)
+    task_db_pool_size: int = 2  # pooled DB connections per Celery worker thread (each has its own event loop)
+    task_db_echo: bool = False  # log SQL issued by Celery tasks
+    ugc_parallel_stages: bool = True  # run independent stages (B-Roll images alongside A-Roll) concurrently
+    ugc_slot_fanout: bool = True  # one Celery subtask per A-Roll scene / B-Roll shot, joined by a chord (needs the result backend)
+    ingest_workers: int = 2  # parallel normalize processes per ugc_ingest_clips task
+    upload_max_mb: int = 2048  # max declared size of a resumable upload
+    upload_session_ttl_hours: float = 24  # resumable upload sessions idle this long are deleted
+
     # Landing Page Generation
     lp_color_scheme: str = "research"  # Options: "extract", "research", "preset"
     lp_color_preset: str = ""  # Preset palette name when lp_color_scheme=preset
@@ -51,6 +67,18 @@ class Settings(BaseSettings):
     veo_quota_rpd: int = 10
     imagen_quota_rpm: int = 20
     imagen_quota_rpd: int = 100
+    imagen_concurrency: int = 4  # Independent Imagen prompts of a batch in flight at once (capped at imagen_quota_rpm)
+    image_regen_candidates: int = 2  # Images per slot on "regenerate all" (one request, 1-4); extras land in history
+    image_cache_enabled: bool = False  # Reuse Imagen outputs for identical requests (output/image_cache)
+    image_cache_max_mb: int = 1024  # LRU-evict cached images beyond this size
+    clip_cache_enabled: bool = True  # Reuse Veo clips for identical requests (output/clip_cache); regens bypass
+    clip_cache_max_mb: int = 4096  # LRU-evict cached clips beyond this size
+    llm_cache_enabled: bool = True  # Reuse Gemini responses for identical requests (Redis, else output/llm_cache.sqlite3); regens bypass
+    llm_cache_ttl_hours: int = 168  # Cached LLM responses expire after this long (0 = never)
+    llm_cache_max_entries: int = 5000  # LRU-evict cached LLM responses beyond this count (0 = unbounded)
+    quota_max_wait_seconds: int = 300  # Longest a Veo/Imagen call waits for a quota slot before failing
+    veo_concurrency: int = 4  # Veo clips generated in parallel per stage (capped at veo_quota_rpm)
+    veo_download_retries: int = 5  # Resume attempts (HTTP Range) when a finished clip's download drops
 
     # Cloudflare Pages Deployment
     cf_api_token: str = ""             # CLOUDFLARE_API_TOKEN for wrangler auth
@@ -36,14 +36,20 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
 
 
 def get_task_session_factory():
-    """Create a fresh async session factory for Celery task contexts.
-
-    Celery workers (especially with prefork pool) run asyncio.run() which
-    creates a new event loop. The module-level engine's connection pool is
-    bound to the import-time event loop, causing 'attached to a different
-    loop' errors with asyncpg. This function creates a fresh engine with
-    NullPool (no connection reuse) to avoid the conflict.
+    """Async session factory for Celery task contexts.
+
+    Tasks run on their worker thread's long-lived loop (app.task_runtime),
+    which owns a pooled engine bound to that loop; its factory is returned.
+    The module-level engine cannot be used there: its pool is bound to the
+    import-time event loop ('attached to a different loop' with asyncpg).
+    Outside a task runtime (e.g. a script calling asyncio.run()) a fresh
+    NullPool engine is created as before.
     """
+    from app.task_runtime import current_session_factory
+
+    factory = current_session_factory()
+    if factory is not None:
+        return factory
     task_engine = create_async_engine(
         settings.database_url,
         echo=True,
@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text, select
 from contextlib import asynccontextmanager
 from pathlib import Path
+import asyncio
 import os
 import time
 from collections import defaultdict
@@ -15,6 +16,7 @@ from app.ui import router as ui_router
 from app.config import get_settings
 from app import ugc_router
 from app.schemas import WaitlistSubmit
+from app.services.uploads import expire_uploads_periodically
 
 settings = get_settings()
 
@@ -57,7 +59,10 @@ _limiter = _RateLimiter(requests_per_minute=60)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("Starting ViralForge API...")
+    # Delete abandoned resumable upload sessions at startup and hourly
+    upload_cleanup = asyncio.create_task(expire_uploads_periodically())
     yield
+    upload_cleanup.cancel()
     print("Shutting down ViralForge API...")
 
 
@@ -117,8 +122,15 @@ async def health_check(session: AsyncSession = Depends(get_session)):
         except Exception as e:
             redis_status = f"error: {str(e)}"
 
+    from app.services import job_events
+    from app.services.registry import registry_stats
+
     overall = "healthy" if db_status == "connected" and redis_status in ("connected", "not configured") else "unhealthy"
-    return {"status": overall, "database": db_status, "redis": redis_status, "version": "1.0.0"}
+    return {
+        "status": overall, "database": db_status, "redis": redis_status, "version": "1.0.0",
+        "providers": registry_stats(),
+        "job_events": {"backend": job_events.get_backend().name, **job_events.get_hub().stats()},
+    }
 
 
 @app.post("/waitlist")
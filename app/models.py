@@ -70,9 +70,11 @@ class UGCJob(Base):
     style_preference = Column(String(100), nullable=True)
     use_mock = Column(Boolean, default=True)  # passed per job, not from settings
     broll_include_creator = Column(Boolean, default=False)  # include A-Roll creator in B-Roll images
+    compose_engine = Column(String(20), nullable=True)  # moviepy/ffmpeg; None = settings.compose_engine
 
     # --- State columns ---
     status = Column(String(50), nullable=False, default="pending")
+    stage_states = Column(JSON, nullable=True)  # {stage: state} per parallel branch; None = linear (pre-019) job
     error_message = Column(Text, nullable=True)
 
     # --- Stage 1: Product Analysis ---
@@ -109,11 +111,13 @@ class UGCJob(Base):
 
     # --- Stage 6: Composition ---
     final_video_path = Column(String(1000), nullable=True)
+    render_profile = Column(String(20), nullable=True)  # draft/final profile of final_video_path; None = final
     cost_usd = Column(Float, nullable=True)
 
     # --- Candidate (regeneration) ---
     candidate_video_path = Column(String(1000), nullable=True)
     trim_history = Column(JSON, nullable=True)  # stack of previous video paths for multi-undo
+    trim_cuts = Column(JSON, nullable=True)  # list[list[{start, end}]] cuts applied, parallel to trim_history
 
     # --- Timestamps ---
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,14 +1,13 @@
 """HeyGen avatar provider implementation."""
 
 import os
-import time
 from uuid import uuid4
 from typing import List, Optional
 
-import httpx
-
 from app.services.avatar_generator.base import AvatarProvider
 from app.services.avatar_generator.mock import MockAvatarProvider
+from app.services.poller import PENDING, get_poller
+from app.services.registry import get_http_client
 
 
 class HeyGenAvatarProvider(AvatarProvider):
@@ -122,10 +121,9 @@ class HeyGenAvatarProvider(AvatarProvider):
             }
         }
 
-        with httpx.Client(timeout=30.0) as client:
-            response = client.post(url, headers=headers, json=payload)
-            response.raise_for_status()
-            result = response.json()
+        response = get_http_client("heygen", timeout=30.0).post(url, headers=headers, json=payload)
+        response.raise_for_status()
+        result = response.json()
 
         video_id = result.get("data", {}).get("video_id")
         if not video_id:
@@ -136,6 +134,8 @@ class HeyGenAvatarProvider(AvatarProvider):
     def _wait_for_completion(self, video_id: str, timeout_seconds: int = 600) -> str:
         """Poll HeyGen API until video generation is complete.
 
+        Polling runs on the shared operation poller with adaptive backoff.
+
         Args:
             video_id: Video ID to poll
             timeout_seconds: Maximum time to wait (default 10 minutes)
@@ -152,33 +152,31 @@ class HeyGenAvatarProvider(AvatarProvider):
             "X-Api-Key": self.api_key
         }
 
-        start_time = time.time()
-        poll_interval = 10  # Poll every 10 seconds
-
-        with httpx.Client(timeout=30.0) as client:
-            while True:
-                elapsed = time.time() - start_time
-                if elapsed > timeout_seconds:
-                    raise TimeoutError(f"HeyGen video generation timed out after {timeout_seconds}s")
+        def check():
+            response = get_http_client("heygen", timeout=30.0).get(url, headers=headers)
+            response.raise_for_status()
+            result = response.json()
 
-                response = client.get(url, headers=headers)
-                response.raise_for_status()
-                result = response.json()
+            status = result.get("data", {}).get("status")
 
-                status = result.get("data", {}).get("status")
+            if status == "completed":
+                video_url = result.get("data", {}).get("video_url")
+                if not video_url:
+                    raise ValueError(f"HeyGen API completed but no video_url: {result}")
+                return video_url
 
-                if status == "completed":
-                    video_url = result.get("data", {}).get("video_url")
-                    if not video_url:
-                        raise ValueError(f"HeyGen API completed but no video_url: {result}")
-                    return video_url
+            elif status == "failed":
+                error = result.get("data", {}).get("error", "Unknown error")
+                raise ValueError(f"HeyGen video generation failed: {error}")
 
-                elif status == "failed":
-                    error = result.get("data", {}).get("error", "Unknown error")
-                    raise ValueError(f"HeyGen video generation failed: {error}")
+            # Status is pending or processing: poll again after a backoff
+            return PENDING
 
-                # Status is pending or processing, wait and retry
-                time.sleep(poll_interval)
+        future = get_poller().submit(check, name=f"HeyGen video {video_id}", timeout=timeout_seconds)
+        try:
+            return future.result()
+        except TimeoutError:
+            raise TimeoutError(f"HeyGen video generation timed out after {timeout_seconds}s") from None
 
     def _download_video(self, video_url: str) -> str:
         """Download video from HeyGen URL to local file.
@@ -192,12 +190,11 @@ class HeyGenAvatarProvider(AvatarProvider):
         filename = f"heygen_{uuid4().hex[:8]}.mp4"
         output_path = os.path.join(self.avatar_dir, filename)
 
-        with httpx.Client(timeout=60.0) as client:
-            response = client.get(video_url)
-            response.raise_for_status()
+        response = get_http_client("heygen", timeout=30.0).get(video_url, timeout=60.0)
+        response.raise_for_status()
 
-            with open(output_path, "wb") as f:
-                f.write(response.content)
+        with open(output_path, "wb") as f:
+            f.write(response.content)
 
         return output_path
 
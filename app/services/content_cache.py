@@ -0,0 +1,173 @@
+"""Content-addressed, size-bounded LRU cache for generated media files.
+
+Generated images and clips are fully determined by their request (model,
+prompt, input file contents, output shape), so an identical request can
+reuse the earlier output instead of spending quota. Keys are a SHA-256
+over the request parts; input files contribute their content hash, not
+their path.
+
+Each cache is a directory with a small SQLite index (last use, size,
+hit/miss counters, bytes served). Hits are hard-linked (or copied) into
+the caller's output dir under a fresh name, so evicting an entry never
+breaks a path already stored on a job. Entries are trimmed to max_bytes,
+least recently used first.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    files TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def _link_or_copy(src: str, dest: str) -> None:
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copy2(src, dest)
+
+
+class ContentCache:
+    """Disk-backed LRU of generated files keyed by request content."""
+
+    def __init__(self, root: str, max_bytes: int, label: str = "cache"):
+        self.root = root
+        self.label = label
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(os.path.join(self.root, INDEX_FILE), timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")  # concurrent readers across workers
+        return conn
+
+    @staticmethod
+    def key(**parts: Any) -> str:
+        """Stable digest of the request parts (JSON-serializable values)."""
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _count(self, conn: sqlite3.Connection, name: str, amount: int = 1) -> None:
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount),
+        )
+
+    def get(self, key: str, dest_dir: str, prefix: str = "cached") -> Optional[List[str]]:
+        """Materialize a cached result into dest_dir, or None on a miss."""
+        conn = self._connect()
+        try:
+            with conn:
+                row = conn.execute("SELECT files, bytes FROM entries WHERE key = ?", (key,)).fetchone()
+                files = json.loads(row[0]) if row else []
+                if not files or not all(os.path.exists(f) for f in files):
+                    if row:  # files removed behind our back
+                        conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    self._count(conn, "misses")
+                    return None
+                conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+                self._count(conn, "hits")
+                self._count(conn, "bytes_served", row[1])
+        finally:
+            conn.close()
+
+        os.makedirs(dest_dir, exist_ok=True)
+        paths = []
+        for src in files:
+            dest = os.path.join(dest_dir, f"{prefix}_{uuid4().hex[:8]}{os.path.splitext(src)[1]}")
+            _link_or_copy(src, dest)
+            paths.append(dest)
+        return paths
+
+    def put(self, key: str, paths: List[str]) -> None:
+        """Store generated files under key (replacing any older entry), then evict."""
+        entry_dir = os.path.join(self.root, key[:2])
+        os.makedirs(entry_dir, exist_ok=True)
+        files = []
+        for n, src in enumerate(paths):
+            dest = os.path.join(entry_dir, f"{key}_{n}{os.path.splitext(src)[1]}")
+            tmp = f"{dest}.{os.getpid()}.tmp"
+            _link_or_copy(src, tmp)
+            os.replace(tmp, dest)
+            files.append(dest)
+        size = sum(os.path.getsize(f) for f in files)
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, files, bytes, last_used) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(files), size, time.time()),
+                )
+            self._evict(conn)
+        finally:
+            conn.close()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, files, size in conn.execute(
+            "SELECT key, files, bytes FROM entries ORDER BY last_used"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            for f in json.loads(files):
+                try:
+                    os.remove(f)
+                except OSError:
+                    pass
+            with conn:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        logger.info(f"{self.label}: evicted {evicted} entr{'y' if evicted == 1 else 'ies'}, {total} bytes kept")
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters, bytes served from cache and current size.
+
+        Every hit is one provider request (and its quota) saved.
+        """
+        conn = self._connect()
+        try:
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM entries"
+            ).fetchone()
+        finally:
+            conn.close()
+        return {
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "bytes_served": counters.get("bytes_served", 0),
+            "entries": entries,
+            "bytes": size,
+        }
@@ -3,9 +3,35 @@
 import os
 
 from app.config import get_settings
-from app.services.image_provider.base import ImageProvider
+from app.services.image_provider.base import ImageProvider, ImageRequest
 from app.services.image_provider.mock import MockImageProvider
 from app.services.image_provider.google_imagen import GoogleImagenProvider
+from app.services.registry import get_instance
+
+
+def get_imagen_provider(use_mock: bool = False) -> ImageProvider:
+    """Process-wide Imagen provider (or mock), reused across tasks and threads.
+
+    The real provider is keyed on every setting its client depends on, so
+    rotating the service-account file or changing the model builds a new one.
+    """
+    settings = get_settings()
+    output_dir = getattr(settings, "output_dir", "output")
+    os.makedirs(output_dir, exist_ok=True)
+
+    if use_mock:
+        return get_instance("imagen:mock", (output_dir,), lambda: MockImageProvider(output_dir=output_dir))
+
+    google_api_key = getattr(settings, "google_api_key", "")
+    creds_path = settings.google_application_credentials
+    creds_mtime = os.path.getmtime(creds_path) if creds_path and os.path.exists(creds_path) else None
+    key = (
+        google_api_key, output_dir, settings.imagen_model,
+        settings.vertex_ai_project, settings.vertex_ai_location, creds_path, creds_mtime,
+    )
+    return get_instance(
+        "imagen", key, lambda: GoogleImagenProvider(api_key=google_api_key, output_dir=output_dir)
+    )
 
 
 def get_image_provider() -> ImageProvider:
@@ -16,16 +42,12 @@ def get_image_provider() -> ImageProvider:
     - "imagen": GoogleImagenProvider (requires GOOGLE_API_KEY)
 
     Returns:
-        Configured ImageProvider instance
+        Configured ImageProvider instance (shared, see get_imagen_provider)
     """
     settings = get_settings()
 
     # Get provider type from settings (default to mock)
     provider_type = getattr(settings, "image_provider_type", "mock")
-    output_dir = getattr(settings, "output_dir", "output")
-
-    # Ensure output directory exists
-    os.makedirs(output_dir, exist_ok=True)
 
     # Create provider based on type
     if provider_type == "imagen":
@@ -34,16 +56,18 @@ def get_image_provider() -> ImageProvider:
         if not google_api_key:
             print("Warning: IMAGE_PROVIDER_TYPE is 'imagen' but GOOGLE_API_KEY "
                   "is empty. Using mock provider.")
-            return MockImageProvider(output_dir=output_dir)
-        return GoogleImagenProvider(api_key=google_api_key, output_dir=output_dir)
+            return get_imagen_provider(use_mock=True)
+        return get_imagen_provider()
     else:
         # Default to mock for local development
-        return MockImageProvider(output_dir=output_dir)
+        return get_imagen_provider(use_mock=True)
 
 
 __all__ = [
     "ImageProvider",
+    "ImageRequest",
     "MockImageProvider",
     "GoogleImagenProvider",
-    "get_image_provider"
+    "get_image_provider",
+    "get_imagen_provider",
 ]
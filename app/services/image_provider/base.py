@@ -1,7 +1,39 @@
 """Abstract base class for image providers."""
 
+import logging
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Most images a single Imagen request may return
+MAX_CANDIDATES = 4
+
+
+@dataclass
+class ImageRequest:
+    """One independent prompt in a generate_batch() call."""
+
+    prompt: str
+    width: int = 1024
+    height: int = 1024
+    reference_images: Optional[List[str]] = None
+    # Extra generate_image() keyword arguments (force_new, subject_type, extra_refs, ...)
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+def batch_workers() -> int:
+    """How many Imagen requests a batch may have in flight.
+
+    settings.imagen_concurrency, capped at imagen_quota_rpm; each request
+    still waits for its own quota slot.
+    """
+    settings = get_settings()
+    return max(1, min(settings.imagen_concurrency, settings.imagen_quota_rpm or settings.imagen_concurrency))
 
 
 class ImageProvider(ABC):
@@ -42,3 +74,56 @@ class ImageProvider(ABC):
             True if resolution is supported
         """
         pass
+
+    def generate_batch(
+        self,
+        requests: List[ImageRequest],
+        candidates: int = 1,
+        max_workers: Optional[int] = None,
+        on_result: Optional[Callable[[int, List[str] | Exception], None]] = None,
+    ) -> List[List[str] | Exception]:
+        """Generate several independent prompts, each with up to `candidates` images.
+
+        All candidates for one prompt come from a single request
+        (num_images), and the prompts are dispatched concurrently, at most
+        max_workers (default batch_workers()) at a time.
+
+        Args:
+            requests: One ImageRequest per slot
+            candidates: Images per slot, clamped to 1..MAX_CANDIDATES
+            max_workers: Concurrency override
+            on_result: Called as on_result(slot, result) from the worker thread
+                as soon as each slot finishes, in completion order
+
+        Returns:
+            Per slot, in order: the list of generated paths, or the exception
+            that slot raised (one failed slot does not stop the others)
+        """
+        if not requests:
+            return []
+        candidates = max(1, min(candidates, MAX_CANDIDATES))
+        workers = min(max_workers or batch_workers(), len(requests))
+
+        def run(slot: int) -> List[str] | Exception:
+            req = requests[slot]
+            try:
+                result = self.generate_image(
+                    prompt=req.prompt, width=req.width, height=req.height,
+                    num_images=candidates, reference_images=req.reference_images,
+                    **req.options,
+                )
+            except Exception as e:
+                logger.warning(f"Batch image '{req.prompt[:60]}' failed: {e}")
+                result = e
+            if on_result:
+                try:
+                    on_result(slot, result)
+                except Exception as e:
+                    logger.error(f"Batch on_result callback failed for slot {slot}: {e}")
+            return result
+
+        logger.info(f"Generating {len(requests)} image slot(s) x {candidates} candidate(s), {workers} at a time")
+        if workers <= 1:
+            return [run(slot) for slot in range(len(requests))]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-batch") as pool:
+            return list(pool.map(run, range(len(requests))))
@@ -0,0 +1,33 @@
+"""Image generation cache (see app.services.content_cache).
+
+Imagen outputs are keyed on model, prompt, aspect ratio, reference and
+sketch content hashes and subject settings. Opt-in via IMAGE_CACHE_ENABLED.
+"""
+
+import logging
+import os
+import sqlite3
+from typing import Optional
+
+from app.config import get_settings
+from app.services.content_cache import ContentCache
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = "image_cache"
+
+
+def get_image_cache() -> Optional[ContentCache]:
+    """The configured cache, or None when IMAGE_CACHE_ENABLED is off."""
+    settings = get_settings()
+    if not settings.image_cache_enabled:
+        return None
+    try:
+        return ContentCache(
+            os.path.join(settings.output_dir, CACHE_DIR),
+            settings.image_cache_max_mb * 1024 * 1024,
+            label="Image cache",
+        )
+    except sqlite3.Error as e:
+        logger.warning(f"Image cache unavailable, generating directly: {e}")
+        return None
@@ -2,10 +2,8 @@
 
 import logging
 import os
+from typing import Callable, List, Optional
 from uuid import uuid4
-from typing import List, Optional
-
-logger = logging.getLogger(__name__)
 
 from google import genai
 from google.genai import types
@@ -14,8 +12,17 @@ from tenacity import retry, stop_after_attempt, wait_exponential
 
 from app.config import get_settings
 from app.services.image_provider.base import ImageProvider
+from app.services.image_provider.cache import get_image_cache
 from app.services.image_provider.mock import MockImageProvider
 from app.services.quota_tracker import record_imagen_request
+from app.services.ugc_pipeline.probe_index import get_content_hash
+
+logger = logging.getLogger(__name__)
+
+
+def _content_hashes(paths: List[str]) -> List[str]:
+    """Content hashes of input images, for cache keys."""
+    return [get_content_hash(p) for p in paths]
 
 
 def _friendly_error(exc: Exception) -> str:
@@ -99,6 +106,35 @@ class GoogleImagenProvider(ImageProvider):
             self._mock_provider = MockImageProvider(output_dir=self.output_dir)
         return self._mock_provider
 
+    def _cached(
+        self,
+        force_new: bool,
+        prefix: str,
+        generate: Callable[[], List[str]],
+        key_parts: Callable[[], dict],
+    ) -> List[str]:
+        """Return a cached result for this request, else generate() and store it.
+
+        key_parts() must determine the output: model, prompt, aspect ratio and
+        content hashes of every input image. It is only evaluated when the
+        cache is enabled. force_new skips the lookup (a deliberate regen)
+        but still stores the fresh result.
+        """
+        cache = get_image_cache()
+        if cache is None:
+            return generate()
+
+        parts = key_parts()
+        key = cache.key(provider="imagen", **parts)
+        if not force_new:
+            hit = cache.get(key, self.images_dir, prefix=prefix)
+            if hit:
+                logger.info("Imagen cache hit (%s): %s", parts.get("op"), hit)
+                return hit
+        paths = generate()
+        cache.put(key, paths)
+        return paths
+
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=2, min=4, max=30))
     def _generate_with_retry(self, prompt: str, num_images: int, aspect_ratio: str):
         """Generate images with retry logic."""
@@ -133,12 +169,14 @@ class GoogleImagenProvider(ImageProvider):
         subject_type: str = "product",
         subject_description: str = "the product",
         extra_refs: Optional[List[dict]] = None,
+        force_new: bool = False,
     ) -> List[str]:
         """Generate images. Uses subject refs via edit_image when Vertex AI + refs available.
 
         subject_description: Human-readable description of the subject for Imagen.
         extra_refs: Additional references with different subject type.
             Each dict: {"path": str, "subject_type": str, "description": str}
+        force_new: Bypass the image cache (deliberate regeneration).
         """
         if not self.api_key:
             return self.mock_provider.generate_image(
@@ -153,40 +191,58 @@ class GoogleImagenProvider(ImageProvider):
         # Validate extra_refs paths
         valid_extra = [er for er in (extra_refs or []) if os.path.exists(er.get("path", ""))]
 
-        try:
-            if valid_refs and self.supports_edit:
-                try:
-                    response = self._edit_with_subject_refs(
-                        prompt=prompt, reference_paths=valid_refs,
-                        aspect_ratio=aspect_ratio,
-                        subject_type=subject_type,
-                        subject_description=subject_description,
-                        extra_refs=valid_extra or None,
+        def generate() -> List[str]:
+            try:
+                if valid_refs and self.supports_edit:
+                    try:
+                        response = self._edit_with_subject_refs(
+                            prompt=prompt, reference_paths=valid_refs,
+                            aspect_ratio=aspect_ratio,
+                            subject_type=subject_type,
+                            subject_description=subject_description,
+                            extra_refs=valid_extra or None,
+                            num_images=num_images,
+                        )
+                    except Exception as e:
+                        logger.error("Subject-ref edit_image failed after retries: %s", e)
+                        raise
+                else:
+                    response = self._generate_with_retry(
+                        prompt=prompt, num_images=num_images, aspect_ratio=aspect_ratio,
                     )
-                except Exception as e:
-                    logger.error("Subject-ref edit_image failed after retries: %s", e)
-                    raise
-            else:
-                response = self._generate_with_retry(
-                    prompt=prompt, num_images=num_images, aspect_ratio=aspect_ratio,
-                )
 
-            # Save generated images
-            output_paths = []
-            for img in response.generated_images:
-                filename = f"imagen_{uuid4().hex[:8]}.png"
-                output_path = os.path.join(self.images_dir, filename)
-                img.image.save(output_path)
-                output_paths.append(output_path)
+                # Save generated images
+                output_paths = []
+                for img in response.generated_images:
+                    filename = f"imagen_{uuid4().hex[:8]}.png"
+                    output_path = os.path.join(self.images_dir, filename)
+                    img.image.save(output_path)
+                    output_paths.append(output_path)
 
-            logger.info("Imagen generated %d image(s) (aspect_ratio=%s, ~$%.3f)",
-                        len(output_paths), aspect_ratio, 0.04 * num_images)
+                logger.info("Imagen generated %d image(s) (aspect_ratio=%s, ~$%.3f)",
+                            len(output_paths), aspect_ratio, 0.04 * num_images)
 
-            return output_paths
+                return output_paths
 
-        except Exception as e:
-            logger.error("Imagen generation failed: %s: %s", type(e).__name__, e)
-            raise RuntimeError(_friendly_error(e)) from e
+            except Exception as e:
+                logger.error("Imagen generation failed: %s: %s", type(e).__name__, e)
+                raise RuntimeError(_friendly_error(e)) from e
+
+        return self._cached(force_new, "imagen", generate, lambda: dict(
+            op="generate_image",
+            model=self.model_name,
+            edit_model=get_settings().imagen_edit_model if valid_refs and self.supports_edit else "",
+            prompt=prompt,
+            aspect_ratio=aspect_ratio,
+            num_images=num_images,
+            references=_content_hashes(valid_refs),
+            subject_type=subject_type,
+            subject_description=subject_description,
+            extra_refs=[
+                [get_content_hash(er["path"]), er.get("subject_type"), er.get("description")]
+                for er in valid_extra
+            ],
+        ))
 
     # Map string subject_type to SDK enum
     _SUBJECT_TYPE_MAP = {
@@ -200,11 +256,13 @@ class GoogleImagenProvider(ImageProvider):
     def _edit_with_subject_refs(self, prompt: str, reference_paths: List[str],
                                  aspect_ratio: str, subject_description: str = "the product",
                                  subject_type: str = "product",
-                                 extra_refs: Optional[List[dict]] = None):
+                                 extra_refs: Optional[List[dict]] = None,
+                                 num_images: int = 1):
         """Subject-referenced image generation via Imagen edit_image API.
 
         Uses SubjectReferenceImage to preserve the subject's appearance.
         subject_type: "product", "person", "animal", or "default".
+        num_images: Candidates returned by the one request (1-4).
         extra_refs: Additional refs with different subject type.
             Each dict: {"path": str, "subject_type": str, "description": str}
         """
@@ -252,7 +310,7 @@ class GoogleImagenProvider(ImageProvider):
 
         config = types.EditImageConfig(
             edit_mode=types.EditMode.EDIT_MODE_DEFAULT,
-            number_of_images=1,
+            number_of_images=num_images,
             aspect_ratio=aspect_ratio,
             output_mime_type="image/png",
         )
@@ -313,6 +371,7 @@ class GoogleImagenProvider(ImageProvider):
         subject_description: str = "the product",
         width: int = 720,
         height: int = 1280,
+        force_new: bool = False,
     ) -> List[str]:
         """Generate image using product photos as subject references.
 
@@ -324,27 +383,37 @@ class GoogleImagenProvider(ImageProvider):
 
         aspect_ratio = "9:16" if height > width else ("16:9" if width > height else "1:1")
 
-        try:
-            response = self._edit_with_subject_refs(
-                prompt=prompt,
-                reference_paths=reference_images,
-                aspect_ratio=aspect_ratio,
-                subject_description=subject_description,
-            )
+        def generate() -> List[str]:
+            try:
+                response = self._edit_with_subject_refs(
+                    prompt=prompt,
+                    reference_paths=reference_images,
+                    aspect_ratio=aspect_ratio,
+                    subject_description=subject_description,
+                )
+
+                output_paths = []
+                for img in response.generated_images:
+                    filename = f"imagen_ref_{uuid4().hex[:8]}.png"
+                    output_path = os.path.join(self.images_dir, filename)
+                    img.image.save(output_path)
+                    output_paths.append(output_path)
 
-            output_paths = []
-            for img in response.generated_images:
-                filename = f"imagen_ref_{uuid4().hex[:8]}.png"
-                output_path = os.path.join(self.images_dir, filename)
-                img.image.save(output_path)
-                output_paths.append(output_path)
+                logger.info("Imagen subject-ref: generated %d image(s)", len(output_paths))
+                return output_paths
 
-            logger.info("Imagen subject-ref: generated %d image(s)", len(output_paths))
-            return output_paths
+            except Exception as e:
+                logger.error("Subject-ref generation failed: %s: %s", type(e).__name__, e)
+                raise RuntimeError(_friendly_error(e)) from e
 
-        except Exception as e:
-            logger.error("Subject-ref generation failed: %s: %s", type(e).__name__, e)
-            raise RuntimeError(_friendly_error(e)) from e
+        return self._cached(force_new, "imagen_ref", generate, lambda: dict(
+            op="generate_with_references",
+            model=get_settings().imagen_edit_model,
+            prompt=prompt,
+            aspect_ratio=aspect_ratio,
+            references=_content_hashes(reference_images),
+            subject_description=subject_description,
+        ))
 
     def generate_from_sketch(
         self,
@@ -352,6 +421,7 @@ class GoogleImagenProvider(ImageProvider):
         sketch_path: str,
         width: int = 720,
         height: int = 1280,
+        force_new: bool = False,
     ) -> List[str]:
         """Generate image guided by a hand-drawn sketch.
 
@@ -362,26 +432,35 @@ class GoogleImagenProvider(ImageProvider):
 
         aspect_ratio = "9:16" if height > width else ("16:9" if width > height else "1:1")
 
-        try:
-            response = self._edit_with_sketch(
-                prompt=prompt,
-                sketch_path=sketch_path,
-                aspect_ratio=aspect_ratio,
-            )
+        def generate() -> List[str]:
+            try:
+                response = self._edit_with_sketch(
+                    prompt=prompt,
+                    sketch_path=sketch_path,
+                    aspect_ratio=aspect_ratio,
+                )
 
-            output_paths = []
-            for img in response.generated_images:
-                filename = f"imagen_sketch_{uuid4().hex[:8]}.png"
-                output_path = os.path.join(self.images_dir, filename)
-                img.image.save(output_path)
-                output_paths.append(output_path)
+                output_paths = []
+                for img in response.generated_images:
+                    filename = f"imagen_sketch_{uuid4().hex[:8]}.png"
+                    output_path = os.path.join(self.images_dir, filename)
+                    img.image.save(output_path)
+                    output_paths.append(output_path)
 
-            logger.info("Imagen sketch-guided: generated %d image(s)", len(output_paths))
-            return output_paths
+                logger.info("Imagen sketch-guided: generated %d image(s)", len(output_paths))
+                return output_paths
 
-        except Exception as e:
-            logger.error("Sketch-guided generation failed: %s: %s", type(e).__name__, e)
-            raise RuntimeError(_friendly_error(e)) from e
+            except Exception as e:
+                logger.error("Sketch-guided generation failed: %s: %s", type(e).__name__, e)
+                raise RuntimeError(_friendly_error(e)) from e
+
+        return self._cached(force_new, "imagen_sketch", generate, lambda: dict(
+            op="generate_from_sketch",
+            model=get_settings().imagen_edit_model,
+            prompt=prompt,
+            aspect_ratio=aspect_ratio,
+            sketch=get_content_hash(sketch_path),
+        ))
 
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=2, min=4, max=30))
     def _edit_with_refs_and_sketch(self, prompt: str, reference_paths: List[str],
@@ -445,6 +524,7 @@ class GoogleImagenProvider(ImageProvider):
         subject_description: str = "the product",
         width: int = 720,
         height: int = 1280,
+        force_new: bool = False,
     ) -> List[str]:
         """Generate image combining product subject refs + sketch composition control."""
         if not self.api_key:
@@ -452,28 +532,39 @@ class GoogleImagenProvider(ImageProvider):
 
         aspect_ratio = "9:16" if height > width else ("16:9" if width > height else "1:1")
 
-        try:
-            response = self._edit_with_refs_and_sketch(
-                prompt=prompt,
-                reference_paths=reference_images,
-                sketch_path=sketch_path,
-                aspect_ratio=aspect_ratio,
-                subject_description=subject_description,
-            )
+        def generate() -> List[str]:
+            try:
+                response = self._edit_with_refs_and_sketch(
+                    prompt=prompt,
+                    reference_paths=reference_images,
+                    sketch_path=sketch_path,
+                    aspect_ratio=aspect_ratio,
+                    subject_description=subject_description,
+                )
+
+                output_paths = []
+                for img in response.generated_images:
+                    filename = f"imagen_combo_{uuid4().hex[:8]}.png"
+                    output_path = os.path.join(self.images_dir, filename)
+                    img.image.save(output_path)
+                    output_paths.append(output_path)
 
-            output_paths = []
-            for img in response.generated_images:
-                filename = f"imagen_combo_{uuid4().hex[:8]}.png"
-                output_path = os.path.join(self.images_dir, filename)
-                img.image.save(output_path)
-                output_paths.append(output_path)
+                logger.info("Imagen refs+sketch: generated %d image(s)", len(output_paths))
+                return output_paths
 
-            logger.info("Imagen refs+sketch: generated %d image(s)", len(output_paths))
-            return output_paths
+            except Exception as e:
+                logger.error("Refs+sketch generation failed: %s: %s", type(e).__name__, e)
+                raise RuntimeError(_friendly_error(e)) from e
 
-        except Exception as e:
-            logger.error("Refs+sketch generation failed: %s: %s", type(e).__name__, e)
-            raise RuntimeError(_friendly_error(e)) from e
+        return self._cached(force_new, "imagen_combo", generate, lambda: dict(
+            op="generate_with_refs_and_sketch",
+            model=get_settings().imagen_edit_model,
+            prompt=prompt,
+            aspect_ratio=aspect_ratio,
+            references=_content_hashes(reference_images),
+            sketch=get_content_hash(sketch_path),
+            subject_description=subject_description,
+        ))
 
     def supports_resolution(self, width: int, height: int) -> bool:
         """Check if Imagen provider supports the given resolution."""
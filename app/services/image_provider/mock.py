@@ -41,7 +41,8 @@ class MockImageProvider(ImageProvider):
         width: int = 1024,
         height: int = 1024,
         num_images: int = 1,
-        reference_images: Optional[List[str]] = None
+        reference_images: Optional[List[str]] = None,
+        **kwargs
     ) -> List[str]:
         """Generate solid-color mock images.
 
@@ -51,6 +52,7 @@ class MockImageProvider(ImageProvider):
             height: Image height in pixels
             num_images: Number of images to generate
             reference_images: Ignored by mock provider
+            **kwargs: Real-provider options (subject settings, force_new), ignored
 
         Returns:
             List of paths to generated PNG files
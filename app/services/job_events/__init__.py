@@ -0,0 +1,148 @@
+"""Push-based job progress events for SSE streams.
+
+Tasks call publish(job_id) after committing a status or progress change.
+Redis pub/sub carries the notification when REDIS_URL is set (docker
+mode, across nodes); otherwise an in-process broadcaster does, with a
+per-job DB poll covering workers in other processes (local mode).
+
+In the API process the hub keeps one watcher per job however many SSE
+clients follow it. On each notification it reloads the job once (with
+the caller's load function) and fans the payload out to every client
+whose stream is open; unchanged payloads are not re-sent. New clients
+get the last payload straight away.
+"""
+
+import asyncio
+import contextlib
+import logging
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+
+from app.config import get_settings
+from app.services.job_events.base import JobEventBackend
+from app.services.job_events.local_backend import LocalJobEventBackend
+
+logger = logging.getLogger(__name__)
+
+Payload = Dict[str, Any]
+Loader = Callable[[int], Awaitable[Payload]]
+
+_backend: Optional[JobEventBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> JobEventBackend:
+    """The process-wide backend: Redis if configured and reachable, else in-process."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            redis_url = get_settings().redis_url
+            if redis_url:
+                try:
+                    from app.services.job_events.redis_backend import RedisJobEventBackend
+                    _backend = RedisJobEventBackend(redis_url)
+                except Exception as e:
+                    logger.warning(f"Redis job events unavailable, polling the DB instead: {e}")
+            if _backend is None:
+                _backend = LocalJobEventBackend()
+        return _backend
+
+
+def publish(job_id: int, **event: Any) -> None:
+    """Notify watchers of job_id that it changed. Never raises."""
+    try:
+        get_backend().publish(job_id, {"job_id": job_id, **event})
+    except Exception as e:
+        logger.debug(f"Job {job_id}: event not published: {e}")
+
+
+class _JobFeed:
+    """One job's watcher task and the client queues it feeds."""
+
+    def __init__(self, job_id: int, load: Loader):
+        self.job_id = job_id
+        self.load = load
+        self.clients: Set[asyncio.Queue] = set()
+        self.last: Optional[Payload] = None
+        self.ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def send(self, payload: Payload) -> None:
+        self.last = payload
+        for queue in self.clients:
+            # Only the newest payload matters; replace one the client has not read
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(payload)
+
+    async def refresh(self) -> None:
+        payload = await self.load(self.job_id)
+        if payload != self.last:
+            self.send(payload)
+
+    async def run(self) -> None:
+        try:
+            async for _ in get_backend().watch(self.job_id, self.ready):
+                await self.refresh()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Job {self.job_id}: event watcher stopped: {e}")
+            self.ready.set()
+            # Wake clients so they end their streams instead of hanging
+            self.send({"status": "unavailable", "error": str(e)})
+
+
+class JobEventHub:
+    """Fan-out of job payloads to SSE clients in this process."""
+
+    def __init__(self):
+        self._feeds: Dict[int, _JobFeed] = {}
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, job_id: int, load: Loader) -> AsyncIterator[asyncio.Queue]:
+        """Queue receiving job_id's payloads; the first one arrives immediately.
+
+        load(job_id) builds a payload; it runs once per notification for all
+        clients of the job.
+        """
+        feed = self._feeds.get(job_id)
+        created = feed is None
+        if created:
+            feed = self._feeds[job_id] = _JobFeed(job_id, load)
+            feed.task = asyncio.create_task(feed.run())
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        feed.clients.add(queue)
+        try:
+            if created:
+                # Read only once subscribed, so no change falls in between
+                await feed.ready.wait()
+                if feed.last is None:
+                    await feed.refresh()
+            elif feed.last is not None:
+                queue.put_nowait(feed.last)
+            # else the creating client's first read reaches this queue too
+            yield queue
+        finally:
+            feed.clients.discard(queue)
+            if not feed.clients and self._feeds.get(job_id) is feed:
+                del self._feeds[job_id]
+                feed.task.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        """Jobs watched and SSE clients attached in this process."""
+        return {
+            "jobs": len(self._feeds),
+            "clients": sum(len(f.clients) for f in self._feeds.values()),
+        }
+
+
+_hub: Optional[JobEventHub] = None
+
+
+def get_hub() -> JobEventHub:
+    """The API process's hub (created on first use, on the server's loop)."""
+    global _hub
+    if _hub is None:
+        _hub = JobEventHub()
+    return _hub
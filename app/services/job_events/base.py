@@ -0,0 +1,34 @@
+"""Job event backend interface."""
+
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict
+
+CHANNEL_PREFIX = "viralforge:job-events"
+
+
+def channel(job_id: int) -> str:
+    return f"{CHANNEL_PREFIX}:{job_id}"
+
+
+class JobEventBackend(ABC):
+    """Carries "job changed" notifications from publishers to watchers.
+
+    Events are notifications, not state: a watcher that receives one reloads
+    the job, so a dropped or coalesced event only delays the next update.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def publish(self, job_id: int, event: Dict[str, Any]) -> None:
+        """Send event to every watcher of job_id (sync; callable from any thread)."""
+        pass
+
+    @abstractmethod
+    def watch(self, job_id: int, ready: asyncio.Event) -> AsyncIterator[Dict[str, Any]]:
+        """Yield events for job_id until cancelled.
+
+        Sets ready once events published from then on will be delivered.
+        """
+        pass
@@ -0,0 +1,54 @@
+"""In-process job events with a DB poll fallback, for local mode.
+
+Events published in the API process reach its watchers directly. Celery
+workers run in other processes that this broadcaster cannot reach, so a
+watcher also yields a "poll" tick every JOB_EVENTS_POLL_SECONDS of
+silence; the hub then reloads the job once for all of its streams.
+"""
+
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Dict, Set, Tuple
+
+from app.config import get_settings
+from app.services.job_events.base import JobEventBackend
+
+POLL_EVENT = {"type": "poll"}
+
+
+class LocalJobEventBackend(JobEventBackend):
+    """Broadcaster for watchers in this process."""
+
+    name = "local"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._watchers: Dict[int, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+
+    def publish(self, job_id: int, event: Dict[str, Any]) -> None:
+        with self._lock:
+            watchers = list(self._watchers.get(job_id, ()))
+        for loop, queue in watchers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                pass  # loop already closed; its watcher is going away
+
+    async def watch(self, job_id: int, ready: asyncio.Event) -> AsyncIterator[Dict[str, Any]]:
+        poll_seconds = get_settings().job_events_poll_seconds
+        watcher = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._watchers.setdefault(job_id, set()).add(watcher)
+        try:
+            ready.set()
+            while True:
+                try:
+                    yield await asyncio.wait_for(watcher[1].get(), timeout=poll_seconds)
+                except TimeoutError:
+                    yield POLL_EVENT
+        finally:
+            with self._lock:
+                watchers = self._watchers.get(job_id, set())
+                watchers.discard(watcher)
+                if not watchers:
+                    self._watchers.pop(job_id, None)
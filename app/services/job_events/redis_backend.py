@@ -0,0 +1,44 @@
+"""Redis pub/sub job events for docker mode.
+
+Workers on any node publish to viralforge:job-events:<job_id>; each API
+process holds one subscription per watched job. Nothing is read while no
+event arrives, so an idle open stream costs one idle connection.
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict
+
+from app.services.job_events.base import JobEventBackend, channel
+
+
+class RedisJobEventBackend(JobEventBackend):
+    """Pub/sub channel per job, shared across nodes."""
+
+    name = "redis"
+
+    def __init__(self, redis_url: str):
+        import redis
+
+        self.redis_url = redis_url
+        # Short timeouts: a publish must never hold up a task for long
+        self.client = redis.Redis.from_url(redis_url, socket_timeout=2, socket_connect_timeout=2)
+        self.client.ping()
+
+    def publish(self, job_id: int, event: Dict[str, Any]) -> None:
+        self.client.publish(channel(job_id), json.dumps(event))
+
+    async def watch(self, job_id: int, ready: asyncio.Event) -> AsyncIterator[Dict[str, Any]]:
+        import redis.asyncio as aioredis
+
+        client = aioredis.Redis.from_url(self.redis_url)
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(channel(job_id))
+            ready.set()
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    yield json.loads(message["data"])
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
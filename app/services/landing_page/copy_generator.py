@@ -312,7 +312,7 @@ def regenerate_module(module: str, product_idea: str, target_audience: str) -> d
     prompt = _MODULE_PROMPTS[module].format(
         product_idea=product_idea, target_audience=target_audience
     )
-    llm = get_llm_provider()
+    llm = get_llm_provider(refresh=True)
     raw = llm.generate_text(prompt=prompt, temperature=0.9)
 
     # Parse JSON from response (strip markdown fences if present)
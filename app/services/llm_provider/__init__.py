@@ -3,13 +3,21 @@
 import logging
 from app.config import get_settings
 from app.services.llm_provider.base import LLMProvider
+from app.services.llm_provider.cache import CachedLLMProvider, with_cache
 from app.services.llm_provider.mock import MockLLMProvider
-# GeminiLLMProvider imported lazily in get_llm_provider() — google-genai may not be installed
+from app.services.registry import get_instance
+# GeminiLLMProvider imported lazily in get_gemini_provider() — google-genai may not be installed
 
 logger = logging.getLogger(__name__)
 
 
-def get_llm_provider() -> LLMProvider:
+def get_gemini_provider(api_key: str) -> LLMProvider:
+    """Process-wide GeminiLLMProvider for api_key (one genai client and connection pool)."""
+    from app.services.llm_provider.gemini import GeminiLLMProvider  # noqa: PLC0415
+    return get_instance("llm:gemini", (api_key,), lambda: GeminiLLMProvider(api_key=api_key))
+
+
+def get_llm_provider(refresh: bool = False) -> LLMProvider:
     """Factory function to create LLM provider based on configuration.
 
     Provider is selected based on LLM_PROVIDER_TYPE setting:
@@ -17,6 +25,10 @@ def get_llm_provider() -> LLMProvider:
     - "gemini": GeminiLLMProvider (requires GOOGLE_API_KEY)
 
     Falls back to mock if API key is missing for the selected provider.
+    Real providers are wrapped in the response cache (LLM_CACHE_ENABLED).
+
+    Args:
+        refresh: Regenerate semantics: bypass the cache and store the new response
 
     Returns:
         Configured LLMProvider instance
@@ -35,16 +47,17 @@ def get_llm_provider() -> LLMProvider:
             logger.warning("GOOGLE_API_KEY not set, falling back to MockLLMProvider")
             return MockLLMProvider()
 
-        # Lazy import — only load google-genai when actually needed
-        from app.services.llm_provider.gemini import GeminiLLMProvider  # noqa: PLC0415
-        return GeminiLLMProvider(api_key=google_api_key)
+        return with_cache(get_gemini_provider(google_api_key), refresh=refresh)
     else:
         # Default to mock for local development
         return MockLLMProvider()
 
 
 __all__ = [
+    "CachedLLMProvider",
     "LLMProvider",
     "MockLLMProvider",
-    "get_llm_provider"
+    "get_gemini_provider",
+    "get_llm_provider",
+    "with_cache",
 ]
@@ -0,0 +1,355 @@
+"""Response cache for LLM providers.
+
+Analysis, script and copy calls are pure functions of their request, and a
+resumed or retried job repeats them verbatim. CachedLLMProvider wraps any
+LLMProvider and answers a repeated request from the cache instead of
+calling the model again. Keys are a SHA-256 over model, system prompt,
+prompt, output schema (its JSON schema) and sampling parameters.
+
+Entries expire after LLM_CACHE_TTL_HOURS and are trimmed to
+LLM_CACHE_MAX_ENTRIES, least recently used first. Storage is Redis when
+REDIS_URL is set and reachable (shared by every container), otherwise a
+SQLite file in OUTPUT_DIR. Identical requests issued concurrently within
+a process (Celery's thread pool) share one model call.
+
+Regenerate actions construct the wrapper with refresh=True: the model is
+always called and the fresh answer replaces the cached one.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Type
+
+from pydantic import BaseModel
+
+from app.config import get_settings
+from app.services.llm_provider.base import LLMProvider
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_DB_FILE = "llm_cache.sqlite3"
+REDIS_KEY_PREFIX = "viralforge:llm"
+
+
+class LLMCacheBackend(ABC):
+    """Key/value store for serialized LLM responses."""
+
+    name = "base"
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Cached response for key, or None if missing or expired."""
+
+    @abstractmethod
+    def put(self, key: str, value: str, ttl_seconds: int, max_entries: int) -> None:
+        """Store value under key (0 = no expiry / no entry cap), then evict."""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current entry count."""
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_responses (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_llm_responses_last_used ON llm_responses (last_used);
+CREATE TABLE IF NOT EXISTS llm_counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class SQLiteLLMCacheBackend(LLMCacheBackend):
+    """Host-local cache in <output_dir>/llm_cache.sqlite3."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str = ""):
+        if not path:
+            output_dir = get_settings().output_dir
+            os.makedirs(output_dir, exist_ok=True)
+            path = os.path.join(output_dir, LLM_CACHE_DB_FILE)
+        self.path = path
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _count(self, conn: sqlite3.Connection, name: str) -> None:
+        conn.execute(
+            "INSERT INTO llm_counters (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                row = conn.execute(
+                    "SELECT value FROM llm_responses WHERE key = ? "
+                    "AND (expires_at IS NULL OR expires_at > ?)",
+                    (key, now),
+                ).fetchone()
+                if row:
+                    conn.execute("UPDATE llm_responses SET last_used = ? WHERE key = ?", (now, key))
+                self._count(conn, "hits" if row else "misses")
+            return row[0] if row else None
+        finally:
+            conn.close()
+
+    def put(self, key: str, value: str, ttl_seconds: int, max_entries: int) -> None:
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_responses (key, value, expires_at, last_used) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, value, now + ttl_seconds if ttl_seconds > 0 else None, now),
+                )
+                conn.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (now,))
+                if max_entries > 0:
+                    conn.execute(
+                        "DELETE FROM llm_responses WHERE key IN ("
+                        "SELECT key FROM llm_responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                        (max_entries,),
+                    )
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._connect()
+        try:
+            counters = dict(conn.execute("SELECT name, value FROM llm_counters").fetchall())
+            entries = conn.execute(
+                "SELECT COUNT(*) FROM llm_responses WHERE expires_at IS NULL OR expires_at > ?",
+                (time.time(),),
+            ).fetchone()[0]
+        finally:
+            conn.close()
+        return {"hits": counters.get("hits", 0), "misses": counters.get("misses", 0), "entries": entries}
+
+
+class RedisLLMCacheBackend(LLMCacheBackend):
+    """Cache shared by every container on the same REDIS_URL.
+
+    Responses are plain keys with a Redis TTL; a sorted set scored by last
+    use drives the entry cap.
+    """
+
+    name = "redis"
+
+    def __init__(self, redis_url: str):
+        import redis
+
+        self.client = redis.Redis.from_url(redis_url, socket_timeout=5)
+        self.client.ping()
+        self._index = f"{REDIS_KEY_PREFIX}:index"
+        self._counters = f"{REDIS_KEY_PREFIX}:stats"
+
+    def _key(self, key: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:{key}"
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(self._key(key))
+        pipe = self.client.pipeline()
+        if value is not None:
+            pipe.zadd(self._index, {key: time.time()})
+        pipe.hincrby(self._counters, "hits" if value is not None else "misses", 1)
+        pipe.execute()
+        return value.decode() if value is not None else None
+
+    def put(self, key: str, value: str, ttl_seconds: int, max_entries: int) -> None:
+        pipe = self.client.pipeline()
+        pipe.set(self._key(key), value, ex=ttl_seconds if ttl_seconds > 0 else None)
+        pipe.zadd(self._index, {key: time.time()})
+        pipe.zcard(self._index)
+        count = pipe.execute()[-1]
+        if max_entries > 0 and count > max_entries:
+            # Oldest first; entries already expired by TTL are dropped from the index too
+            stale = self.client.zrange(self._index, 0, count - max_entries - 1)
+            if stale:
+                pipe = self.client.pipeline()
+                pipe.delete(*(self._key(k.decode()) for k in stale))
+                pipe.zrem(self._index, *stale)
+                pipe.execute()
+
+    def stats(self) -> Dict[str, int]:
+        counters = {k.decode(): int(v) for k, v in self.client.hgetall(self._counters).items()}
+        return {
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "entries": self.client.zcard(self._index),
+        }
+
+
+_backend: Optional[LLMCacheBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCacheBackend]:
+    """The process-wide cache backend, or None when LLM_CACHE_ENABLED is off."""
+    global _backend
+    settings = get_settings()
+    if not settings.llm_cache_enabled:
+        return None
+    with _backend_lock:
+        if _backend is None:
+            if settings.redis_url:
+                try:
+                    _backend = RedisLLMCacheBackend(settings.redis_url)
+                except Exception as e:
+                    logger.warning(f"Redis LLM cache unavailable, using SQLite (this host only): {e}")
+            if _backend is None:
+                try:
+                    _backend = SQLiteLLMCacheBackend()
+                except sqlite3.Error as e:
+                    logger.warning(f"LLM cache unavailable, calling the model directly: {e}")
+                    return None
+        return _backend
+
+
+# Requests currently being answered by the model in this process, by key
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+class CachedLLMProvider(LLMProvider):
+    """LLMProvider wrapper that answers repeated requests from the cache."""
+
+    def __init__(self, provider: LLMProvider, backend: LLMCacheBackend, refresh: bool = False):
+        """
+        Args:
+            provider: The provider that actually calls the model
+            backend: Where responses are stored
+            refresh: Skip lookups (regenerate): always call the model and
+                overwrite the cached response
+        """
+        self.provider = provider
+        self.backend = backend
+        self.refresh = refresh
+        self.model_name = getattr(provider, "model_name", type(provider).__name__)
+
+    def _key(self, **parts) -> str:
+        payload = json.dumps({"model": self.model_name, **parts}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[str]:
+        try:
+            return self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed, calling the model: {e}")
+            return None
+
+    def _store(self, key: str, value: str) -> None:
+        settings = get_settings()
+        try:
+            self.backend.put(
+                key, value, settings.llm_cache_ttl_hours * 3600, settings.llm_cache_max_entries
+            )
+        except Exception as e:
+            logger.warning(f"LLM cache store failed: {e}")
+
+    def _cached(self, key: str, compute: Callable[[], str], label: str) -> str:
+        if self.refresh:
+            value = compute()
+            self._store(key, value)
+            return value
+
+        value = self._lookup(key)
+        if value is not None:
+            logger.info(f"LLM cache hit: {label}")
+            return value
+
+        with _inflight_lock:
+            future = _inflight.get(key)
+            leader = future is None
+            if leader:
+                future = _inflight[key] = Future()
+        if not leader:
+            logger.info(f"LLM cache: waiting on identical in-flight request ({label})")
+            return future.result()
+
+        try:
+            value = compute()
+            self._store(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with _inflight_lock:
+                _inflight.pop(key, None)
+
+    def generate_structured(
+        self,
+        prompt: str,
+        schema: Type[BaseModel],
+        system_prompt: Optional[str] = None,
+        temperature: float = 1.0
+    ) -> BaseModel:
+        key = self._key(
+            kind="structured", prompt=prompt, system_prompt=system_prompt,
+            schema=schema.model_json_schema(), temperature=temperature,
+        )
+        raw = self._cached(
+            key,
+            lambda: self.provider.generate_structured(
+                prompt=prompt, schema=schema, system_prompt=system_prompt, temperature=temperature
+            ).model_dump_json(),
+            label=schema.__name__,
+        )
+        return schema.model_validate_json(raw)
+
+    def generate_text(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 1.0,
+        max_tokens: int = 4096
+    ) -> str:
+        key = self._key(
+            kind="text", prompt=prompt, system_prompt=system_prompt,
+            temperature=temperature, max_tokens=max_tokens,
+        )
+        return self._cached(
+            key,
+            lambda: self.provider.generate_text(
+                prompt=prompt, system_prompt=system_prompt, temperature=temperature, max_tokens=max_tokens
+            ),
+            label="text",
+        )
+
+
+def with_cache(provider: LLMProvider, refresh: bool = False) -> LLMProvider:
+    """Wrap provider in the response cache, or return it as-is when disabled.
+
+    Args:
+        provider: Model-backed provider to wrap
+        refresh: Regenerate semantics: bypass lookups, store the new answer
+    """
+    backend = get_llm_cache()
+    if backend is None:
+        return provider
+    return CachedLLMProvider(provider, backend, refresh=refresh)
@@ -0,0 +1,138 @@
+"""Shared poller for long-running provider operations.
+
+Veo clips and HeyGen avatar videos take minutes to render remotely. Rather
+than parking one thread per operation in a sleep loop, every outstanding
+operation is polled from a single asyncio loop running on a daemon thread.
+Each poll backs off from POLL_INITIAL_SECONDS to POLL_MAX_SECONDS with
+jitter, so fresh operations are checked quickly and long ones cheaply.
+
+submit() returns a concurrent.futures.Future: callers that need the result
+can block on it, or attach callbacks and keep working.
+"""
+
+import asyncio
+import concurrent.futures
+import inspect
+import logging
+import os
+import random
+import threading
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+POLL_INITIAL_SECONDS = 2.0
+POLL_MAX_SECONDS = 30.0
+POLL_BACKOFF = 1.5
+POLL_JITTER = 0.2  # +/- fraction applied to every interval
+
+# Threads for blocking status checks and completion handlers (downloads)
+POLL_IO_THREADS = 8
+
+
+class _Pending:
+    def __repr__(self) -> str:
+        return "PENDING"
+
+
+# Returned by a check function while the operation is still running
+PENDING = _Pending()
+
+
+class OperationPoller:
+    """Multiplexes polling of many remote operations on one event loop."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._io_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._pid = None
+        self._active = 0
+
+    @property
+    def active(self) -> int:
+        """Number of operations currently being polled."""
+        return self._active
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            # A forked child inherits the object but not the loop thread
+            if self._loop is None or self._pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="operation-poller", daemon=True).start()
+                self._loop = loop
+                self._io_pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=POLL_IO_THREADS, thread_name_prefix="poller-io"
+                )
+                self._pid = os.getpid()
+                self._active = 0
+            return self._loop
+
+    def submit(
+        self,
+        check: Callable[[], Any],
+        *,
+        name: str = "operation",
+        timeout: float = 600.0,
+        then: Optional[Callable[[Any], Any]] = None,
+        callback: Optional[Callable[[concurrent.futures.Future], None]] = None,
+        initial_interval: float = POLL_INITIAL_SECONDS,
+        max_interval: float = POLL_MAX_SECONDS,
+    ) -> concurrent.futures.Future:
+        """Poll check() until it returns something other than PENDING.
+
+        Args:
+            check: Sync or async function returning PENDING while the operation
+                runs, else its result. Raising fails the operation.
+            name: Label for logs and the timeout error
+            timeout: Seconds before the future fails with TimeoutError
+            then: Optional sync function applied to the finished result off the
+                loop (e.g. download the output); its return value resolves the future
+            callback: Optional done-callback added to the returned future
+            initial_interval: First poll delay; grows by POLL_BACKOFF up to max_interval
+
+        Returns:
+            Future resolving to then(result), or the result itself
+        """
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(
+            self._poll(check, name, timeout, then, initial_interval, max_interval), loop
+        )
+        if callback:
+            future.add_done_callback(callback)
+        return future
+
+    async def _call(self, fn: Callable, *args) -> Any:
+        if inspect.iscoroutinefunction(fn):
+            return await fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(self._io_pool, fn, *args)
+
+    async def _poll(self, check, name, timeout, then, interval, max_interval) -> Any:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        polls = 0
+        self._active += 1
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise TimeoutError(f"{name} did not finish within {timeout:.0f}s")
+                await asyncio.sleep(min(remaining, interval * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER)))
+                interval = min(max_interval, interval * POLL_BACKOFF)
+
+                polls += 1
+                result = await self._call(check)
+                if result is not PENDING:
+                    break
+            logger.info(f"{name} finished after {polls} poll(s)")
+            return await self._call(then, result) if then else result
+        finally:
+            self._active -= 1
+
+
+_poller = OperationPoller()
+
+
+def get_poller() -> OperationPoller:
+    """The process-wide poller (its loop thread starts on first submit)."""
+    return _poller
@@ -0,0 +1,167 @@
+"""Cross-process request quota limiter for Veo and Imagen.
+
+Every provider call goes through acquire(api) first. It takes a slot from
+a token bucket (settings.<api>_quota_rpm: bursts of up to rpm requests,
+then one per 60/rpm seconds) and a rolling 24h log (<api>_quota_rpd),
+and sleeps until a slot is free rather than letting the request fail with
+a 429. State is shared by all API and worker processes: Redis when
+REDIS_URL is set (docker mode, works across nodes), otherwise a SQLite
+file in OUTPUT_DIR (local mode, one host).
+
+A limit of 0 disables that check.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.config import get_settings
+from app.services.quota_tracker.base import QuotaBackend, QuotaExhausted
+from app.services.quota_tracker.sqlite_backend import SQLiteQuotaBackend
+
+logger = logging.getLogger(__name__)
+
+APIS = ("veo", "imagen")
+
+_backend: Optional[QuotaBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> QuotaBackend:
+    """The process-wide backend: Redis if configured and reachable, else SQLite."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            redis_url = get_settings().redis_url
+            if redis_url:
+                try:
+                    from app.services.quota_tracker.redis_backend import RedisQuotaBackend
+                    _backend = RedisQuotaBackend(redis_url)
+                except Exception as e:
+                    logger.warning(f"Redis quota backend unavailable, using SQLite (this host only): {e}")
+            if _backend is None:
+                _backend = SQLiteQuotaBackend()
+        return _backend
+
+
+def _limits(api: str):
+    settings = get_settings()
+    return getattr(settings, f"{api}_quota_rpm", 0), getattr(settings, f"{api}_quota_rpd", 0)
+
+
+def _next_wait(api: str, deadline: float) -> float:
+    """Try once; 0.0 if a slot was taken, else how long to sleep before retrying.
+
+    Raises:
+        QuotaExhausted: If the next slot is past the deadline.
+    """
+    rpm, rpd = _limits(api)
+    wait = get_backend().try_acquire(api, rpm, rpd)
+    if wait <= 0:
+        return 0.0
+    if time.monotonic() + wait > deadline:
+        raise QuotaExhausted(api, wait)
+    logger.info(f"{api} quota: waiting {wait:.1f}s for a request slot")
+    # Jitter so callers woken together do not all race for one token
+    return wait + random.uniform(0, 0.25)
+
+
+def acquire(api: str, max_wait: Optional[float] = None) -> None:
+    """Block until a request slot for api is free, then take it.
+
+    Args:
+        api: "veo" or "imagen" (selects the <api>_quota_rpm/rpd settings)
+        max_wait: Longest acceptable wait in seconds
+            (default settings.quota_max_wait_seconds)
+
+    Raises:
+        QuotaExhausted: If no slot frees up within max_wait, e.g. the daily
+            quota is spent.
+    """
+    if max_wait is None:
+        max_wait = get_settings().quota_max_wait_seconds
+    deadline = time.monotonic() + max_wait
+    while True:
+        wait = _next_wait(api, deadline)
+        if not wait:
+            return
+        time.sleep(wait)
+
+
+async def acquire_async(api: str, max_wait: Optional[float] = None) -> None:
+    """acquire() for async callers: backend calls run in a thread, waits use asyncio.sleep."""
+    if max_wait is None:
+        max_wait = get_settings().quota_max_wait_seconds
+    deadline = time.monotonic() + max_wait
+    while True:
+        wait = await asyncio.to_thread(_next_wait, api, deadline)
+        if not wait:
+            return
+        await asyncio.sleep(wait)
+
+
+def record_veo_request() -> None:
+    """Take a Veo request slot (blocking); call right before each Veo submission."""
+    acquire("veo")
+
+
+def record_imagen_request() -> None:
+    """Take an Imagen request slot (blocking); call right before each Imagen request."""
+    acquire("imagen")
+
+
+def _pct(used: int, limit: int) -> int:
+    return min(100, round(used * 100 / limit)) if limit > 0 else 0
+
+
+def get_quota_status() -> Dict[str, Any]:
+    """Live usage per API for the quota widget.
+
+    For each API: rpm/rpd used, limit and percentage, plus
+    next_slot_seconds (0 when a request could be made right now).
+    image_cache / clip_cache hold the Imagen and Veo cache counters (hits =
+    requests saved, bytes_served) when enabled; llm_cache the Gemini one.
+    """
+    backend = get_backend()
+    status: Dict[str, Any] = {"backend": backend.name}
+    for api in APIS:
+        rpm, rpd = _limits(api)
+        minute_used, day_used, wait = backend.usage(api, rpm, rpd)
+        status[api] = {
+            "rpm_used": minute_used,
+            "rpm_limit": rpm,
+            "rpm_pct": _pct(minute_used, rpm),
+            "rpd_used": day_used,
+            "rpd_limit": rpd,
+            "rpd_pct": _pct(day_used, rpd),
+            "next_slot_seconds": round(wait, 1),
+        }
+
+    # Cache hits are requests that never reached the quota
+    from app.services.image_provider.cache import get_image_cache
+    from app.services.llm_provider.cache import get_llm_cache
+    from app.services.video_generator.cache import get_clip_cache
+    for name, cache in (
+        ("image_cache", get_image_cache()), ("clip_cache", get_clip_cache()), ("llm_cache", get_llm_cache()),
+    ):
+        try:
+            status[name] = cache.stats() if cache else None
+        except Exception as e:
+            logger.warning(f"{name} stats unavailable: {e}")
+            status[name] = None
+    return status
+
+
+__all__ = [
+    "QuotaBackend",
+    "QuotaExhausted",
+    "acquire",
+    "acquire_async",
+    "get_backend",
+    "get_quota_status",
+    "record_imagen_request",
+    "record_veo_request",
+]
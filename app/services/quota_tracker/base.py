@@ -0,0 +1,88 @@
+"""Quota backend interface and the limiter arithmetic shared by backends."""
+
+from abc import ABC, abstractmethod
+from typing import Optional, Tuple
+
+# Rolling window for requests-per-day quotas
+DAY_SECONDS = 86400.0
+MINUTE_SECONDS = 60.0
+
+
+class QuotaExhausted(RuntimeError):
+    """No request slot frees up within the caller's maximum wait.
+
+    A RuntimeError so pipeline stages report it like any other provider
+    failure (tagged with the scene/shot it happened in).
+    """
+
+    def __init__(self, api: str, wait_seconds: float):
+        self.api = api
+        self.wait_seconds = wait_seconds
+        super().__init__(
+            f"{api} quota exhausted: next request slot in {wait_seconds:.0f}s"
+        )
+
+    def __reduce__(self):
+        # Picklable across process pools / Celery result backends
+        return type(self), (self.api, self.wait_seconds)
+
+
+def refill(tokens: Optional[float], updated_at: float, now: float, rpm: int) -> float:
+    """Token-bucket level at `now`.
+
+    The bucket holds at most rpm tokens and refills at rpm per minute;
+    a bucket that was never used is full.
+    """
+    if tokens is None:
+        return float(rpm)
+    return min(float(rpm), tokens + max(0.0, now - updated_at) * rpm / MINUTE_SECONDS)
+
+
+def slot_wait(
+    tokens: float,
+    rpm: int,
+    day_count: int,
+    oldest: Optional[float],
+    rpd: int,
+    now: float,
+) -> float:
+    """Seconds until a request may be made (0.0 if one may be made now).
+
+    rpm/rpd <= 0 disable the respective limit.
+    """
+    wait = 0.0
+    if rpd > 0 and day_count >= rpd and oldest is not None:
+        wait = max(wait, oldest + DAY_SECONDS - now)
+    if rpm > 0 and tokens < 1:
+        wait = max(wait, (1 - tokens) * MINUTE_SECONDS / rpm)
+    return wait
+
+
+class QuotaBackend(ABC):
+    """Shared request-rate state for one API family ("veo", "imagen", ...).
+
+    Implementations must make try_acquire() atomic across every process
+    that shares the backend.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def try_acquire(self, api: str, rpm: int, rpd: int) -> float:
+        """Take a request slot if one is free.
+
+        Returns:
+            0.0 when a slot was taken, otherwise the seconds until one frees up
+            (nothing is consumed in that case).
+        """
+        pass
+
+    @abstractmethod
+    def usage(self, api: str, rpm: int, rpd: int) -> Tuple[int, int, float]:
+        """Live usage without consuming anything.
+
+        Returns:
+            (requests in the last minute, requests in the last 24h,
+            seconds until the next slot)
+        """
+        pass
@@ -0,0 +1,98 @@
+"""Redis quota backend for docker mode.
+
+Shared by every API and worker container pointed at the same REDIS_URL.
+Acquire is a single Lua script, so the check-and-take is atomic across
+nodes, and it reads the Redis server clock so node clock skew does not
+matter. Per API there is a hash (token bucket) and a sorted set of
+request timestamps (rolling 24h log).
+"""
+
+import uuid
+from typing import Tuple
+
+from app.services.quota_tracker.base import (
+    DAY_SECONDS,
+    MINUTE_SECONDS,
+    QuotaBackend,
+    refill,
+    slot_wait,
+)
+
+KEY_PREFIX = "viralforge:quota"
+
+# KEYS: bucket hash, event zset. ARGV: rpm, rpd, unique member.
+# Returns "0" when a slot was taken, else the wait in seconds (as a string:
+# Lua numbers are truncated to integers in Redis replies).
+_ACQUIRE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rpm = tonumber(ARGV[1])
+local rpd = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now - 86400)
+local wait = 0
+if rpd > 0 then
+  if redis.call('ZCARD', KEYS[2]) >= rpd then
+    local oldest = redis.call('ZRANGE', KEYS[2], 0, 0, 'WITHSCORES')
+    wait = math.max(wait, tonumber(oldest[2]) + 86400 - now)
+  end
+end
+local tokens = rpm
+if rpm > 0 then
+  local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+  if state[1] then
+    tokens = math.min(rpm, tonumber(state[1]) + math.max(0, now - tonumber(state[2])) * rpm / 60)
+  end
+  if tokens < 1 then
+    wait = math.max(wait, (1 - tokens) * 60 / rpm)
+  end
+end
+if wait > 0 then
+  return tostring(wait)
+end
+if rpm > 0 then
+  redis.call('HSET', KEYS[1], 'tokens', tostring(tokens - 1), 'ts', tostring(now))
+  redis.call('EXPIRE', KEYS[1], 3600)
+end
+redis.call('ZADD', KEYS[2], now, ARGV[3])
+redis.call('EXPIRE', KEYS[2], 86400)
+return '0'
+"""
+
+
+class RedisQuotaBackend(QuotaBackend):
+    """Token bucket + request log in Redis, shared across nodes."""
+
+    name = "redis"
+
+    def __init__(self, redis_url: str):
+        import redis
+
+        self.client = redis.Redis.from_url(redis_url, socket_timeout=5)
+        self.client.ping()
+        self._acquire = self.client.register_script(_ACQUIRE_LUA)
+
+    def _keys(self, api: str):
+        return f"{KEY_PREFIX}:{api}:bucket", f"{KEY_PREFIX}:{api}:events"
+
+    def try_acquire(self, api: str, rpm: int, rpd: int) -> float:
+        result = self._acquire(keys=self._keys(api), args=[rpm, rpd, uuid.uuid4().hex])
+        return float(result)
+
+    def usage(self, api: str, rpm: int, rpd: int) -> Tuple[int, int, float]:
+        bucket, events = self._keys(api)
+        seconds, micros = self.client.time()
+        now = seconds + micros / 1e6
+        with self.client.pipeline() as pipe:
+            pipe.zcount(events, now - MINUTE_SECONDS, "+inf")
+            pipe.zcount(events, now - DAY_SECONDS, "+inf")
+            pipe.zrangebyscore(events, now - DAY_SECONDS, "+inf", start=0, num=1, withscores=True)
+            pipe.hmget(bucket, "tokens", "ts")
+            minute_count, day_count, oldest, (tokens, updated_at) = pipe.execute()
+        tokens = refill(
+            float(tokens) if tokens is not None else None,
+            float(updated_at) if updated_at is not None else now,
+            now,
+            rpm,
+        )
+        wait = slot_wait(tokens, rpm, day_count, oldest[0][1] if oldest else None, rpd, now)
+        return minute_count, day_count, wait
@@ -0,0 +1,104 @@
+"""SQLite quota backend for local mode.
+
+State lives in <output_dir>/quota.sqlite3, shared by the API process and
+every Celery worker on the host. Each acquire runs in a BEGIN IMMEDIATE
+transaction, so concurrent callers serialize on the database write lock.
+"""
+
+import os
+import sqlite3
+import time
+from typing import Tuple
+
+from app.config import get_settings
+from app.services.quota_tracker.base import (
+    DAY_SECONDS,
+    MINUTE_SECONDS,
+    QuotaBackend,
+    refill,
+    slot_wait,
+)
+
+QUOTA_DB_FILE = "quota.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quota_buckets (
+    api TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS quota_events (
+    api TEXT NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_quota_events_api_ts ON quota_events (api, ts);
+"""
+
+
+class SQLiteQuotaBackend(QuotaBackend):
+    """Token bucket + request log in a host-local SQLite file."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str = ""):
+        if not path:
+            output_dir = get_settings().output_dir
+            os.makedirs(output_dir, exist_ok=True)
+            path = os.path.join(output_dir, QUOTA_DB_FILE)
+        self.path = path
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: transactions are opened explicitly below
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _state(self, conn: sqlite3.Connection, api: str, rpm: int, rpd: int, now: float):
+        conn.execute("DELETE FROM quota_events WHERE api = ? AND ts <= ?", (api, now - DAY_SECONDS))
+        day_count, oldest = conn.execute(
+            "SELECT COUNT(*), MIN(ts) FROM quota_events WHERE api = ?", (api,)
+        ).fetchone()
+        row = conn.execute(
+            "SELECT tokens, updated_at FROM quota_buckets WHERE api = ?", (api,)
+        ).fetchone()
+        tokens = refill(row[0] if row else None, row[1] if row else now, now, rpm)
+        return tokens, day_count, oldest, slot_wait(tokens, rpm, day_count, oldest, rpd, now)
+
+    def try_acquire(self, api: str, rpm: int, rpd: int) -> float:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                tokens, _, _, wait = self._state(conn, api, rpm, rpd, now)
+                if wait <= 0:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO quota_buckets (api, tokens, updated_at) VALUES (?, ?, ?)",
+                        (api, tokens - 1, now),
+                    )
+                    conn.execute("INSERT INTO quota_events (api, ts) VALUES (?, ?)", (api, now))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return wait
+        finally:
+            conn.close()
+
+    def usage(self, api: str, rpm: int, rpd: int) -> Tuple[int, int, float]:
+        conn = self._connect()
+        try:
+            now = time.time()
+            _, day_count, _, wait = self._state(conn, api, rpm, rpd, now)
+            minute_count = conn.execute(
+                "SELECT COUNT(*) FROM quota_events WHERE api = ? AND ts > ?",
+                (api, now - MINUTE_SECONDS),
+            ).fetchone()[0]
+            return minute_count, day_count, wait
+        finally:
+            conn.close()
@@ -0,0 +1,141 @@
+"""Process-wide registry of provider instances and HTTP clients.
+
+Building a provider is not free: each one creates a genai.Client (its own
+connection pool), and Imagen on Vertex re-reads the service-account JSON.
+Tasks therefore ask the registry instead of constructing providers
+directly. The first request for a (kind, key) builds the instance; later
+ones, from any thread, reuse it. Keys carry every setting the instance
+depends on (API key, output dir, model, credentials file and its mtime),
+so a changed setting builds a fresh instance instead of reusing a stale one.
+
+get_http_client() does the same for httpx.Client, so downloads reuse
+keep-alive connections. registry_stats() reports instances built vs
+reused, and per HTTP client the requests sent vs new connections opened.
+
+State is per process; a forked child starts empty.
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, TypeVar
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_lock = threading.Lock()
+_pid: Optional[int] = None
+_instances: Dict[tuple, Any] = {}
+_build_locks: Dict[tuple, threading.Lock] = {}
+_counters: Dict[str, Dict[str, int]] = {}
+_http_clients: Dict[str, httpx.Client] = {}
+_http_counters: Dict[str, Dict[str, int]] = {}
+
+
+def _check_fork() -> None:
+    """Drop state inherited from a parent process (caller holds _lock)."""
+    global _pid
+    if _pid != os.getpid():
+        _instances.clear()
+        _build_locks.clear()
+        _counters.clear()
+        _http_clients.clear()
+        _http_counters.clear()
+        _pid = os.getpid()
+
+
+def get_instance(kind: str, key: Hashable, factory: Callable[[], T]) -> T:
+    """Return the shared instance for (kind, key), building it with factory() once.
+
+    Concurrent first calls for the same key wait for a single build; builds
+    for different keys do not block each other. A factory that raises is
+    retried on the next call.
+
+    Args:
+        kind: Instance family for stats (e.g. "imagen", "veo", "llm:gemini")
+        key: Everything the instance depends on (settings values, use_mock)
+        factory: Builds the instance
+    """
+    full_key = (kind, key)
+    with _lock:
+        _check_fork()
+        counter = _counters.setdefault(kind, {"built": 0, "reused": 0})
+        if full_key in _instances:
+            counter["reused"] += 1
+            return _instances[full_key]
+        build_lock = _build_locks.setdefault(full_key, threading.Lock())
+
+    with build_lock:
+        with _lock:
+            if full_key in _instances:
+                counter["reused"] += 1
+                return _instances[full_key]
+        instance = factory()
+        with _lock:
+            _instances[full_key] = instance
+            counter["built"] += 1
+        logger.info(f"Registry: built {kind} provider ({type(instance).__name__})")
+        return instance
+
+
+def get_http_client(name: str, timeout: float = 60.0, **kwargs: Any) -> httpx.Client:
+    """Shared httpx.Client for name (thread-safe, keeps connections alive).
+
+    The first call's timeout/kwargs configure the client; pass a per-request
+    timeout to client.get() for calls that need a different one. Do not
+    close the returned client.
+    """
+    with _lock:
+        _check_fork()
+        client = _http_clients.get(name)
+        if client is None:
+            counters = _http_counters[name] = {"requests": 0, "connections": 0}
+
+            def trace(event_name: str, info: dict) -> None:
+                if event_name == "connection.connect_tcp.complete":
+                    with _lock:
+                        counters["connections"] += 1
+
+            def on_request(request: httpx.Request) -> None:
+                request.extensions["trace"] = trace
+                with _lock:
+                    counters["requests"] += 1
+
+            client = httpx.Client(timeout=timeout, event_hooks={"request": [on_request]}, **kwargs)
+            _http_clients[name] = client
+        return client
+
+
+def registry_stats() -> Dict[str, Any]:
+    """Instances built/reused per kind, and per HTTP client requests vs new connections.
+
+    reused_connections is how many requests went out on an already-open
+    keep-alive connection.
+    """
+    with _lock:
+        _check_fork()
+        http = {
+            name: {**c, "reused_connections": max(0, c["requests"] - c["connections"])}
+            for name, c in _http_counters.items()
+        }
+        return {
+            "pid": _pid,
+            "instances": {kind: dict(c) for kind, c in _counters.items()},
+            "http": http,
+        }
+
+
+def reset_registry() -> None:
+    """Close HTTP clients and forget every instance (settings reload, tests)."""
+    with _lock:
+        clients = list(_http_clients.values())
+        _instances.clear()
+        _build_locks.clear()
+        _counters.clear()
+        _http_clients.clear()
+        _http_counters.clear()
+    for client in clients:
+        client.close()
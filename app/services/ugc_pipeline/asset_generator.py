@@ -6,9 +6,12 @@ Generates hero images, A-Roll scenes, and B-Roll product shots using Imagen + Ve
 import logging
 import os
 import re
-from typing import List, Optional, Dict, Any
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from app.config import get_settings
+from app.services.image_provider.base import ImageRequest
+from app.services.registry import get_instance
 from app.services.video_generator.google_veo import GoogleVeoProvider
 from app.services.video_generator.mock import MockVideoProvider
 
@@ -91,10 +94,13 @@ def _get_veo_or_mock(use_mock: bool = False) -> GoogleVeoProvider:
     # Use mock when explicitly requested or no API key available
     if use_mock or not google_api_key:
         logger.info("Using MockVideoProvider for Veo operations (use_mock=True or no API key)")
-        return MockVideoProvider(output_dir=output_dir)
+        return get_instance("veo:mock", (output_dir,), lambda: MockVideoProvider(output_dir=output_dir))
 
-    # Return actual Veo provider (which has its own mock fallback)
-    return GoogleVeoProvider(google_api_key=google_api_key, output_dir=output_dir)
+    # Return actual Veo provider (which has its own mock fallback), shared per process
+    return get_instance(
+        "veo", (google_api_key, output_dir),
+        lambda: GoogleVeoProvider(google_api_key=google_api_key, output_dir=output_dir),
+    )
 
 
 def generate_hero_image(
@@ -106,6 +112,7 @@ def generate_hero_image(
     use_mock: bool = False,
     sketch_path: Optional[str] = None,
     reference_images: Optional[List[str]] = None,
+    force_new: bool = False,
 ) -> str:
     """Generate hero image for the product.
 
@@ -123,14 +130,11 @@ def generate_hero_image(
         use_mock: Use mock image provider instead of real API
         sketch_path: Optional hand-drawn sketch to guide generation
         reference_images: Optional list of product photo paths for subject reference
+        force_new: Bypass the image cache (deliberate regeneration)
 
     Returns:
         Path to generated hero image (720x1280 vertical)
     """
-    settings = get_settings()
-    output_dir = getattr(settings, "output_dir", "output")
-    os.makedirs(output_dir, exist_ok=True)
-
     # Filter reference_images to only existing files
     valid_refs = [p for p in (reference_images or []) if os.path.exists(p)]
     # Append product_image_path as fallback (user-uploaded refs take priority)
@@ -143,21 +147,16 @@ def generate_hero_image(
     has_sketch = sketch_path and os.path.exists(sketch_path)
     subject_desc = product_name or "the product"
 
+    image_provider = _get_image_provider(use_mock)
     if use_mock:
-        from app.services.image_provider.mock import MockImageProvider
         prompt = (
             f"Professional product photography, {ugc_style} style. "
             f"Mood: {emotional_tone}. Style: {visual_style}. Vertical 9:16 format."
         )
-        image_provider = MockImageProvider(output_dir=output_dir)
         image_paths = image_provider.generate_image(
             prompt=prompt, width=720, height=1280, reference_images=valid_refs or None
         )
     else:
-        from app.services.image_provider.google_imagen import GoogleImagenProvider
-        google_api_key = getattr(settings, "google_api_key", "")
-        image_provider = GoogleImagenProvider(api_key=google_api_key, output_dir=output_dir)
-
         if has_refs and has_sketch:
             # Both: subject refs + sketch composition control
             prompt = (
@@ -170,7 +169,8 @@ def generate_hero_image(
             image_paths = image_provider.generate_with_refs_and_sketch(
                 prompt=prompt, reference_images=valid_refs,
                 sketch_path=sketch_path, subject_description=subject_desc,
-                width=720, height=1280
+                width=720, height=1280,
+                force_new=force_new,
             )
         elif has_refs:
             # Subject-referenced only: preserves product appearance
@@ -184,7 +184,8 @@ def generate_hero_image(
             logger.info(f"Using subject-referenced generation with {len(valid_refs)} reference(s)")
             image_paths = image_provider.generate_with_references(
                 prompt=prompt, reference_images=valid_refs,
-                subject_description=subject_desc, width=720, height=1280
+                subject_description=subject_desc, width=720, height=1280,
+                force_new=force_new,
             )
         elif has_sketch:
             # Sketch-guided only: composition from hand-drawn sketch
@@ -197,7 +198,8 @@ def generate_hero_image(
             )
             logger.info(f"Using sketch-guided generation: {sketch_path}")
             image_paths = image_provider.generate_from_sketch(
-                prompt=prompt, sketch_path=sketch_path, width=720, height=1280
+                prompt=prompt, sketch_path=sketch_path, width=720, height=1280,
+                force_new=force_new,
             )
         else:
             # Text-to-image only
@@ -210,7 +212,8 @@ def generate_hero_image(
             )
             logger.info("Using text-to-image generation (no references)")
             image_paths = image_provider.generate_image(
-                prompt=prompt, width=720, height=1280, num_images=1
+                prompt=prompt, width=720, height=1280, num_images=1,
+                force_new=force_new,
             )
 
     hero_image_path = image_paths[0]
@@ -220,18 +223,9 @@ def generate_hero_image(
 
 
 def _get_image_provider(use_mock: bool = False):
-    """Get Imagen provider or mock fallback."""
-    settings = get_settings()
-    output_dir = getattr(settings, "output_dir", "output")
-    os.makedirs(output_dir, exist_ok=True)
-
-    if use_mock:
-        from app.services.image_provider.mock import MockImageProvider
-        return MockImageProvider(output_dir=output_dir)
-
-    from app.services.image_provider.google_imagen import GoogleImagenProvider
-    google_api_key = getattr(settings, "google_api_key", "")
-    return GoogleImagenProvider(api_key=google_api_key, output_dir=output_dir)
+    """Get the shared Imagen provider or mock fallback."""
+    from app.services.image_provider import get_imagen_provider
+    return get_imagen_provider(use_mock)
 
 
 def generate_aroll_images(
@@ -241,16 +235,41 @@ def generate_aroll_images(
     creator_persona: str = "",
     product_image_paths: Optional[List[str]] = None,
     product_name: str = "",
+    force_new: bool = False,
 ) -> List[str]:
     """Generate a single A-Roll creator image used for all video clips.
 
     Uses Imagen 4 text-to-image (no subject refs) for best quality.
     Subject refs force Imagen 3 edit model which produces worse results.
     The product is described textually in the prompt instead.
+    force_new bypasses the image cache (deliberate regeneration).
 
     Returns:
         List with 1 image path (single creator image for all scenes)
     """
+    candidate_sets = generate_aroll_image_candidates(
+        aroll_scenes, hero_image_path, use_mock=use_mock, creator_persona=creator_persona,
+        product_image_paths=product_image_paths, product_name=product_name, force_new=force_new,
+    )
+    return [paths[0] for paths in candidate_sets]
+
+
+def generate_aroll_image_candidates(
+    aroll_scenes: List[Dict[str, Any]],
+    hero_image_path: str,
+    use_mock: bool = False,
+    creator_persona: str = "",
+    product_image_paths: Optional[List[str]] = None,
+    product_name: str = "",
+    candidates: int = 1,
+    force_new: bool = False,
+) -> List[List[str]]:
+    """generate_aroll_images() with up to `candidates` alternatives from one Imagen request.
+
+    Returns:
+        One candidate list for the single creator image; the first entry is
+        the primary pick
+    """
     logger.info("Generating 1 A-Roll creator image (text-to-image, Imagen 4)")
 
     image_provider = _get_image_provider(use_mock=use_mock)
@@ -274,12 +293,192 @@ def generate_aroll_images(
     logger.info(f"A-Roll prompt (text-to-image): {prompt}")
 
     # No reference_images → uses text-to-image path → Imagen 4
-    paths = image_provider.generate_image(
-        prompt=prompt, width=720, height=1280, num_images=1,
-    )
+    request = ImageRequest(prompt=prompt, width=720, height=1280, options={"force_new": force_new})
+    candidate_sets = _batch_or_raise(image_provider, [request], candidates)
+
+    logger.info(f"A-Roll creator image generated: {candidate_sets[0]}")
+    return candidate_sets
+
+
+def _batch_or_raise(image_provider, requests: List[ImageRequest], candidates: int) -> List[List[str]]:
+    """Run generate_batch() and re-raise the first failed slot's error (lowest index).
+
+    Every slot runs to completion first, so the other images are still produced.
+    """
+    results = image_provider.generate_batch(requests, candidates=candidates)
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+    return results
+
+
+def _veo_slot_limit() -> int:
+    """How many Veo operations a stage may have in flight at once.
+
+    settings.veo_concurrency, capped at veo_quota_rpm so one stage's burst of
+    submissions cannot exceed the per-minute quota on its own.
+    """
+    settings = get_settings()
+    return max(1, min(settings.veo_concurrency, settings.veo_quota_rpm))
+
+
+def _pending_slots(
+    existing_paths: Optional[List], count: int, label: str
+) -> Tuple[List[Optional[str]], List[int]]:
+    """Resolve pre-filled and skipped slots.
+
+    Returns (clip_paths, pending) where clip_paths has one entry per item
+    ("__skipped__" replaced with None) and pending lists the 0-based
+    indexes that still need a clip.
+    """
+    clip_paths = list(existing_paths) if existing_paths else []
+    clip_paths += [None] * (count - len(clip_paths))
+    pending = []
+    for i in range(count):
+        if clip_paths[i] == "__skipped__":
+            clip_paths[i] = None  # Replace sentinel with None
+            logger.info(f"{label} {i + 1}: skipped by user")
+        elif clip_paths[i] is not None:
+            logger.info(f"{label} {i + 1}: slot pre-filled, skipping generation")
+        else:
+            pending.append(i)
+    return clip_paths, pending
+
+
+class SlotsFailed(RuntimeError):
+    """A slot failed in _run_slots; the message is its "[<tag>:<i>] ..." error.
+
+    results maps slot index -> clip path for the slots that did finish, so
+    callers can save them before failing the stage.
+    """
+
+    def __init__(self, message: str, results: Dict[int, str]):
+        super().__init__(message)
+        self.results = results
+
+
+def _run_slots(
+    pending: List[int],
+    start: Callable[[int], Future],
+    fallback: Callable[[int, Exception], Optional[Future]],
+    tag: str,
+    label: str,
+) -> Dict[int, str]:
+    """Generate a clip for every pending slot, up to _veo_slot_limit() in flight.
+
+    start(i) submits slot i's Veo operation and returns a Future for the
+    clip path; the shared poller does the status checks, but the calling
+    thread still blocks until every slot has settled. When a slot fails, fallback(i, error) may
+    return a Future for one retry (or None).
+
+    Each slot succeeds or fails on its own: all slots run to completion
+    before the first failure (lowest index) is raised as
+    SlotsFailed("[<tag>:<i>] ...") carrying the clips of the other slots.
+    """
+    if not pending:
+        return {}
+    limit = min(_veo_slot_limit(), len(pending))
+    logger.info(f"Generating {len(pending)} {label} clip(s), {limit} at a time")
+
+    results: Dict[int, str] = {}
+    errors: Dict[int, Exception] = {}
+    queue = list(pending)
+    running: Dict[Future, Tuple[int, bool]] = {}  # future -> (slot, is_retry)
+
+    def failed(i: int, error: Exception, is_retry: bool) -> None:
+        retry = None
+        if not is_retry:
+            try:
+                retry = fallback(i, error)
+            except Exception as e:
+                error = e
+        if retry is not None:
+            running[retry] = (i, True)
+        else:
+            errors[i] = error
+            logger.error(f"{label} {i + 1} failed: {error}")
+
+    while queue or running:
+        while queue and len(running) < limit:
+            i = queue.pop(0)
+            try:
+                running[start(i)] = (i, False)
+            except Exception as e:
+                failed(i, e, False)
+        if not running:
+            continue
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            i, is_retry = running.pop(future)
+            try:
+                results[i] = future.result()
+                logger.info(f"{label} {i + 1} generated: {results[i]}")
+            except Exception as e:
+                failed(i, e, is_retry)
+
+    if errors:
+        first = min(errors)
+        if results:
+            logger.info(f"{label}: {len(results)} clip(s) finished before failure: {results}")
+        raise SlotsFailed(f"[{tag}:{first}] {errors[first]}", results) from errors[first]
+    return results
+
+
+def _aroll_slot_fns(
+    veo: GoogleVeoProvider,
+    aroll_scenes: List[Dict[str, Any]],
+    aroll_image_paths: List[str],
+    creator_persona: str,
+    force_new: bool,
+) -> Tuple[Callable[[int], Future], Callable[[int, Exception], Optional[Future]]]:
+    """start/fallback callables for A-Roll slots (see _run_slots)."""
+    image_path = aroll_image_paths[0]  # All clips use the single creator image
+    duration_seconds = 8  # Always max — Veo snaps to [4,6,8], shorter clips truncate voiceover
+    prompts: Dict[int, str] = {}
+
+    def start(i: int) -> Future:
+        scene = aroll_scenes[i]
+        visual_prompt = scene.get("visual_prompt", "")
+        camera_angle = scene.get("camera_angle", "medium close-up")
+        script_text = scene.get("script_text", "")
+
+        # Prepend creator persona so Veo keeps the same person across clips
+        persona_prefix = f"{creator_persona}. " if creator_persona else ""
+        # Sanitize visual prompt only — dialogue must stay as-is for accurate speech
+        visual_part = f"{persona_prefix}{visual_prompt} Camera: {camera_angle}."
+        visual_part = _sanitize_veo_prompt(visual_part)
+        dialogue = f' The person says: "{script_text}"' if script_text else ""
+        prompts[i] = f"{visual_part}{dialogue}"
+
+        logger.info(f"Generating A-Roll scene {i + 1}/{len(aroll_scenes)} "
+                   f"(duration: {duration_seconds}s)")
+        return veo.submit_clip_from_image(
+            prompt=prompts[i],
+            image_path=image_path,
+            duration_seconds=duration_seconds,
+            width=720,
+            height=1280,
+            force_new=force_new,
+        )
 
-    logger.info(f"A-Roll creator image generated: {paths[0]}")
-    return [paths[0]]
+    def fallback(i: int, error: Exception) -> Optional[Future]:
+        # Image-to-video retry on celebrity false-positive
+        if not isinstance(error, RuntimeError) or "celebrity" not in str(error).lower():
+            return None
+        logger.warning(f"A-Roll scene {i + 1}: celebrity filter hit, retrying with modified prompt")
+        retry_prompt = (
+            f"Original fictional character (not a real person). {prompts[i]}"
+        )
+        return veo.submit_clip_from_image(
+            prompt=retry_prompt,
+            image_path=image_path,
+            duration_seconds=duration_seconds,
+            width=720,
+            height=1280,
+            force_new=force_new,
+        )
+
+    return start, fallback
 
 
 def generate_aroll_assets(
@@ -288,122 +487,155 @@ def generate_aroll_assets(
     use_mock: bool = False,
     creator_persona: str = "",
     existing_paths: Optional[List] = None,
+    force_new: bool = False,
 ) -> List[str]:
     """Generate A-Roll video clips from per-scene images using Veo image-to-video.
 
+    Pending scenes are submitted together and polled concurrently (see _run_slots).
+
     Args:
         aroll_scenes: Scene dicts with visual_prompt, duration_seconds, etc.
         aroll_image_paths: Per-scene image paths (from generate_aroll_images)
         use_mock: Use mock provider instead of real Veo API
         existing_paths: Pre-filled paths list. Non-None slots are kept as-is (skipped).
+        force_new: Bypass the clip cache (user-initiated regeneration)
 
     Returns:
         List of paths to A-Roll video clips in scene order
+
+    Raises:
+        SlotsFailed: If a scene failed; .results holds the clips that finished.
     """
     logger.info(f"Generating {len(aroll_scenes)} A-Roll clips from per-scene images")
 
     veo = _get_veo_or_mock(use_mock=use_mock)
+    clip_paths, pending = _pending_slots(existing_paths, len(aroll_scenes), "A-Roll scene")
+    start, fallback = _aroll_slot_fns(veo, aroll_scenes, aroll_image_paths, creator_persona, force_new)
 
-    clip_paths = list(existing_paths) if existing_paths else [None] * len(aroll_scenes)
-    for idx, scene in enumerate(aroll_scenes, 1):
-        # Skip slots that already have a path or are marked as skipped
-        slot = clip_paths[idx - 1] if idx - 1 < len(clip_paths) else None
-        if slot == "__skipped__":
-            clip_paths[idx - 1] = None  # Replace sentinel with None
-            logger.info(f"A-Roll scene {idx}: skipped by user")
-            continue
-        if slot is not None:
-            logger.info(f"A-Roll scene {idx}: slot pre-filled, skipping generation")
-            continue
-        visual_prompt = scene.get("visual_prompt", "")
-        camera_angle = scene.get("camera_angle", "medium close-up")
-        script_text = scene.get("script_text", "")
-        duration_seconds = 8  # Always max — Veo snaps to [4,6,8], shorter clips truncate voiceover
-
-        # Prepend creator persona so Veo keeps the same person across clips
-        persona_prefix = f"{creator_persona}. " if creator_persona else ""
-        # Sanitize visual prompt only — dialogue must stay as-is for accurate speech
-        visual_part = f"{persona_prefix}{visual_prompt} Camera: {camera_angle}."
-        visual_part = _sanitize_veo_prompt(visual_part)
-        dialogue = f' The person says: "{script_text}"' if script_text else ""
-        full_prompt = f"{visual_part}{dialogue}"
-
-        # All clips use the single creator image
-        image_path = aroll_image_paths[0]
-
-        logger.info(f"Generating A-Roll scene {idx}/{len(aroll_scenes)} "
-                   f"(duration: {duration_seconds}s)")
-
-        # Image-to-video with retry on celebrity false-positive
-        try:
-            try:
-                clip_path = veo.generate_clip_from_image(
-                    prompt=full_prompt,
-                    image_path=image_path,
-                    duration_seconds=duration_seconds,
-                    width=720,
-                    height=1280
-                )
-            except RuntimeError as e:
-                if "celebrity" in str(e).lower():
-                    logger.warning(f"A-Roll scene {idx}: celebrity filter hit, retrying with modified prompt")
-                    retry_prompt = (
-                        f"Original fictional character (not a real person). {full_prompt}"
-                    )
-                    clip_path = veo.generate_clip_from_image(
-                        prompt=retry_prompt,
-                        image_path=image_path,
-                        duration_seconds=duration_seconds,
-                        width=720,
-                        height=1280
-                    )
-                else:
-                    raise
-        except Exception as e:
-            raise RuntimeError(f"[aroll_scene:{idx - 1}] {e}") from e
-
-        clip_paths[idx - 1] = clip_path
-        logger.info(f"A-Roll scene {idx} generated: {clip_path}")
+    for i, clip_path in _run_slots(pending, start, fallback, "aroll_scene", "A-Roll scene").items():
+        clip_paths[i] = clip_path
 
     generated = sum(1 for p in clip_paths if p is not None)
     logger.info(f"A-Roll complete: {generated}/{len(clip_paths)} clips (rest skipped)")
     return clip_paths
 
 
+def generate_aroll_clip(
+    aroll_scenes: List[Dict[str, Any]],
+    aroll_image_paths: List[str],
+    index: int,
+    use_mock: bool = False,
+    creator_persona: str = "",
+    force_new: bool = False,
+) -> str:
+    """Generate the A-Roll clip for one scene (same prompt and fallback as generate_aroll_assets).
+
+    Used by the per-scene Celery subtasks. Raises RuntimeError("[aroll_scene:<index>] ...").
+    """
+    veo = _get_veo_or_mock(use_mock=use_mock)
+    start, fallback = _aroll_slot_fns(veo, aroll_scenes, aroll_image_paths, creator_persona, force_new)
+    return _run_slots([index], start, fallback, "aroll_scene", "A-Roll scene")[index]
+
+
 def generate_broll_images(
     broll_shots: List[Dict[str, Any]],
     product_images: List[str],
     use_mock: bool = False,
+    force_new: bool = False,
 ) -> List[str]:
     """Generate per-shot B-Roll product images via Imagen.
 
     Each shot uses a product photo as reference to generate a styled product image.
+    force_new bypasses the image cache (deliberate regeneration).
 
     Returns:
         List of image paths, one per shot
     """
+    candidate_sets = generate_broll_image_candidates(
+        broll_shots, product_images, use_mock=use_mock, force_new=force_new,
+    )
+    return [paths[0] for paths in candidate_sets]
+
+
+def generate_broll_image_candidates(
+    broll_shots: List[Dict[str, Any]],
+    product_images: List[str],
+    use_mock: bool = False,
+    candidates: int = 1,
+    force_new: bool = False,
+) -> List[List[str]]:
+    """Per-shot B-Roll images, up to `candidates` per shot from one request each.
+
+    Shots are independent prompts, so they are dispatched concurrently within
+    the Imagen quota (see ImageProvider.generate_batch).
+
+    Returns:
+        One candidate list per shot; the first entry is the primary pick
+    """
     logger.info(f"Generating {len(broll_shots)} B-Roll images "
                 f"(using {len(product_images)} reference images)")
 
     image_provider = _get_image_provider(use_mock=use_mock)
 
-    image_paths = []
-    for idx, shot in enumerate(broll_shots, 1):
-        image_prompt = shot.get("image_prompt", "")
+    requests = []
+    for shot in broll_shots:
         ref_index = shot.get("reference_image_index", 0)
         ref_index = max(0, min(ref_index, len(product_images) - 1))
-        reference_image = product_images[ref_index]
+        requests.append(ImageRequest(
+            prompt=shot.get("image_prompt", ""), width=720, height=1280,
+            reference_images=[product_images[ref_index]], options={"force_new": force_new},
+        ))
+
+    candidate_sets = _batch_or_raise(image_provider, requests, candidates)
+    for idx, paths in enumerate(candidate_sets, 1):
+        logger.info(f"B-Roll image {idx} generated: {paths[0]}")
+    return candidate_sets
 
-        logger.info(f"Generating B-Roll image {idx}/{len(broll_shots)} (ref image {ref_index})")
 
-        paths = image_provider.generate_image(
-            prompt=image_prompt, width=720, height=1280, num_images=1,
-            reference_images=[reference_image],
+def _broll_slot_fns(
+    veo: GoogleVeoProvider,
+    broll_shots: List[Dict[str, Any]],
+    broll_image_paths: List[str],
+    force_new: bool,
+) -> Tuple[Callable[[int], Future], Callable[[int, Exception], Optional[Future]]]:
+    """start/fallback callables for B-Roll slots (see _run_slots)."""
+
+    def _shot(i: int):
+        animation_prompt = _sanitize_veo_prompt(broll_shots[i].get("animation_prompt", ""))
+        duration_seconds = broll_shots[i].get("duration_seconds", 5)
+        return animation_prompt, duration_seconds
+
+    def start(i: int) -> Future:
+        animation_prompt, duration_seconds = _shot(i)
+
+        # Use per-shot image
+        image_path = broll_image_paths[i] if i < len(broll_image_paths) else broll_image_paths[0]
+
+        logger.info(f"Generating B-Roll shot {i + 1}/{len(broll_shots)} via Veo")
+        return veo.submit_clip_from_image(
+            prompt=animation_prompt,
+            image_path=image_path,
+            duration_seconds=duration_seconds,
+            width=720,
+            height=1280,
+            force_new=force_new,
+        )
+
+    def fallback(i: int, error: Exception) -> Optional[Future]:
+        if not isinstance(error, RuntimeError) or "safety filter" not in str(error).lower():
+            return None
+        logger.warning(f"B-Roll shot {i + 1}: image blocked by safety filter, "
+                      f"retrying as text-to-video")
+        animation_prompt, duration_seconds = _shot(i)
+        return veo.submit_clip(
+            prompt=animation_prompt,
+            duration_seconds=duration_seconds,
+            width=720,
+            height=1280,
+            force_new=force_new,
         )
-        image_paths.append(paths[0])
-        logger.info(f"B-Roll image {idx} generated: {paths[0]}")
 
-    return image_paths
+    return start, fallback
 
 
 def generate_broll_assets(
@@ -411,69 +643,50 @@ def generate_broll_assets(
     broll_image_paths: List[str],
     use_mock: bool = False,
     existing_paths: Optional[List] = None,
+    force_new: bool = False,
 ) -> List[str]:
     """Generate B-Roll video clips from pre-generated images via Veo.
 
+    Pending shots are submitted together and polled concurrently (see _run_slots).
+
     Args:
         broll_shots: Shot dicts with animation_prompt, duration_seconds, etc.
         broll_image_paths: Per-shot image paths (from generate_broll_images)
         use_mock: Use mock providers instead of real APIs
         existing_paths: Pre-filled paths list. Non-None slots are kept as-is (skipped).
+        force_new: Bypass the clip cache (user-initiated regeneration)
 
     Returns:
         List of paths to B-Roll video clips in shot order
+
+    Raises:
+        SlotsFailed: If a shot failed; .results holds the clips that finished.
     """
     logger.info(f"Generating {len(broll_shots)} B-Roll clips from pre-generated images")
 
     veo = _get_veo_or_mock(use_mock=use_mock)
+    clip_paths, pending = _pending_slots(existing_paths, len(broll_shots), "B-Roll shot")
+    start, fallback = _broll_slot_fns(veo, broll_shots, broll_image_paths, force_new)
 
-    clip_paths = list(existing_paths) if existing_paths else [None] * len(broll_shots)
-    for idx, shot in enumerate(broll_shots, 1):
-        # Skip slots that already have a path or are marked as skipped
-        slot = clip_paths[idx - 1] if idx - 1 < len(clip_paths) else None
-        if slot == "__skipped__":
-            clip_paths[idx - 1] = None  # Replace sentinel with None
-            logger.info(f"B-Roll shot {idx}: skipped by user")
-            continue
-        if slot is not None:
-            logger.info(f"B-Roll shot {idx}: slot pre-filled, skipping generation")
-            continue
-        animation_prompt = _sanitize_veo_prompt(shot.get("animation_prompt", ""))
-        duration_seconds = shot.get("duration_seconds", 5)
-
-        # Use per-shot image
-        image_idx = idx - 1
-        image_path = broll_image_paths[image_idx] if image_idx < len(broll_image_paths) else broll_image_paths[0]
-
-        logger.info(f"Generating B-Roll shot {idx}/{len(broll_shots)} via Veo")
-
-        try:
-            try:
-                clip_path = veo.generate_clip_from_image(
-                    prompt=animation_prompt,
-                    image_path=image_path,
-                    duration_seconds=duration_seconds,
-                    width=720,
-                    height=1280
-                )
-            except RuntimeError as e:
-                if "safety filter" in str(e).lower():
-                    logger.warning(f"B-Roll shot {idx}: image blocked by safety filter, "
-                                  f"retrying as text-to-video")
-                    clip_path = veo.generate_clip(
-                        prompt=animation_prompt,
-                        duration_seconds=duration_seconds,
-                        width=720,
-                        height=1280
-                    )
-                else:
-                    raise
-        except Exception as e:
-            raise RuntimeError(f"[broll_shot:{image_idx}] {e}") from e
-
-        clip_paths[idx - 1] = clip_path
-        logger.info(f"B-Roll shot {idx} animated clip generated: {clip_path}")
+    for i, clip_path in _run_slots(pending, start, fallback, "broll_shot", "B-Roll shot").items():
+        clip_paths[i] = clip_path
 
     generated = sum(1 for p in clip_paths if p is not None)
     logger.info(f"B-Roll complete: {generated}/{len(clip_paths)} clips (rest skipped)")
     return clip_paths
+
+
+def generate_broll_clip(
+    broll_shots: List[Dict[str, Any]],
+    broll_image_paths: List[str],
+    index: int,
+    use_mock: bool = False,
+    force_new: bool = False,
+) -> str:
+    """Generate the B-Roll clip for one shot (same prompt and fallback as generate_broll_assets).
+
+    Used by the per-shot Celery subtasks. Raises RuntimeError("[broll_shot:<index>] ...").
+    """
+    veo = _get_veo_or_mock(use_mock=use_mock)
+    start, fallback = _broll_slot_fns(veo, broll_shots, broll_image_paths, force_new)
+    return _run_slots([index], start, fallback, "broll_shot", "B-Roll shot")[index]
@@ -0,0 +1,382 @@
+"""Native ffmpeg render engine for UGC ad composition.
+
+Compiles the same timeline compose_ugc_ad() builds with moviepy (A-Roll base,
+full-screen B-Roll intercuts with crossfades, optional PiP creator bubble,
+overall fade in/out) into a single ffmpeg filter_complex. Frames never pass
+through Python, so a 30s ad renders in a fraction of the moviepy time and
+memory.
+"""
+
+import logging
+import subprocess
+from typing import Any, Dict, List, Optional
+
+import imageio_ffmpeg
+
+from app.services.ugc_pipeline.probe_index import get_crop_box, get_media_info
+from app.services.ugc_pipeline.ugc_compositor import (
+    AUDIO_BITRATE,
+    CROSSFADE_DURATION,
+    ENCODE_CRF,
+    ENCODE_PRESET,
+    FRAME_H,
+    FRAME_W,
+    MIN_BAR_THRESHOLD,
+    OUTPUT_FPS,
+    PIP_MARGIN,
+    PIP_SIZE_RATIO,
+    VIDEO_FADE_IN,
+    VIDEO_FADE_OUT,
+    resolve_variants,
+)
+
+logger = logging.getLogger(__name__)
+
+AUDIO_RATE = 44100
+
+
+def encode_args(
+    crf: int = ENCODE_CRF,
+    preset: str = ENCODE_PRESET,
+    audio_bitrate: str = AUDIO_BITRATE,
+) -> List[str]:
+    """Output options matching the moviepy write_videofile() settings."""
+    return [
+        "-c:v", "libx264", "-preset", preset, "-crf", str(crf),
+        "-pix_fmt", "yuv420p", "-r", str(OUTPUT_FPS),
+        "-c:a", "aac", "-b:a", audio_bitrate, "-ar", str(AUDIO_RATE),
+        "-movflags", "+faststart",
+    ]
+
+# Upper bound for one ffmpeg render (matches ugc_stage_5_compose time_limit)
+RENDER_TIMEOUT = 1200
+
+
+def _fmt(t: float) -> str:
+    """Format seconds for filter arguments."""
+    return f"{t:.3f}"
+
+
+def _cover_filters(pix_fmt: str) -> str:
+    """Scale-to-cover + center-crop to the 9:16 frame at output fps.
+
+    fps must come after any setpts so downstream filters (tpad) see a
+    constant frame rate.
+    """
+    return f"fps={OUTPUT_FPS},{_frame_filters(pix_fmt)}"
+
+
+def _frame_filters(pix_fmt: str) -> str:
+    """Per-frame part of _cover_filters (scale, crop, pixel format)."""
+    return (
+        f"scale={FRAME_W}:{FRAME_H}:force_original_aspect_ratio=increase,"
+        f"crop={FRAME_W}:{FRAME_H},setsar=1,format={pix_fmt}"
+    )
+
+
+def _bar_crop_filter(path: str, height: int) -> str:
+    """Build a crop filter removing letterbox bars, or '' if none found.
+
+    Uses the same cached crop box and thresholds as the moviepy engine.
+    """
+    bars = get_crop_box(path)
+    if bars is None:
+        return ""
+    top_bar, bottom_bar = bars
+    if top_bar < MIN_BAR_THRESHOLD and bottom_bar < MIN_BAR_THRESHOLD:
+        return ""
+    content_h = height - top_bar - bottom_bar
+    logger.info(f"Cropped black bars: top={top_bar}px, bottom={bottom_bar}px")
+    return f"crop=iw:{content_h}:0:{top_bar},"
+
+
+def _pip_filters() -> str:
+    """Center-square crop of the A-Roll, scaled down with a circular mask."""
+    pip_w = int(FRAME_W * PIP_SIZE_RATIO)
+    square = min(FRAME_W, FRAME_H)
+    x_off = (FRAME_W - square) // 2
+    y_off = int(FRAME_H * 0.05)  # slight top bias to capture face
+    crop_h = min(square, FRAME_H - y_off)
+    r = pip_w // 2
+    return (
+        f"crop={square}:{crop_h}:{x_off}:{y_off},scale={pip_w}:{pip_w},"
+        f"format=yuva420p,"
+        f"geq=lum='lum(X,Y)':cb='cb(X,Y)':cr='cr(X,Y)':"
+        f"a='if(lte(hypot(X-{r},Y-{r}),{r}),255,0)'"
+    )
+
+
+def _fanout(chains: List[str], label: str, count: int, audio: bool = False) -> List[str]:
+    """Split one stream label into ``count`` labels (no-op for 1)."""
+    if count == 1:
+        return [label]
+    outs = [f"{label}_{i}" for i in range(count)]
+    split = "asplit" if audio else "split"
+    chains.append(f"[{label}]{split}={count}{''.join(f'[{o}]' for o in outs)}")
+    return outs
+
+
+def _fade_filters(duration: float) -> str:
+    """Overall fade in/out (video only, like vfx.FadeIn/FadeOut)."""
+    fade_out_st = max(duration - VIDEO_FADE_OUT, 0.0)
+    return (
+        f"fade=t=in:st=0:d={VIDEO_FADE_IN},"
+        f"fade=t=out:st={_fmt(fade_out_st)}:d={VIDEO_FADE_OUT},"
+        f"format=yuv420p"
+    )
+
+
+def _aroll_audio_chain(idx: int, clip: Dict[str, Any], label: str) -> str:
+    """Conform one A-Roll clip's audio (silence if it has none) to its duration."""
+    dur = _fmt(clip["duration"])
+    if clip["has_audio"]:
+        return (
+            f"[{idx}:a]aresample={AUDIO_RATE},"
+            f"aformat=sample_fmts=fltp:channel_layouts=stereo,"
+            f"apad,atrim=duration={dur},asetpts=PTS-STARTPTS[{label}]"
+        )
+    return f"anullsrc=r={AUDIO_RATE}:cl=stereo,atrim=duration={dur}[{label}]"
+
+
+def build_filtergraph(
+    aroll: List[Dict[str, Any]],
+    broll: List[Dict[str, Any]],
+    pip_mode: bool = False,
+    variants: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """Compile the composition timeline into an ffmpeg filter_complex.
+
+    Args:
+        aroll: [{"path", "duration", "has_audio"}] in playback order
+        broll: [{"path", "duration", "overlay_start", "crop"}] where crop is
+            a pre-built bar-removal filter prefix (may be empty)
+        pip_mode: Overlay circular creator bubble while B-Roll is on screen
+        variants: Specs from resolve_variants(); each gets its own output
+            pad pair. The decoded sources are split, never decoded twice.
+            Defaults to a single full-quality "final" output.
+
+    Returns:
+        Dict with "inputs" (paths in -i order), "filter" (filter_complex
+        string) and "outputs": [{spec, "video", "audio", "duration"}].
+    """
+    if variants is None:
+        variants = [{"name": "final", "layer": "final", "height": None}]
+    final_specs = [v for v in variants if v["layer"] == "final"]
+    aroll_specs = [v for v in variants if v["layer"] == "aroll"]
+
+    chains: List[str] = []
+    inputs: List[str] = []
+
+    # --- A-Roll base: conform each clip, then concatenate with audio ---
+    base_duration = 0.0
+    concat_pads = []
+    for i, clip in enumerate(aroll):
+        idx = len(inputs)
+        inputs.append(clip["path"])
+        dur = clip["duration"]
+        base_duration += dur
+        chains.append(
+            f"[{idx}:v]trim=duration={_fmt(dur)},setpts=PTS-STARTPTS,"
+            f"{_cover_filters('yuv420p')}[av{i}]"
+        )
+        chains.append(_aroll_audio_chain(idx, clip, f"aa{i}"))
+        concat_pads.append(f"[av{i}][aa{i}]")
+
+    if len(aroll) > 1:
+        chains.append(f"{''.join(concat_pads)}concat=n={len(aroll)}:v=1:a=1[basev][basea]")
+        video, audio = "basev", "basea"
+    else:
+        video, audio = "av0", "aa0"
+
+    # A-Roll-only deliverables branch off the base before any B-Roll work
+    layers = {}
+    if aroll_specs:
+        video, aroll_video = _fanout(chains, video, 2)
+        audio, aroll_audio = _fanout(chains, audio, 2, audio=True)
+        chains.append(f"[{aroll_video}]{_fade_filters(base_duration)}[arollv]")
+        layers["aroll"] = ("arollv", aroll_audio, base_duration)
+
+    # B-Roll may run past the end of the A-Roll voiceover
+    final_duration = base_duration
+    for b in broll:
+        final_duration = max(final_duration, b["overlay_start"] + b["duration"])
+    if final_duration > base_duration:
+        logger.info(f"Extending timeline {base_duration:.1f}s -> {final_duration:.1f}s to fit B-Roll")
+        pad = final_duration - base_duration
+        chains.append(f"[{video}]tpad=stop_mode=add:stop_duration={_fmt(pad)}:color=black[basevp]")
+        chains.append(f"[{audio}]apad=whole_dur={_fmt(final_duration)}[baseap]")
+        video, audio = "basevp", "baseap"
+
+    pip_windows = []
+    if pip_mode and broll:
+        chains.append(f"[{video}]split=2[main][pipsrc]")
+        chains.append(f"[pipsrc]{_pip_filters()}[pip]")
+        video = "main"
+
+    # --- B-Roll intercuts: alpha crossfade, shifted to overlay_start ---
+    for j, b in enumerate(broll):
+        idx = len(inputs)
+        inputs.append(b["path"])
+        start, dur = b["overlay_start"], b["duration"]
+        fade_out_st = max(dur - CROSSFADE_DURATION, 0.0)
+        chains.append(
+            f"[{idx}:v]{b.get('crop', '')}trim=duration={_fmt(dur)},setpts=PTS-STARTPTS,"
+            f"{_cover_filters('yuva420p')},"
+            f"fade=t=in:st=0:d={CROSSFADE_DURATION}:alpha=1,"
+            f"fade=t=out:st={_fmt(fade_out_st)}:d={CROSSFADE_DURATION}:alpha=1,"
+            f"setpts=PTS-STARTPTS+{_fmt(start)}/TB[b{j}]"
+        )
+        chains.append(f"[{video}][b{j}]overlay=eof_action=pass:format=auto[o{j}]")
+        video = f"o{j}"
+        # PiP is cut from the A-Roll, so it cannot outlast the voiceover
+        pip_end = min(start + dur, base_duration)
+        if pip_mode and pip_end > start:
+            pip_windows.append(f"between(t,{_fmt(start)},{_fmt(pip_end)})")
+
+    if pip_windows:
+        pip_x = PIP_MARGIN
+        pip_y = FRAME_H - int(FRAME_W * PIP_SIZE_RATIO) - PIP_MARGIN
+        chains.append(
+            f"[{video}][pip]overlay={pip_x}:{pip_y}:"
+            f"enable='{'+'.join(pip_windows)}'[opip]"
+        )
+        video = "opip"
+    elif pip_mode and broll:
+        chains.append("[pip]nullsink")
+
+    # --- Overall fade in/out ---
+    chains.append(f"[{video}]{_fade_filters(final_duration)}[finalv]")
+    layers["final"] = ("finalv", audio, final_duration)
+
+    # --- Fan each layer out to its variants (scaled copies, own encoder) ---
+    outputs = []
+    for layer, specs in (("final", final_specs), ("aroll", aroll_specs)):
+        if not specs:
+            continue
+        v_label, a_label, duration = layers[layer]
+        v_outs = _fanout(chains, v_label, len(specs))
+        a_outs = _fanout(chains, a_label, len(specs), audio=True)
+        for spec, v_out, a_out in zip(specs, v_outs, a_outs, strict=True):
+            if spec.get("height"):
+                chains.append(f"[{v_out}]scale=-2:{spec['height']}[{v_out}s]")
+                v_out = f"{v_out}s"
+            outputs.append({**spec, "video": v_out, "audio": a_out, "duration": duration})
+
+    return {
+        "inputs": inputs,
+        "filter": ";".join(chains),
+        "outputs": outputs,
+    }
+
+
+def _run_render(graph: Dict[str, Any]) -> None:
+    """Execute a compiled filtergraph, writing every output in one process."""
+    ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+    cmd = [ffmpeg, "-y", "-hide_banner", "-loglevel", "error"]
+    for path in graph["inputs"]:
+        cmd += ["-i", path]
+    cmd += ["-filter_complex", graph["filter"]]
+    for out in graph["outputs"]:
+        cmd += [
+            "-map", f"[{out['video']}]", "-map", f"[{out['audio']}]",
+            "-t", _fmt(out["duration"]),
+            *encode_args(
+                out.get("crf") or ENCODE_CRF,
+                out.get("preset") or ENCODE_PRESET,
+                out.get("audio_bitrate") or AUDIO_BITRATE,
+            ),
+            out["path"],
+        ]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=RENDER_TIMEOUT)
+    if result.returncode != 0:
+        logger.error(f"ffmpeg render failed: {result.stderr[-1000:]}")
+        paths = ", ".join(out["path"] for out in graph["outputs"])
+        raise RuntimeError(f"ffmpeg composition failed for {paths}")
+
+
+def _aroll_inputs(aroll_paths: List[str]) -> List[Dict[str, Any]]:
+    """Probe A-Roll clips for the fields build_filtergraph() needs."""
+    clips = []
+    for path in aroll_paths:
+        info = get_media_info(path)
+        if not info["duration"]:
+            raise RuntimeError(f"Could not determine duration of A-Roll clip {path}")
+        clips.append({
+            "path": path,
+            "duration": info["duration"],
+            "has_audio": info["has_audio"],
+        })
+    return clips
+
+
+def _broll_inputs(
+    broll_metadata: List[Dict[str, Any]],
+    base_duration: float,
+) -> List[Dict[str, Any]]:
+    """Probe B-Roll clips and detect letterbox crops."""
+    items = []
+    for idx, broll in enumerate(broll_metadata, 1):
+        info = get_media_info(broll["path"])
+        if not info["duration"]:
+            raise RuntimeError(f"Could not determine duration of B-Roll clip {broll['path']}")
+        start, dur = broll["overlay_start"], info["duration"]
+        if start + dur > base_duration:
+            logger.warning(f"B-Roll {idx} extends beyond A-Roll "
+                          f"({start + dur:.1f}s > {base_duration:.1f}s)")
+        items.append({
+            "path": broll["path"],
+            "duration": dur,
+            "overlay_start": start,
+            "crop": _bar_crop_filter(broll["path"], info["height"]),
+        })
+        logger.info(f"B-Roll {idx}: {start:.1f}s-{start + dur:.1f}s (full-screen, crossfade)")
+    return items
+
+
+def compose_ugc_ad_ffmpeg(
+    aroll_paths: List[str],
+    broll_metadata: List[Dict[str, Any]],
+    output_path: str,
+    pip_mode: bool = False,
+    variants: Optional[List[Dict[str, Any]]] = None,
+    incremental: bool = False,
+    workers: int = 1,
+) -> str:
+    """Render the UGC ad with a single ffmpeg filtergraph.
+
+    Drop-in equivalent of the moviepy engine in compose_ugc_ad(): same
+    frame size, crossfades, fades, PiP layout and encoder settings. All
+    variants (see resolve_variants) come out of one ffmpeg process: sources
+    are decoded once and only the encoders run per variant.
+
+    incremental renders through the segment store (see segments), so a
+    recompose only re-encodes the parts of the timeline whose inputs changed.
+    workers > 1 also renders through the segment store, encoding that many
+    timeline windows in parallel processes.
+    """
+    logger.info(f"Starting ffmpeg UGC ad composition: {len(aroll_paths)} A-Roll clips, "
+               f"{len(broll_metadata)} B-Roll overlays")
+
+    if not aroll_paths:
+        raise ValueError("aroll_paths cannot be empty - at least one A-Roll clip required")
+
+    if variants is None:
+        variants = resolve_variants(None, output_path, has_broll=bool(broll_metadata))
+
+    if incremental or workers > 1:
+        from app.services.ugc_pipeline.segments import compose_segmented
+        return compose_segmented(aroll_paths, broll_metadata, output_path, pip_mode, variants,
+                                 workers=workers, reuse=incremental)
+
+    aroll = _aroll_inputs(aroll_paths)
+    base_duration = sum(c["duration"] for c in aroll)
+    logger.info(f"A-Roll base: {base_duration:.2f}s")
+
+    broll = _broll_inputs(broll_metadata, base_duration) if broll_metadata else []
+
+    graph = build_filtergraph(aroll, broll, pip_mode=pip_mode, variants=variants)
+    for out in graph["outputs"]:
+        logger.info(f"Writing {out['name']} variant: {out['duration']:.2f}s -> {out['path']}")
+    _run_render(graph)
+    logger.info("UGC ad composition complete")
+    return output_path
@@ -0,0 +1,83 @@
+"""Normalize-on-ingest for uploaded and generated clips.
+
+Every clip is conformed (h264/aac, CFR 30fps mp4 — see normalize_video) as
+soon as it lands, so composition only ever reads conformed inputs. Results
+are cached by content hash under <output_dir>/normalized/: re-uploading the
+same file, or a Veo clip regenerated from history, never re-encodes twice.
+"""
+
+import logging
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from app.config import get_settings
+from app.services.ugc_pipeline.probe_index import get_content_hash
+from app.services.ugc_pipeline.ugc_compositor import is_normalized, normalize_video
+
+logger = logging.getLogger(__name__)
+
+NORMALIZED_DIR = "normalized"
+
+
+def _cache_path(path: str) -> Path:
+    """Where the conformed copy of path's content lives."""
+    digest = get_content_hash(path)
+    return Path(get_settings().output_dir) / NORMALIZED_DIR / f"{digest[:32]}.normalized.mp4"
+
+
+def _ready(path: str) -> Optional[str]:
+    """Conformed path if no encode is needed, else None."""
+    if is_normalized(path):
+        return path
+    cached = _cache_path(path)
+    return str(cached) if cached.exists() else None
+
+
+def conform_clip(path: str) -> str:
+    """Return a conformed version of path, reusing earlier results for the same content.
+
+    Returns path itself when it already conforms.
+    """
+    ready = _ready(path)
+    if ready:
+        return ready
+
+    cached = _cache_path(path)
+    cached.parent.mkdir(parents=True, exist_ok=True)
+    # Write under a per-process name so concurrent ingests of the same
+    # content cannot expose a half-written file
+    tmp_path = cached.with_name(f"{cached.name.split('.')[0]}.{os.getpid()}.tmp.mp4")
+    normalize_video(path, out_path=str(tmp_path))
+    os.replace(tmp_path, cached)
+    return str(cached)
+
+
+def conform_clips(paths: List[Optional[str]], max_workers: Optional[int] = None) -> List[Optional[str]]:
+    """Conform many clips in parallel; empty or missing slots pass through unchanged.
+
+    Cache hits are resolved in-process. Each remaining clip is an
+    independent ffmpeg encode, so they run in a process pool
+    (settings.ingest_workers wide by default).
+    """
+    results = {}
+    pending = []
+    for p in dict.fromkeys(p for p in paths if p and os.path.isfile(p)):
+        ready = _ready(p)
+        if ready:
+            results[p] = ready
+        else:
+            pending.append(p)
+
+    workers = min(max_workers or get_settings().ingest_workers, len(pending))
+    if workers <= 1:
+        results.update((p, conform_clip(p)) for p in pending)
+    elif pending:
+        # spawn: safe to start from Celery's thread pool
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+            results.update(zip(pending, pool.map(conform_clip, pending), strict=True))
+    if pending:
+        logger.info(f"Conformed {len(pending)} clip(s), {len(results) - len(pending)} already conformed")
+    return [results.get(p, p) for p in paths]
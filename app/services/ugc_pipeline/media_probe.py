@@ -0,0 +1,155 @@
+"""Lightweight media probing via the bundled ffmpeg binary.
+
+imageio-ffmpeg ships ffmpeg but not ffprobe, so metadata is parsed from the
+stream header ffmpeg prints for ``ffmpeg -i <path>``. This avoids opening a
+moviepy reader (which spawns a decoder) just to learn duration/fps/size.
+"""
+
+import io
+import logging
+import re
+import subprocess
+from typing import Any, Dict, Optional, Tuple
+
+import imageio_ffmpeg
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_DURATION_RE = re.compile(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)")
+_VIDEO_RE = re.compile(r"Stream #\d+:\d+.*?: Video: (\w+)(.*)")
+_AUDIO_RE = re.compile(r"Stream #\d+:\d+.*?: Audio: (\w+)(.*)")
+_AUDIO_FMT_RE = re.compile(r"(\d+) Hz, ([^,]+)")
+_PROFILE_RE = re.compile(r"^ \(([^)]+)\)")
+_PIX_FMT_RE = re.compile(r"\), (\w+)[(,]")
+_SIZE_RE = re.compile(r"\b(\d{2,5})x(\d{2,5})\b")
+_FPS_RE = re.compile(r"([\d.]+)(k?) fps")
+_ROTATION_RE = re.compile(r"rotation of (-?[\d.]+) degrees")
+
+
+def probe_media(path: str) -> Dict[str, Any]:
+    """Read basic stream metadata for a media file.
+
+    Returns dict with keys: duration, fps, video_codec, video_profile,
+    pix_fmt, width, height, rotation, has_audio, audio_codec, sample_rate,
+    channels. Width/height are display dimensions (already swapped for
+    90/270 degree rotation, matching what ffmpeg and moviepy decode).
+    Missing values are None.
+
+    Raises:
+        RuntimeError: If ffmpeg cannot read the file at all.
+    """
+    ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+    result = subprocess.run(
+        [ffmpeg, "-hide_banner", "-i", str(path)],
+        capture_output=True, text=True, timeout=30,
+    )
+    header = result.stderr
+
+    info: Dict[str, Any] = {
+        "duration": None,
+        "fps": None,
+        "video_codec": None,
+        "video_profile": None,
+        "pix_fmt": None,
+        "width": None,
+        "height": None,
+        "rotation": 0,
+        "has_audio": False,
+        "audio_codec": None,
+        "sample_rate": None,
+        "channels": None,
+    }
+
+    m = _DURATION_RE.search(header)
+    if m:
+        h, mnt, s = m.groups()
+        info["duration"] = int(h) * 3600 + int(mnt) * 60 + float(s)
+
+    for line in header.splitlines():
+        vm = _VIDEO_RE.search(line)
+        if vm and info["video_codec"] is None:
+            info["video_codec"] = vm.group(1)
+            rest = vm.group(2)
+            pm = _PROFILE_RE.search(rest)
+            if pm:
+                info["video_profile"] = pm.group(1)
+            xm = _PIX_FMT_RE.search(rest)
+            if xm:
+                info["pix_fmt"] = xm.group(1)
+            sm = _SIZE_RE.search(rest)
+            if sm:
+                info["width"], info["height"] = int(sm.group(1)), int(sm.group(2))
+            fm = _FPS_RE.search(rest)
+            if fm:
+                fps = float(fm.group(1))
+                info["fps"] = fps * 1000 if fm.group(2) else fps
+            continue
+        am = _AUDIO_RE.search(line)
+        if am and not info["has_audio"]:
+            info["has_audio"] = True
+            info["audio_codec"] = am.group(1)
+            fm = _AUDIO_FMT_RE.search(am.group(2))
+            if fm:
+                info["sample_rate"] = int(fm.group(1))
+                info["channels"] = fm.group(2).strip()
+            continue
+        rm = _ROTATION_RE.search(line)
+        if rm:
+            info["rotation"] = int(round(float(rm.group(1)))) % 360
+
+    if info["duration"] is None and info["video_codec"] is None:
+        raise RuntimeError(f"ffmpeg could not read media: {path}")
+
+    # ffmpeg auto-rotates on decode, so report the displayed frame size
+    if info["rotation"] in (90, 270) and info["width"] and info["height"]:
+        info["width"], info["height"] = info["height"], info["width"]
+
+    return info
+
+
+def extract_frame(path: str, t: float) -> Optional[np.ndarray]:
+    """Decode a single RGB frame at time ``t`` (seconds) without moviepy.
+
+    Returns an (h, w, 3) uint8 array, or None if no frame could be decoded.
+    """
+    from PIL import Image
+
+    ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+    result = subprocess.run(
+        [
+            ffmpeg, "-hide_banner", "-loglevel", "error",
+            "-ss", f"{max(t, 0.0):.3f}", "-i", str(path),
+            "-frames:v", "1", "-f", "image2pipe", "-vcodec", "png", "-",
+        ],
+        capture_output=True, timeout=60,
+    )
+    if result.returncode != 0 or not result.stdout:
+        logger.warning(f"Frame extraction failed for {path} at {t:.2f}s")
+        return None
+    with Image.open(io.BytesIO(result.stdout)) as img:
+        return np.asarray(img.convert("RGB"))
+
+
+def detect_black_bars(frame: np.ndarray) -> Optional[Tuple[int, int]]:
+    """Return (top_bar, bottom_bar) heights in pixels for a sampled frame.
+
+    Rows with mean brightness <= 10 count as bar rows. Returns None when
+    the whole frame is black (nothing sensible to crop).
+    """
+    h = frame.shape[0]
+    row_brightness = frame.mean(axis=(1, 2))
+    content_rows = np.where(row_brightness > 10)[0]
+
+    if len(content_rows) == 0:
+        return None
+
+    top_bar = int(content_rows[0])
+    bottom_bar = int(h - content_rows[-1] - 1)
+    return top_bar, bottom_bar
+
+
+def bar_sample_time(duration: float) -> float:
+    """Timestamp used to sample a frame for black bar detection."""
+    # Sample frame at 1s (or mid-point for very short clips)
+    return min(1.0, duration / 2)
@@ -0,0 +1,127 @@
+"""Persistent media probe index shared by all pipeline stages.
+
+Probing a clip (ffmpeg header parse, letterbox detection, codec extradata)
+is cheap once but adds up when every recomposition repeats it for every
+clip. Results are cached in a small SQLite sidecar next to the outputs,
+keyed by absolute path + size + mtime, so web and worker processes share
+them and an edited or replaced file is re-probed automatically.
+
+The index is only a cache: if it cannot be opened, values are computed
+directly and nothing is stored.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import get_settings
+from app.services.ugc_pipeline.media_probe import (
+    bar_sample_time,
+    detect_black_bars,
+    extract_frame,
+    probe_media,
+)
+
+logger = logging.getLogger(__name__)
+
+PROBE_INDEX_FILE = "probe_index.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS media_probes (
+    path TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (path, kind)
+)
+"""
+
+
+def _connect() -> sqlite3.Connection:
+    """Open the index (creating it on first use)."""
+    settings = get_settings()
+    os.makedirs(settings.output_dir, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(settings.output_dir, PROBE_INDEX_FILE), timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")  # concurrent readers across workers
+    conn.execute(_SCHEMA)
+    return conn
+
+
+def _file_key(path: str) -> Tuple[str, int, int]:
+    st = os.stat(path)
+    return os.path.abspath(path), st.st_size, st.st_mtime_ns
+
+
+def cached_probe(path: str, kind: str, compute: Callable[[str], Any]) -> Any:
+    """Return compute(path), reusing the stored value while the file is unchanged.
+
+    kind namespaces the value ("info", "crop_box", ...). compute must return
+    something JSON-serializable; tuples come back as lists.
+    """
+    abspath, size, mtime_ns = _file_key(path)
+    try:
+        conn = _connect()
+    except sqlite3.Error as e:
+        logger.warning(f"Probe index unavailable, probing directly: {e}")
+        return compute(path)
+
+    try:
+        row = conn.execute(
+            "SELECT value FROM media_probes WHERE path = ? AND kind = ? AND size = ? AND mtime_ns = ?",
+            (abspath, kind, size, mtime_ns),
+        ).fetchone()
+        if row:
+            return json.loads(row[0])
+
+        value = compute(path)
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO media_probes (path, kind, size, mtime_ns, value) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (abspath, kind, size, mtime_ns, json.dumps(value)),
+            )
+        return value
+    finally:
+        conn.close()
+
+
+def content_hash(path: str) -> str:
+    """SHA-256 of the file contents, read in 1 MiB chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_content_hash(path: str) -> str:
+    """Cached content_hash(): unchanged files are read once."""
+    return cached_probe(path, "sha256", content_hash)
+
+
+def get_media_info(path: str) -> Dict[str, Any]:
+    """Cached probe_media(): duration, fps, codec, dimensions, audio format."""
+    return cached_probe(path, "info", probe_media)
+
+
+def _detect_crop_box(path: str) -> Optional[List[int]]:
+    duration = get_media_info(path)["duration"] or 0.0
+    frame = extract_frame(path, bar_sample_time(duration))
+    if frame is None:
+        return None
+    bars = detect_black_bars(frame)
+    return list(bars) if bars else None
+
+
+def get_crop_box(path: str) -> Optional[Tuple[int, int]]:
+    """Cached (top_bar, bottom_bar) letterbox heights, or None if undetectable.
+
+    Decodes one frame the first time a file is seen; never again after.
+    """
+    bars = cached_probe(path, "crop_box", _detect_crop_box)
+    return tuple(bars) if bars else None
+
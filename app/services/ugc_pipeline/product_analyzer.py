@@ -13,7 +13,8 @@ def analyze_product(
     image_count: int,
     style_preference: Optional[str] = None,
     product_url: Optional[str] = None,
-    use_mock: bool = False
+    use_mock: bool = False,
+    refresh: bool = False,
 ) -> ProductAnalysis:
     """Analyze product for UGC ad creation using LLMProvider.
 
@@ -27,6 +28,7 @@ def analyze_product(
         style_preference: Optional style preference (selfie-review, unboxing, tutorial, lifestyle)
         product_url: Optional product URL for additional brand/product context
         use_mock: Use mock LLM provider instead of real API
+        refresh: Bypass the LLM response cache (regenerate)
 
     Returns:
         ProductAnalysis with category, features, audience, style, tone, and visual keywords
@@ -36,10 +38,10 @@ def analyze_product(
         from app.services.llm_provider.mock import MockLLMProvider
         llm = MockLLMProvider()
     else:
-        from app.services.llm_provider.gemini import GeminiLLMProvider
         from app.config import get_settings
+        from app.services.llm_provider import get_gemini_provider, with_cache
         settings = get_settings()
-        llm = GeminiLLMProvider(api_key=settings.google_api_key)
+        llm = with_cache(get_gemini_provider(settings.google_api_key), refresh=refresh)
 
     # Build prompt
     prompt_parts = [
@@ -13,6 +13,7 @@ def generate_ugc_script(
     analysis: ProductAnalysis,
     target_duration: int = 30,
     use_mock: bool = False,
+    refresh: bool = False,
 ) -> AdBreakdown:
     """Generate UGC ad script and A-Roll/B-Roll breakdown using two-call pattern.
 
@@ -25,6 +26,7 @@ def generate_ugc_script(
         analysis: ProductAnalysis from analyze_product()
         target_duration: Target duration in seconds (25-30s typical)
         use_mock: Use mock LLM provider instead of real API
+        refresh: Bypass the LLM response cache (regenerate)
 
     Returns:
         AdBreakdown with master_script, aroll_scenes, broll_shots, and total_duration
@@ -34,10 +36,10 @@ def generate_ugc_script(
         from app.services.llm_provider.mock import MockLLMProvider
         llm = MockLLMProvider()
     else:
-        from app.services.llm_provider.gemini import GeminiLLMProvider
         from app.config import get_settings
+        from app.services.llm_provider import get_gemini_provider, with_cache
         settings = get_settings()
-        llm = GeminiLLMProvider(api_key=settings.google_api_key)
+        llm = with_cache(get_gemini_provider(settings.google_api_key), refresh=refresh)
 
     # Call 1: Generate master script text
     master_script_prompt = f"""Product: {product_name}
@@ -219,10 +221,10 @@ def resplit_script_to_scenes(full_script: str, num_scenes: int, use_mock: bool =
     from pydantic import BaseModel
 
     from app.config import get_settings
-    from app.services.llm_provider.gemini import GeminiLLMProvider
+    from app.services.llm_provider import get_gemini_provider, with_cache
 
     settings = get_settings()
-    llm = GeminiLLMProvider(api_key=settings.google_api_key)
+    llm = with_cache(get_gemini_provider(settings.google_api_key))
 
     class ScriptSegments(BaseModel):
         segments: list[str]
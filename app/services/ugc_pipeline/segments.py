@@ -0,0 +1,495 @@
+"""Incremental recomposition from keyframe-aligned timeline segments.
+
+The ffmpeg engine can render the timeline as fixed-length, independently
+encoded video segments (each starts on an IDR frame). Every segment is keyed
+by a hash of exactly the inputs that feed it: which A-Roll and B-Roll
+content (by file hash) is on screen in that window and at which in-clip
+offsets, crossfade/PiP/fade state, and the encode settings. Segments live
+in a content-addressed store under <output_dir>/segments/, so swapping one
+B-Roll clip and recomposing only re-encodes the segments that clip (and its
+crossfades) touches; everything else is stream-copied back into the new
+output. Audio is only the A-Roll voiceover and cheap to encode, so it is
+rendered whole each time, which avoids AAC priming gaps at the splices.
+
+A manifest of the segments and their inputs is written next to each output
+as <name>.segments.json.
+"""
+
+import hashlib
+import json
+import logging
+import multiprocessing as mp
+import os
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, pairwise
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import imageio_ffmpeg
+
+from app.config import get_settings
+from app.services.ugc_pipeline.ffmpeg_compositor import (
+    AUDIO_RATE,
+    RENDER_TIMEOUT,
+    _aroll_audio_chain,
+    _aroll_inputs,
+    _broll_inputs,
+    _fanout,
+    _fmt,
+    _frame_filters,
+    _pip_filters,
+)
+from app.services.ugc_pipeline.probe_index import get_content_hash
+from app.services.ugc_pipeline.stream_copy import _run, _write_concat_list
+from app.services.ugc_pipeline.ugc_compositor import (
+    CROSSFADE_DURATION,
+    FRAME_H,
+    FRAME_W,
+    OUTPUT_FPS,
+    PIP_MARGIN,
+    PIP_SIZE_RATIO,
+    VIDEO_FADE_IN,
+    VIDEO_FADE_OUT,
+)
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_DIR = "segments"
+
+# Segment length: a multiple of the frame duration, short enough that one
+# swapped 4-6s B-Roll clip invalidates only a few segments
+SEGMENT_SECONDS = 2.0
+
+# Unused segments are pruned after this many days
+SEGMENT_TTL_DAYS = 14
+
+# Bump when the rendering of a segment changes for identical inputs
+SEGMENT_FORMAT = 1
+
+
+def segment_bounds(duration: float, cuts: Sequence[float] = ()) -> List[Tuple[float, float]]:
+    """Split [0, duration) into windows of about SEGMENT_SECONDS.
+
+    cuts are scene boundaries; windows never straddle one, so a scene's
+    segments stay valid when an earlier scene changes and parallel renders
+    split where the content does. Cuts are snapped to the output frame grid.
+    A remainder shorter than half a segment is folded into the span's last
+    window.
+    """
+    grid = sorted({round(c * OUTPUT_FPS) / OUTPUT_FPS for c in cuts} - {0.0})
+    edges = [0.0] + [c for c in grid if c < duration - SEGMENT_SECONDS / 2] + [duration]
+    bounds = []
+    for span_start, span_end in pairwise(edges):
+        start = span_start
+        while span_end - start > SEGMENT_SECONDS * 1.5:
+            bounds.append((start, start + SEGMENT_SECONDS))
+            start += SEGMENT_SECONDS
+        bounds.append((start, span_end))
+    return bounds
+
+
+def _r(t: float) -> float:
+    return round(t, 3)
+
+
+def segment_inputs(
+    start: float,
+    end: float,
+    aroll: List[Dict[str, Any]],
+    broll: List[Dict[str, Any]],
+    pip_mode: bool,
+    duration: float,
+) -> Dict[str, Any]:
+    """Everything that determines the frames of the [start, end) window.
+
+    aroll/broll items carry a "hash" of the file contents; broll is empty
+    for the A-Roll-only layer.
+    """
+    inputs: Dict[str, Any] = {"start": _r(start), "end": _r(end), "aroll": [], "broll": []}
+
+    cursor = 0.0
+    for clip in aroll:
+        clip_end = cursor + clip["duration"]
+        if cursor < end and clip_end > start:
+            inputs["aroll"].append([clip["hash"], _r(max(start, cursor) - cursor),
+                                    _r(min(end, clip_end) - cursor)])
+        cursor = clip_end
+    base_duration = cursor
+    if end > base_duration:
+        inputs["base_end"] = _r(base_duration)
+
+    for b in broll:
+        b_start, b_end = b["overlay_start"], b["overlay_start"] + b["duration"]
+        if b_start < end and b_end > start:
+            inputs["broll"].append([b["hash"], _r(b_start), _r(b["duration"]), b["crop"],
+                                    _r(max(start, b_start) - b_start), _r(min(end, b_end) - b_start)])
+            if pip_mode:
+                inputs["pip"] = True
+
+    if start < VIDEO_FADE_IN:
+        inputs["fade_in"] = VIDEO_FADE_IN
+    if end > duration - VIDEO_FADE_OUT:
+        inputs["fade_out_start"] = _r(duration - VIDEO_FADE_OUT)
+    return inputs
+
+
+def segment_key(inputs: Dict[str, Any], spec: Dict[str, Any]) -> str:
+    """Content address of a segment: its inputs plus encode settings."""
+    payload = {
+        "format": SEGMENT_FORMAT,
+        "inputs": inputs,
+        "encode": [spec.get("height"), spec["crf"], spec["preset"]],
+        "render": [FRAME_W, FRAME_H, OUTPUT_FPS, CROSSFADE_DURATION,
+                   PIP_SIZE_RATIO, PIP_MARGIN, VIDEO_FADE_IN, VIDEO_FADE_OUT],
+    }
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest()[:32]
+
+
+def _segment_store() -> Path:
+    path = Path(get_settings().output_dir) / SEGMENT_DIR
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def manifest_path(output_path: str) -> str:
+    """Sidecar manifest written next to a segmented render."""
+    return str(Path(output_path).with_suffix(".segments.json"))
+
+
+def build_window_graph(
+    aroll: List[Dict[str, Any]],
+    broll: List[Dict[str, Any]],
+    pip_mode: bool,
+    start: float,
+    end: float,
+    duration: float,
+    specs: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Filtergraph for the video of one timeline window, one output per spec.
+
+    Mirrors build_filtergraph(), but every source is cut to the window right
+    after frame-rate conversion, so frames outside it never reach the
+    scale/overlay/PiP filters. Only inputs on screen in the window are opened.
+
+    Returns dict with "inputs", "filter" and "outputs": [(spec, label)].
+    """
+    chains: List[str] = []
+    inputs: List[str] = []
+    length = end - start
+
+    # --- A-Roll pieces under the window ---
+    pieces = []
+    cursor = 0.0
+    for clip in aroll:
+        clip_end = cursor + clip["duration"]
+        if cursor < end and clip_end > start:
+            idx = len(inputs)
+            inputs.append(clip["path"])
+            label = f"av{len(pieces)}"
+            chains.append(
+                f"[{idx}:v]trim=duration={_fmt(clip['duration'])},setpts=PTS-STARTPTS,fps={OUTPUT_FPS},"
+                f"trim=start={_fmt(max(start, cursor) - cursor)}:end={_fmt(min(end, clip_end) - cursor)},"
+                f"setpts=PTS-STARTPTS,{_frame_filters('yuv420p')}[{label}]"
+            )
+            pieces.append(label)
+        cursor = clip_end
+    base_duration = cursor
+
+    covered = max(0.0, min(end, base_duration) - start)
+    if not pieces:
+        # Window lies entirely in the B-Roll overhang past the voiceover
+        chains.append(f"color=c=black:s={FRAME_W}x{FRAME_H}:r={OUTPUT_FPS}:d={_fmt(length)},"
+                      f"format=yuv420p,setsar=1[base]")
+        video = "base"
+    elif len(pieces) > 1:
+        chains.append(f"{''.join(f'[{p}]' for p in pieces)}concat=n={len(pieces)}:v=1:a=0[base]")
+        video = "base"
+    else:
+        video = pieces[0]
+    if pieces and covered < length:
+        chains.append(f"[{video}]tpad=stop_mode=add:stop_duration={_fmt(length - covered)}:color=black[basevp]")
+        video = "basevp"
+
+    # --- B-Roll intercuts on screen in the window ---
+    shown = [b for b in broll if b["overlay_start"] < end and b["overlay_start"] + b["duration"] > start]
+    if pip_mode and shown:
+        chains.append(f"[{video}]split=2[main][pipsrc]")
+        chains.append(f"[pipsrc]{_pip_filters()}[pip]")
+        video = "main"
+
+    pip_windows = []
+    for j, b in enumerate(shown):
+        idx = len(inputs)
+        inputs.append(b["path"])
+        b_start, dur = b["overlay_start"], b["duration"]
+        cut_start = max(start, b_start)
+        cut_end = min(end, b_start + dur)
+        fade_out_st = max(dur - CROSSFADE_DURATION, 0.0)
+        # Fades run on clip time, before the shift onto the window
+        chains.append(
+            f"[{idx}:v]{b.get('crop', '')}trim=duration={_fmt(dur)},setpts=PTS-STARTPTS,fps={OUTPUT_FPS},"
+            f"trim=start={_fmt(cut_start - b_start)}:end={_fmt(cut_end - b_start)},"
+            f"{_frame_filters('yuva420p')},"
+            f"fade=t=in:st=0:d={CROSSFADE_DURATION}:alpha=1,"
+            f"fade=t=out:st={_fmt(fade_out_st)}:d={CROSSFADE_DURATION}:alpha=1,"
+            f"setpts=PTS-STARTPTS+{_fmt(cut_start - start)}/TB[b{j}]"
+        )
+        chains.append(f"[{video}][b{j}]overlay=eof_action=pass:format=auto[o{j}]")
+        video = f"o{j}"
+        pip_end = min(cut_end, base_duration)
+        if pip_mode and pip_end > cut_start:
+            pip_windows.append(f"between(t,{_fmt(cut_start - start)},{_fmt(pip_end - start)})")
+
+    if pip_windows:
+        pip_x = PIP_MARGIN
+        pip_y = FRAME_H - int(FRAME_W * PIP_SIZE_RATIO) - PIP_MARGIN
+        chains.append(f"[{video}][pip]overlay={pip_x}:{pip_y}:enable='{'+'.join(pip_windows)}'[opip]")
+        video = "opip"
+    elif pip_mode and shown:
+        chains.append("[pip]nullsink")
+
+    # --- Overall fades: segment_bounds() keeps them inside the first/last window ---
+    fades = []
+    if start < VIDEO_FADE_IN:
+        fades.append(f"fade=t=in:st=0:d={VIDEO_FADE_IN}")
+    if end > duration - VIDEO_FADE_OUT:
+        fades.append(f"fade=t=out:st={_fmt(max(duration - VIDEO_FADE_OUT - start, 0.0))}:d={VIDEO_FADE_OUT}")
+    chains.append(f"[{video}]{','.join(fades + ['format=yuv420p'])}[segv]")
+
+    outputs = []
+    for spec, label in zip(specs, _fanout(chains, "segv", len(specs)), strict=True):
+        if spec.get("height"):
+            chains.append(f"[{label}]scale=-2:{spec['height']}[{label}s]")
+            label = f"{label}s"
+        outputs.append((spec, label))
+    return {"inputs": inputs, "filter": ";".join(chains), "outputs": outputs}
+
+
+def build_audio_graph(aroll: List[Dict[str, Any]], durations: List[float]) -> Dict[str, Any]:
+    """Filtergraph for the voiceover track, padded to each of durations.
+
+    Returns dict with "inputs", "filter" and "outputs" (one label per duration).
+    """
+    chains = [_aroll_audio_chain(i, clip, f"aa{i}") for i, clip in enumerate(aroll)]
+    if len(aroll) > 1:
+        chains.append(f"{''.join(f'[aa{i}]' for i in range(len(aroll)))}concat=n={len(aroll)}:v=0:a=1[basea]")
+        audio = "basea"
+    else:
+        audio = "aa0"
+    outputs = []
+    for i, label in enumerate(_fanout(chains, audio, len(durations), audio=True)):
+        chains.append(f"[{label}]apad=whole_dur={_fmt(durations[i])}[aout{i}]")
+        outputs.append(f"aout{i}")
+    return {"inputs": [c["path"] for c in aroll], "filter": ";".join(chains), "outputs": outputs}
+
+
+def _ffmpeg(inputs: List[str], graph: str, out_args: List[str], what: str) -> None:
+    ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+    cmd = [ffmpeg, "-y", "-hide_banner", "-loglevel", "error"]
+    for path in inputs:
+        cmd += ["-i", path]
+    cmd += ["-filter_complex", graph, *out_args]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=RENDER_TIMEOUT)
+    if result.returncode != 0:
+        logger.error(f"ffmpeg {what} failed: {result.stderr[-1000:]}")
+        raise RuntimeError(f"ffmpeg {what} failed")
+
+
+def render_window(job: Dict[str, Any], tmp: str) -> None:
+    """Encode one timeline window for every spec that is missing it.
+
+    Segments are written to tmp and moved into the store only when
+    complete, so concurrent renders of the same key never see a partial file.
+    """
+    graph = build_window_graph(job["aroll"], job["broll"], job["pip_mode"],
+                               job["start"], job["end"], job["duration"],
+                               [seg["spec"] for seg in job["segments"]])
+    out_args = []
+    for seg, (spec, label) in zip(job["segments"], graph["outputs"], strict=True):
+        seg["part"] = os.path.join(tmp, f"{seg['key']}.mp4")
+        out_args += [
+            "-map", f"[{label}]", "-an",
+            "-c:v", "libx264", "-preset", spec["preset"], "-crf", str(spec["crf"]),
+            "-pix_fmt", "yuv420p", "-r", str(OUTPUT_FPS), "-threads", str(job.get("threads", 0)),
+            seg["part"],
+        ]
+    _ffmpeg(graph["inputs"], graph["filter"], out_args, "segment render")
+    for seg in job["segments"]:
+        os.replace(seg["part"], seg["file"])
+
+
+def _window_cost(job: Dict[str, Any]) -> int:
+    """Rough relative encode cost of a window job, for scheduling."""
+    shown = sum(1 for b in job["broll"]
+                if b["overlay_start"] < job["end"] and b["overlay_start"] + b["duration"] > job["start"])
+    return len(job["segments"]) * (1 + shown)
+
+
+def _plan(
+    specs: List[Dict[str, Any]],
+    aroll: List[Dict[str, Any]],
+    broll: List[Dict[str, Any]],
+    pip_mode: bool,
+    reuse: bool = True,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Segment every variant; return (per-variant plans, window render jobs).
+
+    Jobs cover only segments missing from the store (all of them when
+    reuse is off), one per timeline window and layer, listing every variant
+    that needs it.
+    """
+    store = _segment_store()
+    base_duration = sum(c["duration"] for c in aroll)
+    final_duration = max([base_duration] + [b["overlay_start"] + b["duration"] for b in broll])
+
+    scene_cuts = list(accumulate(c["duration"] for c in aroll))
+
+    plans = []
+    jobs: Dict[Tuple[str, float, float], Dict[str, Any]] = {}
+    queued = set()
+    for spec in specs:
+        is_final = spec["layer"] == "final"
+        duration = final_duration if is_final else base_duration
+        layer_broll = broll if is_final else []
+        segments = []
+        for start, end in segment_bounds(duration, scene_cuts):
+            inputs = segment_inputs(start, end, aroll, layer_broll, pip_mode, duration)
+            key = segment_key(inputs, spec)
+            seg = {"start": start, "end": end, "key": key, "file": str(store / f"{key}.mp4"),
+                   "inputs": inputs, "spec": spec}
+            segments.append(seg)
+            # Identical windows (e.g. B-Roll-free stretches of both layers) render once
+            if key in queued or (reuse and os.path.exists(seg["file"])):
+                continue
+            queued.add(key)
+            job = jobs.setdefault((spec["layer"], start, end), {
+                "aroll": aroll, "broll": layer_broll, "pip_mode": pip_mode,
+                "start": start, "end": end, "duration": duration, "segments": [],
+            })
+            job["segments"].append(seg)
+        plans.append({"spec": spec, "duration": duration, "segments": segments})
+    return plans, list(jobs.values())
+
+
+def _render_audio(aroll: List[Dict[str, Any]], plans: List[Dict[str, Any]], tmp: str) -> None:
+    """Encode each variant's voiceover track in one pass."""
+    graph = build_audio_graph(aroll, [plan["duration"] for plan in plans])
+    out_args = []
+    for n, (plan, label) in enumerate(zip(plans, graph["outputs"], strict=True)):
+        plan["audio"] = os.path.join(tmp, f"audio{n}.m4a")
+        out_args += [
+            "-map", f"[{label}]", "-t", _fmt(plan["duration"]),
+            "-c:a", "aac", "-b:a", plan["spec"]["audio_bitrate"], "-ar", str(AUDIO_RATE), plan["audio"],
+        ]
+    _ffmpeg(graph["inputs"], graph["filter"], out_args, "voiceover render")
+
+
+def _assemble(plan: Dict[str, Any], tmp: str) -> None:
+    """Stream-copy a variant's segments and its audio into the output file."""
+    spec = plan["spec"]
+    list_path = os.path.join(tmp, f"{spec['name']}.txt")
+    _write_concat_list([seg["file"] for seg in plan["segments"]], list_path)
+    ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+    _run(
+        [ffmpeg, "-y", "-v", "error", "-f", "concat", "-safe", "0", "-i", list_path,
+         "-i", plan["audio"], "-map", "0:v:0", "-map", "1:a:0", "-c", "copy",
+         "-movflags", "+faststart", spec["path"]],
+        "segment splice",
+    )
+
+
+def _write_manifest(output_path: str, plans: List[Dict[str, Any]]) -> None:
+    manifest = {
+        "segment_seconds": SEGMENT_SECONDS,
+        "variants": {
+            plan["spec"]["name"]: {
+                "path": plan["spec"]["path"],
+                "segments": [
+                    {"start": _r(s["start"]), "end": _r(s["end"]), "key": s["key"], "inputs": s["inputs"]}
+                    for s in plan["segments"]
+                ],
+            }
+            for plan in plans
+        },
+    }
+    with open(manifest_path(output_path), "w") as f:
+        json.dump(manifest, f, indent=1)
+
+
+def prune_segments(max_age_days: float = SEGMENT_TTL_DAYS) -> int:
+    """Delete segments not used for max_age_days; returns how many were removed."""
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    for seg in _segment_store().glob("*.mp4"):
+        try:
+            if seg.stat().st_mtime < cutoff:
+                seg.unlink()
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+def compose_segmented(
+    aroll_paths: List[str],
+    broll_metadata: List[Dict[str, Any]],
+    output_path: str,
+    pip_mode: bool,
+    variants: List[Dict[str, Any]],
+    workers: int = 1,
+    reuse: bool = True,
+) -> str:
+    """Render the ffmpeg timeline through the segment store.
+
+    Same output as compose_ugc_ad_ffmpeg(), but only segments whose inputs
+    changed since any earlier render are encoded. With workers > 1 the
+    missing windows are encoded concurrently in a process pool, each
+    encoder getting an equal share of the cores. reuse=False re-encodes
+    every segment even if the store already has it.
+    """
+    aroll = _aroll_inputs(aroll_paths)
+    for clip in aroll:
+        clip["hash"] = get_content_hash(clip["path"])
+    base_duration = sum(c["duration"] for c in aroll)
+    broll = _broll_inputs(broll_metadata, base_duration) if broll_metadata else []
+    for b in broll:
+        b["hash"] = get_content_hash(b["path"])
+
+    plans, jobs = _plan(variants, aroll, broll, pip_mode, reuse=reuse)
+    total = sum(len(p["segments"]) for p in plans)
+    encoded = sum(len(job["segments"]) for job in jobs)
+
+    with tempfile.TemporaryDirectory(dir=_segment_store()) as tmp:
+        workers = min(workers, len(jobs))
+        if workers <= 1:
+            for job in jobs:
+                render_window(job, tmp)
+            _render_audio(aroll, plans, tmp)
+        else:
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            # Windows under B-Roll cost the most; start them first to avoid a long tail
+            jobs.sort(key=_window_cost, reverse=True)
+            # spawn: safe to start from Celery's thread pool
+            with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+                futures = [pool.submit(render_window, {**job, "threads": threads}, tmp) for job in jobs]
+                _render_audio(aroll, plans, tmp)
+                for future in futures:
+                    future.result()
+        for plan in plans:
+            _assemble(plan, tmp)
+    _write_manifest(output_path, plans)
+
+    # Mark reused segments as live so pruning keeps them
+    now = time.time()
+    for plan in plans:
+        for seg in plan["segments"]:
+            os.utime(seg["file"], (now, now))
+    prune_segments()
+
+    logger.info(f"Segmented composition: encoded {encoded}/{total} segments, "
+               f"stream-copied the rest -> {Path(output_path).name}")
+    return output_path
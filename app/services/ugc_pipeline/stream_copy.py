@@ -0,0 +1,340 @@
+"""Stream-copy fast paths for composition.
+
+Veo clips for one job usually share codec, resolution, frame rate and even
+H.264 parameter sets, so they can be joined with ffmpeg's concat demuxer
+without decoding a single frame. When nothing but the overall fade in/out
+has to change, only the GOPs under the fades are re-encoded and the rest of
+the video is copied bit-for-bit.
+"""
+
+import logging
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import imageio_ffmpeg
+
+from app.services.ugc_pipeline.probe_index import cached_probe, get_media_info
+
+logger = logging.getLogger(__name__)
+
+# Stream parameters that must match for concat demuxer + -c copy
+_COMPAT_KEYS = (
+    "video_codec", "video_profile", "pix_fmt", "width", "height", "fps",
+    "rotation", "has_audio", "audio_codec", "sample_rate", "channels",
+)
+
+# Remux/segment encodes are short; generous cap against hung processes
+COPY_TIMEOUT = 300
+
+
+def _run(cmd: List[str], what: str, timeout: int = COPY_TIMEOUT) -> str:
+    """Run ffmpeg, return stdout, raise RuntimeError with stderr tail on failure."""
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    if result.returncode != 0:
+        logger.error(f"ffmpeg {what} failed: {result.stderr[-500:]}")
+        raise RuntimeError(f"ffmpeg {what} failed")
+    return result.stdout
+
+
+def _extradata(path: str) -> Dict[str, str]:
+    """CRC of each stream's codec extradata (H.264 SPS/PPS, AAC config).
+
+    Clips with different extradata cannot share one MP4 sample description,
+    so they are not safe to join with -c copy.
+    """
+    ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+    out = _run(
+        [ffmpeg, "-v", "error", "-i", str(path), "-map", "0:v:0", "-map", "0:a:0?",
+         "-c", "copy", "-frames:v", "1", "-f", "framecrc", "-"],
+        "extradata probe",
+    )
+    crcs = {}
+    for line in out.splitlines():
+        if line.startswith("#extradata"):
+            idx, rest = line[len("#extradata"):].split(":", 1)
+            crcs[idx.strip()] = rest.split(",")[-1].strip()
+    return crcs
+
+
+def stream_signature(path: str) -> Dict[str, Any]:
+    """Everything that has to be identical for a lossless concat."""
+    info = get_media_info(path)
+    sig = {key: info.get(key) for key in _COMPAT_KEYS}
+    sig["extradata"] = cached_probe(path, "extradata", _extradata)
+    return sig
+
+
+def streams_compatible(paths: List[str]) -> bool:
+    """True if all clips can be joined with the concat demuxer and -c copy."""
+    if len(paths) < 2:
+        return True
+    try:
+        signatures = [stream_signature(p) for p in paths]
+    except Exception as e:
+        logger.warning(f"Stream-copy probe failed, using full render: {e}")
+        return False
+    first = signatures[0]
+    if first["video_codec"] is None:
+        return False
+    for path, sig in zip(paths[1:], signatures[1:], strict=True):
+        diff = [k for k in sig if sig[k] != first[k]]
+        if diff:
+            logger.info(f"A-Roll {Path(path).name} differs in {diff} — cannot stream-copy concat")
+            return False
+    return True
+
+
+def _scan_video_packets(path: str) -> Tuple[List[float], float]:
+    """Keyframe times and video stream length (seconds from the first frame).
+
+    Reads packet headers only (framecrc with -c copy), never decodes.
+    """
+    ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+    out = _run(
+        [ffmpeg, "-v", "error", "-i", str(path), "-map", "0:v:0",
+         "-c", "copy", "-f", "framecrc", "-"],
+        "keyframe scan",
+    )
+    timebase = None
+    key_pts = []
+    first, end = None, None
+    for line in out.splitlines():
+        if line.startswith("#tb 0:"):
+            num, den = line.split(":", 1)[1].strip().split("/")
+            timebase = int(num) / int(den)
+            continue
+        if line.startswith("#") or timebase is None:
+            continue
+        fields = [f.strip() for f in line.split(",")]
+        pts, dur = int(fields[2]), int(fields[3])
+        first = pts if first is None else min(first, pts)
+        end = pts + dur if end is None else max(end, pts + dur)
+        # framecrc omits the flags column for plain keyframes
+        flags = next((f for f in fields[6:] if f.startswith("F=")), "F=0x1")
+        if int(flags[2:], 16) & 0x1:
+            key_pts.append(pts)
+    if first is None:
+        return [], 0.0
+    return sorted((pts - first) * timebase for pts in key_pts), (end - first) * timebase
+
+
+def keyframe_times(path: str) -> List[float]:
+    """Keyframe times (seconds from the first video frame), read from packets only."""
+    return _scan_video_packets(path)[0]
+
+
+def _write_concat_list(paths: List[str], list_path: str) -> None:
+    """Write an ffconcat list file (absolute, quoted paths)."""
+    with open(list_path, "w") as f:
+        f.write("ffconcat version 1.0\n")
+        for p in paths:
+            escaped = os.path.abspath(p).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+
+def concat_copy(paths: List[str], output_path: str) -> str:
+    """Join compatible clips losslessly with the concat demuxer.
+
+    Callers must check streams_compatible() first.
+    """
+    ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+    with tempfile.TemporaryDirectory() as tmp:
+        list_path = os.path.join(tmp, "concat.txt")
+        _write_concat_list(paths, list_path)
+        _run(
+            [ffmpeg, "-y", "-v", "error", "-f", "concat", "-safe", "0", "-i", list_path,
+             "-map", "0:v:0", "-map", "0:a:0?", "-c", "copy",
+             "-movflags", "+faststart", str(output_path)],
+            "concat copy",
+        )
+    logger.info(f"Stream-copied {len(paths)} clips -> {Path(output_path).name}")
+    return output_path
+
+
+def fade_edges_copy(
+    src_path: str,
+    output_path: str,
+    fade_in: float,
+    fade_out: float,
+    crf: int = 15,
+    preset: str = "slow",
+) -> Optional[str]:
+    """Apply a fade-in/out by re-encoding only the GOPs under the fades.
+
+    The head (up to the first keyframe after the fade-in) and the tail (from
+    the last keyframe before the fade-out) are re-encoded; everything in
+    between is copied. Segments are written as separate MP4s so each carries
+    its own SPS/PPS; the concat demuxer converts them to Annex B so the
+    parameter set switch travels in-band. Audio is copied untouched from
+    the source, since the fades are video-only.
+
+    Returns output_path, or None if the keyframe layout leaves nothing to
+    copy (caller should fall back to a full render).
+    """
+    info = get_media_info(src_path)
+    if info.get("video_codec") != "h264":
+        return None
+
+    keyframes, duration = _scan_video_packets(src_path)
+    head_end = next((t for t in keyframes if t >= fade_in), None)
+    tail_start = next((t for t in reversed(keyframes) if t <= duration - fade_out), None)
+    if head_end is None or tail_start is None or tail_start <= head_end:
+        logger.info(f"No copyable GOPs between fades in {Path(src_path).name}")
+        return None
+
+    ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+    encode = ["-c:v", "libx264", "-preset", preset, "-crf", str(crf),
+              "-pix_fmt", info.get("pix_fmt") or "yuv420p", "-fps_mode", "passthrough"]
+    with tempfile.TemporaryDirectory() as tmp:
+        # Split packets at the two keyframes: every packet lands in exactly
+        # one piece, so nothing is duplicated or dropped at the seams.
+        # Cut times sit just before the keyframe to dodge float rounding.
+        _run(
+            [ffmpeg, "-y", "-v", "error", "-i", src_path, "-map", "0:v:0", "-c", "copy",
+             "-f", "segment", "-segment_times", f"{head_end - 0.001:.6f},{tail_start - 0.001:.6f}",
+             "-reset_timestamps", "1", os.path.join(tmp, "part%d.mp4")],
+            "keyframe split",
+        )
+        head = os.path.join(tmp, "head.mp4")
+        mid = os.path.join(tmp, "part1.mp4")
+        tail = os.path.join(tmp, "tail.mp4")
+        _run(
+            [ffmpeg, "-y", "-v", "error", "-i", os.path.join(tmp, "part0.mp4"),
+             "-vf", f"fade=t=in:st=0:d={fade_in}", *encode, head],
+            "head fade encode",
+        )
+        fade_st = max(duration - fade_out - tail_start, 0.0)
+        _run(
+            [ffmpeg, "-y", "-v", "error", "-i", os.path.join(tmp, "part2.mp4"),
+             "-vf", f"fade=t=out:st={fade_st:.6f}:d={fade_out}", *encode, tail],
+            "tail fade encode",
+        )
+        list_path = os.path.join(tmp, "segments.txt")
+        _write_concat_list([head, mid, tail], list_path)
+        _run(
+            [ffmpeg, "-y", "-v", "error", "-f", "concat", "-safe", "0", "-i", list_path,
+             "-i", src_path, "-map", "0:v:0", "-map", "1:a:0?", "-c", "copy",
+             "-movflags", "+faststart", str(output_path)],
+            "segment join",
+        )
+
+    logger.info(f"Faded edges with stream copy: re-encoded {head_end:.2f}s head + "
+               f"{duration - tail_start:.2f}s tail of {duration:.2f}s")
+    return output_path
+
+
+def scale_copy_audio(
+    src_path: str,
+    output_path: str,
+    height: int,
+    crf: int = 15,
+    preset: str = "slow",
+) -> str:
+    """Downscale a finished render, copying its audio (for preview variants)."""
+    ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+    _run(
+        [ffmpeg, "-y", "-v", "error", "-i", src_path, "-map", "0:v:0", "-map", "0:a:0?",
+         "-vf", f"scale=-2:{height}", "-c:v", "libx264", "-preset", preset, "-crf", str(crf),
+         "-pix_fmt", "yuv420p", "-c:a", "copy", "-movflags", "+faststart", str(output_path)],
+        "variant scale",
+    )
+    return output_path
+
+
+def smart_cut(
+    src_path: str,
+    output_path: str,
+    keep: List[Tuple[float, float]],
+    crf: int = 15,
+    preset: str = "slow",
+    audio_bitrate: str = "192k",
+) -> Optional[str]:
+    """Keep only the given (start, end) ranges, re-encoding only partial GOPs.
+
+    Within each kept range the whole GOPs between its first and last
+    keyframe are copied bit-for-bit; only the frames from the range start
+    to the first keyframe and from the last keyframe to the range end are
+    re-encoded. Ranges too short to contain a whole GOP are re-encoded
+    entirely. Audio is cut sample-accurately and re-encoded (cheap).
+
+    Returns output_path, or None if the source is not H.264 (caller should
+    fall back to a full re-encode).
+    """
+    info = get_media_info(src_path)
+    if info.get("video_codec") != "h264":
+        return None
+
+    keyframes, _ = _scan_video_packets(src_path)
+    # (start, end, copy) pieces in playback order; copy pieces are whole GOPs
+    pieces: List[Tuple[float, float, bool]] = []
+    for start, end in keep:
+        first_key = next((t for t in keyframes if t >= start - 0.001), None)
+        last_key = next((t for t in reversed(keyframes) if t <= end + 0.001), None)
+        if first_key is None or last_key is None or last_key <= first_key:
+            pieces.append((start, end, False))
+            continue
+        if first_key - start > 0.001:
+            pieces.append((start, first_key, False))
+        pieces.append((first_key, last_key, True))
+        if end - last_key > 0.001:
+            pieces.append((last_key, end, False))
+
+    ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+    encode = ["-c:v", "libx264", "-preset", preset, "-crf", str(crf),
+              "-pix_fmt", info.get("pix_fmt") or "yuv420p", "-fps_mode", "passthrough"]
+    copy_starts = sorted({s for s, _, copy in pieces if copy} | {e for _, e, copy in pieces if copy})
+    copy_starts = [t for t in copy_starts if t > 0.001]
+    with tempfile.TemporaryDirectory() as tmp:
+        files = []
+        if any(copy for _, _, copy in pieces):
+            # Split packets at every copied GOP boundary in one pass; part j
+            # starts at split_times[j]. Cuts sit just before the keyframe.
+            split_times = [0.0] + copy_starts
+            cmd = [ffmpeg, "-y", "-v", "error", "-i", src_path, "-map", "0:v:0", "-c", "copy",
+                   "-f", "segment", "-reset_timestamps", "1"]
+            if copy_starts:
+                cmd += ["-segment_times", ",".join(f"{t - 0.001:.6f}" for t in copy_starts)]
+            _run(cmd + [os.path.join(tmp, "part%d.mp4")], "keyframe split")
+
+        for n, (start, end, copy) in enumerate(pieces):
+            if copy:
+                files.append(os.path.join(tmp, f"part{split_times.index(start)}.mp4"))
+                continue
+            piece = os.path.join(tmp, f"enc{n}.mp4")
+            # Accurate seek: decodes from the preceding keyframe, drops frames before start
+            _run(
+                [ffmpeg, "-y", "-v", "error", "-ss", f"{start:.6f}", "-i", src_path,
+                 "-map", "0:v:0", "-t", f"{end - start - 0.001:.6f}", *encode, piece],
+                "cut edge encode",
+            )
+            files.append(piece)
+
+        list_path = os.path.join(tmp, "pieces.txt")
+        _write_concat_list(files, list_path)
+        cmd = [ffmpeg, "-y", "-v", "error", "-f", "concat", "-safe", "0", "-i", list_path]
+        if info.get("has_audio"):
+            trims = ";".join(
+                f"[0:a]atrim=start={s:.6f}:end={e:.6f},asetpts=PTS-STARTPTS[a{i}]"
+                for i, (s, e) in enumerate(keep)
+            )
+            joined = "".join(f"[a{i}]" for i in range(len(keep)))
+            audio = os.path.join(tmp, "audio.m4a")
+            _run(
+                [ffmpeg, "-y", "-v", "error", "-i", src_path, "-filter_complex",
+                 f"{trims};{joined}concat=n={len(keep)}:v=0:a=1[aout]",
+                 "-map", "[aout]", "-c:a", "aac", "-b:a", audio_bitrate, audio],
+                "cut audio encode",
+            )
+            cmd += ["-i", audio, "-map", "0:v:0", "-map", "1:a:0"]
+        else:
+            cmd += ["-map", "0:v:0"]
+        _run(cmd + ["-c", "copy", "-movflags", "+faststart", str(output_path)], "smart cut join")
+
+    copied = sum(e - s for s, e, copy in pieces if copy)
+    total = sum(e - s for s, e in keep)
+    logger.info(f"Smart cut {Path(src_path).name}: copied {copied:.2f}s of {total:.2f}s, "
+               f"re-encoded {total - copied:.2f}s")
+    return output_path
@@ -8,20 +8,30 @@ Auto-detects and removes black bars (letterboxing) from clips, then scales
 to fill the 9:16 frame.
 """
 
-import json
 import logging
+import shutil
 import subprocess
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
 import imageio_ffmpeg
 import numpy as np
 from moviepy import VideoFileClip, CompositeVideoClip, concatenate_videoclips, vfx
 
+from app.services.ugc_pipeline.probe_index import get_crop_box, get_media_info
+from app.services.ugc_pipeline.stream_copy import (
+    concat_copy,
+    fade_edges_copy,
+    scale_copy_audio,
+    smart_cut,
+    streams_compatible,
+)
+
 logger = logging.getLogger(__name__)
 
-# Target frame size (9:16 vertical)
+# Target frame size (9:16 vertical) and frame rate, for both render engines
 FRAME_W, FRAME_H = 720, 1280
+OUTPUT_FPS = 30
 
 # Crossfade duration for B-Roll transitions (seconds)
 CROSSFADE_DURATION = 0.4
@@ -38,66 +48,72 @@ PIP_CORNER_RADIUS = 999  # large value = circle mask
 # Minimum black bar size to trigger removal (pixels)
 MIN_BAR_THRESHOLD = 20
 
+# Available render engines for compose_ugc_ad()
+COMPOSE_ENGINES = ("moviepy", "ffmpeg")
+
+# Output variants compose_ugc_ad() can write alongside the final ad.
+# layer: "final" = full composite, "aroll" = A-Roll base only.
+# suffix is inserted before .mp4; height/crf/preset None = render profile.
+OUTPUT_VARIANTS = {
+    "final": {"layer": "final", "suffix": "", "height": None, "crf": None, "preset": None},
+    "aroll": {"layer": "aroll", "suffix": "_aroll", "height": None, "crf": None, "preset": None},
+    "preview": {"layer": "final", "suffix": "_preview", "height": 640, "crf": 28, "preset": "veryfast"},
+}
+DEFAULT_VARIANTS = ("final", "aroll")
+
+# Encoder settings for the final master
+ENCODE_CRF = 15
+ENCODE_PRESET = "slow"
+AUDIO_BITRATE = "192k"
+
+# Named encode settings for compose_ugc_ad() and trim_video().
+# "draft" is a quick review render; "final" is the delivered master.
+RENDER_PROFILES = {
+    "draft": {"height": 960, "crf": 26, "preset": "veryfast", "audio_bitrate": "128k"},
+    "final": {"height": None, "crf": ENCODE_CRF, "preset": ENCODE_PRESET, "audio_bitrate": AUDIO_BITRATE},
+}
+
+
+def is_normalized(path: str) -> bool:
+    """True if path needs no normalize_video() pass (mp4, h264, CFR ~30fps)."""
+    p = Path(path)
+    if p.suffixes and ".normalized" in p.stem:
+        return True
+
+    # Codec and frame rate come from the shared probe index
+    try:
+        info = get_media_info(str(p))
+    except Exception as e:
+        logger.warning(f"Probe failed for {p.name}, will re-encode: {e}")
+        return False
+
+    fps = info.get("fps") or 0
+    return (
+        p.suffix.lower() == ".mp4"
+        and info.get("video_codec") == "h264"
+        and 29.9 <= fps <= 30.1
+    )
+
 
-def normalize_video(path: str) -> str:
+def normalize_video(path: str, out_path: Optional[str] = None) -> str:
     """Re-encode video to h264/aac/30fps CFR mp4 if needed.
 
     iPhone .MOV files use VFR and QuickTime edit lists that cause moviepy
-    to misread duration (losing the last 1-2s). This probes the file first
-    and skips re-encoding if already mp4 + CFR 30fps.
+    to misread duration (losing the last 1-2s). Skips re-encoding if
+    is_normalized() (already mp4 + CFR 30fps).
 
-    Returns path to normalized file (.normalized.mp4) or original if already OK.
+    Returns path to normalized file (out_path, default <name>.normalized.mp4)
+    or original if already OK.
     """
     p = Path(path)
-
-    # Already normalized — skip
-    if p.suffixes and ".normalized" in p.stem:
+    if is_normalized(path):
         logger.info(f"Already normalized, skipping: {p.name}")
         return path
 
     ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
-    ffprobe = ffmpeg.replace("ffmpeg", "ffprobe")
-
-    # Probe codec, fps, and whether edit list / VFR is present
-    try:
-        probe_cmd = [
-            ffprobe, "-v", "quiet",
-            "-print_format", "json",
-            "-show_streams", "-show_format",
-            str(p),
-        ]
-        probe_out = subprocess.run(probe_cmd, capture_output=True, text=True, timeout=30)
-        info = json.loads(probe_out.stdout)
-    except Exception as e:
-        logger.warning(f"ffprobe failed for {p.name}, will re-encode: {e}")
-        info = {}
-
-    # Check if re-encoding is needed
-    needs_reencode = True
-    video_stream = None
-    for s in info.get("streams", []):
-        if s.get("codec_type") == "video":
-            video_stream = s
-            break
-
-    if video_stream and p.suffix.lower() == ".mp4":
-        codec = video_stream.get("codec_name", "")
-        # Check for CFR 30fps: r_frame_rate = "30/1" or "30000/1001"
-        r_fps = video_stream.get("r_frame_rate", "")
-        try:
-            num, den = map(int, r_fps.split("/"))
-            fps = num / den if den else 0
-        except (ValueError, ZeroDivisionError):
-            fps = 0
-        if codec == "h264" and 29.9 <= fps <= 30.1:
-            needs_reencode = False
-
-    if not needs_reencode:
-        logger.info(f"Already normalized (h264/30fps mp4), skipping: {p.name}")
-        return path
 
     # Re-encode to CFR h264/aac mp4
-    out_path = p.with_suffix("").with_suffix(".normalized.mp4")
+    out_path = Path(out_path) if out_path else p.with_suffix("").with_suffix(".normalized.mp4")
     cmd = [
         ffmpeg, "-y", "-i", str(p),
         "-c:v", "libx264", "-preset", "slow", "-crf", "15",
@@ -116,26 +132,19 @@ def normalize_video(path: str) -> str:
     return str(out_path)
 
 
-def _fill_frame(clip: VideoFileClip) -> VideoFileClip:
+def _fill_frame(clip: VideoFileClip, path: str) -> VideoFileClip:
     """Remove black bars and scale clip to fill the target 9:16 frame.
 
-    Samples a frame, detects top/bottom black bars, crops them out,
-    then scales to cover the full frame (center-cropping any overflow).
+    Looks up the clip's top/bottom black bars in the probe index, crops
+    them out, then scales to cover the full frame (center-cropping any
+    overflow).
     """
-    # Sample frame at 1s (or mid-point for very short clips)
-    sample_t = min(1.0, clip.duration / 2)
-    frame = clip.get_frame(sample_t)
-    h, w, _ = frame.shape
-
-    # Detect black bar rows (brightness < 10)
-    row_brightness = frame.mean(axis=(1, 2))
-    content_rows = np.where(row_brightness > 10)[0]
+    h = clip.size[1]
 
-    if len(content_rows) == 0:
+    bars = get_crop_box(path)
+    if bars is None:
         return clip  # all black, nothing to do
-
-    top_bar = content_rows[0]
-    bottom_bar = h - content_rows[-1] - 1
+    top_bar, bottom_bar = bars
 
     # Only crop if bars are significant
     if top_bar >= MIN_BAR_THRESHOLD or bottom_bar >= MIN_BAR_THRESHOLD:
@@ -200,11 +209,72 @@ def _make_pip_clip(aroll_clip, start: float, duration: float) -> CompositeVideoC
     return cropped
 
 
+def variant_path(output_path: str, name: str) -> str:
+    """Path of an output variant written next to the final ad."""
+    suffix = OUTPUT_VARIANTS[name]["suffix"]
+    return output_path.replace(".mp4", f"{suffix}.mp4") if suffix else output_path
+
+
+def resolve_variants(
+    names: Optional[List[str]],
+    output_path: str,
+    has_broll: bool,
+    profile: str = "final",
+) -> List[Dict[str, Any]]:
+    """Expand variant names into render specs with output paths.
+
+    "final" is always rendered first. A-Roll-only variants are dropped
+    when there is no B-Roll, since they would be identical to the final.
+    Settings a variant leaves unset come from the RENDER_PROFILES entry.
+    """
+    if profile not in RENDER_PROFILES:
+        raise ValueError(f"Unknown render profile '{profile}' — expected one of {list(RENDER_PROFILES)}")
+    defaults = RENDER_PROFILES[profile]
+    names = list(names) if names else list(DEFAULT_VARIANTS)
+    unknown = [n for n in names if n not in OUTPUT_VARIANTS]
+    if unknown:
+        raise ValueError(f"Unknown output variant(s) {unknown} — expected any of {list(OUTPUT_VARIANTS)}")
+
+    ordered = ["final"] + [n for n in dict.fromkeys(names) if n != "final"]
+    specs = []
+    for name in ordered:
+        spec = dict(OUTPUT_VARIANTS[name])
+        if spec["layer"] == "aroll" and not has_broll:
+            continue
+        spec["name"] = name
+        spec["path"] = variant_path(output_path, name)
+        spec["height"] = spec["height"] or defaults["height"]
+        spec["crf"] = spec["crf"] or defaults["crf"]
+        spec["preset"] = spec["preset"] or defaults["preset"]
+        spec["audio_bitrate"] = defaults["audio_bitrate"]
+        specs.append(spec)
+    return specs
+
+
+def _write_variant(clip, spec: Dict[str, Any]) -> None:
+    """Encode one moviepy clip to a variant's path with its settings."""
+    if spec["height"]:
+        clip = clip.resized(height=spec["height"])
+    logger.info(f"Writing {spec['name']} variant: {clip.duration:.2f}s -> {spec['path']}")
+    clip.write_videofile(
+        spec["path"],
+        codec="libx264", audio_codec="aac",
+        fps=OUTPUT_FPS, preset=spec["preset"],
+        ffmpeg_params=["-crf", str(spec["crf"])],
+        audio_bitrate=spec["audio_bitrate"]
+    )
+
+
 def compose_ugc_ad(
     aroll_paths: List[str],
     broll_metadata: List[Dict[str, Any]],
     output_path: str,
     pip_mode: bool = False,
+    engine: str = "moviepy",
+    variants: Optional[List[str]] = None,
+    profile: str = "final",
+    incremental: bool = False,
+    workers: int = 1,
 ) -> str:
     """Compose final UGC ad from A-Roll + full-screen B-Roll intercuts.
 
@@ -212,12 +282,117 @@ def compose_ugc_ad(
     B-Roll clips appear full-screen at their timestamps, replacing the A-Roll
     visually while the voiceover continues underneath. Crossfade transitions
     smooth the cuts. Overall video has fade-in and fade-out.
-    """
-    logger.info(f"Starting UGC ad composition: {len(aroll_paths)} A-Roll clips, "
-               f"{len(broll_metadata)} B-Roll overlays")
 
+    engine selects the renderer: "moviepy" (per-frame Python compositing)
+    or "ffmpeg" (single native filtergraph, see ffmpeg_compositor).
+
+    variants lists OUTPUT_VARIANTS keys to write next to output_path
+    (default: final + A-Roll only). The ffmpeg engine decodes the sources
+    once and encodes every variant in the same pass; the moviepy engine
+    writes them one after another.
+
+    profile picks the RENDER_PROFILES encode settings: "draft" for quick
+    review renders, "final" for the master.
+
+    A-Roll clips with identical stream parameters are concatenated with
+    stream copy (see stream_copy); without B-Roll the result is remuxed and
+    only the GOPs under the fades are re-encoded, skipping both engines.
+
+    incremental (ffmpeg engine only) keeps the rendered timeline as
+    keyframe-aligned segments and re-encodes only those whose inputs
+    changed since an earlier render (see segments). workers > 1 (ffmpeg
+    engine only) splits the timeline at scene boundaries and encodes the
+    pieces in that many parallel processes, joined with stream copy.
+
+    Returns output_path (the "final" variant).
+    """
+    if engine not in COMPOSE_ENGINES:
+        raise ValueError(f"Unknown compose engine '{engine}' — expected one of {COMPOSE_ENGINES}")
     if not aroll_paths:
         raise ValueError("aroll_paths cannot be empty - at least one A-Roll clip required")
+    specs = resolve_variants(variants, output_path, has_broll=bool(broll_metadata), profile=profile)
+
+    # Matching Veo clips are joined losslessly up front, so either engine
+    # decodes one base file instead of re-rendering the concat. Segments
+    # are keyed by the original clips, so the incremental path skips this
+    # unless the no-B-Roll fast path can use it.
+    source_paths = aroll_paths
+    segmented = engine == "ffmpeg" and (incremental or workers > 1)
+    base_path = None if segmented and broll_metadata else _stream_copy_base(aroll_paths, output_path)
+    if base_path:
+        aroll_paths = [base_path]
+    try:
+        if (not broll_metadata and len(aroll_paths) == 1
+                and _compose_by_stream_copy(aroll_paths[0], specs)):
+            return output_path
+        if engine == "ffmpeg":
+            from app.services.ugc_pipeline.ffmpeg_compositor import compose_ugc_ad_ffmpeg
+            return compose_ugc_ad_ffmpeg(
+                source_paths if segmented else aroll_paths, broll_metadata, output_path,
+                pip_mode=pip_mode, variants=specs, incremental=incremental, workers=workers,
+            )
+        return _compose_moviepy(aroll_paths, broll_metadata, output_path, pip_mode, specs)
+    finally:
+        if base_path:
+            Path(base_path).unlink(missing_ok=True)
+
+
+def _stream_copy_base(aroll_paths: List[str], output_path: str) -> Optional[str]:
+    """Concat compatible A-Roll clips with -c copy; None means use the render path."""
+    if len(aroll_paths) < 2 or not streams_compatible(aroll_paths):
+        return None
+    base_path = output_path.replace(".mp4", "_base.mp4")
+    try:
+        return concat_copy(aroll_paths, base_path)
+    except Exception as e:
+        logger.warning(f"Stream-copy concat failed, re-rendering A-Roll: {e}")
+        Path(base_path).unlink(missing_ok=True)
+        return None
+
+
+def _compose_by_stream_copy(base_path: str, specs: List[Dict[str, Any]]) -> bool:
+    """No-B-Roll fast path: copy the A-Roll and re-encode only the faded edges.
+
+    Only taken when the base already matches the output frame and frame
+    rate and the profile keeps full resolution (the audio is kept as-is), so
+    it yields the same stream a full render would. Returns False to request
+    a full render.
+    """
+    if specs[0]["height"]:
+        return False
+    try:
+        info = get_media_info(base_path)
+        if (info["width"], info["height"], info["rotation"]) != (FRAME_W, FRAME_H, 0):
+            return False
+        if abs((info["fps"] or 0) - OUTPUT_FPS) > 0.01:
+            return False
+        final = specs[0]
+        if not fade_edges_copy(base_path, final["path"], VIDEO_FADE_IN, VIDEO_FADE_OUT,
+                               crf=final["crf"], preset=final["preset"]):
+            return False
+        for spec in specs[1:]:
+            if spec["height"]:
+                scale_copy_audio(final["path"], spec["path"], spec["height"],
+                                 crf=spec["crf"], preset=spec["preset"])
+            else:
+                shutil.copyfile(final["path"], spec["path"])
+    except Exception as e:
+        logger.warning(f"Stream-copy compose failed, falling back to full render: {e}")
+        return False
+    logger.info("UGC ad composition complete (stream copy)")
+    return True
+
+
+def _compose_moviepy(
+    aroll_paths: List[str],
+    broll_metadata: List[Dict[str, Any]],
+    output_path: str,
+    pip_mode: bool,
+    specs: List[Dict[str, Any]],
+) -> str:
+    """Per-frame moviepy render of the full timeline."""
+    logger.info(f"Starting UGC ad composition: {len(aroll_paths)} A-Roll clips, "
+               f"{len(broll_metadata)} B-Roll overlays")
 
     aroll_clips = [VideoFileClip(path) for path in aroll_paths]
     logger.info(f"Loaded {len(aroll_clips)} A-Roll clips")
@@ -241,13 +416,8 @@ def compose_ugc_ad(
                 vfx.FadeIn(VIDEO_FADE_IN),
                 vfx.FadeOut(VIDEO_FADE_OUT),
             ])
-            final_video.write_videofile(
-                output_path,
-                codec="libx264", audio_codec="aac",
-                fps=30, preset="slow",
-                ffmpeg_params=["-crf", "15"],
-                audio_bitrate="192k"
-            )
+            for spec in specs:
+                _write_variant(final_video, spec)
             return output_path
 
         # Build full-screen B-Roll intercuts with crossfade
@@ -262,7 +432,7 @@ def compose_ugc_ad(
                               f"({overlay_start + clip.duration:.1f}s > {total_duration:.1f}s)")
 
             # Remove black bars and scale to fill frame
-            clip = _fill_frame(clip)
+            clip = _fill_frame(clip, broll["path"])
 
             # Full-screen B-Roll: no audio, crossfade transitions
             overlay = (clip
@@ -288,9 +458,7 @@ def compose_ugc_ad(
         # Calculate total duration including B-Roll that extends past A-Roll
         max_broll_end = 0.0
         for broll in broll_metadata:
-            clip = VideoFileClip(broll["path"])
-            end = broll["overlay_start"] + clip.duration
-            clip.close()
+            end = broll["overlay_start"] + (get_media_info(broll["path"])["duration"] or 0.0)
             if end > max_broll_end:
                 max_broll_end = end
         final_duration = max(total_duration, max_broll_end)
@@ -312,23 +480,10 @@ def compose_ugc_ad(
             vfx.FadeOut(VIDEO_FADE_OUT),
         ])
 
-        # Write A-Roll only version (reuses already-built base_video)
-        aroll_only_path = output_path.replace(".mp4", "_aroll.mp4")
+        # A-Roll only variants reuse the already-built base_video
         aroll_only = base_video.with_effects([vfx.FadeIn(VIDEO_FADE_IN), vfx.FadeOut(VIDEO_FADE_OUT)])
-        logger.info(f"Writing A-Roll only: {aroll_only.duration:.2f}s -> {aroll_only_path}")
-        aroll_only.write_videofile(
-            aroll_only_path, codec="libx264", audio_codec="aac",
-            fps=30, preset="slow", ffmpeg_params=["-crf", "15"], audio_bitrate="192k"
-        )
-
-        logger.info(f"Writing final UGC ad: {final_video.duration:.2f}s")
-        final_video.write_videofile(
-            output_path,
-            codec="libx264", audio_codec="aac",
-            fps=30, preset="slow",
-            ffmpeg_params=["-crf", "15"],
-            audio_bitrate="192k"
-        )
+        for spec in specs:
+            _write_variant(aroll_only if spec["layer"] == "aroll" else final_video, spec)
         logger.info("UGC ad composition complete")
 
     finally:
@@ -346,3 +501,76 @@ def compose_ugc_ad(
             base_video.close()
 
     return output_path
+
+
+def _keep_segments(ranges: List[Dict[str, float]], duration: float) -> List[Tuple[float, float]]:
+    """Complement of the cut ranges within [0, duration)."""
+    keep_segments = []
+    cursor = 0.0
+    for r in sorted(ranges, key=lambda r: r["start"]):
+        cut_start = max(0.0, min(r["start"], duration))
+        cut_end = max(0.0, min(r["end"], duration))
+        if cut_start > cursor:
+            keep_segments.append((cursor, cut_start))
+        cursor = max(cursor, cut_end)
+    if cursor < duration:
+        keep_segments.append((cursor, duration))
+    return keep_segments
+
+
+def trim_video(
+    src_path: str,
+    output_path: str,
+    ranges: List[Dict[str, float]],
+    profile: str = "final",
+) -> str:
+    """Cut the given {start, end} ranges out of a rendered video.
+
+    Ranges are in seconds of src_path and may be unsorted or overlap.
+    Whole GOPs are stream-copied and only the GOPs straddling a cut are
+    re-encoded (see stream_copy.smart_cut), with the RENDER_PROFILES
+    settings for profile, which should match the profile src_path was
+    rendered with. Falls back to a full moviepy re-encode if the smart cut
+    is not possible.
+
+    Raises:
+        ValueError: If the ranges would remove all content.
+    """
+    settings = RENDER_PROFILES[profile]
+    keep_segments = _keep_segments(ranges, get_media_info(src_path)["duration"] or 0.0)
+    if not keep_segments:
+        raise ValueError("All content would be removed")
+
+    try:
+        if smart_cut(src_path, output_path, keep_segments, crf=settings["crf"],
+                     preset=settings["preset"], audio_bitrate=settings["audio_bitrate"]):
+            return output_path
+    except Exception as e:
+        logger.warning(f"Smart cut failed, re-encoding whole video: {e}")
+    return _trim_moviepy(src_path, output_path, keep_segments, settings)
+
+
+def _trim_moviepy(
+    src_path: str,
+    output_path: str,
+    keep_segments: List[Tuple[float, float]],
+    settings: Dict[str, Any],
+) -> str:
+    """Full decode + re-encode of the kept segments."""
+    clip = VideoFileClip(src_path)
+    # Extract subclips and concatenate
+    subclips = [clip.subclipped(s, min(e, clip.duration)) for s, e in keep_segments]
+    final = concatenate_videoclips(subclips)
+    try:
+        final.write_videofile(
+            output_path, codec="libx264", audio_codec="aac",
+            fps=clip.fps, preset=settings["preset"],
+            ffmpeg_params=["-crf", str(settings["crf"])],
+            audio_bitrate=settings["audio_bitrate"], logger=None,
+        )
+    finally:
+        for sc in subclips:
+            sc.close()
+        final.close()
+        clip.close()
+    return output_path
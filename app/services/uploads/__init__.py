@@ -0,0 +1,20 @@
+"""Streaming and resumable file uploads."""
+from app.services.uploads.store import (
+    claim_upload,
+    create_upload,
+    expire_uploads,
+    expire_uploads_periodically,
+    get_upload,
+    save_upload,
+    write_chunk,
+)
+
+__all__ = [
+    "save_upload",
+    "create_upload",
+    "get_upload",
+    "write_chunk",
+    "claim_upload",
+    "expire_uploads",
+    "expire_uploads_periodically",
+]
@@ -0,0 +1,225 @@
+"""Streaming and resumable (tus-style) file uploads.
+
+save_upload() copies a multipart UploadFile to its destination in fixed-size
+chunks on a worker thread, so a 500 MB .MOV is never held in API memory and
+disk writes never block the event loop.
+
+Resumable uploads follow the core tus flow: create a session with the total
+length, append bytes at the current offset, and after a dropped connection
+ask for the offset and continue from there. Sessions live on disk as
+<id>.part + <id>.json under <output_dir>/upload_sessions, so they survive
+API restarts. A finished upload is claimed by the regular upload endpoints
+via its upload_id. Appends hold an flock on the .part file, so two requests
+(in any API process) never write the same upload at once. Sessions idle for
+UPLOAD_SESSION_TTL_HOURS are deleted by expire_uploads(), which the API runs
+at startup and hourly.
+"""
+
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Dict, Optional
+from uuid import uuid4
+
+from fastapi import UploadFile
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Copy/write granularity: bounds per-request memory
+CHUNK_BYTES = 1 << 20
+
+SESSION_DIR = "upload_sessions"
+
+EXPIRE_INTERVAL_SECONDS = 3600
+
+
+def _copy_stream(src: BinaryIO, dest: Path) -> int:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    with open(dest, "wb") as out:
+        shutil.copyfileobj(src, out, CHUNK_BYTES)
+        return out.tell()
+
+
+async def save_upload(file: UploadFile, dest: Path) -> int:
+    """Stream an UploadFile to dest without loading it into memory.
+
+    Returns the number of bytes written.
+    """
+    await file.seek(0)
+    size = await asyncio.to_thread(_copy_stream, file.file, Path(dest))
+    logger.info(f"Saved upload {file.filename} -> {dest} ({size} bytes)")
+    return size
+
+
+def _session_dir() -> Path:
+    path = Path(get_settings().output_dir) / SESSION_DIR
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _paths(upload_id: str):
+    # ids are uuid hex; reject anything that could escape the session dir
+    if not upload_id.isalnum():
+        raise LookupError(f"Upload {upload_id} not found")
+    base = _session_dir() / upload_id
+    return base.with_suffix(".part"), base.with_suffix(".json")
+
+
+def create_upload(filename: str, length: int) -> Dict[str, Any]:
+    """Start a resumable upload of `length` bytes.
+
+    Raises:
+        ValueError: If length is not positive or exceeds settings.upload_max_mb.
+    """
+    max_bytes = get_settings().upload_max_mb * 1024 * 1024
+    if length <= 0 or length > max_bytes:
+        raise ValueError(f"Upload length must be 1..{max_bytes} bytes, got {length}")
+
+    upload_id = uuid4().hex
+    part, meta = _paths(upload_id)
+    part.touch()
+    info = {"upload_id": upload_id, "filename": filename, "length": length, "created_at": time.time()}
+    meta.write_text(json.dumps(info))
+    logger.info(f"Upload {upload_id} created: {filename} ({length} bytes)")
+    return {**info, "offset": 0}
+
+
+def get_upload(upload_id: str) -> Dict[str, Any]:
+    """Session info plus the current offset (bytes received so far).
+
+    Raises:
+        LookupError: If the upload does not exist.
+    """
+    part, meta = _paths(upload_id)
+    if not meta.exists() or not part.exists():
+        raise LookupError(f"Upload {upload_id} not found")
+    info = json.loads(meta.read_text())
+    info["offset"] = part.stat().st_size
+    return info
+
+
+def _open_locked(upload_id: str, part: Path) -> BinaryIO:
+    """Open part for appending under an exclusive, non-blocking flock."""
+    try:
+        f = open(part, "r+b")
+    except FileNotFoundError:
+        raise LookupError(f"Upload {upload_id} not found") from None
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        raise ValueError(f"Upload {upload_id} is busy: another request is appending to it") from None
+    return f
+
+
+def _append(f: BinaryIO, chunk: bytes) -> None:
+    f.seek(0, os.SEEK_END)
+    f.write(chunk)
+    f.flush()
+
+
+async def write_chunk(upload_id: str, offset: int, stream: AsyncIterator[bytes]) -> int:
+    """Append request body bytes at `offset`; returns the new offset.
+
+    The client must send the offset the server reported, as in tus; a
+    mismatch means a lost response and the client should re-query.
+    Bytes received before a dropped connection are kept. The .part file is
+    locked for the whole request and the offset checked under the lock, so
+    a concurrent append to the same upload is refused, not interleaved.
+
+    Raises:
+        LookupError: If the upload does not exist.
+        ValueError: On offset mismatch, a concurrent append, or data past
+            the declared length.
+    """
+    info = get_upload(upload_id)
+    part, _ = _paths(upload_id)
+    f = await asyncio.to_thread(_open_locked, upload_id, part)
+    try:
+        current = os.fstat(f.fileno()).st_size
+        if offset != current:
+            raise ValueError(f"Offset mismatch: upload is at {current}, got {offset}")
+
+        written = offset
+        buffer = bytearray()
+        try:
+            async for data in stream:
+                if written + len(buffer) + len(data) > info["length"]:
+                    raise ValueError(f"Upload exceeds declared length {info['length']}")
+                buffer += data
+                if len(buffer) >= CHUNK_BYTES:
+                    await asyncio.to_thread(_append, f, bytes(buffer))
+                    written += len(buffer)
+                    buffer.clear()
+        finally:
+            if buffer:
+                await asyncio.to_thread(_append, f, bytes(buffer))
+                written += len(buffer)
+    finally:
+        # Closing releases the flock
+        await asyncio.to_thread(f.close)
+    return written
+
+
+def claim_upload(upload_id: str, dest: Path) -> Dict[str, Any]:
+    """Move a completed upload to dest and close the session.
+
+    Returns the session info (original filename, length).
+
+    Raises:
+        LookupError: If the upload does not exist.
+        ValueError: If not all bytes have been received yet.
+    """
+    info = get_upload(upload_id)
+    if info["offset"] != info["length"]:
+        raise ValueError(f"Upload incomplete: {info['offset']}/{info['length']} bytes")
+    part, meta = _paths(upload_id)
+    Path(dest).parent.mkdir(parents=True, exist_ok=True)
+    shutil.move(str(part), str(dest))
+    meta.unlink(missing_ok=True)
+    logger.info(f"Upload {upload_id} claimed -> {dest}")
+    return info
+
+
+def expire_uploads(max_age_hours: Optional[float] = None) -> int:
+    """Delete sessions idle for max_age_hours; returns how many were removed.
+
+    A session's last activity is its latest append (or its creation).
+    max_age_hours defaults to settings.upload_session_ttl_hours.
+    """
+    if max_age_hours is None:
+        max_age_hours = get_settings().upload_session_ttl_hours
+    cutoff = time.time() - max_age_hours * 3600
+    removed = 0
+    for meta in _session_dir().glob("*.json"):
+        part = meta.with_suffix(".part")
+        try:
+            last_active = json.loads(meta.read_text()).get("created_at", 0)
+            if part.exists():
+                last_active = max(last_active, part.stat().st_mtime)
+            if last_active < cutoff:
+                part.unlink(missing_ok=True)
+                meta.unlink(missing_ok=True)
+                removed += 1
+        except (OSError, ValueError):
+            continue
+    if removed:
+        logger.info(f"Expired {removed} idle upload session(s)")
+    return removed
+
+
+async def expire_uploads_periodically(interval_seconds: float = EXPIRE_INTERVAL_SECONDS) -> None:
+    """Run expire_uploads() now and every interval_seconds until cancelled."""
+    while True:
+        try:
+            await asyncio.to_thread(expire_uploads)
+        except Exception as e:
+            logger.warning(f"Upload session cleanup failed: {e}")
+        await asyncio.sleep(interval_seconds)
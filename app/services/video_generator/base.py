@@ -1,7 +1,29 @@
 """Abstract base class for video providers."""
 
+import logging
 from abc import ABC, abstractmethod
-from typing import Optional
+from concurrent.futures import Future
+from typing import Callable
+
+from app.services.video_generator.cache import get_clip_cache
+
+logger = logging.getLogger(__name__)
+
+
+def _image_hash(path: str) -> str:
+    # Imported here: ugc_pipeline imports the video providers at load time
+    from app.services.ugc_pipeline.probe_index import get_content_hash
+    return get_content_hash(path)
+
+
+def _resolved(fn: Callable[..., str], *args) -> Future:
+    """Run fn now and wrap its outcome in a finished Future."""
+    future: Future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
 
 
 class VideoProvider(ABC):
@@ -28,6 +50,97 @@ class VideoProvider(ABC):
         """
         pass
 
+    def _cached_submit(
+        self,
+        force_new: bool,
+        key_parts: Callable[[], dict],
+        submit: Callable[[], Future],
+    ) -> Future:
+        """Serve a clip from the clip cache, else submit() and cache its result.
+
+        key_parts() must determine the clip (model, prompt, source image
+        hash, duration, shape) and is only evaluated when the cache is on.
+        force_new skips the lookup (user-initiated regen) but still stores
+        the fresh clip. Hits are placed in self.clips_dir.
+        """
+        cache = get_clip_cache()
+        if cache is None:
+            return submit()
+
+        key = cache.key(**key_parts())
+        if not force_new:
+            hit = cache.get(key, self.clips_dir, prefix="cached")
+            if hit:
+                logger.info(f"Clip cache hit: {hit[0]}")
+                future: Future = Future()
+                future.set_result(hit[0])
+                return future
+
+        # Resolve only after the clip is stored, so a caller that sees the
+        # result and immediately repeats the request gets a hit
+        result: Future = Future()
+
+        def store(done: Future) -> None:
+            try:
+                path = done.result()
+            except BaseException as e:
+                result.set_exception(e)
+                return
+            try:
+                cache.put(key, [path])
+            except Exception as e:
+                logger.warning(f"Could not cache clip {path}: {e}")
+            result.set_result(path)
+
+        submit().add_done_callback(store)
+        return result
+
+    def submit_clip(
+        self,
+        prompt: str,
+        duration_seconds: int,
+        width: int = 720,
+        height: int = 1280,
+        force_new: bool = False,
+    ) -> Future:
+        """Start generate_clip() and return a Future for the MP4 path.
+
+        Providers backed by remote long-running operations override this to
+        return while the operation is still rendering (see app.services.poller);
+        the default generates synchronously and returns a finished Future.
+        Both consult the clip cache first unless force_new is set.
+        """
+        return self._cached_submit(
+            force_new,
+            lambda: dict(
+                model=type(self).__name__, mode="text", prompt=prompt,
+                duration=duration_seconds, width=width, height=height,
+            ),
+            lambda: _resolved(self.generate_clip, prompt, duration_seconds, width, height),
+        )
+
+    def submit_clip_from_image(
+        self,
+        prompt: str,
+        image_path: str,
+        duration_seconds: int,
+        width: int = 720,
+        height: int = 1280,
+        force_new: bool = False,
+    ) -> Future:
+        """Image-to-video counterpart of submit_clip()."""
+        return self._cached_submit(
+            force_new,
+            lambda: dict(
+                model=type(self).__name__, mode="image", prompt=prompt,
+                image=_image_hash(image_path),
+                duration=duration_seconds, width=width, height=height,
+            ),
+            lambda: _resolved(
+                self.generate_clip_from_image, prompt, image_path, duration_seconds, width, height
+            ),
+        )
+
     @abstractmethod
     def supports_resolution(self, width: int, height: int) -> bool:
         """Check if provider supports the given resolution.
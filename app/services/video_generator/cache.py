@@ -0,0 +1,35 @@
+"""Veo clip cache (see app.services.content_cache).
+
+Clips are keyed on model, mode, the full (sanitized) prompt, source image
+content hash, duration and output shape, so resuming a failed job or
+rebuilding after a DB restore reuses clips whose inputs did not change.
+User-initiated regenerations pass force_new. Enabled by CLIP_CACHE_ENABLED.
+"""
+
+import logging
+import os
+import sqlite3
+from typing import Optional
+
+from app.config import get_settings
+from app.services.content_cache import ContentCache
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = "clip_cache"
+
+
+def get_clip_cache() -> Optional[ContentCache]:
+    """The configured cache, or None when CLIP_CACHE_ENABLED is off."""
+    settings = get_settings()
+    if not settings.clip_cache_enabled:
+        return None
+    try:
+        return ContentCache(
+            os.path.join(settings.output_dir, CACHE_DIR),
+            settings.clip_cache_max_mb * 1024 * 1024,
+            label="Clip cache",
+        )
+    except sqlite3.Error as e:
+        logger.warning(f"Clip cache unavailable, generating directly: {e}")
+        return None
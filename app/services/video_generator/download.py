@@ -0,0 +1,133 @@
+"""Streamed, resumable download of generated clips.
+
+A Veo clip is paid for once the operation finishes, so losing the download
+must not mean regenerating it. The body is streamed to <dest>.part in
+fixed-size chunks (memory stays bounded whatever the clip size). After a
+dropped connection the download resumes from the bytes already on disk
+with an HTTP Range request. <dest> only appears, via an atomic rename, once
+every byte has arrived.
+"""
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+RETRY_BACKOFF_SECONDS = 1.0
+RETRY_BACKOFF_MAX_SECONDS = 15.0
+# Statuses worth retrying; any other error status fails immediately
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+@dataclass
+class DownloadResult:
+    """Per-clip download metrics."""
+
+    path: str
+    bytes: int
+    seconds: float
+    retries: int
+    resumed_bytes: int  # bytes kept from earlier attempts instead of re-fetched
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes / 1024 / 1024 / self.seconds if self.seconds > 0 else 0.0
+
+
+def _total_size(response: httpx.Response) -> Optional[int]:
+    """Full size of the resource from Content-Range (206) or Content-Length (200)."""
+    content_range = response.headers.get("content-range", "")
+    if "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        return int(total) if total.isdigit() else None
+    length = response.headers.get("content-length")
+    return int(length) if length and length.isdigit() else None
+
+
+def stream_download(
+    client: httpx.Client,
+    url: str,
+    dest: str,
+    headers: Optional[Dict[str, str]] = None,
+    max_retries: int = 5,
+    label: str = "download",
+) -> DownloadResult:
+    """Stream url to dest, resuming with Range after connection failures.
+
+    Args:
+        client: HTTP client (redirects are followed if the client does)
+        url: Source URL
+        dest: Final path; written via dest + ".part" and renamed when complete
+        headers: Extra request headers (auth)
+        max_retries: Attempts after the first before giving up
+        label: Name for log messages
+
+    Returns:
+        DownloadResult with size, elapsed time, retries and resumed bytes
+
+    Raises:
+        httpx.HTTPError: If the download still fails after max_retries
+    """
+    part_path = f"{dest}.part"
+    start = time.monotonic()
+    retries = 0
+    resumed_bytes = 0
+    # Resume a partial file left by an earlier call for the same dest
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+
+    while True:
+        request_headers = dict(headers or {})
+        if offset:
+            request_headers["Range"] = f"bytes={offset}-"
+        try:
+            with client.stream("GET", url, headers=request_headers) as response:
+                if offset and response.status_code == 416:
+                    # Nothing left to fetch: the part file is already complete
+                    break
+                response.raise_for_status()
+                if offset and response.status_code != 206:
+                    logger.info(f"{label}: server ignored Range, restarting from 0")
+                    offset = 0
+                resumed_bytes += offset
+                total = _total_size(response)
+                with open(part_path, "ab" if offset else "wb") as f:
+                    for chunk in response.iter_bytes(CHUNK_SIZE):
+                        f.write(chunk)
+                        offset += len(chunk)
+                if total is not None and offset < total:
+                    raise httpx.ReadError(f"connection closed at {offset} of {total} bytes")
+            break
+        except (httpx.TransportError, httpx.HTTPStatusError) as e:
+            retryable = (
+                isinstance(e, httpx.TransportError)
+                or e.response.status_code in RETRY_STATUSES
+            )
+            if not retryable or retries >= max_retries:
+                logger.error(f"{label}: failed after {retries} retr{'y' if retries == 1 else 'ies'}: {e}")
+                raise
+            retries += 1
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            wait = min(RETRY_BACKOFF_MAX_SECONDS, RETRY_BACKOFF_SECONDS * 2 ** (retries - 1))
+            logger.warning(f"{label}: {e}; retry {retries}/{max_retries} from byte {offset} in {wait:.0f}s")
+            time.sleep(wait)
+
+    os.replace(part_path, dest)
+    result = DownloadResult(
+        path=dest,
+        bytes=os.path.getsize(dest),
+        seconds=time.monotonic() - start,
+        retries=retries,
+        resumed_bytes=resumed_bytes,
+    )
+    logger.info(
+        f"{label}: {result.bytes / 1024 / 1024:.1f} MB in {result.seconds:.1f}s "
+        f"({result.mb_per_second:.1f} MB/s), {result.retries} retries, "
+        f"{result.resumed_bytes} bytes resumed"
+    )
+    return result
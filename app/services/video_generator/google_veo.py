@@ -2,17 +2,22 @@
 
 import os
 import time
+from collections import deque
+from concurrent.futures import Future
 from urllib.parse import urlparse
 from uuid import uuid4
-from typing import Optional
+from typing import Deque, Optional
 
-import httpx
 from google import genai
 from google.genai import types
 
-from app.services.video_generator.base import VideoProvider
+from app.config import get_settings
+from app.services.video_generator.base import VideoProvider, _image_hash
+from app.services.video_generator.download import DownloadResult, stream_download
 from app.services.video_generator.mock import MockVideoProvider
+from app.services.poller import PENDING, get_poller
 from app.services.quota_tracker import record_veo_request
+from app.services.registry import get_http_client
 
 # Allowlisted domains for Veo video downloads
 _ALLOWED_DOWNLOAD_HOSTS = {
@@ -21,6 +26,18 @@ _ALLOWED_DOWNLOAD_HOSTS = {
     "generativeai.googleapis.com",
 }
 
+# Give up on an operation that has not finished in this long
+OPERATION_TIMEOUT_SECONDS = 600
+
+# Recent clip downloads kept per provider for download_result()
+DOWNLOAD_HISTORY = 256
+
+
+def _veo_duration(duration_seconds: int) -> int:
+    """CRITICAL: Veo only accepts even durations: 4, 6, or 8 seconds."""
+    valid_durations = [4, 6, 8]
+    return min(valid_durations, key=lambda d: abs(d - int(duration_seconds)))
+
 
 class GoogleVeoProvider(VideoProvider):
     """Veo 3.1 video generation via google-genai SDK.
@@ -60,6 +77,9 @@ class GoogleVeoProvider(VideoProvider):
         # Fallback to mock provider when not configured
         self._mock_provider = None
 
+        # Metrics of recent clip downloads (see download_result)
+        self._downloads: Deque[DownloadResult] = deque(maxlen=DOWNLOAD_HISTORY)
+
     @property
     def mock_provider(self) -> MockVideoProvider:
         """Lazy initialization of mock provider for fallback."""
@@ -67,17 +87,35 @@ class GoogleVeoProvider(VideoProvider):
             self._mock_provider = MockVideoProvider(output_dir=self.output_dir)
         return self._mock_provider
 
-    def _save_video(self, video_obj, output_path: str):
+    def download_result(self, clip_path: str) -> Optional[DownloadResult]:
+        """Download metrics (size, time, retries, resumed bytes) of a recent clip, if known."""
+        return next((d for d in reversed(self._downloads) if d.path == clip_path), None)
+
+    def _save_video(self, video_obj, output_path: str) -> DownloadResult:
         """Save generated video to file, handling both local bytes and remote URI.
 
+        Remote clips are streamed to disk and resumed after a dropped
+        connection (see download.stream_download); output_path only appears
+        once the clip is complete.
+
         Args:
             video_obj: GeneratedVideo.video object from Veo response
             output_path: Path to save the MP4 file
+
+        Returns:
+            DownloadResult for the saved clip (also kept for download_result)
         """
         if video_obj.video_bytes:
             # Video returned as bytes
-            with open(output_path, "wb") as f:
+            start = time.monotonic()
+            tmp_path = f"{output_path}.part"
+            with open(tmp_path, "wb") as f:
                 f.write(video_obj.video_bytes)
+            os.replace(tmp_path, output_path)
+            result = DownloadResult(
+                path=output_path, bytes=len(video_obj.video_bytes),
+                seconds=time.monotonic() - start, retries=0, resumed_bytes=0,
+            )
         elif video_obj.uri:
             # Validate download URL against allowlist to prevent SSRF
             parsed = urlparse(video_obj.uri)
@@ -86,49 +124,40 @@ class GoogleVeoProvider(VideoProvider):
                     f"Unexpected Veo download domain: {parsed.hostname}"
                 )
 
-            # Follow redirects — Google storage uses 302 redirects for downloads
-            with httpx.Client(timeout=120, follow_redirects=True) as http_client:
-                response = http_client.get(
-                    video_obj.uri,
-                    headers={"X-Goog-Api-Key": self.google_api_key},
-                )
-                response.raise_for_status()
-                with open(output_path, "wb") as f:
-                    f.write(response.content)
+            # Follow redirects — Google storage uses 302 redirects for downloads.
+            # Shared client: consecutive downloads reuse keep-alive connections.
+            http_client = get_http_client("veo-download", timeout=120, follow_redirects=True)
+            result = stream_download(
+                http_client,
+                video_obj.uri,
+                output_path,
+                headers={"X-Goog-Api-Key": self.google_api_key},
+                max_retries=get_settings().veo_download_retries,
+                label=f"Veo download {os.path.basename(output_path)}",
+            )
         else:
             raise ValueError("Veo response has neither video_bytes nor uri")
+        self._downloads.append(result)
+        return result
 
-    def generate_clip(
+    def _submit(
         self,
         prompt: str,
         duration_seconds: int,
-        width: int = 720,
-        height: int = 1280
-    ) -> str:
-        """Generate a video clip using Veo 3.1.
-
-        Args:
-            prompt: Visual description of the scene
-            duration_seconds: Length of clip in seconds (max 8)
-            width: Video width in pixels
-            height: Video height in pixels
-
-        Returns:
-            Path to generated MP4 file
+        width: int,
+        height: int,
+        image: Optional["types.Image"] = None,
+    ) -> Future:
+        """Start a Veo operation and hand it to the shared poller.
+
+        Returns a Future resolving to the saved MP4 path once the remote
+        operation finishes. Status checks run on the poller's loop; a caller
+        that blocks on the Future still holds its own thread until then.
         """
-        # Fallback to mock if no API key
-        if not self.google_api_key:
-            return self.mock_provider.generate_clip(
-                prompt=prompt,
-                duration_seconds=duration_seconds,
-                width=width,
-                height=height
-            )
+        mode = "image-to-video" if image is not None else "generation"
 
-        # CRITICAL: Veo only accepts even durations: 4, 6, or 8 seconds
         original_duration = duration_seconds
-        valid_durations = [4, 6, 8]
-        duration_seconds = min(valid_durations, key=lambda d: abs(d - int(original_duration)))
+        duration_seconds = _veo_duration(original_duration)
         if original_duration != duration_seconds:
             print(f"WARNING: Veo 3.1 requires 4/6/8s: adjusted {original_duration}s to {duration_seconds}s")
 
@@ -147,17 +176,23 @@ class GoogleVeoProvider(VideoProvider):
             operation = self.client.models.generate_videos(
                 model=self.model_name,
                 prompt=prompt,
+                image=image,
                 config=config,
             )
+        except Exception as e:
+            print(f"Veo {mode} failed: {e}")
+            raise
+
+        print(f"Veo {mode} started, polling for completion...")
 
-            # Poll until done
-            print(f"Veo generation started, polling for completion...")
-            while not operation.done:
-                time.sleep(10)
-                operation = self.client.operations.get(operation)
+        def check():
+            nonlocal operation
+            operation = self.client.operations.get(operation)
+            return operation if operation.done else PENDING
 
+        def finish(done_operation) -> str:
             # Check for safety filter
-            resp = operation.response
+            resp = done_operation.response
             if not resp or not resp.generated_videos:
                 reasons = getattr(resp, "rai_media_filtered_reasons", [])
                 raise RuntimeError(
@@ -167,60 +202,70 @@ class GoogleVeoProvider(VideoProvider):
             # Save video
             video = resp.generated_videos[0]
             output_path = os.path.join(self.clips_dir, f"veo_{uuid4().hex[:8]}.mp4")
-            self._save_video(video.video, output_path)
+            download = self._save_video(video.video, output_path)
 
             elapsed = time.time() - start_time
-            print(f"Veo generation completed in {elapsed:.1f}s "
-                  f"({duration_seconds}s clip at {aspect_ratio})")
-
+            print(f"Veo {mode} completed in {elapsed:.1f}s "
+                  f"({duration_seconds}s clip at {aspect_ratio}; "
+                  f"download {download.bytes / 1024 / 1024:.1f} MB at {download.mb_per_second:.1f} MB/s, "
+                  f"{download.retries} retries)")
             return output_path
 
-        except Exception as e:
-            print(f"Veo generation failed: {e}")
-            raise
+        return get_poller().submit(
+            check, name=f"Veo {mode}", timeout=OPERATION_TIMEOUT_SECONDS, then=finish,
+        )
+
+    def _cache_parts(self, mode: str, prompt: str, duration_seconds: int, width: int, height: int,
+                     image_path: str = "") -> dict:
+        """Everything that determines a Veo clip, for the clip cache key."""
+        return dict(
+            model=self.model_name,
+            mode=mode,
+            prompt=prompt,
+            image=_image_hash(image_path) if image_path else "",
+            duration=_veo_duration(duration_seconds),
+            aspect_ratio="9:16" if height > width else "16:9",
+        )
+
+    def submit_clip(
+        self,
+        prompt: str,
+        duration_seconds: int,
+        width: int = 720,
+        height: int = 1280,
+        force_new: bool = False,
+    ) -> Future:
+        """Start text-to-video generation; the Future resolves to the MP4 path.
 
-    def generate_clip_from_image(
+        Served from the clip cache when an identical clip exists, unless force_new.
+        """
+        # Fallback to mock if no API key
+        if not self.google_api_key:
+            return self.mock_provider.submit_clip(prompt, duration_seconds, width, height, force_new=force_new)
+        return self._cached_submit(
+            force_new,
+            lambda: self._cache_parts("text", prompt, duration_seconds, width, height),
+            lambda: self._submit(prompt, duration_seconds, width, height),
+        )
+
+    def submit_clip_from_image(
         self,
         prompt: str,
         image_path: str,
         duration_seconds: int,
         width: int = 720,
-        height: int = 1280
-    ) -> str:
-        """Generate a video clip from an image using Veo 3.1 (image-to-video mode).
+        height: int = 1280,
+        force_new: bool = False,
+    ) -> Future:
+        """Start image-to-video generation; the Future resolves to the MP4 path.
 
-        Args:
-            prompt: Visual description of the scene/motion
-            image_path: Path to input image file
-            duration_seconds: Length of clip in seconds (max 8)
-            width: Video width in pixels
-            height: Video height in pixels
-
-        Returns:
-            Path to generated MP4 file
+        Served from the clip cache when an identical clip exists, unless force_new.
         """
         # Fallback to mock if no API key
         if not self.google_api_key:
-            return self.mock_provider.generate_clip(
-                prompt=prompt,
-                duration_seconds=duration_seconds,
-                width=width,
-                height=height
-            )
-
-        # CRITICAL: Veo only accepts even durations: 4, 6, or 8 seconds
-        original_duration = duration_seconds
-        valid_durations = [4, 6, 8]
-        duration_seconds = min(valid_durations, key=lambda d: abs(d - int(original_duration)))
-        if original_duration != duration_seconds:
-            print(f"WARNING: Veo 3.1 requires 4/6/8s: adjusted {original_duration}s to {duration_seconds}s")
+            return self.mock_provider.submit_clip(prompt, duration_seconds, width, height, force_new=force_new)
 
-        # Determine aspect ratio
-        aspect_ratio = "9:16" if height > width else "16:9"
-
-        start_time = time.time()
-
-        try:
+        def submit() -> Future:
             # Load image as bytes with MIME type for Veo API
             with open(image_path, "rb") as f:
                 image_bytes = f.read()
@@ -231,48 +276,57 @@ class GoogleVeoProvider(VideoProvider):
             mime_type = mime_map.get(ext, "image/png")
 
             image = types.Image(imageBytes=image_bytes, mimeType=mime_type)
+            return self._submit(prompt, duration_seconds, width, height, image=image)
 
-            config = types.GenerateVideosConfig(
-                aspect_ratio=aspect_ratio,
-                duration_seconds=duration_seconds,
-            )
+        return self._cached_submit(
+            force_new,
+            lambda: self._cache_parts("image", prompt, duration_seconds, width, height, image_path),
+            submit,
+        )
 
-            record_veo_request()
-            operation = self.client.models.generate_videos(
-                model=self.model_name,
-                prompt=prompt,
-                image=image,
-                config=config,
-            )
-
-            # Poll until done
-            print(f"Veo image-to-video generation started, polling for completion...")
-            while not operation.done:
-                time.sleep(10)
-                operation = self.client.operations.get(operation)
+    def generate_clip(
+        self,
+        prompt: str,
+        duration_seconds: int,
+        width: int = 720,
+        height: int = 1280
+    ) -> str:
+        """Generate a video clip using Veo 3.1.
 
-            # Check for safety filter
-            resp = operation.response
-            if not resp or not resp.generated_videos:
-                reasons = getattr(resp, "rai_media_filtered_reasons", [])
-                raise RuntimeError(
-                    f"Veo safety filter blocked video: {reasons}"
-                )
+        Args:
+            prompt: Visual description of the scene
+            duration_seconds: Length of clip in seconds (max 8)
+            width: Video width in pixels
+            height: Video height in pixels
 
-            # Save video
-            video = resp.generated_videos[0]
-            output_path = os.path.join(self.clips_dir, f"veo_{uuid4().hex[:8]}.mp4")
-            self._save_video(video.video, output_path)
+        Returns:
+            Path to generated MP4 file
+        """
+        return self.submit_clip(prompt, duration_seconds, width, height).result()
 
-            elapsed = time.time() - start_time
-            print(f"Veo image-to-video completed in {elapsed:.1f}s "
-                  f"({duration_seconds}s clip at {aspect_ratio})")
+    def generate_clip_from_image(
+        self,
+        prompt: str,
+        image_path: str,
+        duration_seconds: int,
+        width: int = 720,
+        height: int = 1280
+    ) -> str:
+        """Generate a video clip from an image using Veo 3.1 (image-to-video mode).
 
-            return output_path
+        Args:
+            prompt: Visual description of the scene/motion
+            image_path: Path to input image file
+            duration_seconds: Length of clip in seconds (max 8)
+            width: Video width in pixels
+            height: Video height in pixels
 
-        except Exception as e:
-            print(f"Veo image-to-video generation failed: {e}")
-            raise
+        Returns:
+            Path to generated MP4 file
+        """
+        return self.submit_clip_from_image(
+            prompt, image_path, duration_seconds, width, height
+        ).result()
 
     def supports_resolution(self, width: int, height: int) -> bool:
         """Check if Veo provider supports the given resolution."""
@@ -0,0 +1,310 @@
+"""Dependency graph and scheduler for UGC pipeline stages.
+
+Analysis and script are sequential, but after the script is approved the
+pipeline splits into two independent branches that join at composition:
+
+    script -> A-Roll images -> A-Roll videos --+
+           -> B-Roll images -> B-Roll videos --+-> compose
+
+B-Roll images only need broll_shots and the product images, so they render
+while the user is still reviewing A-Roll images. A stage starts as soon as
+every stage it depends on is approved; review gates are never skipped.
+
+Each stage's progress lives in UGCJob.stage_states ({stage name: state},
+guarded by UGCStageStateMachine). UGCJob.status remains the single review
+gate the UI presents: a branch that finishes while another gate is open
+waits in "review" and is presented once the open gate is approved.
+
+Jobs created before stage_states existed are seeded from their linear
+status. UGC_PARALLEL_STAGES=false chains every stage linearly again.
+
+The functions here only change the job in memory; callers lock the row
+(lock_job_state), commit, and only then enqueue the returned tasks.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from app.config import get_settings
+from app.state_machines.ugc_job import UGCJobStateMachine, UGCStageStateMachine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A node of the pipeline graph."""
+
+    name: str
+    task: str               # Celery task function name in app.ugc_tasks
+    label: str              # Progress label while running
+    review_status: str      # UGCJob.status while this stage awaits review
+    complete_event: str     # UGCJobStateMachine: running -> review_status
+    approve_event: str      # UGCJobStateMachine: review_status -> running/approved
+    outputs: Tuple[str, ...]  # UGCJob columns the stage writes
+    after: Tuple[str, ...] = ()  # Stages that must be approved first
+
+
+# Linear order: the order gates are presented in and the legacy pipeline order
+STAGES: Tuple[Stage, ...] = (
+    Stage("analysis", "ugc_stage_1_analyze", "Analyzing product",
+          "stage_analysis_review", "complete_analysis", "approve_analysis",
+          ("analysis_category",)),
+    Stage("script", "ugc_stage_2_script", "Writing video script",
+          "stage_script_review", "complete_script", "approve_script",
+          ("master_script", "aroll_scenes", "broll_shots"), after=("analysis",)),
+    Stage("aroll_images", "ugc_stage_3a_aroll_images", "Generating A-Roll images",
+          "stage_aroll_image_review", "complete_aroll_images", "approve_aroll_images",
+          ("aroll_image_paths",), after=("script",)),
+    Stage("aroll_videos", "ugc_stage_3_aroll", "Generating A-Roll videos",
+          "stage_aroll_review", "complete_aroll", "approve_aroll",
+          ("aroll_paths",), after=("aroll_images",)),
+    Stage("broll_images", "ugc_stage_4a_broll_images", "Generating B-Roll images",
+          "stage_broll_image_review", "complete_broll_images", "approve_broll_images",
+          ("broll_image_paths",), after=("script",)),
+    Stage("broll_videos", "ugc_stage_4_broll", "Generating B-Roll videos",
+          "stage_broll_review", "complete_broll", "approve_broll",
+          ("broll_paths",), after=("broll_images",)),
+    Stage("compose", "ugc_stage_5_compose", "Composing final video",
+          "stage_composition_review", "complete_composition", "approve_final",
+          ("final_video_path",), after=("aroll_videos", "broll_videos")),
+)
+
+STAGES_BY_NAME: Dict[str, Stage] = {s.name: s for s in STAGES}
+STAGES_BY_REVIEW: Dict[str, Stage] = {s.review_status: s for s in STAGES}
+STAGES_BY_TASK: Dict[str, Stage] = {s.task: s for s in STAGES}
+
+
+def requires(stage: Stage) -> Tuple[str, ...]:
+    """Stages that must be approved before stage can start."""
+    if get_settings().ugc_parallel_stages:
+        return stage.after
+    idx = STAGES.index(stage)
+    return (STAGES[idx - 1].name,) if idx else ()
+
+
+def dependents(name: str) -> List[Stage]:
+    """Every stage downstream of name (transitively), in linear order."""
+    found = {name}
+    for stage in STAGES:  # STAGES is topologically ordered
+        if any(dep in found for dep in requires(stage)):
+            found.add(stage.name)
+    return [s for s in STAGES if s.name in found and s.name != name]
+
+
+def downstream_columns(review_status: str) -> List[str]:
+    """Output columns invalidated when the user goes back to review_status."""
+    stage = STAGES_BY_REVIEW[review_status]
+    return [col for s in dependents(stage.name) for col in s.outputs]
+
+
+# --- Stage states ---
+
+def _linear_resume_stage(job) -> Stage:
+    """The stage after the last one whose output exists (linear pipeline)."""
+    for idx in range(len(STAGES) - 1, -1, -1):
+        if any(getattr(job, col, None) is not None for col in STAGES[idx].outputs):
+            return STAGES[min(idx + 1, len(STAGES) - 1)]
+    return STAGES[0]
+
+
+def _seed_linear(job) -> Dict[str, str]:
+    """Stage states of a job that ran through the linear pipeline."""
+    if job.status == "approved":
+        return {s.name: "approved" for s in STAGES}
+    if job.status == "pending":
+        return {}
+    current = STAGES_BY_REVIEW.get(job.status)
+    state = "review"
+    if current is None:
+        current = _linear_resume_stage(job)
+        state = "failed" if job.status == "failed" else "running"
+    states = {}
+    for stage in STAGES:
+        if stage is current:
+            states[stage.name] = state
+            break
+        states[stage.name] = "approved"
+    return states
+
+
+def get_stage_states(job) -> Dict[str, str]:
+    """Copy of the job's stage states (a missing stage is pending)."""
+    if job.stage_states is None:
+        return _seed_linear(job)
+    return dict(job.stage_states)
+
+
+def stage_state(job, name: str) -> str:
+    return get_stage_states(job).get(name, "pending")
+
+
+def stages_in(job, state: str) -> List[Stage]:
+    """Stages currently in state, in linear order."""
+    states = get_stage_states(job)
+    return [s for s in STAGES if states.get(s.name, "pending") == state]
+
+
+def _send_stage(states: Dict[str, str], name: str, event: str) -> None:
+    """Apply event to one stage via UGCStageStateMachine (raises TransitionNotAllowed)."""
+    sm = UGCStageStateMachine(start_value=states.get(name, "pending"))
+    sm.send(event)
+    states[name] = sm.current_state.id
+
+
+def _send_job(job, event: str) -> None:
+    sm = UGCJobStateMachine(model=job, state_field="status", start_value=job.status)
+    sm.send(event)
+    job.status = sm.current_state.id
+
+
+async def lock_job_state(session, job) -> None:
+    """Re-read status and stage_states under a row lock.
+
+    Sibling branches and review actions update the same row; without the
+    lock a branch finishing concurrently could overwrite another's state.
+    SQLite has no row locks: flushing pending output columns first takes
+    its database write lock, which serializes the same way.
+    """
+    await session.flush()
+    await session.refresh(job, attribute_names=["status", "stage_states"], with_for_update=True)
+
+
+# --- Transitions ---
+
+def start_job(job) -> List[str]:
+    """Pending job -> running with analysis started. Returns tasks to enqueue."""
+    _send_job(job, "start")
+    job.stage_states = {}
+    return _start_ready(job)
+
+
+def _start_ready(job) -> List[str]:
+    """Start every pending or failed stage whose dependencies are approved."""
+    states = get_stage_states(job)
+    started = []
+    for stage in STAGES:
+        if states.get(stage.name, "pending") not in ("pending", "failed"):
+            continue
+        if all(states.get(dep) == "approved" for dep in requires(stage)):
+            _send_stage(states, stage.name, "start")
+            started.append(stage)
+    job.stage_states = states
+    if started:
+        logger.info(f"UGCJob {job.id}: started {', '.join(s.name for s in started)}")
+    return [s.task for s in started]
+
+
+def _present_next_gate(job) -> None:
+    """If no gate is open, present the first stage waiting for review."""
+    if job.status != "running":
+        return
+    waiting = stages_in(job, "review")
+    if waiting:
+        _send_job(job, waiting[0].complete_event)
+
+
+def approve_gate(job) -> List[str]:
+    """Approve the open review gate and start whatever became ready.
+
+    The job moves to the next branch already waiting for review, else to
+    running (or approved after composition). Returns tasks to enqueue.
+    The caller has checked that job.status is a review gate.
+    """
+    stage = STAGES_BY_REVIEW[job.status]
+    states = get_stage_states(job)
+    _send_job(job, stage.approve_event)
+    _send_stage(states, stage.name, "approve")
+    job.stage_states = states
+    tasks = _start_ready(job)
+    _present_next_gate(job)
+    return tasks
+
+
+def regenerate_gate(job) -> str:
+    """Re-run the open gate's stage: job -> running, stage review -> running.
+
+    Returns the task to enqueue.
+    """
+    stage = STAGES_BY_REVIEW[job.status]
+    states = get_stage_states(job)
+    _send_job(job, stage.approve_event)
+    _send_stage(states, stage.name, "regenerate")
+    job.stage_states = states
+    return stage.task
+
+
+def finish_stage(job, name: str) -> None:
+    """Record a stage's output as ready for review.
+
+    Presents it right away when no other gate is open; otherwise it waits
+    until the open gate is approved.
+    """
+    states = get_stage_states(job)
+    _send_stage(states, name, "complete")
+    job.stage_states = states
+    _present_next_gate(job)
+
+
+def fail_stage(job, task_name: str) -> None:
+    """Mark the stage run by task_name failed (job status is handled by the caller)."""
+    stage = STAGES_BY_TASK.get(task_name)
+    if stage is None:
+        return
+    states = get_stage_states(job)
+    if states.get(stage.name) == "failed":
+        return  # already recorded (e.g. chord callback, then its errback)
+    try:
+        _send_stage(states, stage.name, "fail")
+    except Exception as e:
+        logger.warning(f"UGCJob {job.id}: could not mark {stage.name} failed: {e}")
+        return
+    job.stage_states = states
+
+
+def retry(job) -> List[str]:
+    """Failed job -> running: restart failed stages. Returns tasks to enqueue.
+
+    A stage still "running" on a failed job lost its failure report (or
+    its task); it is restarted too, so the branch cannot stall compose.
+    """
+    states = get_stage_states(job)  # seeds legacy jobs while status is still "failed"
+    for stage in STAGES:
+        if states.get(stage.name) == "running":
+            _send_stage(states, stage.name, "fail")
+    job.stage_states = states
+    _send_job(job, "retry")
+    tasks = _start_ready(job)
+    if not tasks and not stages_in(job, "running"):
+        # No stage recorded the failure: fall back to the linear checkpoint
+        stage = _linear_resume_stage(job)
+        states = get_stage_states(job)
+        states[stage.name] = "failed"  # so _start_ready restarts it
+        job.stage_states = states
+        tasks = _start_ready(job)
+    _present_next_gate(job)
+    return tasks
+
+
+def busy_dependents(job, review_status: str) -> List[Stage]:
+    """Stages downstream of review_status that are still generating."""
+    states = get_stage_states(job)
+    stage = STAGES_BY_REVIEW[review_status]
+    return [s for s in dependents(stage.name) if states.get(s.name) == "running"]
+
+
+def reopen_gate(job, review_status: str) -> None:
+    """Go back to review_status: reopen its stage and reset everything downstream.
+
+    Sets job.status directly (rewinds bypass the job state machine). The
+    caller checks busy_dependents() first and clears
+    downstream_columns(review_status).
+    """
+    stage = STAGES_BY_REVIEW[review_status]
+    states = get_stage_states(job)
+    _send_stage(states, stage.name, "reopen")
+    for dep in dependents(stage.name):
+        _send_stage(states, dep.name, "reset")
+    job.stage_states = states
+    job.status = review_status
@@ -7,6 +7,11 @@ machine starts at the current persisted state.
 Usage:
     sm = UGCJobStateMachine(model=job, state_field="status", start_value=job.status)
     sm.send("start")  # validates pending -> running; writes job.status = "running"
+
+Stages after script approval run as parallel branches (A-Roll and B-Roll),
+see app.state_machines.ugc_graph. Each stage's own progress is kept
+in UGCJob.stage_states and guarded by UGCStageStateMachine; UGCJob.status
+stays the single review gate presented to the user.
 """
 from statemachine import StateMachine, State
 
@@ -14,7 +19,10 @@ from statemachine import StateMachine, State
 class UGCJobStateMachine(StateMachine):
     """Guards all UGCJob status transitions.
 
-    States map 1:1 to UGCJob.status column values.
+    States map 1:1 to UGCJob.status column values. While several branches
+    are in flight, "running" means no review gate is open; a branch that
+    finishes while another gate is open waits in stage_states until that
+    gate is approved, then complete_* presents it.
     Invalid transitions raise statemachine.exceptions.TransitionNotAllowed.
     """
 
@@ -67,3 +75,38 @@ class UGCJobStateMachine(StateMachine):
         | stage_composition_review.to(failed)
         | approved.to(failed)
     )
+
+
+class UGCStageStateMachine(StateMachine):
+    """Guards one pipeline stage's entry in UGCJob.stage_states.
+
+    Stages whose inputs are approved run concurrently, so each keeps its own
+    state: pending -> running -> review -> approved. A missing entry is pending.
+    """
+
+    # --- States ---
+    pending = State(initial=True)
+    running = State()
+    review = State()
+    approved = State()
+    failed = State()
+
+    # --- Transitions ---
+    # Inputs approved (or retry after a failure)
+    start = pending.to(running) | failed.to(running)
+    complete = running.to(review)
+    approve = review.to(approved)
+    # Regenerate from review
+    regenerate = review.to(running)
+    fail = pending.to(failed) | running.to(failed) | review.to(failed)
+
+    # User went back to this stage (rewind, back-to-images, reopen)
+    reopen = approved.to(review) | failed.to(review) | review.to.itself()
+
+    # An upstream stage was reopened: this stage's output is discarded
+    reset = (
+        review.to(pending)
+        | approved.to(pending)
+        | failed.to(pending)
+        | pending.to.itself()
+    )
@@ -0,0 +1,136 @@
+"""Celery queues per workload class, and the worker profile for each.
+
+Tasks wait on very different things: a Gemini call returns in seconds, an
+Imagen batch in tens of seconds, a Veo clip in minutes, and ffmpeg
+composition holds a CPU for up to 20 minutes. On one queue a quick field
+regeneration sits behind whatever composition is ahead of it, so each
+class gets its own queue and its own workers:
+
+  llm        Gemini analysis / script calls (short, I/O-bound)
+  image      Imagen generation, incl. stage 1 (analysis + hero image)
+  video_gen  Veo clips: stage dispatchers and per-slot subtasks (long I/O waits)
+  render     ffmpeg / moviepy: ingest, compose, final render, trim (CPU-bound)
+  celery     default: chord callbacks, celery.chord_unlock, anything unrouted
+
+WORKER_PROFILES holds the recommended pool, concurrency, prefetch and
+default time limits per queue (a task's own time_limit takes precedence).
+`python -m app.task_queues` prints one worker command per profile;
+docker-compose.yml runs the same commands as separate services.
+
+CELERY_DEDICATED_QUEUES=false routes everything except render work to
+"celery", for setups that run a single `-Q celery,render` worker.
+"""
+
+import sys
+from dataclasses import dataclass
+from typing import Dict
+
+from app.config import get_settings
+
+LLM = "llm"
+IMAGE = "image"
+VIDEO_GEN = "video_gen"
+RENDER = "render"
+DEFAULT = "celery"
+
+ALL_QUEUES = (DEFAULT, LLM, IMAGE, VIDEO_GEN, RENDER)
+
+TASK_QUEUES: Dict[str, str] = {
+    # llm
+    "app.ugc_tasks.ugc_regen_analysis_field": LLM,
+    "app.ugc_tasks.ugc_stage_2_script": LLM,
+    "app.ugc_tasks.ugc_regen_script": LLM,
+    "app.ugc_tasks.ugc_regen_script_field": LLM,
+    "ugc_resplit_scenes": LLM,
+    # image
+    "app.ugc_tasks.ugc_stage_1_analyze": IMAGE,
+    "app.ugc_tasks.ugc_regen_hero_image": IMAGE,
+    "app.ugc_tasks.ugc_stage_3a_aroll_images": IMAGE,
+    "app.ugc_tasks.ugc_stage_4a_broll_images": IMAGE,
+    "app.ugc_tasks.ugc_regen_aroll_scene_image": IMAGE,
+    "app.ugc_tasks.ugc_regen_all_aroll_images": IMAGE,
+    "app.ugc_tasks.ugc_regen_broll_shot_image": IMAGE,
+    "app.ugc_tasks.ugc_regen_all_broll_images": IMAGE,
+    "app.ugc_tasks.lp_hero_regen": IMAGE,
+    "app.ugc_tasks.lp_generate_section_images": IMAGE,
+    "app.ugc_tasks.lp_regen_section_image": IMAGE,
+    # video_gen
+    "app.ugc_tasks.ugc_stage_3_aroll": VIDEO_GEN,
+    "app.ugc_tasks.ugc_stage_4_broll": VIDEO_GEN,
+    "app.ugc_tasks.ugc_video_slot": VIDEO_GEN,
+    "app.ugc_tasks.ugc_regen_aroll_scene_video": VIDEO_GEN,
+    "app.ugc_tasks.ugc_regen_broll_shot_video": VIDEO_GEN,
+    "app.ugc_tasks.ugc_regen_all_aroll_videos": VIDEO_GEN,
+    "app.ugc_tasks.ugc_regen_all_broll_videos": VIDEO_GEN,
+    # render
+    "app.ugc_tasks.ugc_ingest_clips": RENDER,
+    "app.ugc_tasks.ugc_stage_5_compose": RENDER,
+    "app.ugc_tasks.ugc_render_final": RENDER,
+    "app.ugc_tasks.ugc_trim_video": RENDER,
+}
+
+
+@dataclass(frozen=True)
+class WorkerProfile:
+    """Recommended worker settings for one queue."""
+
+    queues: str  # -Q value; the llm worker also drains the default queue
+    pool: str
+    concurrency: int
+    prefetch_multiplier: int
+    time_limit: int  # seconds; default for tasks without their own time_limit
+    soft_time_limit: int
+
+
+WORKER_PROFILES: Dict[str, WorkerProfile] = {
+    # Many short calls: more threads and a deeper prefetch keep latency low
+    LLM: WorkerProfile(f"{LLM},{DEFAULT}", "threads", 8, 4, 600, 540),
+    # Bounded by the Imagen quota; IMAGEN_CONCURRENCY already parallelizes inside a task
+    IMAGE: WorkerProfile(IMAGE, "threads", 4, 1, 900, 840),
+    # Each slot task blocks its thread until its clip is done (minutes), so
+    # concurrency caps clips in flight per worker; VEO_QUOTA_RPM bounds submissions
+    VIDEO_GEN: WorkerProfile(VIDEO_GEN, "threads", 8, 1, 900, 840),
+    # ffmpeg runs as a subprocess and ingest/compose start their own process
+    # pools (not allowed inside prefork children), so threads, about one per core
+    RENDER: WorkerProfile(RENDER, "threads", 2, 1, 1800, 1500),
+}
+
+
+def route_for(task_name: str) -> str:
+    """Queue a task is sent to under the current settings."""
+    queue = TASK_QUEUES.get(task_name, DEFAULT)
+    if queue != RENDER and not get_settings().celery_dedicated_queues:
+        return DEFAULT
+    return queue
+
+
+def task_routes() -> Dict[str, Dict[str, str]]:
+    """Celery task_routes for every routed task."""
+    return {name: {"queue": route_for(name)} for name in TASK_QUEUES}
+
+
+def worker_command(name: str) -> str:
+    """celery worker command line for a WORKER_PROFILES entry."""
+    p = WORKER_PROFILES[name]
+    parts = [
+        "celery -A app.worker.celery_app worker",
+        f"-Q {p.queues}",
+        f"-n {name}@%h",
+        f"--pool={p.pool}",
+        f"--concurrency={p.concurrency}",
+        f"--prefetch-multiplier={p.prefetch_multiplier}",
+        f"--time-limit={p.time_limit}",
+        f"--soft-time-limit={p.soft_time_limit}",
+        "--loglevel=info",
+    ]
+    return " ".join(parts)
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(WORKER_PROFILES)
+    for name in names:
+        print(f"# {name}\n{worker_command(name)}")
+    if not sys.argv[1:]:
+        print("# or every queue on one worker (local development)")
+        print(f"celery -A app.worker.celery_app worker -Q {','.join(ALL_QUEUES)} "
+              f"--pool=threads --concurrency=4 --loglevel=info")
@@ -0,0 +1,202 @@
+"""Long-lived event loop and pooled DB engine for Celery tasks.
+
+UGC tasks are sync Celery functions that wrap async handlers. Running each
+one with asyncio.run() built a new event loop per call (two on failure, for
+_fail_job), and every get_task_session_factory() call built a NullPool
+engine, so each task opened a fresh DB connection.
+
+Here each worker thread instead owns one TaskRuntime: an event loop that
+lives as long as the thread, and an engine with a small connection pool
+bound to that loop. Pooled asyncpg connections cannot move between loops,
+so the runtime is per loop, not per process. The worker runs with
+--pool=threads and keeps its threads, so from the second task on a thread
+reuses its loop and warm connections.
+
+A runtime is built by the first run_async() on its thread; a signal handler
+runs on another thread and cannot warm it. init_worker_process() is wired to
+worker_process_init, which only fires under prefork: the child drops
+runtimes inherited from the parent and warms the one its tasks will use.
+shutdown_runtimes() disposes the engines on worker shutdown, each on the
+thread that owns it while that thread is alive.
+runtime_stats() reports loops and engines built, tasks run and DB
+connections opened.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Awaitable, Dict, List, Optional, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_local = threading.local()
+_lock = threading.Lock()
+_pid: Optional[int] = None
+_runtimes: List["TaskRuntime"] = []
+_counters: Dict[str, float] = {}
+
+
+def _count(name: str, amount: float = 1) -> None:
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def build_task_engine() -> AsyncEngine:
+    """Pooled engine for one task event loop (TASK_DB_POOL_SIZE connections)."""
+    settings = get_settings()
+    kwargs: Dict[str, Any] = {"echo": settings.task_db_echo, "future": True}
+    if settings.database_url.startswith("sqlite"):
+        kwargs["connect_args"] = {"check_same_thread": False}
+    else:
+        kwargs["pool_pre_ping"] = True
+        kwargs["pool_size"] = settings.task_db_pool_size
+        kwargs["max_overflow"] = settings.task_db_pool_size
+    engine = create_async_engine(settings.database_url, **kwargs)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        _count("connections")
+
+    return engine
+
+
+class TaskRuntime:
+    """An event loop plus the pooled engine and session factory bound to it."""
+
+    def __init__(self):
+        start = time.perf_counter()
+        self.loop = asyncio.new_event_loop()
+        self.engine = build_task_engine()
+        self.session_factory = sessionmaker(
+            self.engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+        )
+        self.thread = threading.current_thread()
+        self.thread_name = self.thread.name
+        self.closing = threading.Event()
+        _count("runtimes")
+        _count("setup_seconds", time.perf_counter() - start)
+        logger.info(f"Task runtime ready on {self.thread_name} (pid {os.getpid()})")
+
+    def run(self, coro: Awaitable[T]) -> T:
+        _count("tasks")
+        try:
+            return self.loop.run_until_complete(coro)
+        finally:
+            # Shutdown asked while this task ran: dispose here, on the owning thread
+            if self.closing.is_set():
+                self.close()
+
+    def owned_here(self) -> bool:
+        """True if no other thread can be using this loop."""
+        return self.thread is threading.current_thread() or not self.thread.is_alive()
+
+    def close(self) -> None:
+        """Dispose the engine's connections and close the loop (owning thread, idle)."""
+        if self.loop.is_closed():
+            return
+        try:
+            self.loop.run_until_complete(self.engine.dispose())
+        except Exception as e:
+            logger.warning(f"Task runtime on {self.thread_name}: engine dispose failed: {e}")
+        self.loop.close()
+
+
+def _check_fork() -> None:
+    """Forget runtimes inherited from a parent process (caller holds _lock)."""
+    global _pid
+    if _pid != os.getpid():
+        # The parent's loops and pooled connections are not usable here
+        _runtimes.clear()
+        _counters.clear()
+        _local.__dict__.clear()
+        _pid = os.getpid()
+
+
+def get_runtime() -> TaskRuntime:
+    """The calling thread's runtime, built on first use."""
+    with _lock:
+        _check_fork()
+    runtime = getattr(_local, "runtime", None)
+    if runtime is not None and runtime.closing.is_set():
+        runtime.close()
+    if runtime is None or runtime.loop.is_closed():
+        runtime = TaskRuntime()
+        _local.runtime = runtime
+        with _lock:
+            _runtimes.append(runtime)
+    return runtime
+
+
+def current_session_factory() -> Optional[sessionmaker]:
+    """Session factory of the runtime whose loop is running, else None."""
+    runtime = getattr(_local, "runtime", None)
+    if runtime is None:
+        return None
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    return runtime.session_factory if running is runtime.loop else None
+
+
+def run_async(coro: Awaitable[T]) -> T:
+    """Run coro to completion on the calling thread's long-lived loop.
+
+    Replaces asyncio.run() in Celery tasks: the loop and its pooled
+    DB connections survive to the next task on the same thread.
+    """
+    return get_runtime().run(coro)
+
+
+def init_worker_process(**kwargs) -> None:
+    """worker_process_init handler: reset inherited state, warm this process's runtime."""
+    with _lock:
+        _check_fork()
+    get_runtime()
+
+
+def shutdown_runtimes(**kwargs) -> None:
+    """worker_process_shutdown / worker_shutdown handler: close every runtime.
+
+    A runtime is closed here only if it belongs to this thread or its thread
+    has exited (the pool is stopped before worker_shutdown). A live thread's
+    runtime is flagged instead and that thread disposes it after its current
+    task, or before its next one.
+    """
+    with _lock:
+        runtimes = list(_runtimes)
+        _runtimes.clear()
+    for runtime in runtimes:
+        runtime.closing.set()
+        if runtime.owned_here():
+            runtime.close()
+        else:
+            logger.info(f"Task runtime on {runtime.thread_name} closes on its own thread")
+    _local.__dict__.clear()
+
+
+def runtime_stats() -> Dict[str, Any]:
+    """Runtimes (loop + engine) built, tasks run on them, DB connections opened."""
+    with _lock:
+        _check_fork()
+        counters = dict(_counters)
+    runtimes = int(counters.get("runtimes", 0))
+    return {
+        "pid": _pid,
+        "runtimes": runtimes,
+        "tasks": int(counters.get("tasks", 0)),
+        "connections": int(counters.get("connections", 0)),
+        "setup_ms": round(1000 * counters.get("setup_seconds", 0.0) / runtimes, 2) if runtimes else 0.0,
+    }
@@ -25,22 +25,17 @@ from statemachine.exceptions import TransitionNotAllowed
 
 from app.database import async_session_factory, get_session
 from app.models import UGCJob
+from app.state_machines import ugc_graph
+from app.services.uploads import save_upload
 from app.state_machines.ugc_job import UGCJobStateMachine
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ugc", tags=["ugc"])
 
-# Maps review status -> (approve_event, next_task_function_name)
-_STAGE_ADVANCE_MAP = {
-    "stage_analysis_review":      ("approve_analysis",    "ugc_stage_2_script"),
-    "stage_script_review":        ("approve_script",      "ugc_stage_3a_aroll_images"),
-    "stage_aroll_image_review":   ("approve_aroll_images", "ugc_stage_3_aroll"),
-    "stage_aroll_review":         ("approve_aroll",       "ugc_stage_4a_broll_images"),
-    "stage_broll_image_review":   ("approve_broll_images", "ugc_stage_4_broll"),
-    "stage_broll_review":         ("approve_broll",       "ugc_stage_5_compose"),
-    "stage_composition_review":   ("approve_final",       None),
-}
+# Maps review status -> approve_event; the stages it unlocks come from
+# the stage dependency graph (app.state_machines.ugc_graph)
+_STAGE_ADVANCE_MAP = {s.review_status: s.approve_event for s in ugc_graph.STAGES}
 
 # Maps review status -> celery task to re-run for that stage
 _STAGE_REGEN_MAP = {
@@ -57,12 +52,12 @@ _STAGE_SKIP_VIDEO_CONFIG = {
     "stage_aroll_image_review": {
         "video_col": "aroll_paths",
         "count_source": "aroll_scenes",
-        "complete_event": "complete_aroll",
+        "stage": "aroll_videos",
     },
     "stage_broll_image_review": {
         "video_col": "broll_paths",
         "count_source": "broll_shots",
-        "complete_event": "complete_broll",
+        "stage": "broll_videos",
     },
 }
 
@@ -114,10 +109,21 @@ async def submit_ugc_job(
     product_url: Optional[str] = Form(None),
     target_duration: int = Form(30),
     style_preference: Optional[str] = Form(None),
+    compose_engine: Optional[str] = Form(None),
     images: List[UploadFile] = File(default=[]),
     session: AsyncSession = Depends(get_session),
 ):
     """Create a UGCJob, upload product images, and enqueue stage 1 analysis task."""
+    from app.services.ugc_pipeline.ugc_compositor import COMPOSE_ENGINES
+
+    # Empty form value = use settings.compose_engine
+    compose_engine = compose_engine or None
+    if compose_engine and compose_engine not in COMPOSE_ENGINES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid compose_engine '{compose_engine}' — expected one of {list(COMPOSE_ENGINES)}",
+        )
+
     # Create job row
     job = UGCJob(
         product_name=product_name,
@@ -126,6 +132,7 @@ async def submit_ugc_job(
         product_url=product_url,
         target_duration=target_duration,
         style_preference=style_preference,
+        compose_engine=compose_engine,
         status="pending",
     )
     session.add(job)
@@ -138,22 +145,20 @@ async def submit_ugc_job(
         upload_dir.mkdir(parents=True, exist_ok=True)
         for img in images:
             dest = upload_dir / (img.filename or f"image_{len(image_paths)}")
-            content = await img.read()
-            dest.write_bytes(content)
+            await save_upload(img, dest)
             image_paths.append(str(dest))
     job.product_image_paths = image_paths or None
 
-    # Transition pending -> running
-    sm = UGCJobStateMachine(model=job, state_field="status", start_value=job.status)
-    sm.send("start")
-    job.status = sm.current_state.id
+    # Transition pending -> running (stage 1 analysis)
+    next_tasks = ugc_graph.start_job(job)
 
     await session.commit()
     logger.info(f"UGCJob {job.id} created, status={job.status}")
 
     # Enqueue stage 1 task
     import app.ugc_tasks  # noqa: F401 — ensures tasks are registered
-    app.ugc_tasks.ugc_stage_1_analyze.delay(job.id)
+    for task_name in next_tasks:
+        getattr(app.ugc_tasks, task_name).delay(job.id)
 
     return {"job_id": job.id, "status": job.status}
 
@@ -165,12 +170,13 @@ async def advance_ugc_job(
     job_id: int,
     session: AsyncSession = Depends(get_session),
 ):
-    """Approve current review state, optionally enqueue next stage task."""
+    """Approve current review state and enqueue every stage it unlocks."""
     # Load job
     result = await session.execute(select(UGCJob).where(UGCJob.id == job_id))
     job = result.scalars().first()
     if not job:
         raise HTTPException(status_code=404, detail=f"UGCJob {job_id} not found")
+    await ugc_graph.lock_job_state(session, job)
 
     # Check current status is a review state
     if job.status not in _STAGE_ADVANCE_MAP:
@@ -179,13 +185,11 @@ async def advance_ugc_job(
             detail=f"Cannot advance from status '{job.status}' — not a review state",
         )
 
-    approve_event, next_task_name = _STAGE_ADVANCE_MAP[job.status]
+    approve_event = _STAGE_ADVANCE_MAP[job.status]
 
-    # Transition via state machine
+    # Transition via state machine; may present another branch's review gate
     try:
-        sm = UGCJobStateMachine(model=job, state_field="status", start_value=job.status)
-        sm.send(approve_event)
-        job.status = sm.current_state.id
+        next_tasks = ugc_graph.approve_gate(job)
     except TransitionNotAllowed as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
@@ -196,13 +200,22 @@ async def advance_ugc_job(
     await session.commit()
     logger.info(f"UGCJob {job_id} advanced via '{approve_event}', status={job.status}")
 
-    # Enqueue next stage task if applicable
-    if next_task_name:
-        import app.ugc_tasks as ugc_tasks_module  # noqa: F401
-        task_fn = getattr(ugc_tasks_module, next_task_name)
-        task_fn.delay(job_id)
+    # Enqueue the stages this approval unlocked (parallel branches run concurrently)
+    import app.ugc_tasks as ugc_tasks_module  # noqa: F401
+    for task_name in next_tasks:
+        getattr(ugc_tasks_module, task_name).delay(job_id)
+
+    # Reviewed on a draft render: produce the final master now
+    if approve_event == "approve_final" and job.render_profile not in (None, "final"):
+        ugc_tasks_module.ugc_render_final.delay(job_id)
+        next_tasks = ["ugc_render_final"]
 
-    return {"job_id": job.id, "status": job.status, "next_stage": next_task_name}
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "next_stage": next_tasks[0] if next_tasks else None,
+        "next_stages": next_tasks,
+    }
 
 
 # --- POST /ugc/jobs/{job_id}/regenerate ---
@@ -217,6 +230,7 @@ async def regenerate_ugc_stage(
     job = result.scalars().first()
     if not job:
         raise HTTPException(status_code=404, detail=f"UGCJob {job_id} not found")
+    await ugc_graph.lock_job_state(session, job)
 
     # Gate: must be a regeneratable review state
     if job.status not in _STAGE_REGEN_MAP:
@@ -228,12 +242,9 @@ async def regenerate_ugc_stage(
 
     task_name = _STAGE_REGEN_MAP[job.status]
 
-    # Use the advance map approve event to transition review -> running
-    approve_event, _ = _STAGE_ADVANCE_MAP[job.status]
+    # Transition review -> running; other branches keep their state
     try:
-        sm = UGCJobStateMachine(model=job, state_field="status", start_value=job.status)
-        sm.send(approve_event)
-        job.status = sm.current_state.id
+        ugc_graph.regenerate_gate(job)
     except TransitionNotAllowed as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
@@ -243,30 +254,11 @@ async def regenerate_ugc_stage(
     # Lazy import to avoid circular import at module load time
     import app.ugc_tasks as ugc_tasks_module
     task_fn = getattr(ugc_tasks_module, task_name)
-    task_fn.delay(job_id)
+    task_fn.delay(job_id, regenerate=True)
 
     return {"job_id": job_id, "status": job.status, "regenerating": task_name}
 
 
-# Maps populated columns -> Celery task to resume from (bottom-up check)
-_RETRY_RESUME_MAP = [
-    ("broll_paths",       "ugc_stage_5_compose"),
-    ("broll_image_paths", "ugc_stage_4_broll"),
-    ("aroll_paths",       "ugc_stage_4a_broll_images"),
-    ("aroll_image_paths", "ugc_stage_3_aroll"),
-    ("master_script",     "ugc_stage_3a_aroll_images"),
-    ("analysis_category", "ugc_stage_2_script"),
-]
-
-
-def _determine_resume_task(job) -> str:
-    """Pick the Celery task to resume from based on which columns are populated."""
-    for column, task_name in _RETRY_RESUME_MAP:
-        if getattr(job, column, None) is not None:
-            return task_name
-    return "ugc_stage_1_analyze"
-
-
 # --- POST /ugc/jobs/{job_id}/retry ---
 
 @router.post("/jobs/{job_id}/retry")
@@ -279,6 +271,7 @@ async def retry_ugc_job(
     job = result.scalars().first()
     if not job:
         raise HTTPException(status_code=404, detail=f"UGCJob {job_id} not found")
+    await ugc_graph.lock_job_state(session, job)
 
     if job.status != "failed":
         raise HTTPException(
@@ -286,24 +279,21 @@ async def retry_ugc_job(
             detail=f"Cannot retry from status '{job.status}' — job must be failed",
         )
 
-    task_name = _determine_resume_task(job)
-
-    # Transition failed -> running
+    # Transition failed -> running; restarts every failed stage
     try:
-        sm = UGCJobStateMachine(model=job, state_field="status", start_value=job.status)
-        sm.send("retry")
-        job.status = sm.current_state.id
+        next_tasks = ugc_graph.retry(job)
     except TransitionNotAllowed as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
     job.error_message = None
     await session.commit()
-    logger.info(f"UGCJob {job_id} retrying via '{task_name}', status={job.status}")
+    logger.info(f"UGCJob {job_id} retrying via {next_tasks}, status={job.status}")
 
     import app.ugc_tasks as ugc_tasks_module
-    getattr(ugc_tasks_module, task_name).delay(job_id)
+    for task_name in next_tasks:
+        getattr(ugc_tasks_module, task_name).delay(job_id)
 
-    return {"job_id": job_id, "status": job.status, "resuming": task_name}
+    return {"job_id": job_id, "status": job.status, "resuming": next_tasks[0] if next_tasks else None}
 
 
 # --- POST /ugc/jobs/{job_id}/reopen ---
@@ -328,7 +318,7 @@ async def reopen_ugc_job(
     try:
         sm = UGCJobStateMachine(model=job, state_field="status", start_value=job.status)
         sm.send("reopen")
-        job.status = sm.current_state.id
+        ugc_graph.reopen_gate(job, sm.current_state.id)
     except TransitionNotAllowed as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
@@ -339,6 +329,32 @@ async def reopen_ugc_job(
     return {"job_id": job_id, "status": job.status}
 
 
+# --- POST /ugc/jobs/{job_id}/render-final ---
+
+@router.post("/jobs/{job_id}/render-final")
+async def render_final_ugc_job(
+    job_id: int,
+    session: AsyncSession = Depends(get_session),
+):
+    """Render the final-profile master now instead of waiting for approval."""
+    result = await session.execute(select(UGCJob).where(UGCJob.id == job_id))
+    job = result.scalars().first()
+    if not job:
+        raise HTTPException(status_code=404, detail=f"UGCJob {job_id} not found")
+
+    if job.status not in ("stage_composition_review", "approved") or not job.final_video_path:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot render final from status '{job.status}' — no composition to render",
+        )
+
+    import app.ugc_tasks as ugc_tasks_module
+    task = ugc_tasks_module.ugc_render_final.delay(job_id)
+    logger.info(f"UGCJob {job_id} final render queued (was {job.render_profile or 'final'})")
+
+    return {"job_id": job_id, "status": job.status, "task_id": task.id}
+
+
 # --- PATCH /ugc/jobs/{job_id}/edit ---
 
 @router.patch("/jobs/{job_id}/edit")
@@ -411,6 +427,7 @@ async def get_ugc_job(
         "broll_paths": job.broll_paths,
         # Stage 5 outputs
         "final_video_path": job.final_video_path,
+        "render_profile": job.render_profile,
         "cost_usd": job.cost_usd,
         "approved_at": job.approved_at,
     })
@@ -436,10 +453,34 @@ def _derive_stage_progress(job) -> dict:
     """Derive current stage, sub-step detail, and progress % from job data.
 
     7 stages each ~14% of total. Starts at 0% and ends at 98%.
+    Jobs with stage_states report every running branch; percent counts
+    approved stages.
     """
     num_scenes = len(job.aroll_scenes or [])
     num_shots = len(job.broll_shots or [])
 
+    if job.stage_states is not None:
+        running = ugc_graph.stages_in(job, "running")
+        if running:
+            # Clips land slot by slot (ugc_video_slot), so count the ones saved so far
+            aroll_done = sum(1 for p in job.aroll_paths or [] if p and p != "__skipped__")
+            broll_done = sum(1 for p in job.broll_paths or [] if p and p != "__skipped__")
+            details = {
+                "analysis": "Reading product info...",
+                "script": "Drafting hook, proof, CTA...",
+                "aroll_images": "Creating creator image...",
+                "aroll_videos": f"{aroll_done}/{num_scenes} clips" if num_scenes else "Starting...",
+                "broll_images": f"0/{num_shots} shots" if num_shots else "Starting...",
+                "broll_videos": f"{broll_done}/{num_shots} clips" if num_shots else "Starting...",
+                "compose": "Rendering final cut...",
+            }
+            approved = len(ugc_graph.stages_in(job, "approved"))
+            return {
+                "stage": " + ".join(s.label for s in running),
+                "percent": round(98 * approved / len(ugc_graph.STAGES)),
+                "detail": " · ".join(details[s.name] for s in running),
+            }
+
     if job.final_video_path:
         return {"stage": "Composition", "percent": 98, "detail": "Done"}
     if job.broll_paths:
@@ -460,38 +501,63 @@ def _derive_stage_progress(job) -> dict:
     return {"stage": "Analyzing product", "percent": 0, "detail": "Reading product info..."}
 
 
-@router.get("/jobs/{job_id}/events")
-async def ugc_job_events(job_id: int, request: Request):
-    """SSE stream of job status updates at 1-second intervals.
+# Columns the progress payload reads; history columns are never loaded
+_EVENT_COLUMNS = (
+    UGCJob.status, UGCJob.error_message, UGCJob.stage_states,
+    UGCJob.aroll_scenes, UGCJob.broll_shots, UGCJob.master_script, UGCJob.analysis_category,
+    UGCJob.aroll_image_paths, UGCJob.broll_image_paths, UGCJob.aroll_paths, UGCJob.broll_paths,
+    UGCJob.final_video_path,
+)
 
-    Uses a fresh DB session per iteration so the connection is never
-    held open across the full stream duration.
-    Closes automatically on terminal state or client disconnect.
-    """
-    async def event_stream():
-        # Poll for up to 10 minutes (600 × 1s)
-        for _ in range(600):
-            # Check client disconnect before querying DB
-            if await request.is_disconnected():
-                break
+# Longest a stream stays open, and how often an idle one is pinged
+_EVENT_STREAM_SECONDS = 600
+_EVENT_KEEPALIVE_SECONDS = 15
 
-            async with async_session_factory() as s:
-                result = await s.execute(select(UGCJob).where(UGCJob.id == job_id))
-                job = result.scalars().first()
 
-            if job is None:
-                yield f"data: {json.dumps({'status': 'not_found'})}\n\n"
-                break
+async def _job_event_payload(job_id: int) -> dict:
+    """Status payload for the events stream (one narrow read)."""
+    from sqlalchemy.orm import load_only
 
-            payload = {"status": job.status, "error": job.error_message}
-            if job.status == "running":
-                payload.update(_derive_stage_progress(job))
-            yield f"data: {json.dumps(payload)}\n\n"
+    async with async_session_factory() as s:
+        result = await s.execute(
+            select(UGCJob).options(load_only(*_EVENT_COLUMNS)).where(UGCJob.id == job_id)
+        )
+        job = result.scalars().first()
+    if job is None:
+        return {"status": "not_found"}
+    payload = {"status": job.status, "error": job.error_message}
+    if job.status == "running":
+        payload.update(_derive_stage_progress(job))
+    return payload
 
-            if job.status in _TERMINAL_STATES:
-                break
 
-            await asyncio.sleep(1)
+@router.get("/jobs/{job_id}/events")
+async def ugc_job_events(job_id: int, request: Request):
+    """SSE stream of job status updates, pushed as tasks publish them.
+
+    All streams of a job share one event subscription, and the job is
+    reloaded once per event (app.services.job_events), not once a second
+    per stream. Closes on terminal state, client disconnect, or after
+    10 minutes.
+    """
+    from app.services import job_events
+
+    async def event_stream():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + _EVENT_STREAM_SECONDS
+        async with job_events.get_hub().subscribe(job_id, _job_event_payload) as events:
+            while loop.time() < deadline:
+                try:
+                    payload = await asyncio.wait_for(events.get(), timeout=_EVENT_KEEPALIVE_SECONDS)
+                except TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+
+                yield f"data: {json.dumps(payload)}\n\n"
+                if payload["status"] in _TERMINAL_STATES or payload["status"] in ("not_found", "unavailable"):
+                    break
 
     return StreamingResponse(
         event_stream(),
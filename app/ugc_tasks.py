@@ -2,10 +2,16 @@
 
 Each stage task: loads UGCJob, runs service logic, transitions state, commits.
 On failure, transitions to 'failed' and writes error_message.
+Async handlers run on the worker thread's long-lived loop (run_async).
+Status and progress changes are published to SSE streams (job_events).
+A-Roll/B-Roll video stages fan out into one ugc_video_slot subtask per
+scene or shot; a chord callback applies the stage transition.
 """
 import asyncio
 import logging
 
+from app.services import job_events
+from app.task_runtime import run_async
 from app.worker import celery_app
 
 logger = logging.getLogger(__name__)
@@ -13,10 +19,17 @@ logger = logging.getLogger(__name__)
 
 # --- Shared helpers ---
 
-async def _fail_job(job_id: int, error_msg: str) -> None:
-    """Load UGCJob, transition to failed, write error_message, commit."""
+async def _fail_job(job_id: int, error_msg: str, task_name: str = "") -> None:
+    """Load UGCJob, transition to failed, write error_message, commit.
+
+    task_name marks the failed stage in stage_states so retry restarts it.
+    That is recorded even when the job already failed (the other branch,
+    or a chord errback after its callback); the job transition and
+    error_message happen only once (first error wins).
+    """
     from app.database import get_task_session_factory
     from app.models import UGCJob
+    from app.state_machines import ugc_graph
     from app.state_machines.ugc_job import UGCJobStateMachine
     from sqlalchemy import select
 
@@ -27,11 +40,17 @@ async def _fail_job(job_id: int, error_msg: str) -> None:
         if not job:
             logger.error(f"UGCJob {job_id} not found — cannot mark as failed")
             return
-        sm = UGCJobStateMachine(model=job, state_field="status", start_value=job.status)
-        sm.send("fail")
-        job.status = sm.current_state.id
-        job.error_message = error_msg
+        await ugc_graph.lock_job_state(session, job)
+        ugc_graph.fail_stage(job, task_name)
+        if job.status == "failed":
+            logger.info(f"UGCJob {job_id} already failed — keeping its error over: {error_msg}")
+        else:
+            sm = UGCJobStateMachine(model=job, state_field="status", start_value=job.status)
+            sm.send("fail")
+            job.status = sm.current_state.id
+            job.error_message = error_msg
         await session.commit()
+    job_events.publish(job_id, status=job.status)
 
 
 def _run_with_job(task_name, job_id, handler, *, fail_on_error=False):
@@ -57,16 +76,126 @@ def _run_with_job(task_name, job_id, handler, *, fail_on_error=False):
             if not job:
                 raise ValueError(f"UGCJob {job_id} not found")
             await handler(session, job)
+            job_events.publish(job_id, status=job.status)
 
     try:
-        asyncio.run(_run())
+        run_async(_run())
     except Exception as exc:
         logger.error(f"{task_name} job {job_id} failed: {exc}")
         if fail_on_error:
-            asyncio.run(_fail_job(job_id, str(exc)))
+            run_async(_fail_job(job_id, str(exc), task_name))
         raise
 
 
+def _build_broll_metadata(job):
+    """Build compose_ugc_ad() broll_metadata from stored shots and paths.
+
+    Recalculates overlay_start so uploaded clips with different durations
+    don't overlap each other.
+    """
+    from app.services.ugc_pipeline.probe_index import get_media_info
+
+    broll_shots = job.broll_shots or []
+    broll_paths = job.broll_paths or []
+    broll_metadata = []
+    cursor = None  # tracks end of previous B-Roll
+    for i, shot in enumerate(broll_shots):
+        if i >= len(broll_paths) or not broll_paths[i]:
+            continue
+        path = broll_paths[i]
+        scripted_start = shot.get("overlay_start", 0.0)
+        # If previous clip would overlap, push this one forward
+        if cursor is not None and scripted_start < cursor:
+            overlay_start = cursor
+        else:
+            overlay_start = scripted_start
+        # Actual duration (from the probe index) sets the cursor for next clip
+        try:
+            actual_dur = get_media_info(path)["duration"] or shot.get("duration_seconds", 5)
+        except Exception:
+            actual_dur = shot.get("duration_seconds", 5)
+        cursor = overlay_start + actual_dur
+        broll_metadata.append({
+            "path": path,
+            "overlay_start": overlay_start,
+        })
+    return broll_metadata
+
+
+# Job columns holding clips that are conformed on ingest
+_INGEST_COLUMNS = ("aroll_paths", "broll_paths")
+
+
+def _conform_job_column(job, column: str) -> None:
+    """Conform a clip column in place, writing back paths that changed."""
+    from sqlalchemy.orm.attributes import flag_modified
+
+    from app.services.ugc_pipeline.ingest import conform_clips
+
+    paths = list(getattr(job, column) or [])
+    conformed = conform_clips(paths)
+    if conformed != paths:
+        setattr(job, column, conformed)
+        flag_modified(job, column)
+
+
+def _compose_job(job, profile: str) -> str:
+    """Render the job's composition with a RENDER_PROFILES profile, return the path."""
+    import os
+    from uuid import uuid4
+
+    from app.config import get_settings
+    from app.services.ugc_pipeline.ugc_compositor import compose_ugc_ad
+
+    # Normally a cache hit: clips were conformed by ugc_ingest_clips on arrival
+    for column in _INGEST_COLUMNS:
+        _conform_job_column(job, column)
+    broll_metadata = _build_broll_metadata(job)
+
+    settings = get_settings()
+    comp_dir = os.path.join(settings.output_dir, "review")
+    os.makedirs(comp_dir, exist_ok=True)
+    output_path = os.path.join(comp_dir, f"ugc_ad_{job.id}_{uuid4().hex[:8]}.mp4")
+
+    return compose_ugc_ad(
+        aroll_paths=job.aroll_paths or [],
+        broll_metadata=broll_metadata,
+        output_path=output_path,
+        pip_mode=bool(job.broll_include_creator),
+        engine=job.compose_engine or settings.compose_engine,
+        variants=[v.strip() for v in settings.compose_output_variants.split(",") if v.strip()],
+        profile=profile,
+        incremental=settings.compose_incremental,
+        workers=settings.compose_workers,
+    )
+
+
+async def update_lp_hero_frame(session, job) -> None:
+    """Extract a hero frame from the job's video and unlock linked LPs."""
+    from sqlalchemy import select
+
+    from app.models import LandingPage
+    from app.services.video_compositor.thumbnail import generate_thumbnail
+
+    try:
+        frame_path = await asyncio.to_thread(
+            generate_thumbnail,
+            job.final_video_path,
+            2.0,
+            "output/lp_frames"
+        )
+        # Set hero image on any LP linked to this job and unlock review
+        lp_result = await session.execute(
+            select(LandingPage).where(LandingPage.ugc_job_id == job.id)
+        )
+        for lp_row in lp_result.scalars().all():
+            lp_row.lp_hero_image_path = frame_path
+            lp_row.lp_review_locked = False
+        await session.commit()
+    except Exception as e:
+        logger.warning(f"Frame extraction failed for job {job.id}: {e}")
+
+
 def _build_analysis(job):
     """Reconstruct ProductAnalysis from stored UGCJob columns."""
     from app.schemas import ProductAnalysis
@@ -80,24 +209,35 @@ def _build_analysis(job):
     )
 
 
+def _prepend_history(history, new_entries):
+    """Prepend per-slot paths to a list[list[str]] history column (newest first)."""
+    history = [list(h) for h in (history or [])]
+    while len(history) < len(new_entries):
+        history.append([])
+    for i, paths in enumerate(new_entries):
+        history[i] = [p for p in paths if p] + history[i]
+    return history
+
+
 # --- Stage 1: Analyze product + generate hero image ---
 
 @celery_app.task(bind=True, name='app.ugc_tasks.ugc_stage_1_analyze', max_retries=1, time_limit=600)
-def ugc_stage_1_analyze(self, job_id: int):
-    """Stage 1: Product analysis + hero image generation."""
+def ugc_stage_1_analyze(self, job_id: int, regenerate: bool = False):
+    """Stage 1: Product analysis + hero image generation.
+
+    regenerate: re-run requested from the review gate; bypasses the caches.
+    """
 
     async def _handler(session, job):
         from app.services.ugc_pipeline.product_analyzer import analyze_product
         from app.services.ugc_pipeline.asset_generator import generate_hero_image
-        from app.state_machines.ugc_job import UGCJobStateMachine
-
-        sm = UGCJobStateMachine(model=job, state_field="status", start_value=job.status)
+        from app.state_machines import ugc_graph
 
         analysis = analyze_product(
             product_name=job.product_name, description=job.description,
             image_count=len(job.product_image_paths or []),
             style_preference=job.style_preference, product_url=job.product_url,
-            use_mock=job.use_mock,
+            use_mock=job.use_mock, refresh=regenerate,
         )
         logger.info(f"Job {job_id}: analysis complete — category={analysis.category}")
 
@@ -105,7 +245,7 @@ def ugc_stage_1_analyze(self, job_id: int):
             product_image_path=(job.product_image_paths or [""])[0],
             ugc_style=analysis.ugc_style, emotional_tone=analysis.emotional_tone,
             visual_keywords=analysis.visual_keywords, product_name=job.product_name,
-            use_mock=job.use_mock,
+            use_mock=job.use_mock, force_new=regenerate,
         )
         logger.info(f"Job {job_id}: hero image generated — {hero_image_path}")
 
@@ -118,8 +258,8 @@ def ugc_stage_1_analyze(self, job_id: int):
         job.analysis_target_audience = analysis.target_audience
         job.hero_image_path = hero_image_path
 
-        sm.send("complete_analysis")
-        job.status = sm.current_state.id
+        await ugc_graph.lock_job_state(session, job)
+        ugc_graph.finish_stage(job, "analysis")
         await session.commit()
         logger.info(f"Job {job_id}: status -> {job.status}")
 
@@ -144,6 +284,7 @@ def ugc_regen_hero_image(self, job_id: int, reference_paths=None, sketch_paths=N
             visual_keywords=job.analysis_visual_keywords or [],
             product_name=job.product_name, use_mock=job.use_mock,
             sketch_path=sketch_path, reference_images=reference_paths,
+            force_new=True,
         )
 
         # Push current image into history before overwriting
@@ -171,7 +312,7 @@ def ugc_regen_analysis_field(self, job_id: int, field: str):
             product_name=job.product_name, description=job.description,
             image_count=len(job.product_image_paths or []),
             style_preference=job.style_preference, product_url=job.product_url,
-            use_mock=job.use_mock,
+            use_mock=job.use_mock, refresh=True,
         )
 
         field_map = {
@@ -191,21 +332,23 @@ def ugc_regen_analysis_field(self, job_id: int, field: str):
 # --- Stage 2: Script generation ---
 
 @celery_app.task(bind=True, name='app.ugc_tasks.ugc_stage_2_script', max_retries=1, time_limit=600)
-def ugc_stage_2_script(self, job_id: int):
-    """Stage 2: UGC script generation."""
+def ugc_stage_2_script(self, job_id: int, regenerate: bool = False):
+    """Stage 2: UGC script generation.
+
+    regenerate: re-run requested from the review gate; bypasses the LLM cache.
+    """
 
     async def _handler(session, job):
         from app.schemas import ProductAnalysis
         from app.services.ugc_pipeline.script_engine import generate_ugc_script
-        from app.state_machines.ugc_job import UGCJobStateMachine
+        from app.state_machines import ugc_graph
 
-        sm = UGCJobStateMachine(model=job, state_field="status", start_value=job.status)
         analysis = _build_analysis(job)
 
         breakdown = generate_ugc_script(
             product_name=job.product_name, description=job.description,
             analysis=analysis, target_duration=job.target_duration,
-            use_mock=job.use_mock,
+            use_mock=job.use_mock, refresh=regenerate,
         )
         logger.info(f"Job {job_id}: script generated — {len(breakdown.aroll_scenes)} scenes")
 
@@ -213,8 +356,8 @@ def ugc_stage_2_script(self, job_id: int):
         job.aroll_scenes = [s.model_dump() for s in breakdown.aroll_scenes]
         job.broll_shots = [s.model_dump() for s in breakdown.broll_shots]
 
-        sm.send("complete_script")
-        job.status = sm.current_state.id
+        await ugc_graph.lock_job_state(session, job)
+        ugc_graph.finish_stage(job, "script")
         await session.commit()
         logger.info(f"Job {job_id}: status -> {job.status}")
 
@@ -233,7 +376,7 @@ def ugc_regen_script(self, job_id: int):
         breakdown = generate_ugc_script(
             product_name=job.product_name, description=job.description,
             analysis=_build_analysis(job), target_duration=job.target_duration,
-            use_mock=job.use_mock,
+            use_mock=job.use_mock, refresh=True,
         )
         logger.info(f"Job {job_id}: script regenerated — {len(breakdown.aroll_scenes)} scenes")
 
@@ -255,7 +398,7 @@ def ugc_regen_script_field(self, job_id: int, field_type: str, field_index: int
         breakdown = generate_ugc_script(
             product_name=job.product_name, description=job.description,
             analysis=_build_analysis(job), target_duration=job.target_duration,
-            use_mock=job.use_mock,
+            use_mock=job.use_mock, refresh=True,
         )
 
         # Update only the targeted field
@@ -337,56 +480,247 @@ def ugc_resplit_scenes(self, job_id: int):
 # --- Stage 3a: A-Roll image generation ---
 
 @celery_app.task(bind=True, name='app.ugc_tasks.ugc_stage_3a_aroll_images', max_retries=1, time_limit=600)
-def ugc_stage_3a_aroll_images(self, job_id: int):
-    """Stage 3a: Generate per-scene A-Roll images for review."""
+def ugc_stage_3a_aroll_images(self, job_id: int, regenerate: bool = False):
+    """Stage 3a: Generate per-scene A-Roll images for review.
+
+    regenerate: re-run requested from the review gate; bypasses the image cache.
+    """
 
     async def _handler(session, job):
         from app.services.ugc_pipeline.asset_generator import generate_aroll_images
-        from app.state_machines.ugc_job import UGCJobStateMachine
+        from app.state_machines import ugc_graph
 
-        sm = UGCJobStateMachine(model=job, state_field="status", start_value=job.status)
         persona = (job.master_script or {}).get("creator_persona", "")
 
         image_paths = generate_aroll_images(
             aroll_scenes=job.aroll_scenes or [], hero_image_path=job.hero_image_path or "",
             use_mock=job.use_mock, creator_persona=persona,
-            product_image_paths=job.product_image_paths or [],
+            product_image_paths=job.product_image_paths or [], force_new=regenerate,
         )
         logger.info(f"Job {job_id}: {len(image_paths)} A-Roll images generated")
 
         job.aroll_image_paths = image_paths
-        sm.send("complete_aroll_images")
-        job.status = sm.current_state.id
+        await ugc_graph.lock_job_state(session, job)
+        ugc_graph.finish_stage(job, "aroll_images")
         await session.commit()
         logger.info(f"Job {job_id}: status -> {job.status}")
 
     _run_with_job("ugc_stage_3a_aroll_images", job_id, _handler, fail_on_error=True)
 
 
+# --- Video slot fan-out: one subtask per A-Roll scene / B-Roll shot ---
+
+_SLOT_KINDS = {
+    # kind: (paths column, error tag, log label)
+    "aroll": ("aroll_paths", "aroll_scene", "A-Roll scene"),
+    "broll": ("broll_paths", "broll_shot", "B-Roll shot"),
+}
+
+
+async def _lock_job_columns(session, job, *columns) -> None:
+    """Re-read columns under a row lock before a read-modify-write.
+
+    Slot subtasks of one job finish concurrently and each rewrites the
+    whole paths list. Touching updated_at first takes the row lock
+    (SQLite: its write lock), so they merge instead of overwriting.
+    """
+    from sqlalchemy import func
+
+    job.updated_at = func.now()
+    await session.flush()
+    await session.refresh(job, attribute_names=list(columns), with_for_update=True)
+
+
+async def _save_slot_clips(session, job, column: str, clips: dict) -> None:
+    """Write clips (slot index -> path) into column and commit; other slots are left as they are."""
+    await _lock_job_columns(session, job, column)
+    paths = list(getattr(job, column) or [])
+    for index, clip_path in clips.items():
+        paths += [None] * (index + 1 - len(paths))
+        paths[index] = clip_path
+    setattr(job, column, paths)
+    await session.commit()
+
+
+def _video_slots_chord(job_id: int, kind: str, slots, force_new: bool = False, stage_task: str = ""):
+    """chord of one ugc_video_slot per slot, joined by ugc_video_slots_done.
+
+    stage_task is the stage task being fanned out (its transition runs in
+    the callback); empty for regenerate-all.
+    """
+    from celery import chord
+
+    header = [ugc_video_slot.s(job_id, kind, i, force_new) for i in slots]
+    callback = ugc_video_slots_done.s(job_id, kind, stage_task)
+    callback.on_error(ugc_video_slots_failed.s(job_id, kind, stage_task))
+    return chord(header, callback)
+
+
+def _fan_out_stage_slots(job, kind: str, stage_task: str, force_new: bool = False) -> bool:
+    """Queue a subtask per pending slot of a video stage (UGC_SLOT_FANOUT).
+
+    Returns False when fan-out is off or every slot is already filled or
+    skipped; the caller then runs the stage in-process. force_new treats
+    every slot as pending and bypasses the clip cache (stage regenerate).
+    """
+    from app.config import get_settings
+    from app.services.ugc_pipeline.asset_generator import _pending_slots
+
+    if not get_settings().ugc_slot_fanout:
+        return False
+    column, _, label = _SLOT_KINDS[kind]
+    items = job.aroll_scenes if kind == "aroll" else job.broll_shots
+    existing = None if force_new else getattr(job, column)
+    _, pending = _pending_slots(existing, len(items or []), label)
+    if not pending:
+        return False
+    _video_slots_chord(job.id, kind, pending, force_new=force_new, stage_task=stage_task).apply_async()
+    logger.info(f"Job {job.id}: {len(pending)} {label} subtask(s) queued")
+    return True
+
+
+@celery_app.task(
+    bind=True,
+    name='app.ugc_tasks.ugc_video_slot',
+    time_limit=600,
+    soft_time_limit=570,  # report the slot as failed instead of being killed
+)
+def ugc_video_slot(self, job_id: int, kind: str, index: int, force_new: bool = False):
+    """Generate one A-Roll scene or B-Roll shot clip and save it into its slot.
+
+    The clip is committed as soon as it lands, so a retry after a failed
+    or killed stage keeps it. Errors are returned rather than raised so the
+    chord callback still runs and sees every slot's outcome.
+    """
+    column, tag, label = _SLOT_KINDS[kind]
+    logger.info(f"ugc_video_slot: job {job_id}, {label} {index + 1}")
+
+    async def _run():
+        from sqlalchemy import select
+
+        from app.database import get_task_session_factory
+        from app.models import UGCJob
+        from app.services.ugc_pipeline.asset_generator import generate_aroll_clip, generate_broll_clip
+
+        session_factory = get_task_session_factory()
+        async with session_factory() as session:
+            result = await session.execute(select(UGCJob).where(UGCJob.id == job_id))
+            job = result.scalars().first()
+            if not job:
+                raise ValueError(f"UGCJob {job_id} not found")
+
+            if kind == "aroll":
+                clip_path = generate_aroll_clip(
+                    aroll_scenes=job.aroll_scenes or [], aroll_image_paths=job.aroll_image_paths or [],
+                    index=index, use_mock=job.use_mock,
+                    creator_persona=(job.master_script or {}).get("creator_persona", ""),
+                    force_new=force_new,
+                )
+            else:
+                clip_path = generate_broll_clip(
+                    broll_shots=job.broll_shots or [], broll_image_paths=job.broll_image_paths or [],
+                    index=index, use_mock=job.use_mock, force_new=force_new,
+                )
+
+            await _save_slot_clips(session, job, column, {index: clip_path})
+            job_events.publish(job_id, status=job.status, column=column, index=index)
+            return clip_path
+
+    try:
+        clip_path = run_async(_run())
+    except Exception as exc:
+        error = str(exc) if str(exc).startswith(f"[{tag}:") else f"[{tag}:{index}] {exc}"
+        logger.error(f"ugc_video_slot job {job_id} {label} {index + 1} failed: {error}")
+        return {"index": index, "error": error}
+    logger.info(f"Job {job_id}: {label} {index + 1} saved -> {clip_path}")
+    return {"index": index, "path": clip_path}
+
+
+@celery_app.task(bind=True, name='app.ugc_tasks.ugc_video_slots_done', max_retries=1, time_limit=120)
+def ugc_video_slots_done(self, results, job_id: int, kind: str, stage_task: str = ""):
+    """Chord callback: apply the stage transition once every slot subtask has finished.
+
+    A failed slot fails the stage with the lowest-index slot's tagged error
+    (as the in-process stage did); clips of the other slots stay saved.
+    Without stage_task (regenerate-all) it raises, so the task reports FAILURE.
+    """
+    column, _, label = _SLOT_KINDS[kind]
+    errors = sorted((r["index"], r["error"]) for r in results if r.get("error"))
+    if errors:
+        logger.error(f"Job {job_id}: {len(errors)}/{len(results)} {label} subtask(s) failed")
+        if stage_task:
+            # Fail the job here; raising would also run ugc_video_slots_failed
+            run_async(_fail_job(job_id, errors[0][1], stage_task))
+            return
+        raise RuntimeError(errors[0][1])
+
+    async def _handler(session, job):
+        from app.state_machines import ugc_graph
+
+        items = job.aroll_scenes if kind == "aroll" else job.broll_shots
+        paths = list(getattr(job, column) or [])
+        paths += [None] * (len(items or []) - len(paths))
+        # Resolve skipped slots as generate_*_assets does
+        setattr(job, column, [None if p == "__skipped__" else p for p in paths])
+        logger.info(f"Job {job_id}: {len(results)} {label} clip(s) generated by subtasks")
+        if stage_task:
+            await ugc_graph.lock_job_state(session, job)
+            ugc_graph.finish_stage(job, ugc_graph.STAGES_BY_TASK[stage_task].name)
+            logger.info(f"Job {job_id}: status -> {job.status}")
+        else:
+            job.error_message = None
+        await session.commit()
+        ugc_ingest_clips.delay(job_id, column)
+
+    _run_with_job(stage_task or "ugc_video_slots_done", job_id, _handler, fail_on_error=bool(stage_task))
+
+
+@celery_app.task(name='app.ugc_tasks.ugc_video_slots_failed')
+def ugc_video_slots_failed(request, exc, traceback, job_id: int, kind: str, stage_task: str = ""):
+    """Chord error handler: a slot subtask died without reporting (hard time limit, lost worker)."""
+    label = _SLOT_KINDS[kind][2]
+    logger.error(f"Job {job_id}: {label} subtasks did not complete: {exc}")
+    if stage_task:
+        run_async(_fail_job(job_id, f"{label} subtask failed: {exc}", stage_task))
+
+
 # --- Stage 3: A-Roll video generation (from reviewed images) ---
 
 @celery_app.task(bind=True, name='app.ugc_tasks.ugc_stage_3_aroll', max_retries=1, time_limit=600)
-def ugc_stage_3_aroll(self, job_id: int):
-    """Stage 3: A-Roll video clip generation from reviewed images."""
+def ugc_stage_3_aroll(self, job_id: int, regenerate: bool = False):
+    """Stage 3: A-Roll video clip generation from reviewed images.
+
+    regenerate: re-run requested from the review gate; every scene gets a
+    fresh clip instead of keeping the saved or cached one.
+    """
 
     async def _handler(session, job):
-        from app.services.ugc_pipeline.asset_generator import generate_aroll_assets
-        from app.state_machines.ugc_job import UGCJobStateMachine
+        from app.services.ugc_pipeline.asset_generator import SlotsFailed, generate_aroll_assets
+        from app.state_machines import ugc_graph
+
+        if _fan_out_stage_slots(job, "aroll", "ugc_stage_3_aroll", force_new=regenerate):
+            return  # ugc_video_slots_done finishes the stage
 
-        sm = UGCJobStateMachine(model=job, state_field="status", start_value=job.status)
         persona = (job.master_script or {}).get("creator_persona", "")
 
-        aroll_paths = generate_aroll_assets(
-            aroll_scenes=job.aroll_scenes or [], aroll_image_paths=job.aroll_image_paths or [],
-            use_mock=job.use_mock, creator_persona=persona, existing_paths=job.aroll_paths,
-        )
+        try:
+            aroll_paths = generate_aroll_assets(
+                aroll_scenes=job.aroll_scenes or [], aroll_image_paths=job.aroll_image_paths or [],
+                use_mock=job.use_mock, creator_persona=persona,
+                existing_paths=None if regenerate else job.aroll_paths, force_new=regenerate,
+            )
+        except SlotsFailed as exc:
+            # Keep the clips that finished; a retry only generates the failed scenes
+            await _save_slot_clips(session, job, "aroll_paths", exc.results)
+            raise
         logger.info(f"Job {job_id}: {len(aroll_paths)} A-Roll clips generated")
 
         job.aroll_paths = aroll_paths
-        sm.send("complete_aroll")
-        job.status = sm.current_state.id
+        await ugc_graph.lock_job_state(session, job)
+        ugc_graph.finish_stage(job, "aroll_videos")
         await session.commit()
         logger.info(f"Job {job_id}: status -> {job.status}")
+        ugc_ingest_clips.delay(job_id, "aroll_paths")
 
     _run_with_job("ugc_stage_3_aroll", job_id, _handler, fail_on_error=True)
 
@@ -394,24 +728,25 @@ def ugc_stage_3_aroll(self, job_id: int):
 # --- Stage 4a: B-Roll image generation ---
 
 @celery_app.task(bind=True, name='app.ugc_tasks.ugc_stage_4a_broll_images', max_retries=1, time_limit=600)
-def ugc_stage_4a_broll_images(self, job_id: int):
-    """Stage 4a: Generate per-shot B-Roll images for review."""
+def ugc_stage_4a_broll_images(self, job_id: int, regenerate: bool = False):
+    """Stage 4a: Generate per-shot B-Roll images for review.
+
+    regenerate: re-run requested from the review gate; bypasses the image cache.
+    """
 
     async def _handler(session, job):
         from app.services.ugc_pipeline.asset_generator import generate_broll_images
-        from app.state_machines.ugc_job import UGCJobStateMachine
-
-        sm = UGCJobStateMachine(model=job, state_field="status", start_value=job.status)
+        from app.state_machines import ugc_graph
 
         image_paths = generate_broll_images(
             broll_shots=job.broll_shots or [], product_images=job.product_image_paths or [],
-            use_mock=job.use_mock,
+            use_mock=job.use_mock, force_new=regenerate,
         )
         logger.info(f"Job {job_id}: {len(image_paths)} B-Roll images generated")
 
         job.broll_image_paths = image_paths
-        sm.send("complete_broll_images")
-        job.status = sm.current_state.id
+        await ugc_graph.lock_job_state(session, job)
+        ugc_graph.finish_stage(job, "broll_images")
         await session.commit()
         logger.info(f"Job {job_id}: status -> {job.status}")
 
@@ -421,26 +756,38 @@ def ugc_stage_4a_broll_images(self, job_id: int):
 # --- Stage 4: B-Roll video generation (from reviewed images) ---
 
 @celery_app.task(bind=True, name='app.ugc_tasks.ugc_stage_4_broll', max_retries=1, time_limit=600)
-def ugc_stage_4_broll(self, job_id: int):
-    """Stage 4: B-Roll video clip generation from reviewed images."""
+def ugc_stage_4_broll(self, job_id: int, regenerate: bool = False):
+    """Stage 4: B-Roll video clip generation from reviewed images.
+
+    regenerate: re-run requested from the review gate; every shot gets a
+    fresh clip instead of keeping the saved or cached one.
+    """
 
     async def _handler(session, job):
-        from app.services.ugc_pipeline.asset_generator import generate_broll_assets
-        from app.state_machines.ugc_job import UGCJobStateMachine
+        from app.services.ugc_pipeline.asset_generator import SlotsFailed, generate_broll_assets
+        from app.state_machines import ugc_graph
 
-        sm = UGCJobStateMachine(model=job, state_field="status", start_value=job.status)
+        if _fan_out_stage_slots(job, "broll", "ugc_stage_4_broll", force_new=regenerate):
+            return  # ugc_video_slots_done finishes the stage
 
-        broll_paths = generate_broll_assets(
-            broll_shots=job.broll_shots or [], broll_image_paths=job.broll_image_paths or [],
-            use_mock=job.use_mock, existing_paths=job.broll_paths,
-        )
+        try:
+            broll_paths = generate_broll_assets(
+                broll_shots=job.broll_shots or [], broll_image_paths=job.broll_image_paths or [],
+                use_mock=job.use_mock, existing_paths=None if regenerate else job.broll_paths,
+                force_new=regenerate,
+            )
+        except SlotsFailed as exc:
+            # Keep the clips that finished; a retry only generates the failed shots
+            await _save_slot_clips(session, job, "broll_paths", exc.results)
+            raise
         logger.info(f"Job {job_id}: {len(broll_paths)} B-Roll clips generated")
 
         job.broll_paths = broll_paths
-        sm.send("complete_broll")
-        job.status = sm.current_state.id
+        await ugc_graph.lock_job_state(session, job)
+        ugc_graph.finish_stage(job, "broll_videos")
         await session.commit()
         logger.info(f"Job {job_id}: status -> {job.status}")
+        ugc_ingest_clips.delay(job_id, "broll_paths")
 
     _run_with_job("ugc_stage_4_broll", job_id, _handler, fail_on_error=True)
 
@@ -498,7 +845,7 @@ def ugc_regen_aroll_scene_image(self, job_id: int, scene_index: int):
             paths = image_provider.generate_image(
                 prompt=prompt, width=720, height=1280, num_images=1,
                 reference_images=ref_images, subject_type="product",
-                subject_description=product_desc,
+                subject_description=product_desc, force_new=True,
             )
 
             # Save old image to history[0] before overwriting
@@ -519,7 +866,7 @@ def ugc_regen_aroll_scene_image(self, job_id: int, scene_index: int):
             logger.info(f"Job {job_id}: A-Roll creator image regenerated -> {paths[0]}")
 
     try:
-        asyncio.run(_run())
+        run_async(_run())
     except Exception as exc:
         logger.error(f"ugc_regen_aroll_scene_image job {job_id} scene {scene_index} failed: {exc}")
         raise
@@ -538,7 +885,8 @@ def ugc_regen_all_aroll_images(self, job_id: int):
     async def _run():
         from app.database import get_task_session_factory
         from app.models import UGCJob
-        from app.services.ugc_pipeline.asset_generator import generate_aroll_images
+        from app.config import get_settings
+        from app.services.ugc_pipeline.asset_generator import generate_aroll_image_candidates
         from sqlalchemy import select
         from sqlalchemy.orm.attributes import flag_modified
 
@@ -552,32 +900,34 @@ def ugc_regen_all_aroll_images(self, job_id: int):
             # Save old images to per-scene history before overwriting
             old_paths = list(job.aroll_image_paths or [])
             if any(old_paths):
-                history = list(job.aroll_image_history or [])
-                while len(history) < len(old_paths):
-                    history.append([])
-                for i, old_p in enumerate(old_paths):
-                    if old_p:
-                        history[i] = [old_p] + history[i]
-                job.aroll_image_history = history
+                job.aroll_image_history = _prepend_history(job.aroll_image_history, [[p] for p in old_paths])
                 flag_modified(job, "aroll_image_history")
 
             persona = (job.master_script or {}).get("creator_persona", "")
-            image_paths = generate_aroll_images(
+            candidate_sets = generate_aroll_image_candidates(
                 aroll_scenes=job.aroll_scenes or [],
                 hero_image_path=job.hero_image_path or "",
                 use_mock=job.use_mock,
                 creator_persona=persona,
                 product_image_paths=job.product_image_paths or [],
+                candidates=get_settings().image_regen_candidates,
+                force_new=True,
             )
+            image_paths = [paths[0] for paths in candidate_sets]
             logger.info(f"Job {job_id}: {len(image_paths)} A-Roll images regenerated (all scenes)")
 
+            # Alternates go on top of the history so reviewers can pick one without another request
+            job.aroll_image_history = _prepend_history(
+                job.aroll_image_history, [paths[1:] for paths in candidate_sets]
+            )
+            flag_modified(job, "aroll_image_history")
             job.aroll_image_paths = image_paths
             flag_modified(job, "aroll_image_paths")
             job.error_message = None
             await session.commit()
 
     try:
-        asyncio.run(_run())
+        run_async(_run())
     except Exception as exc:
         logger.error(f"ugc_regen_all_aroll_images job {job_id} failed: {exc}")
         raise
@@ -621,7 +971,7 @@ def ugc_regen_broll_shot_image(self, job_id: int, shot_index: int):
             ref_list = [reference_image] if reference_image else None
             paths = image_provider.generate_image(
                 prompt=image_prompt, width=720, height=1280, num_images=1,
-                reference_images=ref_list,
+                reference_images=ref_list, force_new=True,
             )
 
             # Save old image to per-scene history before overwriting
@@ -645,7 +995,7 @@ def ugc_regen_broll_shot_image(self, job_id: int, shot_index: int):
             logger.info(f"Job {job_id}: B-Roll shot {shot_index} image regenerated -> {paths[0]}")
 
     try:
-        asyncio.run(_run())
+        run_async(_run())
     except Exception as exc:
         logger.error(f"ugc_regen_broll_shot_image job {job_id} shot {shot_index} failed: {exc}")
         raise
@@ -666,7 +1016,8 @@ def ugc_regen_all_broll_images(self, job_id: int):
     async def _run():
         from app.database import get_task_session_factory
         from app.models import UGCJob
-        from app.services.ugc_pipeline.asset_generator import generate_broll_images
+        from app.config import get_settings
+        from app.services.ugc_pipeline.asset_generator import generate_broll_image_candidates
         from sqlalchemy import select
         from sqlalchemy.orm.attributes import flag_modified
 
@@ -680,29 +1031,31 @@ def ugc_regen_all_broll_images(self, job_id: int):
             # Save old images to per-scene history before overwriting
             old_paths = list(job.broll_image_paths or [])
             if any(old_paths):
-                history = list(job.broll_image_history or [])
-                while len(history) < len(old_paths):
-                    history.append([])
-                for i, old_p in enumerate(old_paths):
-                    if old_p:
-                        history[i] = [old_p] + history[i]
-                job.broll_image_history = history
+                job.broll_image_history = _prepend_history(job.broll_image_history, [[p] for p in old_paths])
                 flag_modified(job, "broll_image_history")
 
-            image_paths = generate_broll_images(
+            candidate_sets = generate_broll_image_candidates(
                 broll_shots=job.broll_shots or [],
                 product_images=job.product_image_paths or [],
                 use_mock=job.use_mock,
+                candidates=get_settings().image_regen_candidates,
+                force_new=True,
             )
+            image_paths = [paths[0] for paths in candidate_sets]
             logger.info(f"Job {job_id}: {len(image_paths)} B-Roll images regenerated (all shots)")
 
+            # Alternates go on top of the history so reviewers can pick one without another request
+            job.broll_image_history = _prepend_history(
+                job.broll_image_history, [paths[1:] for paths in candidate_sets]
+            )
+            flag_modified(job, "broll_image_history")
             job.broll_image_paths = image_paths
             flag_modified(job, "broll_image_paths")
             job.error_message = None
             await session.commit()
 
     try:
-        asyncio.run(_run())
+        run_async(_run())
     except Exception as exc:
         logger.error(f"ugc_regen_all_broll_images job {job_id} failed: {exc}")
         raise
@@ -717,14 +1070,16 @@ def ugc_regen_all_broll_images(self, job_id: int):
     time_limit=900,
 )
 def ugc_regen_all_broll_videos(self, job_id: int):
-    """Regenerate all B-Roll video clips from their shot images."""
+    """Regenerate all B-Roll video clips from their shot images (one subtask per shot when fanned out)."""
     logger.info(f"ugc_regen_all_broll_videos: starting job {job_id}")
 
     async def _run():
+        from sqlalchemy import select
+
+        from app.config import get_settings
         from app.database import get_task_session_factory
         from app.models import UGCJob
         from app.services.ugc_pipeline.asset_generator import generate_broll_assets
-        from sqlalchemy import select
 
         session_factory = get_task_session_factory()
         async with session_factory() as session:
@@ -733,22 +1088,30 @@ def ugc_regen_all_broll_videos(self, job_id: int):
             if not job:
                 raise ValueError(f"UGCJob {job_id} not found")
 
+            if get_settings().ugc_slot_fanout and job.broll_shots:
+                return _video_slots_chord(job_id, "broll", range(len(job.broll_shots)), force_new=True)
+
             broll_paths = generate_broll_assets(
                 broll_shots=job.broll_shots or [],
                 broll_image_paths=job.broll_image_paths or [],
                 use_mock=job.use_mock,
+                force_new=True,
             )
             logger.info(f"Job {job_id}: {len(broll_paths)} B-Roll videos regenerated (all shots)")
 
             job.broll_paths = broll_paths
             job.error_message = None
             await session.commit()
+            ugc_ingest_clips.delay(job_id, "broll_paths")
 
     try:
-        asyncio.run(_run())
+        fanout = run_async(_run())
     except Exception as exc:
         logger.error(f"ugc_regen_all_broll_videos job {job_id} failed: {exc}")
         raise
+    if fanout is not None:
+        # The chord takes over this task's id, so polling it waits for every slot
+        raise self.replace(fanout)
 
 
 # --- Per-clip video regeneration ---
@@ -798,13 +1161,14 @@ def ugc_regen_aroll_scene_video(self, job_id: int, scene_index: int):
                 raise ValueError(f"No source image for scene {scene_index}")
 
             veo = _get_veo_or_mock(use_mock=job.use_mock)
-            clip_path = veo.generate_clip_from_image(
+            clip_path = veo.submit_clip_from_image(
                 prompt=full_prompt,
                 image_path=image_path,
                 duration_seconds=duration_seconds,
                 width=720,
                 height=1280,
-            )
+                force_new=True,
+            ).result()
 
             # Save old video to history before overwriting
             from sqlalchemy.orm.attributes import flag_modified
@@ -823,10 +1187,11 @@ def ugc_regen_aroll_scene_video(self, job_id: int, scene_index: int):
             job.aroll_paths = aroll_paths
             job.error_message = None
             await session.commit()
+            ugc_ingest_clips.delay(job_id, "aroll_paths")
             logger.info(f"Job {job_id}: A-Roll scene {scene_index} video regenerated -> {clip_path}")
 
     try:
-        asyncio.run(_run())
+        run_async(_run())
     except Exception as exc:
         logger.error(f"ugc_regen_aroll_scene_video job {job_id} scene {scene_index} failed: {exc}")
         raise
@@ -869,13 +1234,14 @@ def ugc_regen_broll_shot_video(self, job_id: int, shot_index: int):
                 raise ValueError(f"No source image for B-Roll shot {shot_index}")
 
             veo = _get_veo_or_mock(use_mock=job.use_mock)
-            clip_path = veo.generate_clip_from_image(
+            clip_path = veo.submit_clip_from_image(
                 prompt=animation_prompt,
                 image_path=image_path,
                 duration_seconds=duration_seconds,
                 width=720,
                 height=1280,
-            )
+                force_new=True,
+            ).result()
 
             # Save old video to history before overwriting
             from sqlalchemy.orm.attributes import flag_modified
@@ -894,10 +1260,11 @@ def ugc_regen_broll_shot_video(self, job_id: int, shot_index: int):
             job.broll_paths = broll_paths
             job.error_message = None
             await session.commit()
+            ugc_ingest_clips.delay(job_id, "broll_paths")
             logger.info(f"Job {job_id}: B-Roll shot {shot_index} video regenerated -> {clip_path}")
 
     try:
-        asyncio.run(_run())
+        run_async(_run())
     except Exception as exc:
         logger.error(f"ugc_regen_broll_shot_video job {job_id} shot {shot_index} failed: {exc}")
         raise
@@ -907,17 +1274,19 @@ def ugc_regen_broll_shot_video(self, job_id: int, shot_index: int):
     bind=True,
     name='app.ugc_tasks.ugc_regen_all_aroll_videos',
     max_retries=1,
-    time_limit=900,  # 15 min — all clips sequentially
+    time_limit=900,  # 15 min — all clips in one task (UGC_SLOT_FANOUT off)
 )
 def ugc_regen_all_aroll_videos(self, job_id: int):
-    """Regenerate all A-Roll video clips from their scene images."""
+    """Regenerate all A-Roll video clips from their scene images (one subtask per scene when fanned out)."""
     logger.info(f"ugc_regen_all_aroll_videos: starting job {job_id}")
 
     async def _run():
+        from sqlalchemy import select
+
+        from app.config import get_settings
         from app.database import get_task_session_factory
         from app.models import UGCJob
         from app.services.ugc_pipeline.asset_generator import generate_aroll_assets
-        from sqlalchemy import select
 
         session_factory = get_task_session_factory()
         async with session_factory() as session:
@@ -926,24 +1295,94 @@ def ugc_regen_all_aroll_videos(self, job_id: int):
             if not job:
                 raise ValueError(f"UGCJob {job_id} not found")
 
+            if get_settings().ugc_slot_fanout and job.aroll_scenes:
+                return _video_slots_chord(job_id, "aroll", range(len(job.aroll_scenes)), force_new=True)
+
             persona = (job.master_script or {}).get("creator_persona", "")
             aroll_paths = generate_aroll_assets(
                 aroll_scenes=job.aroll_scenes or [],
                 aroll_image_paths=job.aroll_image_paths or [],
                 use_mock=job.use_mock,
                 creator_persona=persona,
+                force_new=True,
             )
             logger.info(f"Job {job_id}: {len(aroll_paths)} A-Roll videos regenerated (all scenes)")
 
             job.aroll_paths = aroll_paths
             job.error_message = None
             await session.commit()
+            ugc_ingest_clips.delay(job_id, "aroll_paths")
 
     try:
-        asyncio.run(_run())
+        fanout = run_async(_run())
     except Exception as exc:
         logger.error(f"ugc_regen_all_aroll_videos job {job_id} failed: {exc}")
         raise
+    if fanout is not None:
+        # The chord takes over this task's id, so polling it waits for every slot
+        raise self.replace(fanout)
+
+
+# --- Ingest: conform clips as soon as they land ---
+
+@celery_app.task(
+    bind=True,
+    name='app.ugc_tasks.ugc_ingest_clips',
+    max_retries=1,
+    time_limit=1200,
+)
+def ugc_ingest_clips(self, job_id: int, column: str):
+    """Conform a job's A-Roll or B-Roll clips in parallel (render queue).
+
+    Queued right after clips are generated or uploaded so composition only
+    sees conformed inputs. Only slots still holding the path that was
+    ingested are rewritten; a clip replaced meanwhile gets its own run.
+    """
+    if column not in _INGEST_COLUMNS:
+        raise ValueError(f"Cannot ingest column '{column}'")
+    logger.info(f"ugc_ingest_clips: job {job_id}, {column}")
+
+    async def _run():
+        from sqlalchemy import select
+        from sqlalchemy.orm.attributes import flag_modified
+
+        from app.database import get_task_session_factory
+        from app.models import UGCJob
+        from app.services.ugc_pipeline.ingest import conform_clips
+
+        session_factory = get_task_session_factory()
+        async with session_factory() as session:
+            result = await session.execute(select(UGCJob).where(UGCJob.id == job_id))
+            job = result.scalars().first()
+            if not job:
+                raise ValueError(f"UGCJob {job_id} not found")
+            paths = list(getattr(job, column) or [])
+
+        # Encode without holding a DB session open
+        conformed = await asyncio.to_thread(conform_clips, paths)
+
+        async with session_factory() as session:
+            result = await session.execute(select(UGCJob).where(UGCJob.id == job_id))
+            job = result.scalars().first()
+            if not job:
+                return
+            current = list(getattr(job, column) or [])
+            changed = 0
+            for i, (src, dst) in enumerate(zip(paths, conformed, strict=True)):
+                if dst != src and i < len(current) and current[i] == src:
+                    current[i] = dst
+                    changed += 1
+            if changed:
+                setattr(job, column, current)
+                flag_modified(job, column)
+                await session.commit()
+            logger.info(f"Job {job_id}: ingested {column}, {changed} clip(s) conformed")
+
+    try:
+        run_async(_run())
+    except Exception as exc:
+        logger.error(f"ugc_ingest_clips job {job_id} {column} failed: {exc}")
+        raise
 
 
 # --- Stage 5: Final composition ---
@@ -957,18 +1396,16 @@ def ugc_regen_all_aroll_videos(self, job_id: int):
 def ugc_stage_5_compose(self, job_id: int):
     """Stage 5: Final UGC ad composition.
 
-    Builds broll_metadata from stored shots and paths, runs compose_ugc_ad(),
-    writes final_video_path and cost_usd, transitions running -> stage_composition_review.
+    Builds broll_metadata from stored shots and paths, runs compose_ugc_ad()
+    with settings.compose_review_profile, writes final_video_path,
+    render_profile and cost_usd, transitions running -> stage_composition_review.
     """
     logger.info(f"ugc_stage_5_compose: starting job {job_id}")
 
     async def _run():
-        import os
-        from uuid import uuid4
         from app.database import get_task_session_factory
         from app.models import UGCJob
-        from app.services.ugc_pipeline.ugc_compositor import compose_ugc_ad
-        from app.state_machines.ugc_job import UGCJobStateMachine
+        from app.state_machines import ugc_graph
         from app.config import get_settings
         from sqlalchemy import select
 
@@ -980,85 +1417,152 @@ def ugc_stage_5_compose(self, job_id: int):
             if not job:
                 raise ValueError(f"UGCJob {job_id} not found")
 
-            # Validate state transition
-            sm = UGCJobStateMachine(model=job, state_field="status", start_value=job.status)
-
-            # Build broll_metadata from stored shots and paths
-            # Recalculate overlay_start dynamically so uploaded clips
-            # with different durations don't overlap each other
-            from moviepy import VideoFileClip as _VFC
-            broll_shots = job.broll_shots or []
-            broll_paths = job.broll_paths or []
-            broll_metadata = []
-            cursor = None  # tracks end of previous B-Roll
-            for i, shot in enumerate(broll_shots):
-                if i >= len(broll_paths) or not broll_paths[i]:
-                    continue
-                path = broll_paths[i]
-                # Normalize VFR / non-mp4 files (iPhone .MOV fix)
-                from app.services.ugc_pipeline.ugc_compositor import normalize_video
-                path = normalize_video(path)
-                # Update stored path so future recompositions skip re-encoding
-                if path != broll_paths[i]:
-                    broll_paths[i] = path
-                    job.broll_paths = broll_paths
-                    from sqlalchemy.orm.attributes import flag_modified
-                    flag_modified(job, "broll_paths")
-                scripted_start = shot.get("overlay_start", 0.0)
-                # If previous clip would overlap, push this one forward
-                if cursor is not None and scripted_start < cursor:
-                    overlay_start = cursor
-                else:
-                    overlay_start = scripted_start
-                # Probe actual duration to set cursor for next clip
-                try:
-                    probe = _VFC(path)
-                    actual_dur = probe.duration
-                    probe.close()
-                except Exception:
-                    actual_dur = shot.get("duration_seconds", 5)
-                cursor = overlay_start + actual_dur
-                broll_metadata.append({
-                    "path": path,
-                    "overlay_start": overlay_start,
-                })
-
-            # Build output path
+            # Draft by default: the master is rendered on approval (ugc_render_final)
             settings = get_settings()
-            comp_dir = os.path.join(settings.output_dir, "review")
-            os.makedirs(comp_dir, exist_ok=True)
-            output_path = os.path.join(
-                comp_dir,
-                f"ugc_ad_{job_id}_{uuid4().hex[:8]}.mp4"
-            )
-
-            # Run composition
-            final_path = compose_ugc_ad(
-                aroll_paths=job.aroll_paths or [],
-                broll_metadata=broll_metadata,
-                output_path=output_path,
-                pip_mode=bool(job.broll_include_creator),
-            )
+            profile = settings.compose_review_profile
+            final_path = _compose_job(job, profile)
             logger.info(f"Job {job_id}: composition complete — {final_path}")
 
             # Write output columns
             job.final_video_path = final_path
+            job.render_profile = profile
+            job.trim_cuts = None  # cuts were made against the previous render
             job.cost_usd = 0.0  # Mock cost; real tracking is future work
 
             # Transition: running -> stage_composition_review
-            sm.send("complete_composition")
-            job.status = sm.current_state.id
+            await ugc_graph.lock_job_state(session, job)
+            ugc_graph.finish_stage(job, "compose")
             await session.commit()
             logger.info(f"Job {job_id}: status -> {job.status}")
 
     try:
-        asyncio.run(_run())
+        run_async(_run())
     except Exception as exc:
         logger.error(f"ugc_stage_5_compose job {job_id} failed: {exc}")
-        asyncio.run(_fail_job(job_id, str(exc)))
+        run_async(_fail_job(job_id, str(exc), "ugc_stage_5_compose"))
         raise
 
 
+@celery_app.task(
+    bind=True,
+    name='app.ugc_tasks.ugc_render_final',
+    max_retries=1,
+    time_limit=1200,
+)
+def ugc_render_final(self, job_id: int):
+    """Render the final-profile master for a job reviewed on a draft.
+
+    Recomposes with the "final" profile, replays the reviewer's trims on
+    it, and replaces final_video_path. Runs on approve_final or on demand
+    during composition review; the job status is left unchanged. Approved
+    jobs also get their LP hero frame refreshed from the master. If the
+    review video or its cuts change while rendering (trim, undo, recompose),
+    the master is discarded rather than overwriting them.
+    """
+    async def _handler(session, job):
+        import os
+        from uuid import uuid4
+
+        from app.config import get_settings
+        from app.services.ugc_pipeline.segments import manifest_path
+        from app.services.ugc_pipeline.ugc_compositor import OUTPUT_VARIANTS, trim_video, variant_path
+
+        def remove_outputs(*paths):
+            for stale in paths:
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+
+        src_path, cuts = job.final_video_path, list(job.trim_cuts or [])
+        superseded = [p for p in (job.trim_history or []) + [src_path] if p]
+
+        composed = final_path = _compose_job(job, "final")
+        comp_dir = os.path.join(get_settings().output_dir, "review")
+        for ranges in cuts:
+            trimmed = os.path.join(comp_dir, f"ugc_ad_{job_id}_trimmed_{uuid4().hex[:8]}.mp4")
+            await asyncio.to_thread(trim_video, final_path, trimmed, ranges, "final")
+            if final_path != composed:
+                os.remove(final_path)  # intermediate trim
+            final_path = trimmed
+        logger.info(f"Job {job_id}: final master rendered — {final_path}")
+
+        # Re-read only the watched columns under a row lock: a full refresh
+        # would drop the aroll_paths/broll_paths conform writes _compose_job made
+        await session.refresh(job, attribute_names=["final_video_path", "trim_cuts"], with_for_update=True)
+        if job.final_video_path != src_path or list(job.trim_cuts or []) != cuts:
+            remove_outputs(*{final_path, composed}, manifest_path(composed),
+                           *[variant_path(composed, name) for name in OUTPUT_VARIANTS])
+            raise RuntimeError("Video changed while rendering the final master")
+
+        job.final_video_path = final_path
+        job.render_profile = "final"
+        # Draft versions are superseded; the master already contains the cuts
+        job.trim_history = None
+        job.trim_cuts = None
+        await session.commit()
+
+        for path in superseded:
+            remove_outputs(*[variant_path(path, name) for name in OUTPUT_VARIANTS], manifest_path(path))
+
+        if job.status == "approved":
+            await update_lp_hero_frame(session, job)
+
+    _run_with_job("ugc_render_final", job_id, _handler)
+
+
+@celery_app.task(
+    bind=True,
+    name='app.ugc_tasks.ugc_trim_video',
+    max_retries=0,
+    time_limit=600,
+)
+def ugc_trim_video(self, job_id: int, src_path: str, ranges: list):
+    """Cut ranges out of the composition review video.
+
+    Smart cut (see trim_video): whole GOPs are stream-copied, only the
+    GOPs at the cuts re-encode. The previous version goes onto trim_history
+    for undo and the ranges onto trim_cuts for the final render. src_path
+    is the version the reviewer marked up; if it has been replaced since
+    (another trim, undo, recompose), the cut is rejected.
+    """
+    async def _handler(session, job):
+        import os
+        from uuid import uuid4
+
+        from sqlalchemy.orm.attributes import flag_modified
+
+        from app.config import get_settings
+        from app.services.ugc_pipeline.ugc_compositor import trim_video
+
+        if job.status != "stage_composition_review":
+            raise RuntimeError("Can only trim during composition review")
+        if job.final_video_path != src_path:
+            raise RuntimeError("Video changed since the trim was requested")
+
+        out_path = os.path.join(get_settings().output_dir, "review",
+                                f"ugc_ad_{job_id}_trimmed_{uuid4().hex[:8]}.mp4")
+        # Re-encode at the settings the current cut was rendered with (legacy jobs = final)
+        await asyncio.to_thread(trim_video, src_path, out_path, ranges, job.render_profile or "final")
+
+        await session.refresh(job)
+        if job.final_video_path != src_path:
+            os.remove(out_path)
+            raise RuntimeError("Video changed while trimming")
+
+        # Push current version onto trim history stack for multi-undo
+        job.trim_history = (job.trim_history or []) + [src_path]
+        flag_modified(job, "trim_history")
+        # Keep the cut ranges alongside so a final render can replay them
+        job.trim_cuts = (job.trim_cuts or []) + [ranges]
+        flag_modified(job, "trim_cuts")
+        job.final_video_path = out_path
+        await session.commit()
+        logger.info(f"UGCJob {job_id} trimmed {len(ranges)} region(s), new path: {out_path}")
+
+    _run_with_job("ugc_trim_video", job_id, _handler)
+
+
 # --- LP Hero Image Regeneration ---
 
 @celery_app.task(
@@ -1102,7 +1606,8 @@ def lp_hero_regen(self, lp_id: int):
                 ugc_style="product-hero",
                 emotional_tone="professional",
                 visual_keywords=["product", "hero", "landing page"],
-                use_mock=use_mock
+                use_mock=use_mock,
+                force_new=True,
             )
 
             # Store as candidate — never mutate approved content in place
@@ -1111,7 +1616,7 @@ def lp_hero_regen(self, lp_id: int):
             logger.info(f"LP {lp_id}: hero candidate generated — {candidate_path}")
 
     try:
-        asyncio.run(_run())
+        run_async(_run())
     except Exception as exc:
         logger.error(f"lp_hero_regen LP {lp_id} failed: {exc}")
         raise
@@ -1140,7 +1645,7 @@ def lp_generate_section_images(self, lp_id: int):
     async def _run():
         from app.database import get_task_session_factory
         from app.models import LandingPage, UGCJob
-        from app.services.image_provider import get_image_provider
+        from app.services.image_provider import ImageRequest, get_image_provider
         from sqlalchemy import select
         from sqlalchemy.orm.attributes import flag_modified
 
@@ -1172,12 +1677,18 @@ def lp_generate_section_images(self, lp_id: int):
                             break
 
             provider = get_image_provider()
-            section_images = {}
+            ref_images = [product_ref] if product_ref else None
 
+            # Slots are positional (item i -> image i). Start from the current
+            # images, so a failed item keeps its previous one.
+            current = lp.lp_section_images or {}
+            section_images = {}
+            slots, requests = [], []
             for section_name, copy_field in IMAGEABLE_SECTIONS.items():
                 items = lp_copy.get(copy_field) or []
-                paths = []
-                for item in items:
+                images = list(current.get(section_name) or [])[:len(items)]
+                section_images[section_name] = images + [None] * (len(items) - len(images))
+                for index, item in enumerate(items):
                     title = item.get("title", "")
                     desc = item.get("description", "")
                     if not title:
@@ -1186,32 +1697,43 @@ def lp_generate_section_images(self, lp_id: int):
                         f"Product lifestyle photo: {title} — {desc}. "
                         "Clean commercial photography, bright natural lighting, 16:9 landscape."
                     )
-                    try:
-                        ref_images = [product_ref] if product_ref else None
-                        generated = provider.generate_image(
-                            prompt=prompt,
-                            width=1024,
-                            height=576,
-                            reference_images=ref_images,
-                        )
-                        paths.append(generated[0])
-                        logger.info(f"LP {lp_id} [{section_name}] item '{title}': {generated[0]}")
-                    except Exception as e:
-                        logger.warning(f"LP {lp_id} [{section_name}] item '{title}' failed: {e}")
-                        # Skip failed items — section still gets partial images
-                        continue
-
-                if paths:
-                    section_images[section_name] = paths
-
-            lp.lp_section_images = section_images
-            flag_modified(lp, "lp_section_images")
-            await session.commit()
-            counts = {k: len(v) for k, v in section_images.items()}
-            logger.info(f"LP {lp_id}: section images generated — {counts}")
+                    slots.append((section_name, index, title))
+                    requests.append(ImageRequest(prompt=prompt, width=1024, height=576, reference_images=ref_images))
+
+            progress = {"total": len(requests), "done": 0, "failed": 0}
+            self.update_state(state="PROGRESS", meta=progress)
+
+            # Items run concurrently (generate_batch); each result is committed
+            # as soon as it arrives so the progress stream can show it
+            loop = asyncio.get_running_loop()
+            finished: asyncio.Queue = asyncio.Queue()
+
+            def on_result(slot, generated):
+                loop.call_soon_threadsafe(finished.put_nowait, (slot, generated))
+
+            batch = asyncio.ensure_future(asyncio.to_thread(provider.generate_batch, requests, on_result=on_result))
+            for _ in requests:
+                slot, generated = await finished.get()
+                section_name, index, title = slots[slot]
+                if isinstance(generated, Exception):
+                    # Failed items keep their previous image; the others carry on
+                    progress["failed"] += 1
+                    logger.warning(f"LP {lp_id} [{section_name}] item '{title}' failed: {generated}")
+                else:
+                    progress["done"] += 1
+                    section_images[section_name][index] = generated[0]
+                    lp.lp_section_images = {k: list(v) for k, v in section_images.items() if v}
+                    flag_modified(lp, "lp_section_images")
+                    await session.commit()
+                    logger.info(f"LP {lp_id} [{section_name}] item '{title}': {generated[0]}")
+                self.update_state(state="PROGRESS", meta=progress)
+            await batch
+
+            logger.info(f"LP {lp_id}: section images generated — {progress}")
+            return progress
 
     try:
-        asyncio.run(_run())
+        return run_async(_run())
     except Exception as exc:
         logger.error(f"lp_generate_section_images LP {lp_id} failed: {exc}")
         raise
@@ -1278,7 +1800,7 @@ def lp_regen_section_image(self, lp_id: int, section: str, index: int):
             ref_images = [product_ref] if product_ref else None
             generated = provider.generate_image(
                 prompt=prompt, width=1024, height=576,
-                reference_images=ref_images,
+                reference_images=ref_images, force_new=True,
             )
             new_path = generated[0]
 
@@ -1296,7 +1818,7 @@ def lp_regen_section_image(self, lp_id: int, section: str, index: int):
             logger.info(f"LP {lp_id} [{section}][{index}] regenerated: {new_path}")
 
     try:
-        asyncio.run(_run())
+        run_async(_run())
     except Exception as exc:
         logger.error(f"lp_regen_section_image LP {lp_id} {section}[{index}] failed: {exc}")
         raise
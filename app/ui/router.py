@@ -11,7 +11,7 @@ from uuid import uuid4
 
 from PIL import Image
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, UploadFile
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Query, Request, Response, UploadFile
 from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy import func, select
@@ -21,7 +21,9 @@ from statemachine.exceptions import TransitionNotAllowed
 
 from app.database import async_session_factory, get_session
 from app.models import LandingPage, UGCJob, WaitlistEntry
-from app.ugc_router import _STAGE_ADVANCE_MAP, _STAGE_REGEN_MAP, _STAGE_SKIP_VIDEO_CONFIG, _determine_resume_task
+from app.ugc_router import _STAGE_ADVANCE_MAP, _STAGE_REGEN_MAP, _STAGE_SKIP_VIDEO_CONFIG
+from app.services.uploads import claim_upload, create_upload, get_upload, save_upload, write_chunk
+from app.state_machines import ugc_graph
 from app.state_machines.ugc_job import UGCJobStateMachine
 # NOTE: landing_page service imports are deferred to _run_generation to avoid
 # google.genai module-level import error at server startup in Docker.
@@ -69,31 +71,6 @@ STAGE_ORDER = [
 ]
 _REVIEW_STATES = {s for s, _ in STAGE_ORDER}
 
-# Columns to clear when rewinding to a given stage (everything generated AFTER it)
-_DOWNSTREAM_COLUMNS = {
-    "stage_analysis_review": [
-        "master_script", "aroll_scenes", "broll_shots",
-        "aroll_image_paths", "aroll_paths",
-        "broll_image_paths", "broll_paths", "final_video_path",
-    ],
-    "stage_script_review": [
-        "aroll_image_paths", "aroll_paths",
-        "broll_image_paths", "broll_paths", "final_video_path",
-    ],
-    "stage_aroll_image_review": [
-        "aroll_paths", "broll_image_paths", "broll_paths", "final_video_path",
-    ],
-    "stage_aroll_review": [
-        "broll_image_paths", "broll_paths", "final_video_path",
-    ],
-    "stage_broll_image_review": [
-        "broll_paths", "final_video_path",
-    ],
-    "stage_broll_review": [
-        "final_video_path",
-    ],
-}
-
 # LP module names — single source of truth for review and approve endpoint
 LP_MODULES = ["headline", "hero", "cta", "benefits"]
 
@@ -425,8 +402,7 @@ async def lp_upload_hero(run_id: str, file: UploadFile = File(...), session: Asy
     os.makedirs("output/lp_frames", exist_ok=True)
     ext = Path(file.filename).suffix or ".jpg"
     dest = f"output/lp_frames/lp_hero_{run_id}_upload{ext}"
-    with open(dest, "wb") as f:
-        f.write(await file.read())
+    await save_upload(file, Path(dest))
 
     lp.lp_hero_candidate_path = dest
     await session.commit()
@@ -552,6 +528,52 @@ async def lp_generate_section_images(
     return JSONResponse({"task_id": task.id})
 
 
+@router.get("/lp/{run_id}/section-images/events")
+async def lp_section_images_events(run_id: str, request: Request, task_id: str = Query(...)):
+    """SSE stream of a section image run: task progress plus the images written so far.
+
+    Each event carries state, total/done/failed counts (while running) and
+    the current image URL per section item. Closes when the task finishes,
+    after 10 minutes, or on client disconnect.
+    """
+    from app.worker import celery_app
+
+    async def event_stream():
+        for _ in range(600):
+            if await request.is_disconnected():
+                break
+
+            result = celery_app.AsyncResult(task_id)
+            # state and info each query the result backend
+            state, info = await asyncio.to_thread(lambda r=result: (r.state, r.info))
+            payload = {"state": state}
+            if state in ("PROGRESS", "SUCCESS") and isinstance(info, dict):
+                payload.update(info)
+            elif state == "FAILURE":
+                payload["error"] = str(info)
+
+            async with async_session_factory() as s:
+                lp = (await s.execute(select(LandingPage).where(LandingPage.run_id == run_id))).scalar_one_or_none()
+            if lp is None:
+                yield f"data: {json.dumps({'state': 'not_found'})}\n\n"
+                break
+            payload["images"] = {
+                section: [_media_url(p) if p else None for p in paths]
+                for section, paths in (lp.lp_section_images or {}).items()
+            }
+            yield f"data: {json.dumps(payload)}\n\n"
+
+            if state in ("SUCCESS", "FAILURE", "REVOKED"):
+                break
+            await asyncio.sleep(1)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/lp/{run_id}/regen-section-image")
 async def lp_regen_section_image(
     run_id: str,
@@ -599,8 +621,7 @@ async def lp_upload_section_image(
     suffix = Path(orig).suffix or ".png"
     filename = f"section_{section}_{index}_{uuid4().hex[:6]}{suffix}"
     dest = upload_dir / filename
-    content = await file.read()
-    dest.write_bytes(content)
+    await save_upload(file, dest)
 
     section_imgs[index] = str(dest)
     images[section] = section_imgs
@@ -682,6 +703,8 @@ async def _build_lp_html(lp, session: AsyncSession, template_key: Optional[str]
         for section, paths in lp.lp_section_images.items():
             rel_paths = []
             for p in paths:
+                if not p:  # slot still generating or failed
+                    continue
                 abs_p = Path(p).resolve()
                 if abs_p.exists():
                     rel_paths.append(os.path.relpath(abs_p, html_path.parent.resolve()))
@@ -1053,6 +1076,17 @@ async def ugc_review(request: Request, job_id: int, tab: Optional[str] = Query(N
         else:
             running_toward = "stage_analysis_review"
 
+    # Parallel branches: stages are reviewable as soon as their own branch
+    # reaches review, whichever gate job.status currently presents
+    running_stages = {running_toward} if running_toward else set()
+    waiting_stages = set()
+    if job.stage_states is not None and job.status not in ("approved", "failed"):
+        completed_stages = {s.review_status for s in ugc_graph.stages_in(job, "approved")}
+        waiting_stages = {s.review_status for s in ugc_graph.stages_in(job, "review")} - {job.status}
+        running_stages = {s.review_status for s in ugc_graph.stages_in(job, "running")}
+        if job.status == "running" and running_stages:
+            running_toward = next(s for s, _ in STAGE_ORDER if s in running_stages)
+
     # Don't show image review tabs as completed/viewable if no image data exists
     # (old jobs created before the image review workflow)
     if not job.aroll_image_paths:
@@ -1061,7 +1095,7 @@ async def ugc_review(request: Request, job_id: int, tab: Optional[str] = Query(N
         completed_stages.discard("stage_broll_image_review")
 
     # Stages the user can view (completed + current)
-    viewable_stages = completed_stages | ({job.status} if job.status in stage_keys else set())
+    viewable_stages = completed_stages | waiting_stages | ({job.status} if job.status in stage_keys else set())
     if job.status == "approved":
         viewable_stages = set(stage_keys)
         # Still hide image tabs for approved jobs with no image data
@@ -1098,6 +1132,8 @@ async def ugc_review(request: Request, job_id: int, tab: Optional[str] = Query(N
             "completed_stages": completed_stages,
             "review_states": _REVIEW_STATES,
             "running_toward": running_toward,
+            "running_stages": running_stages,
+            "waiting_stages": waiting_stages,
             "sketch_paths": [str(p) for p in sketch_paths],
             "ref_photo_paths": [str(p) for p in ref_photo_paths],
             "active_tab": active_tab,
@@ -1113,33 +1149,44 @@ async def ugc_ui_advance(request: Request, job_id: int, session: AsyncSession =
     job = result.scalar_one_or_none()
     if not job:
         raise HTTPException(status_code=404, detail=f"UGCJob {job_id} not found")
+    await ugc_graph.lock_job_state(session, job)
 
     # Optional rewind: from_stage lets the user go back to an earlier stage
     form = await request.form()
     from_stage = form.get("from_stage")
     if from_stage and from_stage != job.status and from_stage in _STAGE_ADVANCE_MAP:
-        stage_keys = [s for s, _ in STAGE_ORDER]
-        if from_stage not in stage_keys or job.status not in stage_keys:
+        if job.status not in _REVIEW_STATES:
             raise HTTPException(status_code=400, detail=f"Cannot rewind from '{job.status}'")
-        if stage_keys.index(from_stage) >= stage_keys.index(job.status):
-            raise HTTPException(status_code=400, detail="from_stage must be earlier than current status")
-        # Rewind — set status directly (bypass state machine)
-        job.status = from_stage
-        # Clear all data columns downstream of the rewound stage
-        # so _derive_stage_progress() returns the correct stage label
-        for col in _DOWNSTREAM_COLUMNS.get(from_stage, []):
-            setattr(job, col, None)
+        stage = ugc_graph.STAGES_BY_REVIEW[from_stage]
+        state = ugc_graph.stage_state(job, stage.name)
+        if state == "review":
+            # A parallel branch waiting behind the open gate — approve it directly
+            job.status = from_stage
+        elif state != "approved":
+            raise HTTPException(status_code=400, detail="from_stage must be an already approved stage")
+        else:
+            busy = ugc_graph.busy_dependents(job, from_stage)
+            if busy:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Wait for {', '.join(s.label for s in busy)} to finish before going back",
+                )
+            # Rewind — reopen the stage, reset its dependents (bypasses the job state machine)
+            ugc_graph.reopen_gate(job, from_stage)
+            # Clear all data columns downstream of the rewound stage
+            # so _derive_stage_progress() returns the correct stage label
+            for col in ugc_graph.downstream_columns(from_stage):
+                setattr(job, col, None)
 
     if job.status not in _STAGE_ADVANCE_MAP:
         raise HTTPException(status_code=400, detail=f"Cannot advance from '{job.status}'")
 
-    approve_event, next_task_name = _STAGE_ADVANCE_MAP[job.status]
+    approve_event = _STAGE_ADVANCE_MAP[job.status]
     pre_advance_status = job.status
 
+    # May present another branch's review gate instead of running
     try:
-        sm = UGCJobStateMachine(model=job, state_field="status", start_value=job.status)
-        sm.send(approve_event)
-        job.status = sm.current_state.id
+        next_tasks = ugc_graph.approve_gate(job)
     except TransitionNotAllowed as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
@@ -1178,10 +1225,14 @@ async def ugc_ui_advance(request: Request, job_id: int, session: AsyncSession =
                 # Replace sentinels with None for the final column value
                 setattr(job, skip_cfg["video_col"], [None] * count)
                 flag_modified(job, skip_cfg["video_col"])
-                sm = UGCJobStateMachine(model=job, state_field="status", start_value=job.status)
-                sm.send(skip_cfg["complete_event"])
-                job.status = sm.current_state.id
+                skipped = ugc_graph.STAGES_BY_NAME[skip_cfg["stage"]]
+                ugc_graph.finish_stage(job, skipped.name)
+                next_tasks = [t for t in next_tasks if t != skipped.task]
                 await session.commit()
+                # Other stages this approval unlocked still run
+                import app.ugc_tasks as ugc_tasks_module
+                for task_name in next_tasks:
+                    getattr(ugc_tasks_module, task_name).delay(job_id)
                 return templates.TemplateResponse(
                     request=request,
                     name="partials/ugc_stage_controls.html",
@@ -1190,31 +1241,19 @@ async def ugc_ui_advance(request: Request, job_id: int, session: AsyncSession =
             # Partial skip — commit pre-filled paths, Celery will generate the rest
             await session.commit()
 
-    # Extract hero frame from approved video and unlock linked LPs
+    # Extract hero frame from approved video and unlock linked LPs.
+    # Draft reviews render the master first; that task sets the hero frame.
     if approve_event == "approve_final" and job.final_video_path:
-        from app.services.video_compositor.thumbnail import generate_thumbnail
-        try:
-            frame_path = await asyncio.to_thread(
-                generate_thumbnail,
-                job.final_video_path,
-                2.0,
-                "output/lp_frames"
-            )
-            # Set hero image on any LP linked to this job and unlock review
-            lp_result = await session.execute(
-                select(LandingPage).where(LandingPage.ugc_job_id == job_id)
-            )
-            for lp_row in lp_result.scalars().all():
-                lp_row.lp_hero_image_path = frame_path
-                lp_row.lp_review_locked = False
-            await session.commit()
-        except Exception as e:
-            logger.warning(f"Frame extraction failed for job {job_id}: {e}")
-
-    # Enqueue next stage task
-    if next_task_name:
         import app.ugc_tasks as ugc_tasks_module
-        getattr(ugc_tasks_module, next_task_name).delay(job_id)
+        if job.render_profile not in (None, "final"):
+            ugc_tasks_module.ugc_render_final.delay(job_id)
+        else:
+            await ugc_tasks_module.update_lp_hero_frame(session, job)
+
+    # Enqueue every stage this approval unlocked (parallel branches run concurrently)
+    import app.ugc_tasks as ugc_tasks_module
+    for task_name in next_tasks:
+        getattr(ugc_tasks_module, task_name).delay(job_id)
 
     resp = templates.TemplateResponse(
         request=request,
@@ -1233,6 +1272,7 @@ async def ugc_ui_regenerate(request: Request, job_id: int, session: AsyncSession
     job = result.scalar_one_or_none()
     if not job:
         raise HTTPException(status_code=404, detail=f"UGCJob {job_id} not found")
+    await ugc_graph.lock_job_state(session, job)
 
     if job.status not in _STAGE_REGEN_MAP:
         detail = ("Composition stage cannot be regenerated"
@@ -1241,19 +1281,16 @@ async def ugc_ui_regenerate(request: Request, job_id: int, session: AsyncSession
         raise HTTPException(status_code=400, detail=detail)
 
     task_name = _STAGE_REGEN_MAP[job.status]
-    approve_event, _ = _STAGE_ADVANCE_MAP[job.status]
 
     try:
-        sm = UGCJobStateMachine(model=job, state_field="status", start_value=job.status)
-        sm.send(approve_event)
-        job.status = sm.current_state.id
+        ugc_graph.regenerate_gate(job)
     except TransitionNotAllowed as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
     await session.commit()
 
     import app.ugc_tasks as ugc_tasks_module
-    getattr(ugc_tasks_module, task_name).delay(job_id)
+    getattr(ugc_tasks_module, task_name).delay(job_id, regenerate=True)
 
     return templates.TemplateResponse(
         request=request,
@@ -1271,13 +1308,11 @@ async def ugc_ui_retry(job_id: int, session: AsyncSession = Depends(get_session)
         raise HTTPException(status_code=404, detail=f"UGCJob {job_id} not found")
     if job.status != "failed":
         raise HTTPException(status_code=400, detail=f"Cannot retry from '{job.status}'")
+    await ugc_graph.lock_job_state(session, job)
 
-    task_name = _determine_resume_task(job)
-
+    # Restarts every failed stage
     try:
-        sm = UGCJobStateMachine(model=job, state_field="status", start_value=job.status)
-        sm.send("retry")
-        job.status = sm.current_state.id
+        next_tasks = ugc_graph.retry(job)
     except TransitionNotAllowed as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
@@ -1285,7 +1320,8 @@ async def ugc_ui_retry(job_id: int, session: AsyncSession = Depends(get_session)
     await session.commit()
 
     import app.ugc_tasks as ugc_tasks_module
-    getattr(ugc_tasks_module, task_name).delay(job_id)
+    for task_name in next_tasks:
+        getattr(ugc_tasks_module, task_name).delay(job_id)
 
     return RedirectResponse(url=f"/ui/ugc/{job_id}/review", status_code=303)
 
@@ -1303,15 +1339,27 @@ async def ugc_back_to_images(job_id: int, session: AsyncSession = Depends(get_se
     # Parse error to determine which stage and scene failed
     error_msg = job.error_message or ""
     if "[broll_shot:" in error_msg:
-        job.status = "stage_broll_image_review"
+        target = "stage_broll_image_review"
     elif "[aroll_scene:" in error_msg:
-        job.status = "stage_aroll_image_review"
+        target = "stage_aroll_image_review"
     elif job.broll_image_paths:
-        job.status = "stage_broll_image_review"
+        target = "stage_broll_image_review"
     elif job.aroll_image_paths:
-        job.status = "stage_aroll_image_review"
+        target = "stage_aroll_image_review"
     else:
-        job.status = "stage_script_review"
+        target = "stage_script_review"
+
+    busy = ugc_graph.busy_dependents(job, target)
+    if busy:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Wait for {', '.join(s.label for s in busy)} to finish before going back",
+        )
+    # Reopen the image stage; the failed video stage goes back to pending
+    try:
+        ugc_graph.reopen_gate(job, target)
+    except TransitionNotAllowed as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
     # Keep error_message so the UI can highlight the failed scene
     # It will be cleared on next successful advance
@@ -1332,7 +1380,7 @@ async def ugc_reopen(job_id: int, session: AsyncSession = Depends(get_session)):
 
     sm = UGCJobStateMachine(model=job, state_field="status", start_value=job.status)
     sm.send("reopen")
-    job.status = sm.current_state.id
+    ugc_graph.reopen_gate(job, sm.current_state.id)
     job.approved_at = None
     await session.commit()
 
@@ -1341,7 +1389,7 @@ async def ugc_reopen(job_id: int, session: AsyncSession = Depends(get_session)):
 
 @router.post("/ugc/{job_id}/trim-video")
 async def ugc_trim_video(request: Request, job_id: int, session: AsyncSession = Depends(get_session)):
-    """Remove short segments from the final video at specified timestamps."""
+    """Queue removal of short segments from the final video at specified timestamps."""
     result = await session.execute(select(UGCJob).where(UGCJob.id == job_id))
     job = result.scalar_one_or_none()
     if not job:
@@ -1359,62 +1407,12 @@ async def ugc_trim_video(request: Request, job_id: int, session: AsyncSession =
     # Sort and merge overlapping ranges
     ranges = sorted(ranges, key=lambda r: r["start"])
 
-    # Run blocking moviepy work in a thread
-    import asyncio
-    from uuid import uuid4
-
-    src_path = job.final_video_path
-    out_path = f"output/review/ugc_ad_{job_id}_trimmed_{uuid4().hex[:8]}.mp4"
-
-    def _do_trim():
-        from moviepy import VideoFileClip, concatenate_videoclips
-
-        clip = VideoFileClip(src_path)
-        duration = clip.duration
-
-        # Build list of segments to KEEP (gaps between cut ranges)
-        keep_segments = []
-        cursor = 0.0
-        for r in ranges:
-            cut_start = max(0.0, min(r["start"], duration))
-            cut_end = max(0.0, min(r["end"], duration))
-            if cut_start > cursor:
-                keep_segments.append((cursor, cut_start))
-            cursor = max(cursor, cut_end)
-        if cursor < duration:
-            keep_segments.append((cursor, duration))
-
-        if not keep_segments:
-            clip.close()
-            raise ValueError("All content would be removed")
-
-        # Extract subclips and concatenate
-        subclips = [clip.subclipped(s, e) for s, e in keep_segments]
-        final = concatenate_videoclips(subclips)
-        final.write_videofile(out_path, codec="libx264", audio_codec="aac",
-                              fps=clip.fps, logger=None)
-        for sc in subclips:
-            sc.close()
-        final.close()
-        clip.close()
-
-    try:
-        await asyncio.to_thread(_do_trim)
-    except Exception as exc:
-        logger.error(f"Trim failed for job {job_id}: {exc}")
-        raise HTTPException(status_code=500, detail=f"Trim failed: {exc}")
-
-    # Push current version onto trim history stack for multi-undo
-    from sqlalchemy.orm.attributes import flag_modified
-    history = job.trim_history or []
-    history.append(job.final_video_path)
-    job.trim_history = history
-    flag_modified(job, "trim_history")
-    job.final_video_path = out_path
-    await session.commit()
-    logger.info(f"UGCJob {job_id} trimmed {len(ranges)} region(s), new path: {out_path}")
+    # Smart cut runs on the render worker; the UI polls task-status
+    import app.ugc_tasks as ugc_tasks_module
+    task = ugc_tasks_module.ugc_trim_video.delay(job_id, job.final_video_path, ranges)
+    logger.info(f"UGCJob {job_id} trim queued: {len(ranges)} region(s), task {task.id}")
 
-    return JSONResponse({"ok": True, "video_path": "/" + out_path})
+    return JSONResponse({"status": "queued", "task_id": task.id})
 
 
 @router.post("/ugc/{job_id}/undo-trim")
@@ -1436,6 +1434,11 @@ async def ugc_undo_trim(job_id: int, session: AsyncSession = Depends(get_session
     job.final_video_path = history.pop()
     job.trim_history = history if history else None
     flag_modified(job, "trim_history")
+    cuts = job.trim_cuts or []
+    if cuts:
+        cuts.pop()
+    job.trim_cuts = cuts if cuts else None
+    flag_modified(job, "trim_cuts")
     await session.commit()
     logger.info(f"UGCJob {job_id} undo trim, restored: {job.final_video_path}")
 
@@ -1446,6 +1449,21 @@ async def ugc_undo_trim(job_id: int, session: AsyncSession = Depends(get_session
     })
 
 
+@router.post("/ugc/{job_id}/render-final")
+async def ugc_render_final(job_id: int, session: AsyncSession = Depends(get_session)):
+    """Queue the final-profile master render for a job reviewed on a draft."""
+    result = await session.execute(select(UGCJob).where(UGCJob.id == job_id))
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=404, detail=f"UGCJob {job_id} not found")
+    if job.status not in ("stage_composition_review", "approved") or not job.final_video_path:
+        raise HTTPException(status_code=400, detail="No composition to render")
+
+    from app.ugc_tasks import ugc_render_final as task_fn
+    task = task_fn.delay(job_id)
+    return JSONResponse({"task_id": task.id})
+
+
 # Editable analysis fields (column name -> expected type)
 _ANALYSIS_FIELDS = {
     "analysis_category": str,
@@ -1581,8 +1599,7 @@ async def ugc_upload_hero_image(
     suffix = Path(orig).suffix or ".png"
     filename = f"hero_{stem}_{uuid4().hex[:6]}{suffix}"
     dest = upload_dir / filename
-    content = await file.read()
-    dest.write_bytes(content)
+    await save_upload(file, dest)
 
     # Push current hero to history, set uploaded as current
     history = list(job.hero_image_history or [])
@@ -1621,8 +1638,7 @@ async def ugc_upload_aroll_image(
     suffix = Path(orig).suffix or ".png"
     filename = f"aroll_{scene_index}_{stem}_{uuid4().hex[:6]}{suffix}"
     dest = upload_dir / filename
-    content = await file.read()
-    dest.write_bytes(content)
+    await save_upload(file, dest)
 
     # Push current image to history, set uploaded as current
     history = list(job.aroll_image_history or [])
@@ -1670,8 +1686,7 @@ async def ugc_upload_broll_image(
     suffix = Path(orig).suffix or ".png"
     filename = f"broll_{shot_index}_{uuid4().hex[:6]}{suffix}"
     dest = upload_dir / filename
-    content = await file.read()
-    dest.write_bytes(content)
+    await save_upload(file, dest)
 
     paths[shot_index] = str(dest)
     job.broll_image_paths = paths
@@ -1684,15 +1699,63 @@ async def ugc_upload_broll_image(
     )
 
 
+@router.post("/uploads")
+async def upload_create(request: Request):
+    """Start a resumable upload. Body: {"filename": str, "length": int}."""
+    body = await request.json()
+    try:
+        info = create_upload(str(body.get("filename") or "upload"), int(body.get("length") or 0))
+    except ValueError as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
+    return JSONResponse(
+        {"upload_id": info["upload_id"], "offset": 0},
+        status_code=201,
+        headers={"Upload-Offset": "0", "Location": f"/ui/uploads/{info['upload_id']}"},
+    )
+
+
+@router.head("/uploads/{upload_id}")
+async def upload_offset(upload_id: str):
+    """Report how many bytes the server has (Upload-Offset/Upload-Length headers)."""
+    try:
+        info = get_upload(upload_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    return Response(
+        status_code=200,
+        headers={"Upload-Offset": str(info["offset"]), "Upload-Length": str(info["length"]),
+                 "Cache-Control": "no-store"},
+    )
+
+
+@router.patch("/uploads/{upload_id}")
+async def upload_append(upload_id: str, request: Request, upload_offset: int = Header(...)):
+    """Append the request body at Upload-Offset; 409 if the offset is stale."""
+    try:
+        offset = await write_chunk(upload_id, upload_offset, request.stream())
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    return Response(status_code=204, headers={"Upload-Offset": str(offset)})
+
+
 @router.post("/ugc/{job_id}/upload-video")
 async def ugc_upload_video(
     job_id: int,
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
+    upload_id: Optional[str] = Form(None),
     scene_type: str = Form(...),
     clip_index: int = Form(0),
     session: AsyncSession = Depends(get_session),
 ):
-    """Upload a video file to a specific A-Roll or B-Roll clip slot."""
+    """Upload a video file to a specific A-Roll or B-Roll clip slot.
+
+    Accepts either a multipart file or the upload_id of a completed
+    resumable upload (see /ui/uploads).
+    """
+    if file is None and not upload_id:
+        raise HTTPException(status_code=400, detail="Provide file or upload_id")
     result = await session.execute(select(UGCJob).where(UGCJob.id == job_id))
     job = result.scalar_one_or_none()
     if not job:
@@ -1711,22 +1774,34 @@ async def ugc_upload_video(
 
     upload_dir = Path("output") / "ugc_uploads" / str(job_id)
     upload_dir.mkdir(parents=True, exist_ok=True)
-    suffix = Path(file.filename or "video.mp4").suffix or ".mp4"
+    if upload_id:
+        try:
+            orig = get_upload(upload_id)["filename"]
+        except LookupError as e:
+            raise HTTPException(status_code=404, detail=str(e)) from e
+    else:
+        orig = file.filename
+    suffix = Path(orig or "video.mp4").suffix or ".mp4"
     filename = f"{scene_type}_video_{clip_index}_{uuid4().hex[:6]}{suffix}"
     dest = upload_dir / filename
-    content = await file.read()
-    dest.write_bytes(content)
-
-    # Normalize VFR / non-mp4 uploads (iPhone .MOV fix)
-    from app.services.ugc_pipeline.ugc_compositor import normalize_video
-    normalized = normalize_video(str(dest))
+    if upload_id:
+        try:
+            claim_upload(upload_id, dest)
+        except ValueError as e:
+            raise HTTPException(status_code=409, detail=str(e)) from e
+    else:
+        await save_upload(file, dest)
 
-    paths[clip_index] = normalized
+    paths[clip_index] = str(dest)
     setattr(job, col, paths)
     from sqlalchemy.orm.attributes import flag_modified
     flag_modified(job, col)
     await session.commit()
 
+    # Normalize VFR / non-mp4 uploads (iPhone .MOV fix) off the request path
+    import app.ugc_tasks as ugc_tasks_module
+    ugc_tasks_module.ugc_ingest_clips.delay(job_id, col)
+
     return JSONResponse({"path": str(dest), "index": clip_index})
 
 
@@ -1757,8 +1832,7 @@ async def ugc_upload_sketch(
     suffix = Path(orig).suffix or ".png"
     filename = f"sketch_{stem}_{uuid4().hex[:6]}{suffix}"
     dest = upload_dir / filename
-    content = await sketch.read()
-    dest.write_bytes(content)
+    await save_upload(sketch, dest)
 
     job.hero_sketch_path = str(dest)
     await session.commit()
@@ -1827,8 +1901,7 @@ async def ugc_upload_ref_photo(
     suffix = Path(orig).suffix or ".png"
     filename = f"refphoto_{stem}_{uuid4().hex[:6]}{suffix}"
     dest = upload_dir / filename
-    content = await file.read()
-    dest.write_bytes(content)
+    await save_upload(file, dest)
 
     # Auto-crop to 1:1 (square) for optimal subject reference
     cropped = False
@@ -2007,6 +2080,8 @@ async def ugc_field_value(
             value = paths[index]
         else:
             value = json.dumps(paths)
+    elif item == "final_video_path":
+        value = job.final_video_path or ""
     elif item in _ANALYSIS_FIELDS:
         raw = getattr(job, item, None)
         value = "\n".join(raw) if isinstance(raw, list) else (raw or "")
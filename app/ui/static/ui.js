@@ -1341,6 +1341,17 @@ function _renderCuts() {
     }
 }
 
+/* Poll a Celery task until it finishes; rejects with the task error on failure */
+async function _waitForTask(taskId, intervalMs) {
+    while (true) {
+        await new Promise(function(done) { setTimeout(done, intervalMs || 1000); });
+        var resp = await fetch('/ui/ugc/task-status/' + taskId);
+        var t = await resp.json();
+        if (t.state === 'SUCCESS') return;
+        if (t.state === 'FAILURE') throw new Error(t.error || 'Task failed');
+    }
+}
+
 async function applyCuts(jobId) {
     if (_trimRanges.length === 0) return;
     var btn = document.getElementById('apply-cuts-btn');
@@ -1360,8 +1371,11 @@ async function applyCuts(jobId) {
             throw new Error(err.detail || 'Trim failed');
         }
         var data = await resp.json();
+        await _waitForTask(data.task_id);
+        var field = await fetch('/ui/ugc/' + jobId + '/field-value?item=final_video_path');
+        var current = await field.json();
         var video = document.getElementById('trim-video');
-        video.src = data.video_path;
+        video.src = '/' + current.value;
         video.load();
         _trimRanges = [];
         _renderCuts();
@@ -1405,6 +1419,43 @@ async function undoTrim(jobId) {
     }
 }
 
+// Queue the final-quality master render, reload once it finishes
+async function renderFinal(jobId) {
+    var btn = document.getElementById('render-final-btn');
+    var status = document.getElementById('render-final-status');
+    btn.disabled = true;
+    btn.textContent = 'Rendering...';
+    if (status) status.textContent = 'Rendering final master — this takes a few minutes';
+
+    try {
+        var resp = await fetch('/ui/ugc/' + jobId + '/render-final', {method: 'POST'});
+        if (!resp.ok) {
+            var err = await resp.json();
+            throw new Error(err.detail || 'Render failed');
+        }
+        var data = await resp.json();
+        var poll = setInterval(function() {
+            fetch('/ui/ugc/task-status/' + data.task_id)
+                .then(function(r) { return r.json(); })
+                .then(function(t) {
+                    if (t.state === 'SUCCESS') {
+                        clearInterval(poll);
+                        window.location.reload();
+                    } else if (t.state === 'FAILURE') {
+                        clearInterval(poll);
+                        if (status) { status.textContent = 'Error: ' + (t.error || 'unknown error'); status.style.color = '#c0392b'; }
+                        btn.textContent = 'Render Final Quality';
+                        btn.disabled = false;
+                    }
+                });
+        }, 3000);
+    } catch (err) {
+        if (status) { status.textContent = 'Error: ' + err.message; status.style.color = '#c0392b'; }
+        btn.textContent = 'Render Final Quality';
+        btn.disabled = false;
+    }
+}
+
 // Init trim tool on page load
 document.addEventListener('DOMContentLoaded', _initTrimTool);
 
@@ -1668,19 +1719,70 @@ function bulkDelete() {
         .then(function(r) { if (r.redirected) { window.location.href = r.url; } else if (r.ok) { window.location.reload(); } else { r.text().then(function(t) { alert('Delete failed: ' + t); }); } });
 }
 
+/* Resumable upload: create a session, PATCH 8 MB chunks at the server's
+   offset; on a dropped chunk re-query the offset (HEAD) and continue. */
+var UPLOAD_CHUNK_BYTES = 8 * 1024 * 1024;
+var UPLOAD_MAX_RETRIES = 5;
+
+function resumableUpload(file, onProgress) {
+    return fetch("/ui/uploads", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ filename: file.name, length: file.size })
+    }).then(function(r) {
+        if (!r.ok) return r.text().then(function(t) { throw new Error(t); });
+        return r.json();
+    }).then(function(info) {
+        var url = "/ui/uploads/" + info.upload_id;
+        var retries = 0;
+        function sendFrom(offset) {
+            if (onProgress) onProgress(offset / file.size);
+            if (offset >= file.size) return Promise.resolve(info.upload_id);
+            return fetch(url, {
+                method: "PATCH",
+                headers: { "Upload-Offset": String(offset), "Content-Type": "application/offset+octet-stream" },
+                body: file.slice(offset, offset + UPLOAD_CHUNK_BYTES)
+            }).then(function(r) {
+                if (r.ok) {
+                    retries = 0;
+                    return sendFrom(parseInt(r.headers.get("Upload-Offset"), 10));
+                }
+                if (r.status !== 409) return r.text().then(function(t) { throw new Error(t); });
+                return resume();
+            }, resume);
+        }
+        function resume(err) {
+            if (++retries > UPLOAD_MAX_RETRIES) throw err || new Error("Upload interrupted");
+            return new Promise(function(done) { setTimeout(done, 1000 * retries); })
+                .then(function() { return fetch(url, { method: "HEAD" }); })
+                .then(function(r) {
+                    if (!r.ok) throw new Error("Upload session lost");
+                    return sendFrom(parseInt(r.headers.get("Upload-Offset"), 10));
+                });
+        }
+        return sendFrom(0);
+    });
+}
+
 /* Upload a video file to a specific clip slot */
 function uploadVideo(jobId, sceneType, clipIndex, input) {
     var file = input.files[0];
     if (!file) return;
     var card = input.closest(".stage-card, .media-card");
     var overlay = showUploadOverlay(card, "Uploading & processing…");
-    var fd = new FormData();
-    fd.append("file", file);
-    fd.append("scene_type", sceneType);
-    fd.append("clip_index", clipIndex);
-    fetch("/ui/ugc/" + jobId + "/upload-video", {
-        method: "POST",
-        body: fd
+    var status = overlay && overlay.querySelector(".regen-status");
+    resumableUpload(file, function(fraction) {
+        if (status) status.textContent = "Uploading… " + Math.round(fraction * 100) + "%";
+    }).then(function(uploadId) {
+        if (status) status.textContent = "Processing…";
+        var fd = new FormData();
+        fd.append("upload_id", uploadId);
+        fd.append("scene_type", sceneType);
+        fd.append("clip_index", clipIndex);
+        return fetch("/ui/ugc/" + jobId + "/upload-video", {
+            method: "POST",
+            body: fd
+        });
     }).then(function(r) {
         if (r.ok) {
             window.location.reload();
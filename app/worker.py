@@ -1,5 +1,8 @@
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
 from app.config import get_settings
+from app.task_queues import task_routes
+from app.task_runtime import init_worker_process, shutdown_runtimes
 
 settings = get_settings()
 
@@ -20,8 +23,16 @@ celery_app.conf.update(
     task_soft_time_limit=25 * 60,  # 25 minutes
     worker_prefetch_multiplier=1,  # One task at a time (important for long tasks)
     worker_max_tasks_per_child=1000,  # Restart worker after 1000 tasks (memory cleanup)
+    # One queue per workload class (llm, image, video_gen, render); see app.task_queues
+    task_routes=task_routes(),
 )
 
+# One event loop + pooled DB engine per worker thread (app.task_runtime),
+# built by the thread's first task; worker_process_init fires only under prefork
+worker_process_init.connect(init_worker_process)
+worker_process_shutdown.connect(shutdown_runtimes)
+worker_shutdown.connect(shutdown_runtimes)
+
 # Register UGC pipeline tasks
 import app.ugc_tasks  # noqa: F401
 
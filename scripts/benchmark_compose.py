@@ -0,0 +1,157 @@
+"""Side-by-side benchmark of the UGC compose engines (moviepy vs ffmpeg).
+
+Generates mock A-Roll/B-Roll clips with the bundled ffmpeg (lavfi test
+sources, 720x1280 A-Roll with audio, letterboxed 16:9 B-Roll), then renders
+the same timeline with each engine in a fresh child process and reports
+wall time, CPU time (including ffmpeg subprocesses) and peak RSS.
+
+--workers adds segment-parallel ffmpeg runs (e.g. 4,8): the timeline is
+split at scene boundaries and the windows are encoded in that many
+processes, each run starting from an empty segment store.
+
+Usage:
+    python scripts/benchmark_compose.py [--engines moviepy,ffmpeg] [--pip]
+        [--aroll 3] [--broll 3] [--variants final,aroll] [--profile final]
+        [--workers 4,8] [--workdir /tmp/compose_bench]
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import imageio_ffmpeg  # noqa: E402
+
+ACLIP_SECONDS = 8   # Veo A-Roll clips are 8s
+BCLIP_SECONDS = 5
+
+
+def _make_clips(workdir: Path, n_aroll: int, n_broll: int):
+    """Create mock clips once; reused across runs."""
+    ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+    workdir.mkdir(parents=True, exist_ok=True)
+    aroll, broll = [], []
+    for i in range(n_aroll):
+        path = workdir / f"aroll_{i}.mp4"
+        if not path.exists():
+            subprocess.run([
+                ffmpeg, "-y", "-loglevel", "error",
+                "-f", "lavfi", "-i", f"testsrc2=s=720x1280:r=24:d={ACLIP_SECONDS}",
+                "-f", "lavfi", "-i", f"sine=f={440 + 110 * i}:d={ACLIP_SECONDS}",
+                "-c:v", "libx264", "-preset", "veryfast", "-c:a", "aac", "-shortest",
+                str(path),
+            ], check=True)
+        aroll.append(str(path))
+    for i in range(n_broll):
+        path = workdir / f"broll_{i}.mp4"
+        if not path.exists():
+            # 16:9 clip with baked-in letterbox bars to exercise bar detection
+            src = (f"testsrc=s=1280x720:r=24:d={BCLIP_SECONDS},"
+                   f"drawbox=y=0:h=80:c=black:t=fill,drawbox=y=640:h=80:c=black:t=fill")
+            subprocess.run([
+                ffmpeg, "-y", "-loglevel", "error", "-f", "lavfi", "-i", src,
+                "-c:v", "libx264", "-preset", "veryfast", str(path),
+            ], check=True)
+        broll.append(str(path))
+
+    # Spread B-Roll evenly over the A-Roll timeline without overlap
+    total = n_aroll * ACLIP_SECONDS
+    step = total / max(n_broll, 1)
+    broll_metadata = [
+        {"path": p, "overlay_start": round(1.0 + i * step, 2)}
+        for i, p in enumerate(broll)
+    ]
+    return aroll, broll_metadata
+
+
+def _run_engine(engine, aroll, broll_metadata, output_path, pip_mode, variants, profile,
+                workers, output_dir, queue):
+    """Child process body: render once and report resource usage."""
+    # Private segment store per run, so no run reuses another's segments
+    os.environ["OUTPUT_DIR"] = output_dir
+    from app.services.ugc_pipeline.ugc_compositor import compose_ugc_ad
+
+    start = time.perf_counter()
+    compose_ugc_ad(
+        aroll, broll_metadata, output_path,
+        pip_mode=pip_mode, engine=engine, variants=variants, profile=profile,
+        workers=workers,
+    )
+    wall = time.perf_counter() - start
+
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    kids = resource.getrusage(resource.RUSAGE_CHILDREN)  # ffmpeg readers/writers
+    queue.put({
+        "wall": wall,
+        "cpu": own.ru_utime + own.ru_stime + kids.ru_utime + kids.ru_stime,
+        # ru_maxrss is KiB on Linux; report the largest single process
+        "rss_mb": max(own.ru_maxrss, kids.ru_maxrss) / 1024,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--engines", default="moviepy,ffmpeg")
+    parser.add_argument("--aroll", type=int, default=3)
+    parser.add_argument("--broll", type=int, default=3)
+    parser.add_argument("--pip", action="store_true", help="enable PiP creator overlay")
+    parser.add_argument("--variants", default="final,aroll", help="output variants to write")
+    parser.add_argument("--profile", default="final", help="render profile (draft/final)")
+    parser.add_argument("--workers", default="",
+                        help="comma list of segment-parallel ffmpeg process counts to add (e.g. 4,8)")
+    parser.add_argument("--workdir", default="/tmp/compose_bench")
+    args = parser.parse_args()
+
+    # Importing the app pulls in Settings; allow running without a .env
+    os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./viralforge.db")
+    os.environ.setdefault("API_SECRET_KEY", "benchmark")
+
+    workdir = Path(args.workdir)
+    aroll, broll_metadata = _make_clips(workdir, args.aroll, args.broll)
+    print(f"Timeline: {len(aroll)} A-Roll x {ACLIP_SECONDS}s, "
+          f"{len(broll_metadata)} B-Roll x {BCLIP_SECONDS}s, pip={args.pip}, "
+          f"variants={args.variants}, profile={args.profile}, cores={os.cpu_count()}")
+    variants = args.variants.split(",")
+
+    runs = [(engine, engine, 1) for engine in args.engines.split(",")]
+    runs += [(f"ffmpeg x{n}", "ffmpeg", int(n)) for n in args.workers.split(",") if n]
+
+    ctx = mp.get_context("spawn")  # fresh interpreter per engine, clean rusage
+    results = {}
+    for label, engine, workers in runs:
+        queue = ctx.Queue()
+        slug = label.replace(" ", "_")
+        output_path = str(workdir / f"out_{slug}.mp4")
+        output_dir = str(workdir / f"store_{slug}_{int(time.time())}")
+        proc = ctx.Process(
+            target=_run_engine,
+            args=(engine, aroll, broll_metadata, output_path, args.pip, variants, args.profile,
+                  workers, output_dir, queue),
+        )
+        proc.start()
+        proc.join()
+        if proc.exitcode != 0:
+            print(f"{label}: failed (exit {proc.exitcode})")
+            continue
+        results[label] = queue.get()
+
+    print(f"\n{'engine':<12}{'wall (s)':>10}{'cpu (s)':>10}{'peak RSS (MB)':>16}")
+    for label, r in results.items():
+        print(f"{label:<12}{r['wall']:>10.1f}{r['cpu']:>10.1f}{r['rss_mb']:>16.0f}")
+    if "moviepy" in results and "ffmpeg" in results:
+        speedup = results["moviepy"]["wall"] / results["ffmpeg"]["wall"]
+        print(f"\nffmpeg engine speedup: {speedup:.1f}x wall time")
+    for label, r in results.items():
+        if label.startswith("ffmpeg x") and "ffmpeg" in results:
+            speedup = results["ffmpeg"]["wall"] / r["wall"]
+            print(f"{label} segment-parallel speedup over ffmpeg: {speedup:.1f}x wall time")
+
+
+if __name__ == "__main__":
+    main()
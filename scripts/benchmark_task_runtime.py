@@ -0,0 +1,130 @@
+"""Per-task startup and DB connection overhead of Celery UGC tasks.
+
+Runs the same minimal task body (load a UGCJob row, commit) --tasks times
+across --threads threads, like the worker's --pool=threads, in two modes:
+
+  fresh       what tasks did before app.task_runtime: asyncio.run() per
+              task and a new NullPool engine (echo on) per session factory
+  persistent  app.task_runtime.run_async(): one loop and pooled engine per
+              thread, reused by every task on it
+
+Reports mean / p95 wall time per task and the DB connections opened. With
+--fail every task also runs a second "_fail_job" body, as a failing stage
+task does.
+
+Usage:
+    python scripts/benchmark_task_runtime.py [--tasks 200] [--threads 4] [--fail]
+        [--database-url sqlite+aiosqlite:////tmp/task_bench.db]
+"""
+
+import argparse
+import asyncio
+import io
+import logging
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _setup(database_url: str) -> int:
+    """Create the schema and one job row; returns its id."""
+    os.environ["DATABASE_URL"] = database_url
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from app.models import Base, UGCJob
+
+    sync_url = database_url.replace("+aiosqlite", "").replace("+asyncpg", "+psycopg2")
+    engine = create_engine(sync_url)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        job = UGCJob(product_name="bench", description="bench", status="running")
+        session.add(job)
+        session.commit()
+        return job.id
+
+
+def _fresh_factory(database_url: str, connections: list):
+    """The pre-runtime get_task_session_factory(): new NullPool engine per call."""
+    from sqlalchemy import event, pool
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+
+    engine = create_async_engine(database_url, echo=True, future=True, poolclass=pool.NullPool)
+    event.listen(engine.sync_engine, "connect", lambda *a: connections.append(1))
+    return sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def _body(factory, job_id: int) -> None:
+    from sqlalchemy import select
+
+    from app.models import UGCJob
+
+    async with factory() as session:
+        result = await session.execute(select(UGCJob).where(UGCJob.id == job_id))
+        job = result.scalars().first()
+        job.error_message = None
+        await session.commit()
+
+
+def _run(mode: str, database_url: str, job_id: int, tasks: int, threads: int, fail: bool):
+    from app.database import get_task_session_factory
+    from app.task_runtime import run_async, runtime_stats, shutdown_runtimes
+
+    connections: list = []
+
+    def one_task(_):
+        start = time.perf_counter()
+        for _ in range(2 if fail else 1):
+            if mode == "fresh":
+                asyncio.run(_body(_fresh_factory(database_url, connections), job_id))
+            else:
+                async def body():
+                    await _body(get_task_session_factory(), job_id)
+                run_async(body())
+        return time.perf_counter() - start
+
+    # echo=True logging is part of the old cost; format it, but off the terminal
+    sink = io.StringIO()
+    echo_handlers = logging.getLogger("sqlalchemy.engine.Engine").handlers
+    for handler in echo_handlers:
+        handler.setStream(sink)
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        times = list(pool.map(one_task, range(tasks)))
+    stats = runtime_stats()
+    if mode == "persistent":
+        # Pool threads are gone; close their loops from here
+        shutdown_runtimes()
+
+    times_ms = sorted(t * 1000 for t in times)
+    return {
+        "mean_ms": statistics.mean(times_ms),
+        "p95_ms": times_ms[int(len(times_ms) * 0.95) - 1],
+        "connections": len(connections) if mode == "fresh" else stats["connections"],
+        "loops": tasks * (2 if fail else 1) if mode == "fresh" else stats["runtimes"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--fail", action="store_true", help="two DB bodies per task (work + _fail_job)")
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:////tmp/task_bench.db")
+    args = parser.parse_args()
+
+    job_id = _setup(args.database_url)
+    print(f"{args.tasks} tasks on {args.threads} threads, {args.database_url}")
+    print(f"{'mode':<12}{'mean ms':>10}{'p95 ms':>10}{'loops':>8}{'conns':>8}")
+    for mode in ("fresh", "persistent"):
+        r = _run(mode, args.database_url, job_id, args.tasks, args.threads, args.fail)
+        print(f"{mode:<12}{r['mean_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['loops']:>8}{r['connections']:>8}")
+
+
+if __name__ == "__main__":
+    main()
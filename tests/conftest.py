@@ -0,0 +1,35 @@
+"""Shared test setup: settings from a throwaway SQLite DB and output dir.
+
+The environment is set before any app module is imported, since
+get_settings() is cached on first use.
+"""
+
+import os
+import tempfile
+
+import pytest
+
+_TMP = tempfile.mkdtemp(prefix="viralforge-tests-")
+DB_PATH = os.path.join(_TMP, "test.db")
+
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+os.environ["API_SECRET_KEY"] = "test"
+os.environ["OUTPUT_DIR"] = os.path.join(_TMP, "output")
+os.environ["REDIS_URL"] = ""
+os.environ["UGC_PARALLEL_STAGES"] = "true"
+os.environ["UGC_SLOT_FANOUT"] = "true"
+os.environ["TASK_DB_ECHO"] = "false"
+
+
+@pytest.fixture
+def sync_db():
+    """Fresh tables in the test DB; yields a sync engine for setup and checks."""
+    from sqlalchemy import create_engine
+
+    from app.models import Base
+
+    engine = create_engine(f"sqlite:///{DB_PATH}")
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
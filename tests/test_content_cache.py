@@ -0,0 +1,87 @@
+"""Content-addressed LRU cache: hits, misses, eviction order and counters."""
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import content_cache
+from app.services.content_cache import ContentCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        self.now += 1  # every call is a distinct, later moment
+        return self.now
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(content_cache, "time", SimpleNamespace(time=Clock().time))
+    return ContentCache(str(tmp_path / "cache"), max_bytes=250, label="test cache")
+
+
+def media(tmp_path, name, size=100):
+    path = tmp_path / name
+    path.write_bytes(os.urandom(size))
+    return str(path)
+
+
+def test_key_depends_on_content_not_argument_order():
+    assert ContentCache.key(model="m", prompt="p") == ContentCache.key(prompt="p", model="m")
+    assert ContentCache.key(model="m", prompt="p") != ContentCache.key(model="m", prompt="q")
+
+
+def test_hit_materializes_a_fresh_copy(cache, tmp_path):
+    src = media(tmp_path, "clip.mp4")
+    cache.put("k1", [src])
+
+    [hit] = cache.get("k1", str(tmp_path / "out"), prefix="veo")
+    assert hit != src and os.path.basename(hit).startswith("veo_") and hit.endswith(".mp4")
+    with open(hit, "rb") as a, open(src, "rb") as b:
+        assert a.read() == b.read()
+    assert cache.get("missing", str(tmp_path / "out")) is None
+
+
+def test_eviction_drops_the_least_recently_used_entry(cache, tmp_path):
+    out = str(tmp_path / "out")
+    cache.put("k1", [media(tmp_path, "1.mp4")])
+    cache.put("k2", [media(tmp_path, "2.mp4")])
+    assert cache.get("k1", out)  # k1 is now more recent than k2
+
+    cache.put("k3", [media(tmp_path, "3.mp4")])
+    assert cache.get("k2", out) is None
+    assert cache.get("k1", out) and cache.get("k3", out)
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["bytes"] == 200
+
+
+def test_evicting_an_entry_keeps_paths_already_handed_out(cache, tmp_path):
+    out = str(tmp_path / "out")
+    cache.put("k1", [media(tmp_path, "1.mp4")])
+    [hit] = cache.get("k1", out)
+    cache.put("k2", [media(tmp_path, "2.mp4", size=200)])
+    assert cache.get("k1", out) is None
+    assert os.path.getsize(hit) == 100
+
+
+def test_entry_whose_files_vanished_is_a_miss(cache, tmp_path):
+    cache.put("k1", [media(tmp_path, "1.mp4")])
+    for root, _, files in os.walk(cache.root):
+        for name in files:
+            if name.startswith("k1_"):
+                os.remove(os.path.join(root, name))
+    assert cache.get("k1", str(tmp_path / "out")) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_stats_count_hits_misses_and_bytes_served(cache, tmp_path):
+    out = str(tmp_path / "out")
+    cache.put("k1", [media(tmp_path, "a.png", size=40), media(tmp_path, "b.png", size=60)])
+    cache.get("k1", out)
+    cache.get("k1", out)
+    cache.get("nope", out)
+    assert cache.stats() == {"hits": 2, "misses": 1, "bytes_served": 200, "entries": 1, "bytes": 100}
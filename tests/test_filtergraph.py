@@ -0,0 +1,114 @@
+"""ffmpeg filtergraph builders: graph structure, and that ffmpeg accepts the graphs."""
+
+import subprocess
+
+import imageio_ffmpeg
+import pytest
+
+from app.services.ugc_pipeline.ffmpeg_compositor import build_filtergraph
+from app.services.ugc_pipeline.segments import build_window_graph
+from app.services.ugc_pipeline.ugc_compositor import FRAME_H, FRAME_W, OUTPUT_FPS
+
+AROLL = [
+    {"path": "a0.mp4", "duration": 2.0, "has_audio": True},
+    {"path": "a1.mp4", "duration": 2.0, "has_audio": False},
+]
+BROLL = [{"path": "b0.mp4", "duration": 1.5, "overlay_start": 3.0, "crop": ""}]
+
+
+def chain_for(graph, label):
+    return next(c for c in graph["filter"].split(";") if c.endswith(f"[{label}]"))
+
+
+def test_filtergraph_concatenates_a_roll_and_overlays_b_roll():
+    graph = build_filtergraph(AROLL, BROLL)
+    assert graph["inputs"] == ["a0.mp4", "a1.mp4", "b0.mp4"]
+    assert "[av0][aa0][av1][aa1]concat=n=2:v=1:a=1[basev][basea]" in graph["filter"]
+    # The clip without audio gets silence of its own length
+    assert chain_for(graph, "aa1").startswith("anullsrc=")
+    assert f"fps={OUTPUT_FPS}" in chain_for(graph, "av0")
+    assert "setpts=PTS-STARTPTS+3.000/TB" in chain_for(graph, "b0")
+    # B-Roll runs to 4.5s, past the 4s voiceover: the timeline is padded
+    assert "tpad=stop_mode=add:stop_duration=0.500" in graph["filter"]
+    [out] = graph["outputs"]
+    assert (out["name"], out["duration"]) == ("final", 4.5)
+
+
+def test_filtergraph_fans_out_variants_from_one_decode():
+    variants = [
+        {"name": "final", "layer": "final", "height": None},
+        {"name": "preview", "layer": "final", "height": 640},
+        {"name": "aroll", "layer": "aroll", "height": None},
+    ]
+    graph = build_filtergraph(AROLL, BROLL, variants=variants)
+    assert graph["inputs"].count("a0.mp4") == 1
+    outputs = {o["name"]: o for o in graph["outputs"]}
+    assert outputs["aroll"]["duration"] == 4.0
+    assert outputs["final"]["duration"] == 4.5
+    assert outputs["preview"]["video"].endswith("s")
+    assert "scale=-2:640" in graph["filter"]
+
+
+def test_filtergraph_pip_outside_b_roll_discards_the_bubble():
+    graph = build_filtergraph(AROLL, [{**BROLL[0], "overlay_start": 4.0}], pip_mode=True)
+    assert "[pip]nullsink" in graph["filter"]
+    graph = build_filtergraph(AROLL, BROLL, pip_mode=True)
+    assert "enable='between(t,3.000,4.000)'" in graph["filter"]
+
+
+def test_window_graph_opens_only_the_inputs_on_screen():
+    aroll = [{**a, "hash": a["path"]} for a in AROLL]
+    graph = build_window_graph(aroll, BROLL, False, 2.0, 4.0, 4.5, [{"height": None}])
+    assert graph["inputs"] == ["a1.mp4", "b0.mp4"]
+    assert "trim=start=0.000:end=2.000" in chain_for(graph, "av0")
+    assert "setpts=PTS-STARTPTS+1.000/TB" in chain_for(graph, "b0")
+    assert "fade=t=in" not in chain_for(graph, "segv")
+    assert f"fade=t=out:st={4.5 - 0.8 - 2.0:.3f}" in chain_for(graph, "segv")
+
+
+def test_window_graph_past_the_voiceover_starts_from_black():
+    graph = build_window_graph(AROLL, BROLL, False, 4.0, 4.5, 4.5, [{"height": None}])
+    assert graph["inputs"] == ["b0.mp4"]
+    assert graph["filter"].startswith(f"color=c=black:s={FRAME_W}x{FRAME_H}")
+
+
+@pytest.fixture(scope="module")
+def clips(tmp_path_factory):
+    """Tiny real clips: 16:9 A-Roll (one silent), 4:3 B-Roll."""
+    tmp = tmp_path_factory.mktemp("clips")
+    ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+    made = {}
+    for name, size, audio in (("a0", "320x180", True), ("a1", "320x180", False), ("b0", "240x180", False)):
+        path = str(tmp / f"{name}.mp4")
+        cmd = [ffmpeg, "-y", "-v", "error", "-f", "lavfi", "-i", f"testsrc=s={size}:r=24:d=2"]
+        if audio:
+            cmd += ["-f", "lavfi", "-i", "sine=d=2", "-c:a", "aac"]
+        subprocess.run(cmd + ["-c:v", "libx264", "-preset", "ultrafast", "-shortest", path], check=True)
+        made[name] = path
+    return made
+
+
+def run_graph(graph, maps):
+    cmd = [imageio_ffmpeg.get_ffmpeg_exe(), "-v", "error"]
+    for path in graph["inputs"]:
+        cmd += ["-i", path]
+    cmd += ["-filter_complex", graph["filter"]]
+    for label in maps:
+        cmd += ["-map", f"[{label}]"]
+    result = subprocess.run(cmd + ["-f", "null", "-"], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_ffmpeg_accepts_the_graphs(clips):
+    aroll = [{**a, "path": clips[a["path"][:2]]} for a in AROLL]
+    broll = [{**BROLL[0], "path": clips["b0"]}]
+    variants = [
+        {"name": "final", "layer": "final", "height": None},
+        {"name": "aroll", "layer": "aroll", "height": 640},
+    ]
+    graph = build_filtergraph(aroll, broll, pip_mode=True, variants=variants)
+    run_graph(graph, [label for out in graph["outputs"] for label in (out["video"], out["audio"])])
+
+    for start, end in ((0.0, 2.0), (2.0, 4.0), (4.0, 4.5)):
+        graph = build_window_graph(aroll, broll, True, start, end, 4.5, [{"height": None}])
+        run_graph(graph, [label for _, label in graph["outputs"]])
@@ -0,0 +1,102 @@
+"""Token-bucket quota limiter: bucket arithmetic, SQLite backend, acquire()."""
+
+import pickle
+from types import SimpleNamespace
+
+import pytest
+
+import app.services.quota_tracker as quota_tracker
+from app.config import get_settings
+from app.services.quota_tracker import QuotaExhausted, sqlite_backend
+from app.services.quota_tracker.base import DAY_SECONDS, refill, slot_wait
+from app.services.quota_tracker.sqlite_backend import SQLiteQuotaBackend
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(sqlite_backend, "time", SimpleNamespace(time=clock.time))
+    return clock
+
+
+@pytest.fixture
+def backend(tmp_path, clock):
+    return SQLiteQuotaBackend(str(tmp_path / "quota.sqlite3"))
+
+
+def test_refill_starts_full_and_caps_at_rpm():
+    assert refill(None, 0.0, 100.0, rpm=4) == 4.0
+    assert refill(0.0, 100.0, 115.0, rpm=4) == pytest.approx(1.0)
+    assert refill(3.5, 100.0, 1000.0, rpm=4) == 4.0
+
+
+def test_slot_wait_takes_the_longer_limit():
+    assert slot_wait(tokens=1.0, rpm=4, day_count=0, oldest=None, rpd=10, now=0.0) == 0.0
+    assert slot_wait(tokens=0.5, rpm=4, day_count=0, oldest=None, rpd=10, now=0.0) == pytest.approx(7.5)
+    assert slot_wait(tokens=0.5, rpm=4, day_count=10, oldest=0.0, rpd=10, now=100.0) == DAY_SECONDS - 100.0
+    # 0 disables a limit
+    assert slot_wait(tokens=0.0, rpm=0, day_count=99, oldest=0.0, rpd=0, now=1.0) == 0.0
+
+
+def test_bucket_allows_a_burst_then_one_per_interval(backend, clock):
+    assert [backend.try_acquire("veo", rpm=2, rpd=0) for _ in range(2)] == [0.0, 0.0]
+    assert backend.try_acquire("veo", rpm=2, rpd=0) == pytest.approx(30.0)
+    assert backend.usage("veo", rpm=2, rpd=0) == (2, 2, pytest.approx(30.0))
+
+    clock.now += 30
+    assert backend.try_acquire("veo", rpm=2, rpd=0) == 0.0
+    assert backend.try_acquire("veo", rpm=2, rpd=0) > 0
+
+
+def test_denied_requests_consume_nothing(backend):
+    backend.try_acquire("veo", rpm=1, rpd=0)
+    for _ in range(3):
+        backend.try_acquire("veo", rpm=1, rpd=0)
+    assert backend.usage("veo", rpm=1, rpd=0)[:2] == (1, 1)
+
+
+def test_daily_limit_rolls_over_after_24h(backend, clock):
+    assert backend.try_acquire("imagen", rpm=0, rpd=1) == 0.0
+    clock.now += 3600
+    assert backend.try_acquire("imagen", rpm=0, rpd=1) == pytest.approx(DAY_SECONDS - 3600)
+
+    clock.now += DAY_SECONDS - 3600
+    assert backend.try_acquire("imagen", rpm=0, rpd=1) == 0.0
+
+
+def test_apis_have_separate_buckets(backend):
+    assert backend.try_acquire("veo", rpm=1, rpd=0) == 0.0
+    assert backend.try_acquire("imagen", rpm=1, rpd=0) == 0.0
+
+
+def test_state_is_shared_between_backend_instances(tmp_path, clock):
+    path = str(tmp_path / "quota.sqlite3")
+    SQLiteQuotaBackend(path).try_acquire("veo", rpm=1, rpd=0)
+    assert SQLiteQuotaBackend(path).try_acquire("veo", rpm=1, rpd=0) > 0
+
+
+def test_acquire_raises_quota_exhausted_past_max_wait(backend, monkeypatch):
+    monkeypatch.setattr(quota_tracker, "_backend", backend)
+    monkeypatch.setattr(get_settings(), "veo_quota_rpm", 1)
+    monkeypatch.setattr(get_settings(), "veo_quota_rpd", 0)
+
+    quota_tracker.acquire("veo", max_wait=0)
+    with pytest.raises(QuotaExhausted) as exc_info:
+        quota_tracker.acquire("veo", max_wait=5)
+    assert exc_info.value.api == "veo"
+    assert exc_info.value.wait_seconds == pytest.approx(60.0)
+    assert isinstance(exc_info.value, RuntimeError)
+
+
+def test_quota_exhausted_survives_pickling():
+    error = pickle.loads(pickle.dumps(QuotaExhausted("imagen", 12.0)))
+    assert (error.api, error.wait_seconds) == ("imagen", 12.0)
+    assert str(error) == "imagen quota exhausted: next request slot in 12s"
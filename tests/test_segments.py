@@ -0,0 +1,82 @@
+"""Segment windows and keys: a change re-renders only the segments it touches."""
+
+import pytest
+
+from app.services.ugc_pipeline.segments import (
+    SEGMENT_SECONDS,
+    segment_bounds,
+    segment_inputs,
+    segment_key,
+)
+
+SPEC = {"height": None, "crf": 18, "preset": "medium"}
+AROLL = [{"hash": "a0", "duration": 5.0}, {"hash": "a1", "duration": 5.0}]
+BROLL = [
+    {"hash": "b0", "overlay_start": 1.0, "duration": 2.0, "crop": ""},
+    {"hash": "b1", "overlay_start": 6.5, "duration": 2.0, "crop": ""},
+]
+DURATION = 10.0
+
+
+def keys(aroll=AROLL, broll=BROLL, pip_mode=False, duration=DURATION, spec=SPEC):
+    bounds = segment_bounds(duration, cuts=[5.0])
+    return [segment_key(segment_inputs(s, e, aroll, broll, pip_mode, duration), spec) for s, e in bounds]
+
+
+def changed(before, after):
+    return [i for i, (a, b) in enumerate(zip(before, after, strict=True)) if a != b]
+
+
+def test_bounds_never_straddle_a_scene_cut():
+    assert segment_bounds(10.0, cuts=[5.0]) == [(0.0, 2.0), (2.0, 5.0), (5.0, 7.0), (7.0, 10.0)]
+
+
+def test_bounds_fold_a_short_remainder_into_the_last_window():
+    assert segment_bounds(4.9) == [(0.0, 2.0), (2.0, 4.9)]
+    assert segment_bounds(5.5) == [(0.0, 2.0), (2.0, 4.0), (4.0, 5.5)]
+
+
+def test_bounds_snap_cuts_to_the_frame_grid_and_skip_a_cut_near_the_end():
+    assert segment_bounds(6.0, cuts=[3.01]) == [(0.0, 3.0), (3.0, 6.0)]
+    assert segment_bounds(6.0, cuts=[6.0 - SEGMENT_SECONDS / 4]) == [(0.0, 2.0), (2.0, 4.0), (4.0, 6.0)]
+
+
+def test_inputs_list_only_what_is_on_screen():
+    inputs = segment_inputs(5.0, 7.0, AROLL, BROLL, pip_mode=True, duration=DURATION)
+    assert inputs["aroll"] == [["a1", 0.0, 2.0]]
+    assert inputs["broll"] == [["b1", 6.5, 2.0, "", 0.0, 0.5]]
+    assert inputs["pip"] is True
+    assert "fade_in" not in inputs and "fade_out_start" not in inputs
+
+    first = segment_inputs(0.0, 2.0, AROLL, [], pip_mode=True, duration=DURATION)
+    assert first["fade_in"] > 0 and "pip" not in first
+
+
+def test_inputs_mark_the_b_roll_overhang_past_the_voiceover():
+    broll = [{"hash": "b2", "overlay_start": 9.0, "duration": 3.0, "crop": ""}]
+    inputs = segment_inputs(10.0, 12.0, AROLL, broll, pip_mode=False, duration=12.0)
+    assert inputs["aroll"] == []
+    assert inputs["base_end"] == 10.0
+    assert inputs["fade_out_start"] == pytest.approx(12.0 - 0.8)
+
+
+def test_swapping_a_b_roll_clip_invalidates_only_its_segments():
+    swapped = [BROLL[0], {**BROLL[1], "hash": "b1-new"}]
+    assert changed(keys(), keys(broll=swapped)) == [2, 3]
+
+
+def test_replacing_an_a_roll_clip_invalidates_only_its_scene():
+    replaced = [AROLL[0], {**AROLL[1], "hash": "a1-new"}]
+    assert changed(keys(), keys(aroll=replaced)) == [2, 3]
+
+
+def test_encode_settings_and_pip_invalidate_affected_segments():
+    assert changed(keys(), keys(spec={**SPEC, "crf": 23})) == [0, 1, 2, 3]
+    assert changed(keys(), keys(spec={**SPEC, "height": 640})) == [0, 1, 2, 3]
+    # PiP only affects windows with B-Roll on screen
+    assert changed(keys(broll=BROLL[:1]), keys(broll=BROLL[:1], pip_mode=True)) == [0, 1]
+
+
+def test_keys_are_stable():
+    assert keys() == keys()
+    assert len(set(keys())) == 4
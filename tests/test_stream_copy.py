@@ -0,0 +1,37 @@
+"""No-B-Roll stream-copy fast path only runs when it matches a full render."""
+
+import subprocess
+
+import imageio_ffmpeg
+import pytest
+
+from app.services.ugc_pipeline import ugc_compositor
+from app.services.ugc_pipeline.probe_index import get_media_info
+
+
+def make_clip(path, fps, size="720x1280"):
+    subprocess.run(
+        [imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-v", "error", "-f", "lavfi",
+         "-i", f"testsrc=s={size}:r={fps}:d=4", "-c:v", "libx264", "-g", str(fps),
+         "-pix_fmt", "yuv420p", str(path)],
+        check=True,
+    )
+    return str(path)
+
+
+def final_spec(path):
+    return [{"height": None, "path": str(path), "crf": 23, "preset": "veryfast"}]
+
+
+@pytest.mark.parametrize("fps,copied", [(ugc_compositor.OUTPUT_FPS, True), (24, False)])
+def test_fast_path_requires_output_fps(tmp_path, fps, copied):
+    base = make_clip(tmp_path / "base.mp4", fps)
+    out = tmp_path / "out.mp4"
+    assert ugc_compositor._compose_by_stream_copy(base, final_spec(out)) is copied
+    if copied:
+        assert get_media_info(str(out))["fps"] == pytest.approx(ugc_compositor.OUTPUT_FPS)
+
+
+def test_fast_path_requires_output_frame(tmp_path):
+    base = make_clip(tmp_path / "base.mp4", ugc_compositor.OUTPUT_FPS, size="640x1136")
+    assert not ugc_compositor._compose_by_stream_copy(base, final_spec(tmp_path / "out.mp4"))
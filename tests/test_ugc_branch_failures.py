@@ -0,0 +1,122 @@
+"""Both video branches fail (one through its slot chord), then retry reaches compose."""
+
+import pytest
+from sqlalchemy.orm import Session
+
+import app.services.ugc_pipeline.asset_generator as asset_generator
+import app.ugc_tasks as ugc_tasks
+from app.models import UGCJob
+from app.state_machines import ugc_graph
+
+SCENES = [{"visual_prompt": f"scene {i}", "script_text": "hi"} for i in range(3)]
+SHOTS = [{"animation_prompt": f"shot {i}"} for i in range(2)]
+
+
+@pytest.fixture
+def job_id(sync_db):
+    """A job with both image stages approved and both video stages running."""
+    with Session(sync_db) as session:
+        job = UGCJob(
+            product_name="p", description="d", status="running", use_mock=True,
+            aroll_scenes=SCENES, aroll_image_paths=["a.png"],
+            broll_shots=SHOTS, broll_image_paths=["b0.png", "b1.png"],
+            stage_states={
+                "analysis": "approved", "script": "approved",
+                "aroll_images": "approved", "broll_images": "approved",
+                "aroll_videos": "running", "broll_videos": "running",
+            },
+        )
+        session.add(job)
+        session.commit()
+        return job.id
+
+
+@pytest.fixture
+def chords(monkeypatch):
+    """Capture fanned-out chords instead of sending them; no ingest."""
+    queued = []
+
+    class Chord:
+        def __init__(self, job_id, kind, slots, force_new=False, stage_task=""):
+            self.args = (job_id, kind, list(slots), force_new, stage_task)
+
+        def apply_async(self):
+            queued.append(self)
+
+    monkeypatch.setattr(ugc_tasks, "_video_slots_chord", Chord)
+    monkeypatch.setattr(ugc_tasks.ugc_ingest_clips, "delay", lambda *a, **k: None)
+    return queued
+
+
+def run_chord(chord, errback=False):
+    """Run a captured chord's slot subtasks and its callback (and errback)."""
+    job_id, kind, slots, force_new, stage_task = chord.args
+    results = [ugc_tasks.ugc_video_slot.run(job_id, kind, i, force_new) for i in slots]
+    ugc_tasks.ugc_video_slots_done.run(results, job_id, kind, stage_task)
+    if errback:
+        ugc_tasks.ugc_video_slots_failed(None, RuntimeError("lost"), None, job_id, kind, stage_task)
+    return results
+
+
+def set_clips(monkeypatch, fail_aroll=(), fail_broll=()):
+    def clip(prefix, failing, tag):
+        def generate(index, **kwargs):
+            if index in failing:
+                raise RuntimeError(f"[{tag}:{index}] blocked")
+            return f"/clips/{prefix}{index}.mp4"
+        return generate
+
+    monkeypatch.setattr(asset_generator, "generate_aroll_clip", clip("a", fail_aroll, "aroll_scene"))
+    monkeypatch.setattr(asset_generator, "generate_broll_clip", clip("b", fail_broll, "broll_shot"))
+
+
+def load(sync_db, job_id):
+    with Session(sync_db) as session:
+        return session.get(UGCJob, job_id)
+
+
+def test_both_branches_fail_then_retry_reaches_compose(sync_db, job_id, chords, monkeypatch):
+    set_clips(monkeypatch, fail_aroll={1}, fail_broll={0})
+
+    # A-Roll: one slot fails; the callback fails the job, the errback must not break it
+    ugc_tasks.ugc_stage_3_aroll.run(job_id)
+    run_chord(chords.pop(), errback=True)
+    job = load(sync_db, job_id)
+    assert job.status == "failed"
+    assert job.error_message == "[aroll_scene:1] blocked"
+    assert job.stage_states["aroll_videos"] == "failed"
+    assert job.aroll_paths == ["/clips/a0.mp4", None, "/clips/a2.mp4"]
+
+    # B-Roll fails while the job is already failed: still recorded on its stage
+    ugc_tasks.ugc_stage_4_broll.run(job_id)
+    run_chord(chords.pop())
+    job = load(sync_db, job_id)
+    assert job.status == "failed"
+    assert job.error_message == "[aroll_scene:1] blocked"
+    assert job.stage_states["broll_videos"] == "failed"
+
+    # Retry restarts both branches
+    with Session(sync_db) as session:
+        job = session.get(UGCJob, job_id)
+        tasks = ugc_graph.retry(job)
+        session.commit()
+    assert tasks == ["ugc_stage_3_aroll", "ugc_stage_4_broll"]
+
+    # Only the failed slots are generated again
+    set_clips(monkeypatch)
+    ugc_tasks.ugc_stage_3_aroll.run(job_id)
+    ugc_tasks.ugc_stage_4_broll.run(job_id)
+    assert [c.args[2] for c in chords] == [[1], [0]]
+    for chord in list(chords):
+        run_chord(chord)
+
+    job = load(sync_db, job_id)
+    assert job.status == "stage_aroll_review"
+    assert job.stage_states["broll_videos"] == "review"
+
+    # Approving both video gates starts compose
+    with Session(sync_db) as session:
+        job = session.get(UGCJob, job_id)
+        assert ugc_graph.approve_gate(job) == []
+        assert job.status == "stage_broll_review"
+        assert ugc_graph.approve_gate(job) == ["ugc_stage_5_compose"]
@@ -0,0 +1,144 @@
+"""Stage graph and scheduler: dependencies, gate order, retry and rewinds."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import get_settings
+from app.state_machines import ugc_graph
+from app.state_machines.ugc_graph import STAGES_BY_NAME
+
+
+def make_job(status="pending", stage_states=None, **columns):
+    """Stand-in for UGCJob: the scheduler only reads status, stage_states and outputs."""
+    outputs = {col: None for stage in ugc_graph.STAGES for col in stage.outputs}
+    return SimpleNamespace(id=1, status=status, stage_states=stage_states, **{**outputs, **columns})
+
+
+@pytest.fixture
+def linear(monkeypatch):
+    monkeypatch.setattr(get_settings(), "ugc_parallel_stages", False)
+
+
+def test_requires_follows_the_graph():
+    assert ugc_graph.requires(STAGES_BY_NAME["analysis"]) == ()
+    assert ugc_graph.requires(STAGES_BY_NAME["broll_images"]) == ("script",)
+    assert ugc_graph.requires(STAGES_BY_NAME["compose"]) == ("aroll_videos", "broll_videos")
+
+
+def test_requires_chains_every_stage_when_linear(linear):
+    assert ugc_graph.requires(STAGES_BY_NAME["broll_images"]) == ("aroll_videos",)
+    assert ugc_graph.requires(STAGES_BY_NAME["compose"]) == ("broll_videos",)
+
+
+def test_dependents_and_downstream_columns():
+    assert [s.name for s in ugc_graph.dependents("aroll_images")] == ["aroll_videos", "compose"]
+    assert ugc_graph.downstream_columns("stage_broll_image_review") == ["broll_paths", "final_video_path"]
+    assert ugc_graph.downstream_columns("stage_script_review") == [
+        "aroll_image_paths", "aroll_paths", "broll_image_paths", "broll_paths", "final_video_path",
+    ]
+
+
+def test_script_approval_starts_both_image_branches():
+    job = make_job()
+    assert ugc_graph.start_job(job) == ["ugc_stage_1_analyze"]
+
+    ugc_graph.finish_stage(job, "analysis")
+    assert job.status == "stage_analysis_review"
+    assert ugc_graph.approve_gate(job) == ["ugc_stage_2_script"]
+
+    ugc_graph.finish_stage(job, "script")
+    assert ugc_graph.approve_gate(job) == ["ugc_stage_3a_aroll_images", "ugc_stage_4a_broll_images"]
+    assert job.status == "running"
+    assert ugc_graph.stage_state(job, "aroll_images") == "running"
+    assert ugc_graph.stage_state(job, "broll_images") == "running"
+
+
+def test_script_approval_starts_one_stage_when_linear(linear):
+    job = make_job("stage_script_review", {"analysis": "approved", "script": "review"})
+    assert ugc_graph.approve_gate(job) == ["ugc_stage_3a_aroll_images"]
+
+
+def test_finished_branch_waits_for_the_open_gate():
+    job = make_job("running", {
+        "analysis": "approved", "script": "approved",
+        "aroll_images": "running", "broll_images": "running",
+    })
+    ugc_graph.finish_stage(job, "broll_images")
+    assert job.status == "stage_broll_image_review"
+
+    # A-Roll images finish while the B-Roll gate is open: they wait in review
+    ugc_graph.finish_stage(job, "aroll_images")
+    assert job.status == "stage_broll_image_review"
+    assert ugc_graph.stage_state(job, "aroll_images") == "review"
+
+    # Approving B-Roll images starts B-Roll videos and presents the waiting gate
+    assert ugc_graph.approve_gate(job) == ["ugc_stage_4_broll"]
+    assert job.status == "stage_aroll_image_review"
+
+
+def test_compose_waits_for_both_video_branches():
+    job = make_job("stage_aroll_review", {
+        "analysis": "approved", "script": "approved",
+        "aroll_images": "approved", "broll_images": "approved",
+        "aroll_videos": "review", "broll_videos": "running",
+    })
+    assert ugc_graph.approve_gate(job) == []
+    assert job.status == "running"
+
+    ugc_graph.finish_stage(job, "broll_videos")
+    assert job.status == "stage_broll_review"
+    assert ugc_graph.approve_gate(job) == ["ugc_stage_5_compose"]
+
+
+def test_fail_stage_records_once_and_ignores_unknown_tasks():
+    job = make_job("running", {"analysis": "approved", "script": "running"})
+    ugc_graph.fail_stage(job, "ugc_stage_2_script")
+    ugc_graph.fail_stage(job, "ugc_stage_2_script")
+    ugc_graph.fail_stage(job, "ugc_regen_script")
+    assert job.stage_states == {"analysis": "approved", "script": "failed"}
+
+
+def test_retry_restarts_failed_and_stalled_stages():
+    job = make_job("failed", {
+        "analysis": "approved", "script": "approved",
+        "aroll_images": "approved", "broll_images": "approved",
+        "aroll_videos": "failed", "broll_videos": "running",
+    })
+    assert ugc_graph.retry(job) == ["ugc_stage_3_aroll", "ugc_stage_4_broll"]
+    assert job.status == "running"
+    assert ugc_graph.stages_in(job, "running") == [STAGES_BY_NAME["aroll_videos"], STAGES_BY_NAME["broll_videos"]]
+
+
+def test_retry_resumes_a_legacy_job_from_its_last_output():
+    job = make_job("failed", master_script="s", aroll_image_paths=["a.png"])
+    assert ugc_graph.retry(job) == ["ugc_stage_3_aroll", "ugc_stage_4a_broll_images"]
+    assert job.stage_states["aroll_images"] == "approved"
+
+
+def test_retry_without_a_recorded_failure_falls_back_to_the_checkpoint():
+    approved = {s.name: "approved" for s in ugc_graph.STAGES}
+    job = make_job("failed", {**approved, "compose": "review"}, final_video_path="/review/ad.mp4")
+    assert ugc_graph.retry(job) == ["ugc_stage_5_compose"]
+
+
+def test_reopen_gate_resets_only_downstream_stages():
+    approved = {s.name: "approved" for s in ugc_graph.STAGES}
+    job = make_job("stage_composition_review", {**approved, "compose": "review"})
+    assert ugc_graph.busy_dependents(job, "stage_aroll_image_review") == []
+
+    ugc_graph.reopen_gate(job, "stage_aroll_image_review")
+    assert job.status == "stage_aroll_image_review"
+    assert job.stage_states["aroll_images"] == "review"
+    assert job.stage_states["aroll_videos"] == "pending"
+    assert job.stage_states["compose"] == "pending"
+    assert job.stage_states["broll_videos"] == "approved"
+
+
+def test_busy_dependents_reports_running_downstream_stages():
+    job = make_job("stage_aroll_image_review", {
+        "analysis": "approved", "script": "approved",
+        "aroll_images": "review", "broll_images": "approved", "broll_videos": "running",
+    })
+    assert ugc_graph.busy_dependents(job, "stage_aroll_image_review") == []
+    assert ugc_graph.busy_dependents(job, "stage_script_review") == [STAGES_BY_NAME["broll_videos"]]
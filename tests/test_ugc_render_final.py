@@ -0,0 +1,43 @@
+"""ugc_render_final keeps the clip conform writes made while composing."""
+
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
+
+import app.ugc_tasks as ugc_tasks
+from app.models import UGCJob
+
+
+def make_job(sync_db, **fields):
+    with Session(sync_db) as session:
+        job = UGCJob(
+            product_name="p", description="d", status="stage_composition_review",
+            use_mock=True, aroll_paths=["/clips/a0.mp4"], broll_paths=["/clips/b0.mp4"],
+            final_video_path="/review/draft.mp4", render_profile="draft", **fields,
+        )
+        session.add(job)
+        session.commit()
+        return job.id
+
+
+def load(sync_db, job_id):
+    with Session(sync_db) as session:
+        return session.get(UGCJob, job_id)
+
+
+def test_render_final_keeps_conformed_clip_paths(sync_db, monkeypatch):
+    job_id = make_job(sync_db)
+
+    def compose(job, profile):
+        # What _conform_job_column does when a clip had to be re-conformed
+        job.aroll_paths = ["/clips/a0_conformed.mp4"]
+        flag_modified(job, "aroll_paths")
+        return f"/review/{profile}.mp4"
+
+    monkeypatch.setattr(ugc_tasks, "_compose_job", compose)
+    ugc_tasks.ugc_render_final.run(job_id)
+
+    job = load(sync_db, job_id)
+    assert job.final_video_path == "/review/final.mp4"
+    assert job.render_profile == "final"
+    assert job.aroll_paths == ["/clips/a0_conformed.mp4"]
+    assert job.broll_paths == ["/clips/b0.mp4"]